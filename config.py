@@ -1,26 +1,112 @@
 import configparser 
 import os
 
+
+def read_float_section (config :configparser .ConfigParser ,section :str )->dict :
+    """
+    Метод для чтения секции вида ключ = число (без ключей из DEFAULT)
+    :param config: Прочитанный config.ini
+    :param section: Имя секции
+    :return: Словарь ключ -> число
+    """
+    if not config .has_section (section ):
+        return {}
+    return {
+    key :float (value )
+    for key ,value in config .items (section )
+    if key not in config .defaults ()
+    }
+
+
+def read_list (config :configparser .ConfigParser ,section :str ,key :str )->list :
+    """
+    Метод для чтения значения-списка через запятую
+    :param config: Прочитанный config.ini
+    :param section: Имя секции
+    :param key: Имя ключа
+    :return: Список непустых элементов
+    """
+    return [
+    item .strip ()
+    for item in config .get (section ,key ,fallback ='').split (',')
+    if item .strip ()
+    ]
+
+
+def read_cache_section (config :configparser .ConfigParser ,section :str )->dict :
+    """
+    Метод для чтения секции вида агент = ttl, размер
+    :param config: Прочитанный config.ini
+    :param section: Имя секции
+    :return: Словарь имя агента -> {'ttl': секунды, 'maxsize': число записей}
+    """
+    if not config .has_section (section ):
+        return {}
+    caches ={}
+    for key ,value in config .items (section ):
+        if key in config .defaults ()or not value .strip ():
+            continue
+        ttl ,maxsize =(item .strip ()for item in value .split (','))
+        caches [key ]={'ttl':float (ttl ),'maxsize':int (maxsize )}
+    return caches 
+
+
+# Декоратор агента для кэширования ответов (см. agent_factory.load_agents)
+CACHING_AGENT ="service.utils.agent_cache.CachingAgent"
+
+# Имя агента в приложении -> имя класса; модуль реализации задаётся в config.ini
+AGENT_CLASSES ={
+"auth_agent":"OstisAuthAgent",
+"reg_agent":"OstisRegAgent",
+"verification_agent":"OstisVerificationAgent",
+"user_request_agent":"OstisUserRequestAgent",
+"directory_agent":"OstisDirectoryAgent",
+"add_event_agent":"OstisAddEventAgent",
+"delete_event_agent":"OstisDeleteEventAgent",
+"show_event_agent":"OstisShowEventAgent",
+"test_agent":"OstisTestAgent",
+"profile_agent":"OstisProfileAgent",
+"history_agent":"OstisHistoryAgent",
+"bookmarks_agent":"OstisBookmarksAgent",
+"notes_agent":"OstisNotesAgent",
+"forum_agent":"OstisForumAgent"
+}
+
+# Имя агента в приложении -> декораторы, которые применяются всегда (после CachingAgent)
+AGENT_DECORATORS ={
+"forum_agent":("service.utils.topic_catalog.CatalogForumAgent",)
+}
+
+
+def agents_to_load (module :str ,caches :dict =None )->dict :
+    """
+    Метод для построения спецификаций агентов из одного модуля реализации
+    :param module: Модуль с реализациями агентов (service.agents.ostis или service.agents.mock)
+    :param caches: Имя агента -> параметры CachingAgent (ttl, maxsize)
+    :return: Словарь имя агента -> путь к классу или (путь к классу, декораторы...)
+    """
+    caches =caches or {}
+    specs ={}
+    for agent_name ,class_name in AGENT_CLASSES .items ():
+        path =f"{module }.{class_name }"
+        decorators =list (AGENT_DECORATORS .get (agent_name ,()))
+        if agent_name in caches :
+            decorators .insert (0 ,(CACHING_AGENT ,caches [agent_name ]))
+        specs [agent_name ]=(path ,*decorators )if decorators else path 
+    return specs
+
+
 class Config:
     config = configparser.ConfigParser()
     base_dir = os.path.dirname(os.path.abspath(__file__))
     config_path = os.path.join(base_dir, 'config.ini')
     config.read(config_path)
     
-    AGENTS_TO_LOAD ={
-    "auth_agent":"service.agents.ostis.OstisAuthAgent",
-    "reg_agent":"service.agents.ostis.OstisRegAgent",
-    "user_request_agent":"service.agents.ostis.OstisUserRequestAgent",
-    "directory_agent":"service.agents.ostis.OstisDirectoryAgent",
-    "add_event_agent":"service.agents.ostis.OstisAddEventAgent",
-    "delete_event_agent":"service.agents.ostis.OstisDeleteEventAgent",
-    "show_event_agent":"service.agents.ostis.OstisShowEventAgent",
-    "test_agent":"service.agents.ostis.OstisTestAgent",
-    "profile_agent":"service.agents.ostis.OstisProfileAgent",
-    "history_agent":"service.agents.ostis.OstisHistoryAgent",
-    "bookmarks_agent":"service.agents.ostis.OstisBookmarksAgent",
-    "notes_agent":"service.agents.ostis.OstisNotesAgent"
-    }
+    AGENTS_MODULE =config .get ('AGENTS','module',fallback ='service.agents.ostis').strip ()
+    AGENT_CACHES =read_cache_section (config ,'AGENT_CACHE')
+    AGENTS_TO_LOAD =agents_to_load (AGENTS_MODULE ,AGENT_CACHES )
+    # Ключ подписи сессии: переменная окружения SECRET_KEY или [SERVER] secret_key
+    SECRET_KEY =os .environ .get ('SECRET_KEY')or config .get ('SERVER','secret_key',fallback ='').strip ()or None 
     OSTIS_URL =config ['DEFAULT']['ostis_url']
     PROTOCOL =config ['SERVER']['SC_SERVER_PROTOCOL']
     HOST =config ['SERVER']['SC_SERVER_HOST']
@@ -28,6 +114,43 @@ class Config:
     PROTOCOL_DEFAULT =config ['SERVER']['SC_SERVER_PROTOCOL_DEFAULT']
     HOST_DEFAULT =config ['SERVER']['SC_SERVER_HOST_DEFAULT']
     PORT_DEFAULT =config ['SERVER']['SC_SERVER_PORT_DEFAULT']
+    SC_POOL_SIZE =config .getint ('SC_POOL','size',fallback =4 )
+    SC_POOL_CHECKOUT_TIMEOUT =config .getfloat ('SC_POOL','checkout_timeout',fallback =5 )
+    SC_POOL_HEALTH_CHECK_INTERVAL =config .getfloat ('SC_POOL','health_check_interval',fallback =30 )
+    SC_POOL_EVENT_WORKERS =config .getint ('SC_POOL','event_workers',fallback =4 )
+    BREAKER_FAILURE_THRESHOLD =config .getint ('CIRCUIT_BREAKER','failure_threshold',fallback =5 )
+    BREAKER_RESET_TIMEOUT =config .getfloat ('CIRCUIT_BREAKER','reset_timeout',fallback =30 )
+    BREAKER_HALF_OPEN_PROBES =config .getint ('CIRCUIT_BREAKER','half_open_probes',fallback =1 )
+    ACTION_TIMEOUT_FLOOR =config .getfloat ('ACTION_TIMEOUTS','floor',fallback =2 )
+    ACTION_TIMEOUT_CEILING =config .getfloat ('ACTION_TIMEOUTS','ceiling',fallback =30 )
+    ACTION_TIMEOUT_HEADROOM =config .getfloat ('ACTION_TIMEOUTS','headroom',fallback =2 )
+    ACTION_TIMEOUT_MIN_SAMPLES =config .getint ('ACTION_TIMEOUTS','min_samples',fallback =20 )
+    ACTION_TIMEOUT_WINDOW =config .getint ('ACTION_TIMEOUTS','window',fallback =200 )
+    ACTION_TIMEOUT_OVERRIDES =read_float_section (config ,'ACTION_TIMEOUT_OVERRIDES')
+    REAPER_MAX_AGE =config .getfloat ('ACTION_REAPER','max_age',fallback =600 )
+    REAPER_BATCH_SIZE =config .getint ('ACTION_REAPER','batch_size',fallback =50 )
+    REAPER_INTERVAL =config .getfloat ('ACTION_REAPER','interval',fallback =60 )
+    REAPER_TEMPORARY_ARGUMENTS =read_list (config ,'ACTION_REAPER','temporary_arguments')
+    REAPER_MAX_QUEUE =config .getint ('ACTION_REAPER','max_queue',fallback =10000 )
+    INTERNED_LINKS_CAPACITY =config .getint ('INTERNED_LINKS','capacity',fallback =4096 )
+    USER_DIRECTORY_CAPACITY =config .getint ('USER_DIRECTORY','capacity',fallback =4096 )
+    USER_LOADER_CACHE_TTL =config .getfloat ('USER_LOADER','cache_ttl',fallback =30 )
+    USER_LOADER_CACHE_SIZE =config .getint ('USER_LOADER','cache_size',fallback =1024 )
+    USER_LOADER_REVALIDATE_AFTER =config .getfloat ('USER_LOADER','revalidate_after',fallback =300 )
+    AUTHOR_DISPLAY_TTL =config .getfloat ('AUTHOR_DISPLAY','ttl',fallback =300 )
+    AUTHOR_DISPLAY_SIZE =config .getint ('AUTHOR_DISPLAY','maxsize',fallback =4096 )
+    REQUEST_MEMO_ENABLED =config .getboolean ('REQUEST_MEMO','enabled',fallback =True )
+    TOPIC_CATALOG_BUILD_ON_STARTUP =config .getboolean ('TOPIC_CATALOG','build_on_startup',fallback =True )
+    TOPIC_CATALOG_MESSAGES_IN_TEXT =config .getint ('TOPIC_CATALOG','messages_in_text',fallback =3 )
+    TOPIC_CATALOG_SYNC_INTERVAL =config .getfloat ('TOPIC_CATALOG','sync_interval',fallback =60 )
+    SCHEDULER_HIGH_WORKERS =config .getint ('SCHEDULER','high_workers',fallback =4 )
+    SCHEDULER_LOW_WORKERS =config .getint ('SCHEDULER','low_workers',fallback =1 )
+    SCHEDULER_LOW_QUEUE_SIZE =config .getint ('SCHEDULER','low_queue_size',fallback =1000 )
+    SINGLE_FLIGHT_ACTIONS =read_list (config ,'SINGLE_FLIGHT','actions')
+    SC_TRAFFIC_MODE =config .get ('SC_TRAFFIC','mode',fallback ='off').strip ()
+    SC_TRAFFIC_PATH =config .get ('SC_TRAFFIC','path',fallback ='sc_traffic.jsonl')
+    SC_TRAFFIC_LATENCY_SCALE =config .getfloat ('SC_TRAFFIC','latency_scale',fallback =0 )
+    SC_TRAFFIC_LATENCY =config .getfloat ('SC_TRAFFIC','latency',fallback =0 )
     MAX_SESSION_SIZE =4093 
 
 
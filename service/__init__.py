@@ -1,3 +1,5 @@
+import secrets 
+
 from flask import Flask 
 from flask_login import LoginManager 
 from flask_caching import Cache 
@@ -22,18 +24,35 @@ def create_app (config_path :str ='config.Config'):
     app .config .from_object (config_path )
     cache .init_app (app )
     login_manager .init_app (app )
+    from .utils .user_session import user_loader 
+    user_loader .init_app (app )
     from .views import main 
     app .register_blueprint (main )
+    from .utils import metrics 
+    metrics .init_app (app )
 
     from .agent_factory import load_agents 
     app .config ['agents']=load_agents ()
     app .json_encoder =SCJSONEncoder 
-    app .secret_key ='secret_key'
+    if not app .config .get ('SECRET_KEY'):
+        print ("[CONFIG] SECRET_KEY не задан: используется случайный ключ, сессии не переживут перезапуск")
+        app .secret_key =secrets .token_hex (32 )
 
     from .handlers import register_error_handlers 
     register_error_handlers (app )
+
+    from .utils import sc_traffic 
+    sc_traffic .init_app (app )
+    from .utils .keynode_registry import keynodes 
+    keynodes .init_app (app )
+    from .utils .request_memo import request_memo 
+    request_memo .init_app (app )
+    from .utils .action_reaper import action_reaper 
+    action_reaper .init_app (app )
     init_feedback_db()
     init_view_history_db()
     init_topic_tags_db()
+    from .utils .topic_catalog import topic_catalog 
+    topic_catalog .init_app (app )
 
     return app 
\ No newline at end of file
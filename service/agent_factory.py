@@ -1,6 +1,39 @@
 import importlib 
 from config import Config 
 
+# Агенты в памяти процесса, которым не нужен sc-сервер
+MOCK_AGENTS_MODULE ='service.agents.mock'
+
+
+def import_object (path :str ):
+    """
+    Метод для получения объекта по полному пути
+    :param path: Путь вида пакет.модуль.Имя
+    :return: Объект модуля
+    """
+    module_name ,object_name =path .rsplit (".",1 )
+    module =importlib .import_module (module_name )
+    return getattr (module ,object_name )
+
+
+def build_agent (agent_name :str ,spec ):
+    """
+    Метод для создания агента по спецификации из Config.AGENTS_TO_LOAD
+    :param agent_name: Имя агента
+    :param spec: Путь к классу или кортеж (путь к классу, декоратор, ...), где декоратор —
+        путь к фабрике или пара (путь, параметры); фабрика вызывается как
+        factory(agent, name=agent_name, **параметры) и возвращает обёрнутый агент
+    :return: Экземпляр агента, обёрнутый декораторами по порядку
+    """
+    if isinstance (spec ,str ):
+        spec =(spec ,)
+    agent_path ,*decorators =spec 
+    agent =import_object (agent_path )()
+    for decorator in decorators :
+        decorator_path ,options =(decorator ,{})if isinstance (decorator ,str )else decorator 
+        agent =import_object (decorator_path )(agent ,name =agent_name ,**options )
+    return agent 
+
 
 def load_agents ():
     """
@@ -8,9 +41,18 @@ def load_agents ():
     :return: Словарь с названием и классом агентов
     """
     agents ={}
-    for agent_name ,agent_path in Config .AGENTS_TO_LOAD .items ():
-        module_name ,class_name =agent_path .rsplit (".",1 )
-        module =importlib .import_module (module_name )
-        agent_class =getattr (module ,class_name )
-        agents [agent_name ]=agent_class ()
-    return agents 
\ No newline at end of file
+    for agent_name ,spec in Config .AGENTS_TO_LOAD .items ():
+        agents [agent_name ]=build_agent (agent_name ,spec )
+    return agents 
+
+
+def uses_sc_server ()->bool :
+    """
+    Метод для проверки, нужен ли загружаемым агентам sc-сервер
+    :return: False, если все агенты взяты из MOCK_AGENTS_MODULE
+    """
+    for spec in Config .AGENTS_TO_LOAD .values ():
+        agent_path =spec if isinstance (spec ,str )else spec [0 ]
+        if not agent_path .startswith (MOCK_AGENTS_MODULE +"."):
+            return True 
+    return False 
@@ -22,4 +22,13 @@ class AuthAgent (ABC ):
         :param password: Пароль пользователя для аутентификации
         :return: Словарь со статусом результата выполнения агента аутентификации
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod 
+    def find_user (self ,username :str ):
+        """
+        Абстрактный метод для поиска подтверждённого пользователя по email
+        :param username: Email пользователя
+        :return: Пользователь (service.models.User) или None
+        """
+        pass 
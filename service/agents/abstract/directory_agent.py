@@ -21,4 +21,12 @@ class DirectoryAgent (ABC ):
         :param content: Контент, по которому происходит поиск в БЗ
         :return: Словарь со статусом результата выполнения агента поиска
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod 
+    def term_titles (self )->list :
+        """
+        Абстрактный метод для получения названий терминов справочника
+        :return: Список названий терминов
+        """
+        pass 
@@ -64,4 +64,14 @@ class ShowEventAgent (ABC ):
         :param username: Логин пользователя
         :return:
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod 
+    def events_by_date (self ,username :str ,date :str ):
+        """
+        Абстрактный метод для получения событий пользователя на дату
+        :param username: Логин пользователя
+        :param date: Дата в формате ГГГГ-ММ-ДД
+        :return: EventResponse или None
+        """
+        pass 
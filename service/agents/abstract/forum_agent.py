@@ -0,0 +1,110 @@
+from abc import ABC, abstractmethod
+from enum import StrEnum
+from typing import Optional
+
+
+class ForumStatus(StrEnum):
+    """
+    Перечисление для представления статусов результата выполнения операций форума
+    """
+    VALID = "Valid"
+    INVALID = "Invalid"
+    ERROR = "Error"
+
+
+class ForumAgent(ABC):
+    """
+    Абстрактный класс для реализации агента форума
+    """
+
+    @abstractmethod
+    def get_all_topics(self) -> list:
+        """
+        Получить список всех топиков
+        :return: Список словарей с ключами addr, title, author
+        """
+        pass
+
+    @abstractmethod
+    def topic_addrs(self) -> list:
+        """
+        Получить адреса всех топиков без чтения их содержимого
+        :return: Список значений адресов топиков
+        """
+        pass
+
+    @abstractmethod
+    def get_topic_details(self, topic_addr) -> dict:
+        """
+        Получить детали топика
+        :param topic_addr: Адрес топика
+        :return: Словарь с ключами title, description, author (подпись), author_email;
+            если топик не удалось прочитать, дополнительно error с описанием ошибки
+        """
+        pass
+
+    @abstractmethod
+    def get_topic_messages(self, topic_addr) -> list:
+        """
+        Получить сообщения топика
+        :param topic_addr: Адрес топика
+        :return: Список словарей с ключами content, author, addr, likes, dislikes,
+            is_expert, image_base64, image_mime
+        """
+        pass
+
+    @abstractmethod
+    def add_topic(self, username: str, title: str, description: str) -> dict:
+        """
+        Создать топик
+        :param username: Email автора
+        :param title: Заголовок
+        :param description: Описание
+        :return: Словарь со статусом операции
+        """
+        pass
+
+    @abstractmethod
+    def add_message(self, username: str, topic_addr, message_text: str,
+                    image_base64: Optional[str] = None, image_name: Optional[str] = None,
+                    image_mime: Optional[str] = None) -> dict:
+        """
+        Добавить сообщение в топик
+        :param username: Email автора
+        :param topic_addr: Адрес топика
+        :param message_text: Текст сообщения
+        :param image_base64: Вложенное изображение в base64 (опционально)
+        :param image_name: Имя файла изображения
+        :param image_mime: MIME-тип изображения
+        :return: Словарь со статусом операции
+        """
+        pass
+
+    @abstractmethod
+    def rate_message(self, message_addr, rating_type: str) -> dict:
+        """
+        Оценить сообщение
+        :param message_addr: Адрес сообщения
+        :param rating_type: like или dislike
+        :return: Словарь со статусом операции
+        """
+        pass
+
+    @abstractmethod
+    def edit_message(self, message_addr, new_text: str) -> dict:
+        """
+        Изменить текст сообщения
+        :param message_addr: Адрес сообщения
+        :param new_text: Новый текст
+        :return: Словарь со статусом операции
+        """
+        pass
+
+    @abstractmethod
+    def delete_message(self, message_addr) -> dict:
+        """
+        Удалить сообщение
+        :param message_addr: Адрес сообщения
+        :return: Словарь со статусом операции
+        """
+        pass
@@ -21,4 +21,12 @@ class RequestAgent (ABC ):
         :param content: Контент, по которому происходит поиск в БЗ
         :return: Словарь со статусом результата выполнения агента юридических запросов
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def request_agents (self ,contents :list )->list :
+        """
+        Метод для запуска агента юридических запросов по нескольким запросам
+        :param contents: Список контентов для поиска в БЗ
+        :return: Список словарей со статусом результата в том же порядке
+        """
+        return [self .request_agent (content )for content in contents ]
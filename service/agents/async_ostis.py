@@ -0,0 +1,94 @@
+"""
+Асинхронный фасад для вызова агентов OSTIS.
+
+Использует тот же конвейер вызова, что и Ostis (ActionCall), но ожидание
+результата не занимает поток: несколько независимых вызовов агентов
+можно выполнять одновременно через asyncio.gather.
+"""
+
+import asyncio
+
+from sc_client.models import ScAddr, ScTemplate
+
+from config import Config
+from service.agents.ostis import call_back, call_back_request
+from service.exceptions import AgentError, ScServerError
+from service.utils.action_call import ActionCall
+from service.utils.sc_pool import client, is_connected
+from service.utils.single_flight import single_flight
+
+
+class AsyncOstis:
+    """
+    Класс для асинхронного вызова агентов OSTIS
+    """
+
+    def __init__(self, url: str = Config.OSTIS_URL):
+        self.ostis_url = url
+
+    async def invoke(self, action_name: str, arguments: list, callback=call_back, timeout: int = 10):
+        """
+        Метод для вызова агента без блокировки потока
+        :param action_name: Идентификатор класса действия
+        :param arguments: Аргументы действия по порядку rrel_1, rrel_2, ... (см. build_action)
+        :param callback: Колбэк-функция, извлекающая результат агента
+        :param timeout: Время ожидания в секундах до накопления статистики по действию
+        :return: Результат, переданный колбэком
+        :raises AgentError: Возникает при истечении времени ожидания
+        :raises ScServerError: Возникает при отсутствии sc-сервера или разомкнутом предохранителе
+        """
+        if not is_connected():
+            raise ScServerError()
+
+        key = single_flight.key(action_name, arguments, callback)
+        return await single_flight.do_async(key, lambda: self._invoke(action_name, arguments, callback, timeout))
+
+    async def _invoke(self, action_name: str, arguments: list, callback, timeout: int):
+        """
+        Вызов агента без объединения одинаковых вызовов (см. invoke)
+        """
+        return await ActionCall(action_name, arguments, callback, timeout).run_async()
+
+    async def template_search(self, template: ScTemplate) -> list:
+        """
+        Асинхронный поиск по шаблону
+        :param template: Шаблон поиска
+        :return: Результаты поиска
+        """
+        return await asyncio.to_thread(client.template_search, template)
+
+    async def get_link_contents(self, *links: ScAddr) -> list:
+        """
+        Асинхронное чтение содержимого sc-link одним запросом
+        :param links: Адреса sc-link
+        :return: Содержимое sc-link в том же порядке
+        """
+        if not links:
+            return []
+        contents = await asyncio.to_thread(client.get_link_content, *links)
+        return [content.data for content in contents]
+
+    async def call_user_request_agent(self, action_name: str, content: str):
+        """
+        Асинхронный вызов агента юридических запросов
+        :param action_name: Идентификатор action-ноды агента
+        :param content: Контент, по которому происходит поиск в БЗ
+        :return: Ответ сервера или None при таймауте и отсутствии sc-сервера
+        """
+        try:
+            return await self.invoke(action_name, [content], call_back_request, timeout=30)
+        except (AgentError, ScServerError) as e:
+            print(f"[REQUEST] action_user_request failed: {type(e).__name__}: {e.message}")
+            return None
+
+    @staticmethod
+    def run(*coroutines) -> list:
+        """
+        Выполнение нескольких вызовов одновременно из синхронного кода (например, из view)
+        :param coroutines: Корутины вызовов агентов
+        :return: Результаты в том же порядке; исключения возвращаются как значения
+        """
+        async def gather():
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+        return asyncio.run(gather())
+
@@ -1,142 +1,726 @@
-from .abstract .auth_agent import AuthAgent ,AuthStatus 
-from .abstract .reg_agent import RegAgent ,RegStatus 
-from .abstract .user_request_agent import RequestAgent ,RequestStatus 
-from .abstract .directory_agent import DirectoryAgent ,DirectoryStatus 
-from .abstract .event_agents import (
-AddEventStatus ,
-AddEventAgent ,
-DeleteEventStatus ,
-DeleteEventAgent ,
-ShowEventStatus ,
-ShowEventAgent 
+"""
+Агенты на данных в памяти процесса, без sc-сервера.
+
+Реализуют все абстрактные агенты с теми же именами классов, сигнатурами
+и формой ответов, что и service.agents.ostis, поэтому выбираются одной
+настройкой в config.ini:
+
+    [AGENTS]
+    module = service.agents.mock
+
+Данные лежат в общем хранилище store (MockStore) в словарях с индексами
+по email пользователя и по топику, так что каждая операция стоит O(1)
+или O(размер ответа). Это нулевая по задержке основа для профилирования
+Flask и шаблонов отдельно от sc-machine и быстрый бэкенд для нагрузочных
+прогонов (python -m service.utils.load_test --backend mock).
+
+Топики, сообщения, вопросы и ответы теста получают целые адреса из
+одного счётчика, как элементы sc-памяти, поэтому маршруты вида
+/forum/topic/<int:topic_addr> работают без изменений.
+"""
+
+import itertools
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sc_client.models import ScAddr
+
+from service.agents.abstract.auth_agent import AuthAgent, AuthStatus
+from service.agents.abstract.bookmarks_agent import BookmarksAgent, BookmarksStatus
+from service.agents.abstract.directory_agent import DirectoryAgent, DirectoryStatus
+from service.agents.abstract.event_agents import (
+    AddEventAgent,
+    AddEventStatus,
+    DeleteEventAgent,
+    DeleteEventStatus,
+    ShowEventAgent,
+    ShowEventStatus,
+)
+from service.agents.abstract.forum_agent import ForumAgent, ForumStatus
+from service.agents.abstract.history_agent import HistoryAgent, HistoryStatus
+from service.agents.abstract.notes_agent import NotesAgent, NotesStatus
+from service.agents.abstract.profile_agent import ProfileAgent, ProfileStatus
+from service.agents.abstract.reg_agent import RegAgent, RegStatus, UserType
+from service.agents.abstract.test_agent import TestAgent, TestStatus
+from service.agents.abstract.user_request_agent import RequestAgent, RequestStatus
+from service.agents.abstract.verification_agent import VerificationAgent, VerificationStatus
+from service.models import DirectoryResponse, EventResponse, RequestResponse, User, UserEvent
+from service.utils.agent_cache import agent_caches
+from service.utils.author_display import author_displays, format_rank
+
+# Вопросы теста специалиста: текст, варианты ответа, номер верного варианта
+TEST_QUESTIONS = (
+    ('Какой общий срок исковой давности установлен Гражданским кодексом?',
+     ('Один год', 'Три года', 'Пять лет'), 1),
+    ('С какого возраста наступает полная дееспособность гражданина?',
+     ('С 16 лет', 'С 18 лет', 'С 21 года'), 1),
+    ('За какой срок работодатель предупреждает об увольнении по сокращению штата?',
+     ('Не менее чем за месяц', 'Не менее чем за неделю', 'Не менее чем за два месяца'), 2),
+    ('Кто наследует в первую очередь по закону?',
+     ('Дети, супруг и родители', 'Братья и сёстры', 'Дедушки и бабушки'), 0),
+    ('В какой срок можно обжаловать постановление об административном штрафе?',
+     ('В течение трёх дней', 'В течение десяти дней', 'В течение месяца'), 1),
+    ('Какой документ подтверждает право собственности на недвижимость?',
+     ('Технический паспорт', 'Свидетельство о государственной регистрации', 'Квитанция об оплате'), 1),
+    ('Что является основанием для взыскания алиментов?',
+     ('Соглашение или решение суда', 'Устная договорённость', 'Заявление в налоговую'), 0),
+    ('Какой договор требует обязательной государственной регистрации?',
+     ('Договор займа', 'Договор купли-продажи квартиры', 'Договор поручения'), 1),
+    ('Кто вправе заверить завещание?',
+     ('Нотариус', 'Участковый', 'Работодатель'), 0),
+    ('В течение какого срока потребитель вправе вернуть товар надлежащего качества?',
+     ('В течение 14 дней', 'В течение года', 'Вернуть нельзя'), 0),
 )
-from sc_client .models import ScAddr 
-class OstisAuthAgent (AuthAgent ):
+
+
+class MockStore:
     """
-    Класс-заглушка для представления агента аутентификации
+    Данные всех агентов в памяти процесса с индексами для быстрого доступа
     """
-    def auth_agent (self ,username :str ,password :str ):
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
         """
-        Метод-заглушка для запуска агента аутентификации
-        :param username: Логин пользователя для аутентификации
-        :param password: Пароль пользователя для аутентификации
-        :return: Словарь со статусом результата выполнения агента аутентификации
+        Очистка данных и заполнение банка вопросов теста
         """
-        print (f"MockAgent: Pretend authenticating {username } - {password }")
-        return {
-        "status":AuthStatus .INVALID ,
-        "message":"Invalid credentials",
-        }
+        with self.lock:
+            self._addrs = itertools.count(1)
+            self.users = {}
+            self.tokens = {}
+            self.events = {}
+            self.history = {}
+            self.bookmarks = {}
+            self.notes = {}
+            self.topics = {}
+            self.messages = {}
+            self.topic_messages = {}
+            self.terms = {}
+            self.questions = {}
+            self.answers = {}
+            for text, options, correct in TEST_QUESTIONS:
+                question = self.next_addr()
+                answers = [self.next_addr() for _ in options]
+                self.questions[question] = {'text': text, 'answers': answers, 'correct': answers[correct]}
+                for answer, option in zip(answers, options):
+                    self.answers[answer] = {'text': option, 'question': question}
+
+    def next_addr(self) -> int:
+        return next(self._addrs)
 
-class OstisRegAgent (RegAgent ):
-    """
-    Класс-заглушка для представления агента регистрации
-    """
-    def reg_agent (
-    self ,
-    gender ,
-    surname :str ,
-    name :str ,
-    fname :str ,
-    birthdate ,
-    reg_place :str ,
-    username :str ,
-    password :str 
-    ):
+    def add_user(self, email: str, password: str, user_type: str = UserType.CLIENT,
+                 verified: bool = True, **profile) -> dict:
         """
-        Метод-заглушка для запуска агента регистрации
-        :param gender: Пол пользователя для регистрации
-        :param surname: Фамилия пользователя для регистрации
-        :param name: Имя пользователя для регистрации
-        :param fname: Отчество пользователя для регистрации
-        :param birthdate: Дата рождения пользователя для регистрации
-        :param reg_place: Место регистрации пользователя для регистрации
-        :param username: Логин пользователя для регистрации
-        :param password: Пароль пользователя для регистрации
-        :return: Словарь со статусом результата выполнения агента регистрации
+        Добавление пользователя
+        :param email: Email (логин)
+        :param password: Пароль
+        :param user_type: client или specialist
+        :param verified: Подтверждён ли email
+        :param profile: Поля профиля: name, field, experience, gender, age, jurisdiction
+        :return: Запись пользователя
         """
-        print (f"MockAgent: Pretend registering {gender } - {surname } - {name } - {fname } - {birthdate } - {reg_place } - {username } - {password }")
-        return {"status":RegStatus .CREATED }
+        with self.lock:
+            user = {
+                'addr': self.next_addr(),
+                'email': email,
+                'password': password,
+                'user_type': str(user_type),
+                'verified': verified,
+                'profile': {'name': '', 'jurisdiction': 'BY', **profile},
+                'settings': {},
+                'asked_questions': [],
+                'selected_answers': {},
+            }
+            self.users[email] = user
+            self.events[email] = []
+            self.history[email] = []
+            self.bookmarks[email] = {}
+            self.notes[email] = {}
+            return user
 
-class OstisUserRequestAgent (RequestAgent ):
-    """
-    Класс-заглушка для представления агента юридических запросов
-    """
-    def request_agent (
-    self ,
-    content :str 
-    ):
+    def add_topic(self, author: str, title: str, description: str) -> int:
+        with self.lock:
+            addr = self.next_addr()
+            self.topics[addr] = {'addr': addr, 'title': title, 'description': description, 'author': author}
+            self.topic_messages[addr] = []
+            return addr
+
+    def add_message(self, author: str, topic: int, content: str, likes: int = 0, dislikes: int = 0,
+                    image_base64: str = None, image_mime: str = None) -> int:
+        with self.lock:
+            addr = self.next_addr()
+            self.messages[addr] = {
+                'addr': addr,
+                'topic': topic,
+                'author': author,
+                'content': content,
+                'likes': likes,
+                'dislikes': dislikes,
+                'image_base64': image_base64,
+                'image_mime': image_mime,
+            }
+            self.topic_messages[topic].append(addr)
+            return addr
+
+    def is_specialist(self, email: str) -> bool:
+        user = self.users.get(email)
+        return bool(user) and user['user_type'] == UserType.SPECIALIST
+
+    def correct_answers(self, email: str) -> int:
+        user = self.users[email]
+        return sum(
+            1 for question, answer in user['selected_answers'].items()
+            if self.questions[question]['correct'] == answer
+        )
+
+    def format_user_display(self, email: Optional[str]) -> str:
         """
-        Метод-заглушка для запуска агента юридических запросов
-        :param content: Контент, по которому происходит поиск в БЗ
-        :return: Словарь со статусом результата выполнения агента юридических запросов
+        Отображение автора: email (тип, ранг для специалистов), как в Ostis.format_user_display
         """
-        print (f"MockAgent: Pretend requesting {content }")
-        return {"status":RequestStatus .VALID }
+        if email not in self.users:
+            return "Unknown"
+        if self.is_specialist(email):
+            return f"{email} (Специалист, {format_rank(self.correct_answers(email))})"
+        return f"{email} (Клиент)"
 
-class OstisDirectoryAgent (DirectoryAgent ):
-    """
-    Класс-заглушка для представления агента поиска
-    """
-    def directory_agent (
-    self ,
-    content ,
-    ):
+    def populate(self, topics: int, messages: int, users: int, specialists: float = 0.1,
+                 cabinet_items: int = 2, seed: int = 0) -> dict:
         """
-        Метод-заглушка для запуска агента поиска
-        :param content: Контент, по которому происходит поиск в БЗ
-        :return: Словарь со статусом результата выполнения агента поиска
+        Заполнение синтетическими данными той же формы, что fake_sc.seed.seed_forum
+        :param topics: Количество топиков
+        :param messages: Количество сообщений (распределяются по топикам случайно)
+        :param users: Количество пользователей
+        :param specialists: Доля специалистов среди пользователей
+        :param cabinet_items: Записей истории, закладок и заметок на пользователя
+        :param seed: Начальное значение генератора случайных чисел
+        :return: Словарь с логинами пользователей, адресами топиков и терминами для запросов
         """
-        print (f"MockAgent: Pretend requesting {content }")
-        return {"status":DirectoryStatus .VALID }
+        from service.utils.fake_sc.seed import QUESTIONS, REPLIES, SUBJECTS, TERMS
+
+        rng = random.Random(seed)
+        with self.lock:
+            emails = []
+            for index in range(users):
+                email = f'user{index:05d}@example.by'
+                user_type = UserType.SPECIALIST if rng.random() < specialists else UserType.CLIENT
+                self.add_user(email, 'password', user_type, name=f'Пользователь {index}')
+                for item in range(cabinet_items):
+                    date = f'2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00'
+                    entry = self.next_addr()
+                    self.history[email].append({
+                        'id': str(entry), 'type': 'search', 'text': rng.choice(list(TERMS)), 'date': date,
+                    })
+                    bookmark = str(self.next_addr())
+                    self.bookmarks[email][bookmark] = {
+                        'id': bookmark, 'article_id': f'article_{item}', 'title': rng.choice(SUBJECTS),
+                        'tags': ['важное', 'работа'], 'date': date,
+                    }
+                    note = str(self.next_addr())
+                    self.notes[email][note] = {
+                        'id': note, 'article_id': f'article_{item}', 'article_title': rng.choice(SUBJECTS),
+                        'text': rng.choice(REPLIES), 'created_at': date, 'updated_at': date,
+                    }
+                emails.append(email)
+
+            topic_addrs = []
+            for _ in range(topics):
+                subject = rng.choice(SUBJECTS)
+                topic_addrs.append(self.add_topic(
+                    rng.choice(emails) if emails else None,
+                    f'{rng.choice(QUESTIONS)} {subject}',
+                    f'Вопрос про {subject}. {rng.choice(REPLIES)}',
+                ))
+
+            for _ in range(messages if topic_addrs else 0):
+                self.add_message(
+                    rng.choice(emails) if emails else None,
+                    rng.choice(topic_addrs),
+                    rng.choice(REPLIES),
+                    rng.randint(0, 20),
+                    rng.randint(0, 5),
+                )
+
+            for term, content in TERMS.items():
+                self.terms[term.lower()] = (term, content)
+
+        return {
+            'users': emails,
+            'topics': topic_addrs,
+            'messages': messages if topic_addrs else 0,
+            'terms': list(TERMS),
+        }
+
+
+store = MockStore()
+
+
+def _addr_value(addr) -> int:
+    return addr.value if isinstance(addr, ScAddr) else int(addr)
 
-class OstisAddEventAgent (AddEventAgent ):
+
+class OstisAuthAgent(AuthAgent):
     """
-    Класс-заглушка для представления агента добавления события
+    Агент аутентификации на данных в памяти
     """
-    def add_event_agent (self ,
-    user_name :str ,
-    event_name :str ,
-    event_date ,
-    event_description :str 
-    ):
-        """
-        Метод-заглушка для запуска агента добавления события
-        :param user_name: Логин пользователя
-        :param event_name: Название события
-        :param event_date: Дата события
-        :param event_description: Описание события
-        :return:
-        """
-        print (f"MockAgent: Pretend requesting {event_name } {event_description }")
-        return {"status":AddEventStatus .VALID }
 
-class OstisDeleteEventAgent (DeleteEventAgent ):
+    def auth_agent(self, username: str, password: str) -> dict:
+        user = store.users.get(username)
+        if user and user['verified'] and user['password'] == password:
+            return {"status": AuthStatus.VALID, "message": "Authentication successful"}
+        return {"status": AuthStatus.INVALID, "message": "Invalid credentials or email not verified"}
+
+    def find_user(self, username: str) -> Optional[User]:
+        user = store.users.get(username)
+        if not user or not user['verified']:
+            return None
+        return User(sc_addr=str(user['addr']), username=username)
+
+
+class OstisRegAgent(RegAgent):
     """
-    Класс-заглушка для представления агента удаления события
+    Агент регистрации на данных в памяти
     """
-    def delete_event_agent (self ,
-    event_name :str ,
-    ):
-        """
-        Метод-заглушка для запуска агента удаления события
-        :param event_name: Название события
-        :return:
-        """
-        print (f"MockAgent: Pretend requesting {event_name }")
-        return {"status":DeleteEventStatus .VALID }
 
-class OstisShowEventAgent (ShowEventAgent ):
+    def reg_agent(self, email: str, password: str, password_conf: str, user_type: str,
+                  full_name: str = None, gender: str = None, age: str = None,
+                  experience: str = None, field: str = None) -> dict:
+        if password != password_conf:
+            return {"status": RegStatus.EXISTS, "message": "Пароли не совпадают"}
+        with store.lock:
+            if email in store.users:
+                return {"status": RegStatus.EXISTS, "message": "Пользователь уже существует"}
+            profile = {'name': full_name or ''}
+            if user_type == UserType.SPECIALIST:
+                profile.update(field=field, experience=experience, gender=gender, age=age)
+            store.add_user(email, password, user_type, verified=False, **profile)
+        return {"status": RegStatus.CREATED, "message": "Пользователь успешно зарегистрирован"}
+
+
+class OstisVerificationAgent(VerificationAgent):
     """
-    Класс-заглушка для представления агента просмотра события
+    Агент верификации на данных в памяти: токен хранится в store.tokens
     """
-    def show_event_agent (self ,
-    username :str ,
-    ):
-        """
-        Метод-заглушка для запуска агента просмотра события
-        :param username: Логин пользователя
-        :return:
-        """
-        print (f"MockAgent: Pretend requesting {username }")
-        return {"status":ShowEventStatus .VALID }
\ No newline at end of file
+
+    def send_token(self, email: str) -> dict:
+        if email not in store.users:
+            return {"status": VerificationStatus.INVALID, "message": "Не удалось отправить токен"}
+        store.tokens[email] = f'{random.randint(0, 999999):06d}'
+        return {"status": VerificationStatus.TOKEN_SENT, "message": "Токен отправлен на email"}
+
+    def verify_token(self, email: str, token: str) -> dict:
+        with store.lock:
+            if token is None or store.tokens.get(email) != token:
+                return {"status": VerificationStatus.INVALID, "message": "Неверный код подтверждения"}
+            del store.tokens[email]
+            store.users[email]['verified'] = True
+        return {"status": VerificationStatus.EMAIL_VERIFIED, "message": "Email успешно подтвержден"}
+
+
+class OstisUserRequestAgent(RequestAgent):
+    """
+    Агент юридических запросов по словарю терминов store.terms
+    """
+
+    def request_agent(self, content: str) -> dict:
+        query = content.strip().lower()
+        found = [
+            RequestResponse(term, definition)
+            for key, (term, definition) in store.terms.items()
+            if query and (query in key or key in query)
+        ]
+        return {"status": RequestStatus.VALID, "message": found}
+
+
+class OstisDirectoryAgent(DirectoryAgent):
+    """
+    Агент поиска по словарю терминов store.terms
+    """
+
+    def directory_agent(self, content: str) -> dict:
+        query = content.strip().lower()
+        found = [
+            DirectoryResponse(term, definition)
+            for key, (term, definition) in store.terms.items()
+            if query and query in key
+        ]
+        if not found:
+            return {"status": DirectoryStatus.INVALID, "message": None}
+        return {"status": DirectoryStatus.VALID, "message": found}
+
+    def term_titles(self) -> list:
+        return sorted(term for term, _ in store.terms.values())
+
+
+class OstisAddEventAgent(AddEventAgent):
+    """
+    Агент добавления события на данных в памяти
+    """
+
+    def add_event_agent(self, user_name: str, event_name: str, event_date, event_description: str):
+        events = store.events.get(user_name)
+        if events is None:
+            return {"status": AddEventStatus.INVALID, "message": "Invalid credentials"}
+        date = event_date.isoformat() if hasattr(event_date, 'isoformat') else str(event_date)
+        events.append(UserEvent(user_name, event_name, date, event_description))
+        agent_caches.invalidate('show_event_agent', user_name)
+        return {"status": AddEventStatus.VALID, "message": "Success"}
+
+
+class OstisDeleteEventAgent(DeleteEventAgent):
+    """
+    Агент удаления события на данных в памяти
+    """
+
+    def delete_event_agent(self, username: str, event_name: str):
+        with store.lock:
+            events = store.events.get(username)
+            if events is None:
+                return {"status": DeleteEventStatus.INVALID, "message": "Invalid credentials"}
+            store.events[username] = [event for event in events if event.title != event_name]
+        agent_caches.invalidate('show_event_agent', username)
+        return {"status": DeleteEventStatus.VALID, "message": "Success"}
+
+
+class OstisShowEventAgent(ShowEventAgent):
+    """
+    Агент просмотра событий на данных в памяти
+    """
+
+    def show_event_agent(self, username: str):
+        events = store.events.get(username)
+        if events is None:
+            return {"status": ShowEventStatus.INVALID, "message": "Invalid credentials"}
+        return {"status": ShowEventStatus.VALID, "message": EventResponse(list(events))}
+
+    def events_by_date(self, username: str, date: str):
+        events = [event for event in store.events.get(username, []) if event.date == date]
+        return EventResponse(events) if events else None
+
+
+class OstisTestAgent(TestAgent):
+    """
+    Тест специалиста по банку вопросов TEST_QUESTIONS
+
+    В отличие от агентов sc-machine, ответы содержат тексты вопроса
+    (question_text) и вариантов (text), чтобы их не нужно было читать из sc-памяти.
+    """
+
+    def get_next_question(self, username: str) -> dict:
+        user = store.users.get(username)
+        if not user:
+            return {"status": TestStatus.INVALID, "message": "User not found"}
+        with store.lock:
+            for addr, question in store.questions.items():
+                if addr not in user['asked_questions']:
+                    user['asked_questions'].append(addr)
+                    return {
+                        "status": TestStatus.VALID,
+                        "question": str(addr),
+                        "question_addr": ScAddr(addr),
+                        "question_text": question['text'],
+                    }
+        return {"status": TestStatus.INVALID, "message": "No questions found"}
+
+    def get_answers_for_question(self, question_addr) -> dict:
+        question = store.questions.get(_addr_value(question_addr))
+        if not question:
+            return {"status": TestStatus.INVALID, "message": "Failed to get answers"}
+        return {
+            "status": TestStatus.VALID,
+            "answers": [
+                {"answer_addr": ScAddr(addr), "answer_id": str(addr), "text": store.answers[addr]['text']}
+                for addr in question['answers']
+            ],
+        }
+
+    def save_answer(self, username: str, answer_addr) -> dict:
+        user = store.users.get(username)
+        answer = store.answers.get(_addr_value(answer_addr))
+        if not user or not answer:
+            return {"status": TestStatus.INVALID, "message": "Failed to save answer"}
+        user['selected_answers'][answer['question']] = _addr_value(answer_addr)
+        author_displays.invalidate(username)
+        return {"status": TestStatus.VALID}
+
+    def check_answer(self, username: str, question_addr) -> dict:
+        user = store.users.get(username)
+        question = store.questions.get(_addr_value(question_addr))
+        if not user or not question:
+            return {"status": TestStatus.INVALID, "message": "Failed to check answer"}
+        is_correct = user['selected_answers'].get(_addr_value(question_addr)) == question['correct']
+        return {"status": TestStatus.VALID, "is_correct": is_correct}
+
+    def delete_old_test_data(self, username: str) -> dict:
+        user = store.users.get(username)
+        if not user:
+            return {"status": TestStatus.INVALID, "message": "Failed"}
+        with store.lock:
+            user['asked_questions'].clear()
+            user['selected_answers'].clear()
+        author_displays.invalidate(username)
+        return {"status": TestStatus.VALID}
+
+    def update_rating(self, username: str) -> dict:
+        if username not in store.users:
+            return {"status": TestStatus.INVALID, "message": "Failed to update rating"}
+        author_displays.invalidate(username)
+        return {"status": TestStatus.VALID, "rating": format_rank(store.correct_answers(username))}
+
+
+class OstisProfileAgent(ProfileAgent):
+    """
+    Агент профиля на данных в памяти
+    """
+
+    SETTINGS_DEFAULTS = {
+        'jurisdiction': 'BY',
+        'theme': 'system',
+        'font_size': 'normal',
+        'save_history': True,
+        'high_contrast': False,
+    }
+
+    def get_profile(self, user_email: str) -> dict:
+        user = store.users.get(user_email)
+        if not user:
+            return {'status': ProfileStatus.INVALID, 'message': 'User not found'}
+        profile = {
+            'email': user_email,
+            'name': user['profile'].get('name', ''),
+            'jurisdiction': user['profile'].get('jurisdiction') or 'BY',
+            'user_type': user['user_type'],
+        }
+        if user['user_type'] == UserType.SPECIALIST:
+            for key in ('field', 'experience', 'gender', 'age'):
+                profile[key] = user['profile'].get(key) or ''
+        return {'status': ProfileStatus.VALID, 'profile': profile}
+
+    def update_profile(self, user_email: str, data: dict) -> dict:
+        user = store.users.get(user_email)
+        if not user:
+            return {'status': ProfileStatus.INVALID, 'message': 'User not found'}
+        for key in ('name', 'jurisdiction', 'field', 'experience', 'gender', 'age'):
+            if data.get(key) is not None:
+                user['profile'][key] = str(data[key])
+        return {'status': ProfileStatus.VALID}
+
+    def get_settings(self, user_email: str) -> dict:
+        user = store.users.get(user_email)
+        if not user:
+            return {'status': ProfileStatus.INVALID, 'settings': {}}
+        settings = dict(self.SETTINGS_DEFAULTS, jurisdiction=user['profile'].get('jurisdiction') or 'BY')
+        settings.update(user['settings'])
+        return {'status': ProfileStatus.VALID, 'settings': settings}
+
+    def update_settings(self, user_email: str, settings: dict) -> dict:
+        user = store.users.get(user_email)
+        if not user:
+            return {'status': ProfileStatus.INVALID}
+        for key, value in settings.items():
+            if key in self.SETTINGS_DEFAULTS:
+                user['settings'][key] = value
+                if key == 'jurisdiction':
+                    user['profile']['jurisdiction'] = str(value)
+        return {'status': ProfileStatus.VALID}
+
+
+class OstisHistoryAgent(HistoryAgent):
+    """
+    Агент истории запросов на данных в памяти
+    """
+
+    def get_history(self, user_email: str, period: str = 'week') -> dict:
+        entries = store.history.get(user_email)
+        if entries is None:
+            return {'status': HistoryStatus.INVALID, 'history': []}
+        history = list(entries)
+        if period != 'all':
+            cutoff = (datetime.now() - timedelta(days=7 if period == 'week' else 30)).isoformat()
+            history = [entry for entry in history if not entry['date'] or entry['date'] >= cutoff]
+        history.sort(key=lambda entry: entry['date'], reverse=True)
+        return {'status': HistoryStatus.VALID, 'history': history}
+
+    def add_history_entry(self, user_email: str, query_type: str,
+                          query_text: str, article_id: Optional[str] = None) -> dict:
+        entries = store.history.get(user_email)
+        if entries is None:
+            return {'status': HistoryStatus.INVALID}
+        entry_id = str(store.next_addr())
+        entries.append({'id': entry_id, 'type': query_type, 'text': query_text, 'date': datetime.now().isoformat()})
+        return {'status': HistoryStatus.VALID, 'id': entry_id}
+
+    def clear_history(self, user_email: str) -> dict:
+        entries = store.history.get(user_email)
+        if entries is None:
+            return {'status': HistoryStatus.INVALID}
+        entries.clear()
+        return {'status': HistoryStatus.VALID}
+
+
+class OstisBookmarksAgent(BookmarksAgent):
+    """
+    Агент закладок на данных в памяти
+    """
+
+    def get_bookmarks(self, user_email: str) -> dict:
+        bookmarks = store.bookmarks.get(user_email)
+        if bookmarks is None:
+            return {'status': BookmarksStatus.INVALID, 'bookmarks': []}
+        return {'status': BookmarksStatus.VALID, 'bookmarks': [dict(item) for item in bookmarks.values()]}
+
+    def add_bookmark(self, user_email: str, article_id: str,
+                     title: str, tags: Optional[List[str]] = None) -> dict:
+        bookmarks = store.bookmarks.get(user_email)
+        if bookmarks is None:
+            return {'status': BookmarksStatus.INVALID, 'message': 'User not found'}
+        bookmark_id = str(store.next_addr())
+        bookmarks[bookmark_id] = {
+            'id': bookmark_id,
+            'article_id': article_id or '',
+            'title': title or '',
+            'tags': list(tags or []),
+            'date': datetime.now().isoformat(),
+        }
+        return {'status': BookmarksStatus.VALID, 'id': bookmark_id}
+
+    def update_bookmark(self, user_email: str, bookmark_id: str,
+                        tags: Optional[List[str]] = None) -> dict:
+        bookmark = store.bookmarks.get(user_email, {}).get(str(bookmark_id))
+        if bookmark is None:
+            return {'status': BookmarksStatus.INVALID, 'message': 'Bookmark not found'}
+        bookmark['tags'] = list(tags or [])
+        return {'status': BookmarksStatus.VALID}
+
+    def delete_bookmark(self, user_email: str, bookmark_id: str) -> dict:
+        if store.bookmarks.get(user_email, {}).pop(str(bookmark_id), None) is None:
+            return {'status': BookmarksStatus.INVALID, 'message': 'Bookmark not found'}
+        return {'status': BookmarksStatus.VALID}
+
+
+class OstisNotesAgent(NotesAgent):
+    """
+    Агент заметок на данных в памяти
+    """
+
+    def get_notes(self, user_email: str) -> dict:
+        notes = store.notes.get(user_email)
+        if notes is None:
+            return {'status': NotesStatus.INVALID, 'notes': []}
+        return {'status': NotesStatus.VALID, 'notes': [dict(item) for item in notes.values()]}
+
+    def add_note(self, user_email: str, article_id: str,
+                 article_title: str, text: str) -> dict:
+        notes = store.notes.get(user_email)
+        if notes is None:
+            return {'status': NotesStatus.INVALID, 'message': 'User not found'}
+        note_id = str(store.next_addr())
+        now = datetime.now().isoformat()
+        notes[note_id] = {
+            'id': note_id,
+            'article_id': article_id or '',
+            'article_title': article_title or '',
+            'text': text or '',
+            'created_at': now,
+            'updated_at': now,
+        }
+        return {'status': NotesStatus.VALID, 'id': note_id}
+
+    def update_note(self, user_email: str, note_id: str, text: str) -> dict:
+        note = store.notes.get(user_email, {}).get(str(note_id))
+        if note is None:
+            return {'status': NotesStatus.INVALID, 'message': 'Note not found'}
+        note['text'] = text
+        note['updated_at'] = datetime.now().isoformat()
+        return {'status': NotesStatus.VALID}
+
+    def delete_note(self, user_email: str, note_id: str) -> dict:
+        if store.notes.get(user_email, {}).pop(str(note_id), None) is None:
+            return {'status': NotesStatus.INVALID, 'message': 'Note not found'}
+        return {'status': NotesStatus.VALID}
+
+
+class OstisForumAgent(ForumAgent):
+    """
+    Форум на данных в памяти: сообщения топика берутся из индекса store.topic_messages
+    """
+
+    def get_all_topics(self) -> list:
+        return [
+            {'addr': topic['addr'], 'title': topic['title'], 'author': store.format_user_display(topic['author'])}
+            for topic in list(store.topics.values())
+        ]
+
+    def topic_addrs(self) -> list:
+        return list(store.topics)
+
+    def get_topic_details(self, topic_addr) -> dict:
+        topic = store.topics.get(_addr_value(topic_addr))
+        if topic is None:
+            return {'title': 'Unknown', 'description': '', 'author': 'Unknown', 'author_email': '',
+                    'error': 'Топик не найден'}
+        return {
+            'title': topic['title'],
+            'description': topic['description'],
+            'author': store.format_user_display(topic['author']),
+            'author_email': topic['author'],
+        }
+
+    def get_topic_messages(self, topic_addr) -> list:
+        messages = []
+        for addr in list(store.topic_messages.get(_addr_value(topic_addr), ())):
+            message = store.messages[addr]
+            messages.append({
+                'content': message['content'],
+                'author': store.format_user_display(message['author']),
+                'addr': addr,
+                'likes': message['likes'],
+                'dislikes': message['dislikes'],
+                'is_expert': store.is_specialist(message['author']),
+                'image_base64': message['image_base64'],
+                'image_mime': message['image_mime'],
+            })
+        return messages
+
+    def add_topic(self, username: str, title: str, description: str) -> dict:
+        if username not in store.users:
+            return {'status': ForumStatus.INVALID}
+        return {'status': ForumStatus.VALID, 'addr': store.add_topic(username, title, description)}
+
+    def add_message(self, username: str, topic_addr, message_text: str,
+                    image_base64: Optional[str] = None, image_name: Optional[str] = None,
+                    image_mime: Optional[str] = None) -> dict:
+        topic = _addr_value(topic_addr)
+        if username not in store.users or topic not in store.topics:
+            return {'status': ForumStatus.INVALID}
+        if image_base64:
+            image_mime = image_mime or 'image/jpeg'
+        addr = store.add_message(username, topic, message_text, image_base64=image_base64, image_mime=image_mime)
+        return {'status': ForumStatus.VALID, 'addr': addr}
+
+    def rate_message(self, message_addr, rating_type: str) -> dict:
+        message = store.messages.get(_addr_value(message_addr))
+        if message is None or rating_type not in ('like', 'dislike'):
+            return {'status': ForumStatus.INVALID}
+        with store.lock:
+            message['likes' if rating_type == 'like' else 'dislikes'] += 1
+        return {'status': ForumStatus.VALID}
+
+    def edit_message(self, message_addr, new_text: str) -> dict:
+        message = store.messages.get(_addr_value(message_addr))
+        if message is None:
+            return {'status': ForumStatus.INVALID}
+        message['content'] = new_text
+        return {'status': ForumStatus.VALID}
+
+    def delete_message(self, message_addr) -> dict:
+        addr = _addr_value(message_addr)
+        with store.lock:
+            message = store.messages.pop(addr, None)
+            if message is None:
+                return {'status': ForumStatus.INVALID}
+            store.topic_messages[message['topic']].remove(addr)
+        return {'status': ForumStatus.VALID}
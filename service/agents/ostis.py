@@ -1,10 +1,9 @@
 from enum import Enum 
-from threading import Event 
 
-import sc_client .client as client 
+from service .utils .sc_pool import client 
 
 from ..exceptions import ScServerError 
-from sc_client .client import is_connected ,search_links_by_contents 
+from service .utils .sc_pool import is_connected ,search_links_by_contents 
 from sc_client .models import (
 ScAddr ,
 ScConstruction ,
@@ -16,10 +15,16 @@ ScTemplate
 )
 from sc_client .constants .common import ScEventType 
 from sc_client .constants import sc_types 
-from sc_kpm import ScKeynodes 
+from service .utils .keynode_registry import keynodes 
+from service .utils .action_completion import completions 
+from service .utils .action_call import ActionCall 
+from service .utils .single_flight import single_flight 
+from service .utils .agent_cache import agent_caches 
+from service .utils .user_directory import user_directory 
+from service .utils .author_display import author_displays 
 
 from service .models import RequestResponse ,DirectoryResponse ,EventResponse ,UserEvent 
-from service .models import get_user_by_login 
+from service .models import get_user_by_login ,find_user_by_username 
 from service .agents .abstract .auth_agent import AuthAgent ,AuthStatus 
 from service .agents .abstract .reg_agent import RegAgent ,RegStatus 
 from service .agents .abstract .user_request_agent import RequestAgent ,RequestStatus 
@@ -34,12 +39,14 @@ ShowEventStatus
 )
 from service .exceptions import AgentError 
 from service .utils .ostis_utils import (
-create_link ,
-get_node ,
+ActionNode ,
+InternedLink ,
+read_attributes ,
 set_gender_content ,
 split_date_content ,
 get_main_idtf ,
-set_system_idtf 
+get_term_titles ,
+get_event_by_date 
 )
 from config import Config 
 from service .agents .abstract .test_agent import TestAgent ,TestStatus
@@ -48,12 +55,10 @@ from service.agents.abstract.profile_agent import ProfileAgent, ProfileStatus
 from service.agents.abstract.history_agent import HistoryAgent, HistoryStatus
 from service.agents.abstract.bookmarks_agent import BookmarksAgent, BookmarksStatus
 from service.agents.abstract.notes_agent import NotesAgent, NotesStatus
+from service.agents.abstract.forum_agent import ForumAgent, ForumStatus
 from datetime import datetime 
 
 
-payload =None 
-callback_event =Event ()
-
 gender_dict ={
 "male":"мужчина",
 "female":"женщина"
@@ -74,23 +79,14 @@ def call_back (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     :param trg: Адрес ноды, которая показывает результат выполнения агента
     :return: Результат выполнения агента
     """
-    global payload 
-    callback_event .clear ()
-    succ_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_successfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    unsucc_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_unsuccessfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    node_err =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_with_error',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
+    payload =None 
+    succ_node =keynodes ['action_finished_successfully']
+    unsucc_node =keynodes ['action_finished_unsuccessfully']
+    node_err =keynodes ['action_finished_with_error']
     if trg .value ==succ_node .value :
         print (trg .value )
         print (succ_node .value )
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='nrel_result',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
+        nrel_result =keynodes ['nrel_result']
         res_templ =ScTemplate ()
         res_templ .triple_with_relation (
         src ,
@@ -109,11 +105,51 @@ def call_back (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     elif trg .value ==unsucc_node .value or trg .value ==node_err .value :
         payload ={"message":result .FAILURE }
 
-    callback_event .set ()
     if not payload :
         return result .FAILURE 
+    completions .resolve (src ,payload )
     return result .SUCCESS 
 
+def _result_main_idtf_links (src :ScAddr ,node_type ,node_alias :str ,node_class :ScAddr =None )->list :
+    """
+    Метод для поиска узлов структуры результата действия вместе с sc-link их основных идентификаторов
+    :param src: Адрес action-ноды
+    :param node_type: Тип искомых узлов
+    :param node_alias: Алиас узла в шаблоне
+    :param node_class: Класс, которому должны принадлежать узлы
+    :return: sc-link основных идентификаторов, по одной на узел
+    """
+    template =ScTemplate ()
+    template .triple_with_relation (
+    src ,
+    sc_types .EDGE_D_COMMON_VAR ,
+    sc_types .NODE_VAR_STRUCT >>"_res_struct",
+    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+    keynodes ['nrel_result']
+    )
+    template .triple (
+    "_res_struct",
+    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+    node_type >>node_alias 
+    )
+    if node_class is not None :
+        template .triple (
+        node_class ,
+        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+        node_alias 
+        )
+    template .quintuple (
+    node_alias ,
+    sc_types .EDGE_D_COMMON_VAR ,
+    sc_types .LINK_VAR >>"_main_idtf",
+    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+    keynodes ['nrel_main_idtf']
+    )
+    links ={}
+    for item in client .template_search (template ):
+        links .setdefault (item .get (node_alias ).value ,item .get ("_main_idtf"))
+    return list (links .values ())
+
 def call_back_request (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     """
     Метод для реализации колбэк-функции выполнения агента юридических запросов
@@ -122,43 +158,37 @@ def call_back_request (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     :param trg: Адрес ноды, которая показывает результат выполнения агента
     :return: Результат выполнения агента
     """
-    global payload
-    # Only handle finish signals — ignore arcs created during template_generate
-    # (action_initiated, action class membership, etc.)
+    # Only handle finish signals — ignore arcs created when the action is built
+    # and initiated (action_initiated, action class membership, etc.)
     try:
-        succ_node  = client.resolve_keynodes(ScIdtfResolveParams(idtf='action_finished_successfully',  type=sc_types.NODE_CONST_CLASS))[0]
-        unsucc_node = client.resolve_keynodes(ScIdtfResolveParams(idtf='action_finished_unsuccessfully', type=sc_types.NODE_CONST_CLASS))[0]
-        node_err   = client.resolve_keynodes(ScIdtfResolveParams(idtf='action_finished_with_error',      type=sc_types.NODE_CONST_CLASS))[0]
+        succ_node  = keynodes['action_finished_successfully']
+        unsucc_node = keynodes['action_finished_unsuccessfully']
+        node_err   = keynodes['action_finished_with_error']
     except Exception:
         return result.FAILURE
 
-    # Not a finish signal — silently ignore, do NOT set callback_event
+    # Not a finish signal — silently ignore, do NOT resolve the action
     if trg.value not in (succ_node.value, unsucc_node.value, node_err.value):
         return result.FAILURE
 
     content_list = []
+    payload = None
 
     if trg .value ==succ_node .value :
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='nrel_result',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
         body_template =ScTemplate ()
-        related_article_template =ScTemplate ()
-        related_concept_template =ScTemplate ()
-
         body_template .triple_with_relation (
         src ,
         sc_types .EDGE_ACCESS_VAR_POS_PERM ,
         sc_types .LINK_VAR >>"_src_link",
         sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        ScKeynodes ["rrel_1"]
+        keynodes ["rrel_1"]
         )
         body_template .triple_with_relation (
         src ,
         sc_types .EDGE_D_COMMON_VAR ,
         sc_types .NODE_VAR_STRUCT >>"_res_struct",
         sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        nrel_result 
+        keynodes ['nrel_result']
         )
         body_template .triple (
         "_res_struct",
@@ -166,78 +196,31 @@ def call_back_request (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
         sc_types .LINK_VAR >>"_link_body"
         )
 
-        related_article_template .triple_with_relation (
-        src ,
-        sc_types .EDGE_D_COMMON_VAR ,
-        sc_types .NODE_VAR_STRUCT >>"_res_struct",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        nrel_result 
-        )
-        related_article_template .triple (
-        "_res_struct",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        sc_types .NODE_VAR >>"_related_article"
-        )
-        related_article_template .triple (
-        ScKeynodes ["belarus_legal_article"],
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_related_article",
-        )
-
-        related_concept_template .triple_with_relation (
-        src ,
-        sc_types .EDGE_D_COMMON_VAR ,
-        sc_types .NODE_VAR_STRUCT >>"_res_struct",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        nrel_result 
-        )
-        related_concept_template .triple (
-        "_res_struct",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        sc_types .NODE_VAR_CLASS >>"_related_term"
-        )
-
-        body_result =client .template_search (body_template )
-        for _body in body_result :
-            src_link =_body .get ("_src_link")
-            link =_body .get ("_link_body")
-            term =client .get_link_content (src_link )[0 ].data 
-            content =client .get_link_content (link )[0 ].data 
-
-            related_articles =[]
-            related_concepts =[]
-
-            article_result =client .template_search (related_article_template )
-            for _article in article_result :
-                article_node =_article .get ("_related_article")
-                if article_node :
-                    article_data =get_main_idtf (article_node )
-                    if article_data :
-                        related_articles .append (article_data )
-
-            concept_result =client .template_search (related_concept_template )
-            for _concept in concept_result :
-                concept_node =_concept .get ("_related_term")
-                if concept_node :
-                    concept_data =get_main_idtf (concept_node )
-                    if concept_data :
-                        related_concepts .append (concept_data )
-
-            response =RequestResponse (
-            term =term ,
-            content =content ,
-            related_articles =related_articles ,
-            related_concepts =related_concepts 
-            )
-
-            content_list .append (response )
+        bodies =[(_body .get ("_src_link"),_body .get ("_link_body"))for _body in client .template_search (body_template )]
+        article_links =_result_main_idtf_links (src ,sc_types .NODE_VAR ,"_related_article",keynodes ["belarus_legal_article"])
+        concept_links =_result_main_idtf_links (src ,sc_types .NODE_VAR_CLASS ,"_related_term")
+
+        # Все sc-link (термины, тексты, идентификаторы) читаются одним запросом
+        addrs =[addr for pair in bodies for addr in pair ]+article_links +concept_links 
+        contents =[content .data for content in client .get_link_content (*addrs )]if addrs else []
+        body_contents =contents [:2 *len (bodies )]
+        related_articles =[idtf for idtf in contents [2 *len (bodies ):2 *len (bodies )+len (article_links )]if idtf ]
+        related_concepts =[idtf for idtf in contents [2 *len (bodies )+len (article_links ):]if idtf ]
+
+        for index in range (len (bodies )):
+            content_list .append (RequestResponse (
+            term =body_contents [2 *index ],
+            content =body_contents [2 *index +1 ],
+            related_articles =list (related_articles ),
+            related_concepts =list (related_concepts )
+            ))
 
         payload = {"message": content_list}
     elif trg.value == unsucc_node.value or trg.value == node_err.value:
         payload = {"message": []}  # empty list, not string "Nothing"
 
     # Signal waiting thread only after payload is set
-    callback_event.set()
+    completions.resolve(src, payload)
     return result.SUCCESS if payload else result.FAILURE
 
 def call_back_directory (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
@@ -248,23 +231,14 @@ def call_back_directory (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     :param trg: Адрес ноды, которая показывает результат выполнения агента
     :return: Результат выполнения агента
     """
-    global payload 
-    callback_event .clear ()
+    payload =None 
     content_list =[]
-    succ_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_successfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    unsucc_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_unsuccessfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    node_err =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_with_error',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
+    succ_node =keynodes ['action_finished_successfully']
+    unsucc_node =keynodes ['action_finished_unsuccessfully']
+    node_err =keynodes ['action_finished_with_error']
 
     if trg .value ==succ_node .value :
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='nrel_result',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
+        nrel_result =keynodes ['nrel_result']
         res_templ =ScTemplate ()
         res_templ .triple_with_relation (
         src ,
@@ -287,10 +261,10 @@ def call_back_directory (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
             sc_types .EDGE_D_COMMON_VAR ,
             sc_types .LINK_VAR >>"_title_link",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["nrel_main_idtf"],
+            keynodes ["nrel_main_idtf"],
             )
             _templ .triple (
-            ScKeynodes ["lang_ru"],
+            keynodes ["lang_ru"],
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             "_title_link"
             )
@@ -299,24 +273,24 @@ def call_back_directory (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             node_res ,
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["rrel_key_sc_element"]
+            keynodes ["rrel_key_sc_element"]
             )
             _templ .triple_with_relation (
             sc_types .NODE_VAR >>"_2",
             sc_types .EDGE_D_COMMON_VAR ,
             "_1",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["nrel_sc_text_translation"]
+            keynodes ["nrel_sc_text_translation"]
             )
             _templ .triple_with_relation (
             "_2",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             sc_types .LINK_VAR >>"_content_link",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["rrel_example"]
+            keynodes ["rrel_example"]
             )
             _templ .triple (
-            ScKeynodes ["lang_ru"],
+            keynodes ["lang_ru"],
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             "_content_link"
             )
@@ -334,9 +308,9 @@ def call_back_directory (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     elif trg .value ==unsucc_node .value or trg .value ==node_err .value :
         payload ={"message":"Nothing"}
 
-    callback_event .set ()
     if not payload :
         return result .FAILURE 
+    completions .resolve (src ,payload )
     return result .SUCCESS 
 
 def call_back_get_events (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
@@ -347,22 +321,13 @@ def call_back_get_events (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     :param trg: Адрес ноды, которая показывает результат выполнения агента
     :return: Результат выполнения агента
     """
-    global payload 
-    callback_event .clear ()
-    succ_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_successfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    unsucc_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_unsuccessfully',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    node_err =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ='action_finished_with_error',type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
+    payload =None 
+    succ_node =keynodes ['action_finished_successfully']
+    unsucc_node =keynodes ['action_finished_unsuccessfully']
+    node_err =keynodes ['action_finished_with_error']
 
     if trg .value ==succ_node .value :
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='nrel_result',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
+        nrel_result =keynodes ['nrel_result']
         res_templ =ScTemplate ()
         res_templ .triple_with_relation (
         src ,
@@ -381,33 +346,24 @@ def call_back_get_events (src :ScAddr ,connector :ScAddr ,trg :ScAddr )->Enum :
     elif trg .value ==unsucc_node .value or trg .value ==node_err .value :
         payload ={"message":result .FAILURE }
 
-    callback_event .set ()
     if not payload :
         return result .FAILURE 
+    completions .resolve (src ,payload )
     return result .SUCCESS 
 
 def callback_rating (src :ScAddr ,connector :ScAddr ,trg :ScAddr ):
     """
     Специальный callback для RatingUpdateAgent - извлекает РАНГ пользователя (строкой)
     """
-    global payload 
-    callback_event .clear ()
-
-    succ_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_successfully",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    unsucc_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_unsuccessfully",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    node_err =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_with_error",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
+    payload =None 
+
+    succ_node =keynodes ["action_finished_successfully"]
+    unsucc_node =keynodes ["action_finished_unsuccessfully"]
+    node_err =keynodes ["action_finished_with_error"]
 
     if trg .value ==succ_node .value :
 
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ="nrel_result",type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
+        nrel_result =keynodes ["nrel_result"]
 
         res_templ =ScTemplate ()
         res_templ .triple_with_relation (
@@ -447,35 +403,25 @@ def callback_rating (src :ScAddr ,connector :ScAddr ,trg :ScAddr ):
     elif trg .value ==unsucc_node .value or trg .value ==node_err .value :
         payload ={"message":result .FAILURE }
 
-    callback_event .set ()
-
     if not payload :
         return result .FAILURE 
 
+    completions .resolve (src ,payload )
     return result .SUCCESS 
 
 def callback_check_answer (src :ScAddr ,connector :ScAddr ,trg :ScAddr ):
     """
     Специальный callback для CheckTheAnswerAgent - извлекает правильность ответа
     """
-    global payload 
-    callback_event .clear ()
-
-    succ_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_successfully",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    unsucc_node =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_unsuccessfully",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
-    node_err =client .resolve_keynodes (
-    ScIdtfResolveParams (idtf ="action_finished_with_error",type =sc_types .NODE_CONST_CLASS )
-    )[0 ]
+    payload =None 
+
+    succ_node =keynodes ["action_finished_successfully"]
+    unsucc_node =keynodes ["action_finished_unsuccessfully"]
+    node_err =keynodes ["action_finished_with_error"]
 
     if trg .value ==succ_node .value :
 
-        nrel_result =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ="nrel_result",type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
+        nrel_result =keynodes ["nrel_result"]
 
         res_templ =ScTemplate ()
         res_templ .triple_with_relation (
@@ -514,31 +460,21 @@ def callback_check_answer (src :ScAddr ,connector :ScAddr ,trg :ScAddr ):
     elif trg .value ==unsucc_node .value or trg .value ==node_err .value :
         payload ={"message":result .FAILURE }
 
-    callback_event .set ()
-
     if not payload :
         return result .FAILURE 
 
+    completions .resolve (src ,payload )
     return result .SUCCESS 
 
 def callback_filter_messages(src: ScAddr, connector: ScAddr, trg: ScAddr):
-    global payload
-    callback_event.clear()
-
-    succ_node = client.resolve_keynodes(
-        ScIdtfResolveParams(idtf='action_finished_successfully', type=sc_types.NODE_CONST_CLASS)
-    )[0]
-    unsucc_node = client.resolve_keynodes(
-        ScIdtfResolveParams(idtf='action_finished_unsuccessfully', type=sc_types.NODE_CONST_CLASS)
-    )[0]
-    node_err = client.resolve_keynodes(
-        ScIdtfResolveParams(idtf='action_finished_with_error', type=sc_types.NODE_CONST_CLASS)
-    )[0]
+    payload = None
+
+    succ_node = keynodes['action_finished_successfully']
+    unsucc_node = keynodes['action_finished_unsuccessfully']
+    node_err = keynodes['action_finished_with_error']
 
     if trg.value == succ_node.value:
-        nrel_result = client.resolve_keynodes(
-            ScIdtfResolveParams(idtf='nrel_result', type=sc_types.NODE_CONST_CLASS)
-        )[0]
+        nrel_result = keynodes['nrel_result']
 
         res_templ = ScTemplate()
         res_templ.triple_with_relation(
@@ -564,7 +500,8 @@ def callback_filter_messages(src: ScAddr, connector: ScAddr, trg: ScAddr):
     elif trg.value == unsucc_node.value or trg.value == node_err.value:
         payload = {"message": result.FAILURE, "expert_addrs": set()}
 
-    callback_event.set()
+    if payload:
+        completions.resolve(src, payload)
 
 class Ostis :
     """
@@ -573,6 +510,26 @@ class Ostis :
     def __init__ (self ,url ):
         self .ostis_url =url 
 
+    def invoke (self ,action_name :str ,arguments :list ,callback =call_back ,timeout :int =10 ):
+        """
+        Метод для вызова агента: создание действия, инициирование и ожидание результата
+        :param action_name: Идентификатор класса действия
+        :param arguments: Аргументы действия по порядку rrel_1, rrel_2, ... (см. build_action)
+        :param callback: Колбэк-функция, извлекающая результат агента
+        :param timeout: Время ожидания в секундах до накопления статистики по действию
+        :return: Результат, переданный колбэком
+        :raises AgentError: Возникает при истечении времени ожидания
+        :raises ScServerError: Возникает, если предохранитель разомкнут
+        """
+        key =single_flight .key (action_name ,arguments ,callback )
+        return single_flight .do (key ,lambda :self ._invoke (action_name ,arguments ,callback ,timeout ))
+
+    def _invoke (self ,action_name :str ,arguments :list ,callback ,timeout :int ):
+        """
+        Метод для вызова агента без объединения одинаковых вызовов (см. invoke)
+        """
+        return ActionCall (action_name ,arguments ,callback ,timeout ).run ()
+
     def call_registration_agent (
     self ,
     action_name :str ,
@@ -592,178 +549,20 @@ class Ostis :
         if not is_connected ():
             raise ScServerError ()
 
-        global payload 
-        payload =None 
-
-
-        email_lnk =create_link (client ,email )
-        password_lnk =create_link (client ,password )
-        password_conf_lnk =create_link (client ,password_conf )
-
-
-        action_agent =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
-
-        initiated_node =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
-
-
-        rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        rrel_3 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_3',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        rrel_4 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_4',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-
-        concept_client_kn =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='concept_client',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
-        concept_specialist_kn =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='concept_specialist',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
-
-
-        user_type_class =concept_client_kn if user_type =='client'else concept_specialist_kn 
-
-
-        main_node =get_node (client )
-
-
-        template =ScTemplate ()
-
-
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        email_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_1 
-        )
-
-
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        password_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_2 
-        )
-
-
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        password_conf_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_3 
-        )
-
-
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        sc_types .NODE_VAR >>"_user_type",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_4 
-        )
-
-        template .triple (
-        user_type_class ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_user_type"
-        )
+        user_type_class =keynodes ['concept_client']if user_type =='client'else keynodes ['concept_specialist']
 
+        arguments =[email ,password ,password_conf ,ActionNode (classes =(user_type_class ,))]
 
         if user_type =='specialist':
-            rrel_5 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_5',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_6 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_6',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_7 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_7',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_8 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_8',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_9 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_9',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            if full_name :
-                full_name_lnk =create_link (client ,full_name )
-                template .triple_with_relation (
-                main_node >>"_main_node",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                full_name_lnk ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                rrel_5 
-                )
+            arguments +=[
+            full_name or None ,
+            gender or None ,
+            str (age )if age else None ,
+            str (experience )if experience else None ,
+            field or None 
+            ]
 
-            if gender :
-                gender_lnk =create_link (client ,gender )
-                template .triple_with_relation (
-                main_node >>"_main_node",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                gender_lnk ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                rrel_6 
-                )
-
-            if age :
-                age_lnk =create_link (client ,str (age ))
-                template .triple_with_relation (
-                main_node >>"_main_node",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                age_lnk ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                rrel_7 
-                )
-
-            if experience :
-                experience_lnk =create_link (client ,str (experience ))
-                template .triple_with_relation (
-                main_node >>"_main_node",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                experience_lnk ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                rrel_8 
-                )
-
-            if field :
-                field_lnk =create_link (client ,field )
-                template .triple_with_relation (
-                main_node >>"_main_node",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                field_lnk ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                rrel_9 
-                )
-
-
-        template .triple (
-        action_agent ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-
-
-        template .triple (
-        initiated_node ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-
-
-        event_params =ScEventSubscriptionParams (
-        main_node ,
-        ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-        call_back 
-        )
-        client .events_create (event_params )
-
-
-        client .template_generate (template )
-
-
-        if callback_event .wait (timeout =30 ):
-            while not payload :
-                continue 
-            return payload 
-        else :
-            raise AgentError (524 ,"Timeout")
+        return self .invoke (action_name ,arguments ,call_back ,timeout =30 )
 
 
 
@@ -774,62 +573,7 @@ class Ostis :
         if not is_connected ():
             raise ScServerError ()
 
-        global payload 
-        payload =None 
-
-
-        username_lnk =create_link (client ,email )
-        password_lnk =create_link (client ,password )
-
-
-        rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-        action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-
-        main_node =get_node (client )
-
-
-        template =ScTemplate ()
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        username_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_1 
-        )
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        password_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_2 
-        )
-        template .triple (
-        action_agent ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-        template .triple (
-        initiated_node ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-
-        event_params =ScEventSubscriptionParams (
-        main_node ,
-        ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-        call_back 
-        )
-        client .events_create (event_params )
-        client .template_generate (template )
-
-        if callback_event .wait (timeout =10 ):
-            while not payload :
-                continue 
-            return payload 
-        else :
-            raise AgentError (524 ,"Timeout")
+        return self .invoke (action_name ,[InternedLink (email ),password ],call_back ,timeout =10 )
 
 
     def call_verification_agent (self ,action_name :str ,email :str ,token :str =None ):
@@ -839,66 +583,7 @@ class Ostis :
         if not is_connected ():
             raise ScServerError ()
 
-        global payload 
-        payload =None 
-
-
-        email_lnk =create_link (client ,email )
-
-
-        rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-        initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-        action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-
-        main_node =get_node (client )
-
-
-        template =ScTemplate ()
-        template .triple_with_relation (
-        main_node >>"_main_node",
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        email_lnk ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        rrel_1 
-        )
-
-
-        if token is not None :
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            token_lnk =create_link (client ,token )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            token_lnk ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_2 
-            )
-
-        template .triple (
-        action_agent ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-        template .triple (
-        initiated_node ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        "_main_node",
-        )
-
-        event_params =ScEventSubscriptionParams (
-        main_node ,
-        ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-        call_back 
-        )
-        client .events_create (event_params )
-        client .template_generate (template )
-
-        if callback_event .wait (timeout =10 ):
-            while not payload :
-                continue 
-            return payload 
-        else :
-            raise AgentError (524 ,"Timeout")
+        return self .invoke (action_name ,[InternedLink (email ),token ],call_back ,timeout =10 )
 
 
 
@@ -917,40 +602,13 @@ class Ostis :
         if not is_connected():
             return None
 
-        global payload
-        # Reset state BEFORE subscribing to avoid stale event from previous request
-        payload = None
-        callback_event.clear()
-
-        request_lnk   = create_link(client, content)
-        rrel_1         = client.resolve_keynodes(ScIdtfResolveParams(idtf='rrel_1',          type=sc_types.NODE_CONST_ROLE))[0]
-        initiated_node = client.resolve_keynodes(ScIdtfResolveParams(idtf='action_initiated', type=sc_types.NODE_CONST_CLASS))[0]
-        action_agent   = client.resolve_keynodes(ScIdtfResolveParams(idtf=action_name,        type=sc_types.NODE_CONST_CLASS))[0]
-        main_node      = get_node(client)
-
-        template = ScTemplate()
-        template.triple_with_relation(
-            main_node >> "_main_node",
-            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-            request_lnk,
-            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-            rrel_1,
-        )
-        template.triple(action_agent,   sc_types.EDGE_ACCESS_VAR_POS_PERM, "_main_node")
-        template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, "_main_node")
-
-        event_params = ScEventSubscriptionParams(
-            main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, call_back_request
-        )
-        client.events_create(event_params)
-        client.template_generate(template)
-
-        # Wait for finish signal — callback only sets event on action_finished_* arcs
-        if callback_event.wait(timeout=30):
-            return payload   # may be {"message": []} on failure
-        # Timeout — sc-machine agent didn't respond
-        print(f"[REQUEST] Timeout waiting for action_user_request response")
-        return None
+        # Wait for finish signal — callback only resolves on action_finished_* arcs
+        try:
+            return self.invoke(action_name, [content], call_back_request, timeout=30)
+        except AgentError:
+            # Timeout — sc-machine agent didn't respond
+            print(f"[REQUEST] Timeout waiting for action_user_request response")
+            return None
 
     def call_directory_agent (self ,action_name :str ,content :str )->str :
         """
@@ -962,62 +620,11 @@ class Ostis :
         :raises ScServerError: Возникает при отсутствии запущенного sc-сервера
         """
         if is_connected ():
-            part_node =ScKeynodes ["CONCEPT_FULL_SEARCH"]
-            area_node =ScKeynodes ["FULL_SEARCH"]
-            content_lnk =create_link (client ,content )
-
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_3 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_3',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            part_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            area_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_2 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            content_lnk ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_3 
-            )
-            template .triple (
-            action_agent ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            template .triple (
-            initiated_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back_directory )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[
+            keynodes ["CONCEPT_FULL_SEARCH"],
+            keynodes ["FULL_SEARCH"],
+            content 
+            ],call_back_directory ,timeout =10 )
         else :
             raise ScServerError 
 
@@ -1034,97 +641,18 @@ class Ostis :
         :raises ScServerError: Возникает при отсутствии запущенного sc-сервера
         """
         if is_connected ():
-            event_name_lnk =create_link (client ,event_name )
             day ,month ,year =split_date_content (event_date )
-            day_node =set_system_idtf (day )
-            month_node =set_system_idtf (month )
-            year_node =set_system_idtf (year )
-            event_description_lnk =create_link (client ,event_description )
-
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_3 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_3',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_4 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_4',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            rrel_event_day =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_event_day',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_event_month =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_event_month',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_event_year =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_event_year',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            user =get_user_by_login (user_name )
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            event_name_lnk ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_2 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            sc_types .NODE_VAR_TUPLE >>"_tuple",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_3 
-            )
-            template .triple_with_relation (
-            "_tuple",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            day_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_event_day 
+            event_date_tuple =ActionNode (
+            sc_type =sc_types .NODE_CONST_TUPLE ,
+            members =(
+            (keynodes ['rrel_event_day'],ActionNode (system_idtf =day )),
+            (keynodes ['rrel_event_month'],ActionNode (system_idtf =month )),
+            (keynodes ['rrel_event_year'],ActionNode (system_idtf =year )),
             )
-            template .triple_with_relation (
-            "_tuple",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            month_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_event_month 
             )
-            template .triple_with_relation (
-            "_tuple",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            year_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_event_year 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            event_description_lnk ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_4 
-            )
-            template .triple (
-            action_agent ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            template .triple (
-            initiated_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-            global payload 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+
+            user =get_user_by_login (user_name )
+            return self .invoke (action_name ,[user ,event_name ,event_date_tuple ,event_description ],call_back ,timeout =10 )
         else :
             raise ScServerError 
 
@@ -1139,52 +667,8 @@ class Ostis :
         :raises ScServerError: Возникает при отсутствии запущенного sc-сервера
         """
         if is_connected ():
-
-            event_name_lnk =create_link (client ,event_name )
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
             user =get_user_by_login (username )
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            event_name_lnk ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_2 
-            )
-            template .triple (
-            action_agent ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            template .triple (
-            initiated_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-            global payload 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ,event_name ],call_back ,timeout =10 )
         else :
             raise ScServerError 
 
@@ -1198,44 +682,8 @@ class Ostis :
         :raises ScServerError: Возникает при отсутствии запущенного sc-сервера
         """
         if is_connected ():
-
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
             user =get_user_by_login (username )
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple (
-            action_agent ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            template .triple (
-            initiated_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back_get_events )
-            client .events_create (event_params )
-            client .template_generate (template )
-            print ("here")
-            global payload 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ],call_back_get_events ,timeout =10 )
         else :
             raise ScServerError 
 
@@ -1247,58 +695,7 @@ class Ostis :
             if not user :
                 raise Exception (f"User node for {username } not found")
 
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (main_node >>"_main_node",sc_types .EDGE_ACCESS_VAR_POS_PERM ,user ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_1 )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
-        else :
-            raise ScServerError 
-
-    def call_search_answers_agent (self ,action_name :str ,question_addr )->dict :
-        """Вызов SearchAnswersForQuestionAgent"""
-        if is_connected ():
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (main_node >>"_main_node",sc_types .EDGE_ACCESS_VAR_POS_PERM ,question_addr ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_1 )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ],call_back ,timeout =30 )
         else :
             raise ScServerError 
 
@@ -1310,31 +707,7 @@ class Ostis :
             if not user :
                 raise Exception (f"User node for {username } not found")
 
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_2',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (main_node >>"_main_node",sc_types .EDGE_ACCESS_VAR_POS_PERM ,answer_addr ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_1 )
-            template .triple_with_relation ("_main_node",sc_types .EDGE_ACCESS_VAR_POS_PERM ,user ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_2 )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[answer_addr ,user ],call_back ,timeout =30 )
         else :
             raise ScServerError 
 
@@ -1348,64 +721,14 @@ class Ostis :
             if not user :
                 raise Exception (f"User node for {username } not found")
 
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_1",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_2",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ="action_initiated",type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (main_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,question_addr ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_1 )
-            template .triple_with_relation (main_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,user ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_2 )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-
-
-            event_params =ScEventSubscriptionParams (
-            main_node ,
-            ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-            callback_check_answer 
-            )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[question_addr ,user ],callback_check_answer ,timeout =30 )
         else :
             raise ScServerError ()
 
     def call_search_answers_agent (self ,action_name :str ,question_addr :ScAddr )->dict :
         """Вызов SearchAnswersForQuestionAgent"""
         if is_connected ():
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (main_node >>"_main_node",sc_types .EDGE_ACCESS_VAR_POS_PERM ,question_addr ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,rrel_1 )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,"_main_node")
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[question_addr ],call_back ,timeout =10 )
         else :
             raise ScServerError 
 
@@ -1413,75 +736,15 @@ class Ostis :
     def call_delete_old_nodes_agent (self ,action_name :str ,username :str )->dict :
         """Вызов DeleteOldNodesAgent"""
         if is_connected ():
-            print (1 )
-            rrel_1 =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ='rrel_1',type =sc_types .NODE_CONST_ROLE )
-            )[0 ]
-            initiated_node =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ='action_initiated',type =sc_types .NODE_CONST_CLASS )
-            )[0 ]
-            action_agent =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS )
-            )[0 ]
-            main_node =get_node (client )
-
-            print (2 )
             username_str =str (username )
 
-
             from service .models import get_user_by_login 
             user =get_user_by_login (username_str )
             print (f"DEBUG: user from get_user_by_login = {user }")
             if not user :
                 raise Exception (f"User node for {username_str } not found")
 
-            print (3 )
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node >>"_main_node",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 ,
-            )
-            template .triple (
-            action_agent ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-            template .triple (
-            initiated_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_main_node",
-            )
-
-            print (4 )
-            print (f"DEBUG: Creating event subscription for main_node = {main_node }")
-            event_params =ScEventSubscriptionParams (
-            main_node ,
-            ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-            call_back ,
-            )
-            client .events_create (event_params )
-
-            print (5 )
-            print (f"DEBUG: Generating template, waiting for agent response...")
-            client .template_generate (template )
-            print (6 )
-
-            print ("DEBUG: Waiting for callback event (timeout=30)...")
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                print (f"DEBUG: Callback event received! payload = {payload }")
-                while not payload :
-                    continue 
-                print (f"DEBUG: Returning payload = {payload }")
-                return payload 
-            else :
-                print ("DEBUG: Timeout! Agent didn't respond in 30 seconds")
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ],call_back ,timeout =30 )
         else :
             raise ScServerError 
 
@@ -1494,41 +757,7 @@ class Ostis :
             if not user :
                 raise Exception (f"User node for {username } not found")
 
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_1",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ="action_initiated",type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-
-
-            event_params =ScEventSubscriptionParams (
-            main_node ,
-            ScEventType .AFTER_GENERATE_INCOMING_ARC ,
-            callback_rating 
-            )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-
-            if callback_event .wait (timeout =30 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ],callback_rating ,timeout =30 )
         else :
             raise ScServerError ()
 
@@ -1544,57 +773,7 @@ class Ostis :
             if not user :
                 raise Exception (f"User not found: {username }")
 
-
-            title_link =create_link (client ,title )
-            description_link =create_link (client ,description )
-
-
-            rrel_1 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_1",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_2 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_2",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            rrel_3 =client .resolve_keynodes (ScIdtfResolveParams (idtf ="rrel_3",type =sc_types .NODE_CONST_ROLE ))[0 ]
-            initiated_node =client .resolve_keynodes (ScIdtfResolveParams (idtf ="action_initiated",type =sc_types .NODE_CONST_CLASS ))[0 ]
-            action_agent =client .resolve_keynodes (ScIdtfResolveParams (idtf =action_name ,type =sc_types .NODE_CONST_CLASS ))[0 ]
-
-
-            main_node =get_node (client )
-
-            template =ScTemplate ()
-            template .triple_with_relation (
-            main_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_1 
-            )
-            template .triple_with_relation (
-            main_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            title_link ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_2 
-            )
-            template .triple_with_relation (
-            main_node ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            description_link ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            rrel_3 
-            )
-            template .triple (action_agent ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-            template .triple (initiated_node ,sc_types .EDGE_ACCESS_VAR_POS_PERM ,main_node )
-
-            event_params =ScEventSubscriptionParams (main_node ,ScEventType .AFTER_GENERATE_INCOMING_ARC ,call_back )
-            client .events_create (event_params )
-            client .template_generate (template )
-
-            global payload 
-            payload =None 
-            if callback_event .wait (timeout =10 ):
-                while not payload :
-                    continue 
-                return payload 
-            else :
-                raise AgentError (524 ,"Timeout")
+            return self .invoke (action_name ,[user ,title ,description ],call_back ,timeout =10 )
         else :
             raise ScServerError ()
 
@@ -1608,89 +787,20 @@ class Ostis :
             if not user_sc_addr:
                 raise Exception(f"User SC node not found: {username}")
 
-            message_link = create_link(client, message_text)
-
-            rrel_1 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_1", type=sc_types.NODE_CONST_ROLE))[0]
-            rrel_2 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_2", type=sc_types.NODE_CONST_ROLE))[0]
-            rrel_3 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_3", type=sc_types.NODE_CONST_ROLE))[0]
-            initiated_node = client.resolve_keynodes(ScIdtfResolveParams(idtf="action_initiated", type=sc_types.NODE_CONST_CLASS))[0]
-            action_agent = client.resolve_keynodes(ScIdtfResolveParams(idtf=action_name, type=sc_types.NODE_CONST_CLASS))[0]
-
-            main_node = get_node(client)
-
-            template = ScTemplate()
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, user_sc_addr, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_1)
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, topic_addr, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_2)
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, message_link, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_3)
-
+            arguments = [user_sc_addr, topic_addr, message_text]
             if image_base64:
-                rrel_4 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_4", type=sc_types.NODE_CONST_ROLE))[0]
-                rrel_5 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_5", type=sc_types.NODE_CONST_ROLE))[0]
-                rrel_6 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_6", type=sc_types.NODE_CONST_ROLE))[0]
-                base64_link = create_link(client, image_base64)
-                name_link = create_link(client, image_name or "image.jpg")
-                mime_link = create_link(client, image_mime or "image/jpeg")
-                template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, base64_link, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_4)
-                template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, name_link, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_5)
-                template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, mime_link, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_6)
-
-            template.triple(action_agent, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-            template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-
-            event_params = ScEventSubscriptionParams(main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, call_back)
-            client.events_create(event_params)
-            client.template_generate(template)
-
-            global payload
-            payload = None
-            if callback_event.wait(timeout=10):
-                while not payload:
-                    continue
-                return payload
-            else:
-                raise AgentError(524, "Timeout")
+                arguments += [image_base64, image_name or "image.jpg", InternedLink(image_mime or "image/jpeg")]
+
+            return self.invoke(action_name, arguments, call_back, timeout=10)
         else:
             raise ScServerError()
         
     def find_user_node_by_login(self, login: str) -> ScAddr:
         """Находит узел пользователя в SC-памяти по логину/email"""
         try:
-            nrel_system_identifier = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf="nrel_system_identifier", type=sc_types.NODE_CONST_NOROLE)
-            )[0]
-            registered_user = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf="registered_jurisprudence_user", type=sc_types.NODE_CONST_CLASS)
-            )[0]
-
-            # Ищем все узлы зарегистрированных пользователей
-            users_template = ScTemplate()
-            users_template.triple(
-                registered_user,
-                sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                sc_types.NODE_VAR >> "_user"
-            )
-            users_result = client.template_search(users_template)
-
-            for item in users_result:
-                user_addr = item.get("_user")
-
-                # Проверяем email/логин через nrel_system_identifier
-                id_template = ScTemplate()
-                id_template.triple(
-                    user_addr,
-                    sc_types.EDGE_D_COMMON_VAR >> "_id_arc",
-                    sc_types.LINK_VAR >> "_id_link"
-                )
-                id_template.triple(
-                    nrel_system_identifier,
-                    sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                    "_id_arc"
-                )
-                id_result = client.template_search(id_template)
-                if id_result:
-                    stored_login = client.get_link_content(id_result[0].get("_id_link"))[0].data
-                    if stored_login == login:
-                        return user_addr
+            user_addr = user_directory.resolve(login, "registered_jurisprudence_user", "nrel_system_identifier")
+            if user_addr is not None:
+                return user_addr
 
             print(f"DEBUG: User node not found for login: {login}")
             return None
@@ -1703,106 +813,19 @@ class Ostis :
         
     def call_rate_message_agent(self, action_name: str, message_addr: ScAddr, rating_type: str):
         if is_connected():
-            rating_link = create_link(client, rating_type)
-            rrel1 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_1", type=sc_types.NODE_CONST_ROLE))[0]
-            rrel2 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_2", type=sc_types.NODE_CONST_ROLE))[0]
-            initiated_node = client.resolve_keynodes(ScIdtfResolveParams(idtf="action_initiated", type=sc_types.NODE_CONST_CLASS))[0]
-            action_agent = client.resolve_keynodes(ScIdtfResolveParams(idtf=action_name, type=sc_types.NODE_CONST_CLASS))[0]
-            main_node = get_node(client)
-
-            template = ScTemplate()
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, message_addr, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel1)
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, rating_link, sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel2)
-            template.triple(action_agent, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-            template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-
-            event_params = ScEventSubscriptionParams(main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, call_back)
-            client.events_create(event_params)
-            client.template_generate(template)
-
-            global payload
-            payload = None
-            if callback_event.wait(timeout=10):
-                while not payload:
-                    continue
-                return payload
-            else:
-                raise AgentError(524, "Timeout")
+            return self.invoke(action_name, [message_addr, InternedLink(rating_type)], call_back, timeout=10)
         else:
             raise ScServerError
         
     def call_delete_message_agent(self, action_name: str, message_addr: ScAddr):
         if is_connected():
-            rrel_1 = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf="rrel_1", type=sc_types.NODE_CONST_ROLE)
-            )[0]
-            initiated_node = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf="action_initiated", type=sc_types.NODE_CONST_CLASS)
-            )[0]
-            action_agent = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf=action_name, type=sc_types.NODE_CONST_CLASS)
-            )[0]
-
-            main_node = get_node(client)
-
-            template = ScTemplate()
-            template.triple_with_relation(
-                main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, message_addr,
-                sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel_1
-            )
-            template.triple(action_agent, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-            template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-
-            global payload
-            payload = None
-            callback_event.clear()
-
-            event_params = ScEventSubscriptionParams(
-                main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, call_back  # <-- call_back, не callback
-            )
-            client.events_create(event_params)
-            client.template_generate(template)
-
-            if callback_event.wait(timeout=10):
-                while not payload:
-                    continue
-                return payload
-            else:
-                raise AgentError(524, "Timeout")
+            return self.invoke(action_name, [message_addr], call_back, timeout=10)
         else:
             raise ScServerError
         
     def call_edit_message_agent(self, action_name: str, message_addr: ScAddr, new_text: str):
         if is_connected():
-            new_content_link = create_link(client, new_text)
-
-            rrel1 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_1", type=sc_types.NODE_CONST_ROLE))[0]
-            rrel2 = client.resolve_keynodes(ScIdtfResolveParams(idtf="rrel_2", type=sc_types.NODE_CONST_ROLE))[0]
-            initiated_node = client.resolve_keynodes(ScIdtfResolveParams(idtf="action_initiated", type=sc_types.NODE_CONST_CLASS))[0]
-            action_agent = client.resolve_keynodes(ScIdtfResolveParams(idtf=action_name, type=sc_types.NODE_CONST_CLASS))[0]
-            main_node = get_node(client)
-
-            template = ScTemplate()
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, message_addr,
-                                        sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel1)
-            template.triple_with_relation(main_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, new_content_link,
-                                        sc_types.EDGE_ACCESS_VAR_POS_PERM, rrel2)
-            template.triple(action_agent, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-            template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, main_node)
-
-            global payload
-            payload = None
-            callback_event.clear()
-            event_params = ScEventSubscriptionParams(main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, call_back)
-            client.events_create(event_params)
-            client.template_generate(template)
-
-            if callback_event.wait(timeout=10):
-                while not payload:
-                    continue
-                return payload
-            else:
-                raise AgentError(524, "Timeout")
+            return self.invoke(action_name, [message_addr, new_text], call_back, timeout=10)
         else:
             raise ScServerError
 
@@ -1838,58 +861,35 @@ class Ostis :
         }
     
 
+
     def call_filter_messages_agent(self, action_name: str, topic_addr: ScAddr) -> set:
         if not is_connected():
             raise ScServerError()
 
-        global payload
-        payload = None
-
-        rrel_1 = client.resolve_keynodes(
-            ScIdtfResolveParams(idtf='rrel_1', type=sc_types.NODE_CONST_ROLE)
-        )[0]
-        initiated_node = client.resolve_keynodes(
-            ScIdtfResolveParams(idtf='action_initiated', type=sc_types.NODE_CONST_CLASS)
-        )[0]
-        action_agent = client.resolve_keynodes(
-            ScIdtfResolveParams(idtf=action_name, type=sc_types.NODE_CONST_CLASS)
-        )[0]
-        main_node = get_node(client)
-
-        template = ScTemplate()
-        template.triple_with_relation(
-            main_node >> "_main_node",
-            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-            topic_addr,
-            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-            rrel_1
-        )
-        template.triple(action_agent, sc_types.EDGE_ACCESS_VAR_POS_PERM, "_main_node")
-        template.triple(initiated_node, sc_types.EDGE_ACCESS_VAR_POS_PERM, "_main_node")
-
-        event_params = ScEventSubscriptionParams(
-            main_node, ScEventType.AFTER_GENERATE_INCOMING_ARC, callback_filter_messages
-        )
-        client.events_create(event_params)
-        client.template_generate(template)
-
-        if callback_event.wait(timeout=10):
-            while not payload:
-                continue
-            return payload.get("expert_addrs", set())
-        else:
-            raise AgentError(524, "Timeout")
+        agent_response = self.invoke(action_name, [topic_addr], callback_filter_messages, timeout=10)
+        return agent_response.get("expert_addrs", set())
         
     
+    def get_topic_addrs (self ):
+        """Получает адреса всех топиков форума одним поиском по шаблону"""
+        if not is_connected ():
+            raise ScServerError ()
+        template =ScTemplate ()
+        template .triple (
+        keynodes ["concept_topic"],
+        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+        sc_types .NODE_VAR >>"_topic"
+        )
+        return [item .get ("_topic").value for item in client .template_search (template )]
+
     def get_all_topics (self ):
         """Получает список всех топиков форума"""
         if is_connected ():
             try :
-                concept_topic =client .resolve_keynodes (ScIdtfResolveParams (idtf ="concept_topic",type =sc_types .NODE_CONST_CLASS ))[0 ]
+                concept_topic =keynodes ["concept_topic"]
                 print (f"DEBUG: concept_topic = {concept_topic }")
 
-                nrel_topic_title =client .resolve_keynodes (ScIdtfResolveParams (idtf ="nrel_topic_title",type =sc_types .NODE_CONST_NOROLE ))[0 ]
-                nrel_author =client .resolve_keynodes (ScIdtfResolveParams (idtf ="nrel_author",type =sc_types .NODE_CONST_NOROLE ))[0 ]
+                nrel_author =keynodes ["nrel_author"]
 
 
                 template =ScTemplate ()
@@ -1903,51 +903,36 @@ class Ostis :
                 print (f"DEBUG: Found {len (result )} topics")
                 topics =[]
 
-                for item in result :
-                    topic_addr =item .get ("_topic")
-
+                topic_addrs =[item .get ("_topic")for item in result ]
+                titles =read_attributes (topic_addrs ,['nrel_topic_title'])
 
-                    title_template =ScTemplate ()
-                    title_template .triple (
-                    topic_addr ,
-                    sc_types .EDGE_D_COMMON_VAR >>"_title_arc",
-                    sc_types .LINK_VAR >>"_title_link"
-                    )
-                    title_template .triple (
-                    nrel_topic_title ,
-                    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                    "_title_arc"
-                    )
-
-                    title_result =client .template_search (title_template )
-                    title =""
-                    if title_result :
-                        title_link =title_result [0 ].get ("_title_link")
-                        title =client .get_link_content (title_link )[0 ].data 
-
-
-                    author_template =ScTemplate ()
-                    author_template .triple (
-                    topic_addr ,
-                    sc_types .EDGE_D_COMMON_VAR >>"_author_arc",
-                    sc_types .NODE_VAR >>"_author"
-                    )
-                    author_template .triple (
-                    nrel_author ,
-                    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                    "_author_arc"
-                    )
+                # Авторы всех топиков — одним поиском
+                author_template =ScTemplate ()
+                author_template .triple (
+                concept_topic ,
+                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+                sc_types .NODE_VAR >>"_topic"
+                )
+                author_template .quintuple (
+                "_topic",
+                sc_types .EDGE_D_COMMON_VAR ,
+                sc_types .NODE_VAR >>"_author",
+                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+                nrel_author 
+                )
+                topic_authors ={}
+                for item in client .template_search (author_template ):
+                    topic_authors .setdefault (item .get ("_topic").value ,item .get ("_author"))
+                authors =[topic_authors .get (topic_addr .value )for topic_addr in topic_addrs ]
 
-                    author_result =client .template_search (author_template )
-                    author_display ="Unknown"
-                    if author_result :
-                        author_addr =author_result [0 ].get ("_author")
-                        author_display =self .format_user_display (author_addr )
+                # Подписи всех различных авторов списка загружаются одним пакетом
+                displays =author_displays .displays ([author for author in authors if author is not None ])
 
+                for topic_addr ,attrs ,author_addr in zip (topic_addrs ,titles ,authors ):
                     topics .append ({
                     'addr':topic_addr .value ,
-                    'title':title ,
-                    'author':author_display 
+                    'title':attrs ['nrel_topic_title'],
+                    'author':displays .get (author_addr .value ,"Unknown")if author_addr is not None else "Unknown"
                     })
 
                 return topics 
@@ -1963,47 +948,10 @@ class Ostis :
         """Получает детали топика: заголовок, описание, автор"""
         if is_connected ():
             try :
-                nrel_topic_title =client .resolve_keynodes (ScIdtfResolveParams (idtf ="nrel_topic_title",type =sc_types .NODE_CONST_NOROLE ))[0 ]
-                nrel_topic_description =client .resolve_keynodes (ScIdtfResolveParams (idtf ="nrel_topic_description",type =sc_types .NODE_CONST_NOROLE ))[0 ]
-                nrel_author =client .resolve_keynodes (ScIdtfResolveParams (idtf ="nrel_author",type =sc_types .NODE_CONST_NOROLE ))[0 ]
-
-
-                title_template =ScTemplate ()
-                title_template .triple (
-                topic_addr ,
-                sc_types .EDGE_D_COMMON_VAR >>"_title_arc",
-                sc_types .LINK_VAR >>"_title_link"
-                )
-                title_template .triple (
-                nrel_topic_title ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                "_title_arc"
-                )
-
-                title_result =client .template_search (title_template )
-                title =""
-                if title_result :
-                    title_link =title_result [0 ].get ("_title_link")
-                    title =client .get_link_content (title_link )[0 ].data 
-
-
-                desc_template =ScTemplate ()
-                desc_template .triple (
-                topic_addr ,
-                sc_types .EDGE_D_COMMON_VAR >>"_desc_arc",
-                sc_types .LINK_VAR >>"_desc_link"
-                )
-                desc_template .triple (
-                nrel_topic_description ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                "_desc_arc"
-                )
-
-                desc_result =client .template_search (desc_template )
-                description =""
-                if desc_result :
-                    desc_link =desc_result [0 ].get ("_desc_link")
-                    description =client .get_link_content (desc_link )[0 ].data 
+                nrel_author =keynodes ["nrel_author"]
+                attrs =read_attributes ([topic_addr ],['nrel_topic_title','nrel_topic_description'])[0 ]
+                title =attrs ['nrel_topic_title']
+                description =attrs ['nrel_topic_description']
 
 
                 author_template =ScTemplate ()
@@ -2020,14 +968,18 @@ class Ostis :
 
                 author_result =client .template_search (author_template )
                 author_display ="Unknown"
+                author_email =""
                 if author_result :
                     author_addr =author_result [0 ].get ("_author")
-                    author_display =self .format_user_display (author_addr )
+                    info =author_displays .authors ([author_addr ]).get (author_addr .value )
+                    if info is not None :
+                        author_display ,author_email =info .display ,info .email 
 
                 return {
                 'title':title ,
                 'description':description ,
-                'author':author_display 
+                'author':author_display ,
+                'author_email':author_email 
                 }
 
             except Exception as e :
@@ -2035,7 +987,9 @@ class Ostis :
                 return {
                 'title':'Unknown',
                 'description':'',
-                'author':'Unknown'
+                'author':'Unknown',
+                'author_email':'',
+                'error':str (e )
                 }
         else :
             raise ScServerError ()
@@ -2045,27 +999,7 @@ class Ostis :
         """Получает все сообщения топика"""
         if is_connected():
             try:
-                concept_message = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="concept_message", type=sc_types.NODE_CONST_CLASS)
-                )[0]
-                nrel_message_content = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="nrel_message_content", type=sc_types.NODE_CONST_NOROLE)
-                )[0]
-                nrel_message_author = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="nrel_author", type=sc_types.NODE_CONST_NOROLE)
-                )[0]
-                concept_specialist = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="concept_specialist", type=sc_types.NODE_CONST_CLASS)
-                )[0]
-                nrel_message_attachment = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="nrel_message_attachment", type=sc_types.NODE_CONST_NOROLE)
-                )[0]
-                nrel_attachment_data = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="nrel_attachment_data", type=sc_types.NODE_CONST_NOROLE)
-                )[0]
-                nrel_attachment_mime = client.resolve_keynodes(
-                    ScIdtfResolveParams(idtf="nrel_attachment_mime", type=sc_types.NODE_CONST_NOROLE)
-                )[0]
+                concept_message = keynodes["concept_message"]
 
                 print(f"DEBUG: Looking for messages in topic {topic_addr}")
 
@@ -2084,172 +1018,41 @@ class Ostis :
                 result = client.template_search(template)
                 print(f"DEBUG: Found {len(result)} messages")
                 messages = []
+                authors = []
+
+                message_addrs = [item.get("_message") for item in result]
+                message_attrs = read_attributes(
+                    message_addrs, ['nrel_message_content', 'nrel_likes', 'nrel_dislikes']
+                )
+                message_authors = self._topic_authors(topic_addr)
+                attachments = self._topic_attachments(topic_addr)
 
-                for item in result:
-                    message_addr = item.get("_message")
+                for message_addr, attrs in zip(message_addrs, message_attrs):
                     print(f"DEBUG: Processing message {message_addr}")
 
-                    # Контент
-                    content_template = ScTemplate()
-                    content_template.triple(
-                        message_addr,
-                        sc_types.EDGE_D_COMMON_VAR >> "_content_arc",
-                        sc_types.LINK_VAR >> "_content_link"
-                    )
-                    content_template.triple(
-                        nrel_message_content,
-                        sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                        "_content_arc"
-                    )
-                    content_result = client.template_search(content_template)
-                    content = ""
-                    if content_result:
-                        content_link = content_result[0].get("_content_link")
-                        content = client.get_link_content(content_link)[0].data
-                        print(f"DEBUG: Message content: {content}")
-                    else:
+                    content = attrs['nrel_message_content']
+                    if not content:
                         print(f"DEBUG: No content found for message {message_addr}")
 
-                    # Автор — ищем любой узел связанный с сообщением который является пользователем
+                    # Автор — пользователь, связанный с сообщением (см. _topic_authors)
                     author_display = "Unknown"
                     is_expert = False
+                    author_addr = message_authors.get(message_addr.value)
 
-                    concept_user = client.resolve_keynodes(
-                        ScIdtfResolveParams(idtf="concept_user", type=sc_types.NODE_CONST_CLASS)
-                    )[0]
-                    concept_verified_user = client.resolve_keynodes(
-                        ScIdtfResolveParams(idtf="concept_verified_user", type=sc_types.NODE_CONST_CLASS)
-                    )[0]
-
-                    # Перебираем все исходящие дуги сообщения к узлам
-                    outgoing_tmpl = ScTemplate()
-                    outgoing_tmpl.triple(
-                        message_addr,
-                        sc_types.EDGE_D_COMMON_VAR,
-                        sc_types.NODE_VAR >> "_candidate"
-                    )
-                    candidates = client.template_search(outgoing_tmpl)
-
-                    author_addr = None
-                    for c in candidates:
-                        candidate = c.get("_candidate")
-                        # Проверяем что это пользователь
-                        for user_class in [concept_verified_user, concept_user]:
-                            check = ScTemplate()
-                            check.triple(
-                                user_class,
-                                sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                                candidate
-                            )
-                            if client.template_search(check):
-                                author_addr = candidate
-                                break
-                        if author_addr:
-                            break
-
-                    if author_addr:
-                        author_display = self.format_user_display(author_addr)
-                        specialist_template = ScTemplate()
-                        specialist_template.triple(
-                            concept_specialist,
-                            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                            author_addr
-                        )
-                        is_expert = len(client.template_search(specialist_template)) > 0
-                    else:
+                    if not author_addr:
                         print(f"DEBUG: No author found for message {message_addr}")
 
-                    # Лайки
-                    likes = 0
-                    nrel_likes = client.resolve_keynodes(
-                        ScIdtfResolveParams(idtf="nrel_likes", type=sc_types.NODE_CONST_NOROLE)
-                    )[0]
-                    likes_template = ScTemplate()
-                    likes_template.quintuple(
-                        message_addr,
-                        sc_types.EDGE_D_COMMON_VAR,
-                        sc_types.LINK_VAR >> "_likes_link",
-                        sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                        nrel_likes
-                    )
-                    likes_result = client.template_search(likes_template)
-                    if likes_result:
-                        likes_link = likes_result[0].get("_likes_link")
-                        try:
-                            likes = int(client.get_link_content(likes_link)[0].data)
-                        except:
-                            likes = 0
-
-                    # Дизлайки
-                    dislikes = 0
-                    nrel_dislikes = client.resolve_keynodes(
-                        ScIdtfResolveParams(idtf="nrel_dislikes", type=sc_types.NODE_CONST_NOROLE)
-                    )[0]
-                    dislikes_template = ScTemplate()
-                    dislikes_template.quintuple(
-                        message_addr,
-                        sc_types.EDGE_D_COMMON_VAR,
-                        sc_types.LINK_VAR >> "_dislikes_link",
-                        sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                        nrel_dislikes
-                    )
-                    dislikes_result = client.template_search(dislikes_template)
-                    if dislikes_result:
-                        dislikes_link = dislikes_result[0].get("_dislikes_link")
-                        try:
-                            dislikes = int(client.get_link_content(dislikes_link)[0].data)
-                        except:
-                            dislikes = 0
+                    try:
+                        likes = int(attrs['nrel_likes'])
+                    except (TypeError, ValueError):
+                        likes = 0
+                    try:
+                        dislikes = int(attrs['nrel_dislikes'])
+                    except (TypeError, ValueError):
+                        dislikes = 0
 
                     # Вложение (фото)
-                    image_base64 = None
-                    image_mime = None
-                    attach_template = ScTemplate()
-                    attach_template.triple(
-                        message_addr,
-                        sc_types.EDGE_D_COMMON_VAR >> "_attach_arc",
-                        sc_types.NODE_VAR >> "_attach_node"
-                    )
-                    attach_template.triple(
-                        nrel_message_attachment,
-                        sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                        "_attach_arc"
-                    )
-                    attach_result = client.template_search(attach_template)
-                    if attach_result:
-                        attach_node = attach_result[0].get("_attach_node")
-
-                        data_template = ScTemplate()
-                        data_template.triple(
-                            attach_node,
-                            sc_types.EDGE_D_COMMON_VAR >> "_data_arc",
-                            sc_types.LINK_VAR >> "_data_link"
-                        )
-                        data_template.triple(
-                            nrel_attachment_data,
-                            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                            "_data_arc"
-                        )
-                        data_result = client.template_search(data_template)
-                        if data_result:
-                            image_base64 = client.get_link_content(data_result[0].get("_data_link"))[0].data
-
-                        mime_template = ScTemplate()
-                        mime_template.triple(
-                            attach_node,
-                            sc_types.EDGE_D_COMMON_VAR >> "_mime_arc",
-                            sc_types.LINK_VAR >> "_mime_link"
-                        )
-                        mime_template.triple(
-                            nrel_attachment_mime,
-                            sc_types.EDGE_ACCESS_VAR_POS_PERM,
-                            "_mime_arc"
-                        )
-                        mime_result = client.template_search(mime_template)
-                        if mime_result:
-                            image_mime = client.get_link_content(mime_result[0].get("_mime_link"))[0].data
-
-                        print(f"DEBUG: Attachment found, mime={image_mime}")
+                    image_base64, image_mime = attachments.get(message_addr.value, (None, None))
 
                     messages.append({
                         'content': content,
@@ -2261,6 +1064,15 @@ class Ostis :
                         'image_base64': image_base64,
                         'image_mime': image_mime,
                     })
+                    authors.append(author_addr)
+
+                # Подпись и признак специалиста для всех различных авторов топика — одним пакетом
+                infos = author_displays.authors([author for author in authors if author])
+                for message, author_addr in zip(messages, authors):
+                    info = infos.get(author_addr.value) if author_addr else None
+                    if info is not None:
+                        message['author'] = info.display
+                        message['is_expert'] = info.is_specialist
 
                 print(f"DEBUG: Returning {len(messages)} messages")
                 return messages
@@ -2274,103 +1086,96 @@ class Ostis :
             raise ScServerError()
 
 
-
-    def format_user_display (self ,user_addr :ScAddr ):
-        """Форматирует отображение пользователя: email (тип, ранг для специалистов)"""
-        try :
-            nrel_system_identifier =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ="nrel_system_identifier",type =sc_types .NODE_CONST_NOROLE )
-            )[0 ]
-            concept_specialist =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ="concept_specialist",type =sc_types .NODE_CONST_CLASS )
-            )[0 ]
-
-
-            email_template =ScTemplate ()
-            email_template .triple (
-            user_addr ,
-            sc_types .EDGE_D_COMMON_VAR >>"_email_arc",
-            sc_types .LINK_VAR >>"_email_link"
+    def _topic_authors(self, topic_addr: ScAddr) -> dict:
+        """
+        Авторы всех сообщений топика: по одному поиску на класс пользователей
+        :param topic_addr: Адрес топика
+        :return: Словарь {адрес сообщения: адрес автора}; подтверждённый пользователь важнее обычного
+        """
+        authors = {}
+        for user_class in (keynodes["concept_verified_user"], keynodes["concept_user"]):
+            template = ScTemplate()
+            template.triple(
+                topic_addr,
+                sc_types.EDGE_ACCESS_VAR_POS_PERM,
+                sc_types.NODE_VAR >> "_message"
             )
-            email_template .triple (
-            nrel_system_identifier ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            "_email_arc"
+            template.triple(
+                keynodes["concept_message"],
+                sc_types.EDGE_ACCESS_VAR_POS_PERM,
+                "_message"
             )
-
-            email_result =client .template_search (email_template )
-            email ="Unknown"
-            if email_result :
-                email_link =email_result [0 ].get ("_email_link")
-                email =client .get_link_content (email_link )[0 ].data 
-
-
-            specialist_template =ScTemplate ()
-            specialist_template .triple (
-            concept_specialist ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            user_addr 
+            template.triple(
+                "_message",
+                sc_types.EDGE_D_COMMON_VAR,
+                sc_types.NODE_VAR >> "_author"
             )
-            is_specialist =len (client .template_search (specialist_template ))>0 
-
-
-            if is_specialist :
-                nrel_selected_answers =client .resolve_keynodes (
-                ScIdtfResolveParams (idtf ="nrel_selected_answers",type =sc_types .NODE_CONST_NOROLE )
-                )[0 ]
-                concept_correct_answer =client .resolve_keynodes (
-                ScIdtfResolveParams (idtf ="concept_correct_answer",type =sc_types .NODE_CONST_CLASS )
-                )[0 ]
-
-                answers_template =ScTemplate ()
-                answers_template .triple (
-                user_addr ,
-                sc_types .EDGE_D_COMMON_VAR >>"_answers_arc",
-                sc_types .NODE_VAR >>"_answers_set"
-                )
-                answers_template .triple (
-                nrel_selected_answers ,
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                "_answers_arc"
-                )
-                answers_template .triple (
-                "_answers_set",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM >>"_answer_arc",
-                sc_types .NODE_VAR >>"_answer"
-                )
-
-                answers_result =client .template_search (answers_template )
-
-                total_answers =len (answers_result )
-                correct_count =0 
-
-                for answer_item in answers_result :
-                    answer_addr =answer_item .get ("_answer")
-
-                    correct_template =ScTemplate ()
-                    correct_template .triple (
-                    concept_correct_answer ,
-                    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                    answer_addr 
-                    )
-
-                    if len (client .template_search (correct_template ))>0 :
-                        correct_count +=1 
-
-                rating =correct_count if total_answers >0 else 0 
+            template.triple(
+                user_class,
+                sc_types.EDGE_ACCESS_VAR_POS_PERM,
+                "_author"
+            )
+            for item in client.template_search(template):
+                authors.setdefault(item.get("_message").value, item.get("_author"))
+        return authors
 
+    def _topic_attachments(self, topic_addr: ScAddr) -> dict:
+        """
+        Вложения всех сообщений топика: один поиск по шаблону и одно чтение sc-link
+        :param topic_addr: Адрес топика
+        :return: Словарь {адрес сообщения: (данные, MIME-тип)}; у сообщения берётся первое вложение
+        """
+        relations = {
+            keynodes["nrel_attachment_data"].value: 0,
+            keynodes["nrel_attachment_mime"].value: 1,
+        }
+        template = ScTemplate()
+        template.triple(
+            topic_addr,
+            sc_types.EDGE_ACCESS_VAR_POS_PERM,
+            sc_types.NODE_VAR >> "_message"
+        )
+        template.quintuple(
+            "_message",
+            sc_types.EDGE_D_COMMON_VAR,
+            sc_types.NODE_VAR >> "_attach",
+            sc_types.EDGE_ACCESS_VAR_POS_PERM,
+            keynodes["nrel_message_attachment"]
+        )
+        template.quintuple(
+            "_attach",
+            sc_types.EDGE_D_COMMON_VAR,
+            sc_types.LINK_VAR >> "_value",
+            sc_types.EDGE_ACCESS_VAR_POS_PERM,
+            sc_types.NODE_VAR >> "_relation"
+        )
 
-                if rating >=8 :
-                    rank_str ="первый ранг"
-                elif rating >=5 :
-                    rank_str ="второй ранг"
-                else :
-                    rank_str ="третий ранг"
+        attached = {}
+        filled = set()
+        cells = []
+        links = []
+        for item in client.template_search(template):
+            column = relations.get(item.get("_relation").value)
+            if column is None:
+                continue
+            message = item.get("_message").value
+            attach = attached.setdefault(message, item.get("_attach").value)
+            if attach != item.get("_attach").value or (message, column) in filled:
+                continue
+            filled.add((message, column))
+            cells.append((message, column))
+            links.append(item.get("_value"))
 
-                return f"{email } (Специалист, {rank_str })"
-            else :
-                return f"{email } (Клиент)"
+        attachments = {message: [None, None] for message in attached}
+        if links:
+            for (message, column), content in zip(cells, client.get_link_content(*links)):
+                attachments[message][column] = content.data
+        return {message: tuple(value) for message, value in attachments.items()}
 
+    def format_user_display (self ,user_addr :ScAddr ):
+        """Форматирует отображение пользователя: email (тип, ранг для специалистов)"""
+        try :
+            return author_displays .display (user_addr )
         except Exception as e :
             print (f"Error formatting user display: {e }")
             return "Unknown"
@@ -2391,8 +1196,6 @@ class OstisVerificationAgent (VerificationAgent ):
         :return: Словарь со статусом
         """
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_verification_agent (
             action_name ="action_verification",
@@ -2426,8 +1229,6 @@ class OstisVerificationAgent (VerificationAgent ):
         :return: Словарь со статусом
         """
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_verification_agent (
             action_name ="action_verification",
@@ -2436,6 +1237,7 @@ class OstisVerificationAgent (VerificationAgent ):
             )
 
             if agent_response and agent_response .get ('message')==result .SUCCESS :
+                user_directory .invalidate (email )
                 return {
                 "status":VerificationStatus .EMAIL_VERIFIED ,
                 "message":"Email успешно подтвержден"
@@ -2471,8 +1273,6 @@ class OstisRegAgent (RegAgent ):
     field :str =None 
     )->dict :
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_registration_agent (
             action_name ="action_user_registration",
@@ -2494,6 +1294,7 @@ class OstisRegAgent (RegAgent ):
                 }
 
             if agent_response and agent_response .get ('message')==result .SUCCESS :
+                user_directory .invalidate (email )
                 return {
                 "status":RegStatus .CREATED ,
                 "message":"Пользователь успешно зарегистрирован"
@@ -2530,8 +1331,6 @@ class OstisAuthAgent (AuthAgent ):
         :return: Словарь со статусом результата выполнения агента аутентификации
         """
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_auth_agent (
             action_name ="action_authentication",
@@ -2556,6 +1355,14 @@ class OstisAuthAgent (AuthAgent ):
             "message":str (e )
             }
 
+    def find_user (self ,username :str ):
+        """
+        Метод для поиска подтверждённого пользователя по email
+        :param username: Email пользователя
+        :return: Пользователь или None
+        """
+        return find_user_by_username (username )
+
 
 class OstisUserRequestAgent (RequestAgent ):
     """
@@ -2582,6 +1389,29 @@ class OstisUserRequestAgent (RequestAgent ):
             print(f"[REQUEST] request_agent error: {e}")
             return {"status": RequestStatus.INVALID, "message": None}
 
+    def request_agents(self, contents: list) -> list:
+        """
+        Метод для одновременного запуска агента юридических запросов по нескольким запросам
+        :param contents: Список контентов для поиска в БЗ
+        :return: Список словарей со статусом результата в том же порядке
+        """
+        from service.agents.async_ostis import AsyncOstis
+
+        async_ostis = AsyncOstis(self.ostis.ostis_url)
+        responses = AsyncOstis.run(*[
+            async_ostis.call_user_request_agent("action_user_request", content)
+            for content in contents
+        ])
+        results = []
+        for agent_response in responses:
+            if isinstance(agent_response, Exception):
+                print(f"[REQUEST] request_agents error: {agent_response}")
+            elif agent_response and isinstance(agent_response.get("message"), list):
+                results.append({"status": RequestStatus.VALID, "message": agent_response["message"]})
+                continue
+            results.append({"status": RequestStatus.INVALID, "message": None})
+        return results
+
 class OstisDirectoryAgent (DirectoryAgent ):
     """
     Класс для представления агента поиска
@@ -2595,8 +1425,6 @@ class OstisDirectoryAgent (DirectoryAgent ):
         :param content: Контент, по которому происходит поиск в БЗ
         :return: Словарь со статусом результата выполнения агента поиска
         """
-        global payload 
-        payload =None 
         agent_response =self .ostis .call_directory_agent (
         action_name ="action_search",
         content =content 
@@ -2611,6 +1439,13 @@ class OstisDirectoryAgent (DirectoryAgent ):
             }
         raise AgentError 
 
+    def term_titles (self )->list :
+        """
+        Метод для получения названий терминов справочника
+        :return: Список названий терминов
+        """
+        return get_term_titles ()
+
 class OstisAddEventAgent (AddEventAgent ):
     """
     Класс для представления агента добавления события
@@ -2632,8 +1467,6 @@ class OstisAddEventAgent (AddEventAgent ):
         :param event_description: Описание события
         :return:
         """
-        global payload 
-        payload =None 
         agent_response =self .ostis .call_add_event_agent (
         action_name ="action_add_event",
         user_name =user_name ,
@@ -2641,6 +1474,7 @@ class OstisAddEventAgent (AddEventAgent ):
         event_date =event_date ,
         event_description =event_description 
         )
+        agent_caches .invalidate ("show_event_agent",user_name )
         if agent_response is not None :
             return {"status":AddEventStatus .VALID ,
             "message":agent_response ["message"]}
@@ -2668,13 +1502,12 @@ class OstisDeleteEventAgent (DeleteEventAgent ):
         :param username: Логин пользователя
         :return:
         """
-        global payload 
-        payload =None 
         agent_response =self .ostis .call_delete_event_agent (
         action_name ="action_del_event",
         username =username ,
         event_name =event_name ,
         )
+        agent_caches .invalidate ("show_event_agent",username )
         if agent_response is not None :
             return {"status":DeleteEventStatus .VALID ,
             "message":agent_response ["message"]}
@@ -2700,8 +1533,6 @@ class OstisShowEventAgent (ShowEventAgent ):
         :param username: Логин пользователя
         :return:
         """
-        global payload 
-        payload =None 
         agent_response =self .ostis .call_show_event_agent (
         action_name ="action_user_events",
         username =username 
@@ -2715,6 +1546,15 @@ class OstisShowEventAgent (ShowEventAgent ):
             "message":"Invalid credentials",
             }
 
+    def events_by_date (self ,username :str ,date :str ):
+        """
+        Метод для получения событий пользователя на дату
+        :param username: Логин пользователя
+        :param date: Дата в формате ГГГГ-ММ-ДД
+        :return: EventResponse или None
+        """
+        return get_event_by_date (date ,username )
+
 class OstisTestAgent (TestAgent ):
     """Класс для работы с тестовыми агентами"""
 
@@ -2725,10 +1565,8 @@ class OstisTestAgent (TestAgent ):
         """Вызывает ChoiceNextQuestionAgent"""
         try :
             from service .models import get_user_by_login 
-            from sc_client .client import create_elements_by_scs 
+            from service .utils .sc_pool import create_elements_by_scs 
 
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_choice_next_question_agent (
             action_name ="action_choice_next_question",
@@ -2742,9 +1580,7 @@ class OstisTestAgent (TestAgent ):
                     return {"status":TestStatus .INVALID ,"message":"User not found"}
 
 
-                nrel_asked_questions =client .resolve_keynodes (
-                ScIdtfResolveParams (idtf ='nrel_asked_questions',type =sc_types .NODE_CONST_NOROLE )
-                )[0 ]
+                nrel_asked_questions =keynodes ['nrel_asked_questions']
 
 
                 template =ScTemplate ()
@@ -2794,8 +1630,6 @@ class OstisTestAgent (TestAgent ):
     def get_answers_for_question (self ,question_addr ):
         """Вызывает SearchAnswersForQuestionAgent"""
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_search_answers_agent (
             action_name ="action_search_answers_for_question",
@@ -2804,9 +1638,7 @@ class OstisTestAgent (TestAgent ):
 
             if agent_response and agent_response .get ('message')==result .SUCCESS :
 
-                nrel_answer =client .resolve_keynodes (
-                ScIdtfResolveParams (idtf ='nrel_answer',type =sc_types .NODE_CONST_NOROLE )
-                )[0 ]
+                nrel_answer =keynodes ['nrel_answer']
 
 
                 answers_template =ScTemplate ()
@@ -2844,8 +1676,6 @@ class OstisTestAgent (TestAgent ):
     def save_answer (self ,username :str ,answer_addr ):
         """Вызывает SaveAnswerAgent"""
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_save_answer_agent (
             action_name ="action_save_answer",
@@ -2854,6 +1684,7 @@ class OstisTestAgent (TestAgent ):
             )
 
             if agent_response and agent_response .get ('message')==result .SUCCESS :
+                author_displays .invalidate (username )
                 return {"status":TestStatus .VALID }
             return {"status":TestStatus .INVALID ,"message":"Failed to save answer"}
         except Exception as e :
@@ -2863,8 +1694,6 @@ class OstisTestAgent (TestAgent ):
     def check_answer (self ,username :str ,question_addr ):
         """CheckTheAnswerAgent"""
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_check_answer_agent (
             action_name ="action_check_answer",
@@ -2884,8 +1713,6 @@ class OstisTestAgent (TestAgent ):
     def delete_old_test_data (self ,username :str ):
         """Вызывает DeleteOldNodesAgent"""
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_delete_old_nodes_agent (
             action_name ="action_delete_old_nodes",
@@ -2893,6 +1720,7 @@ class OstisTestAgent (TestAgent ):
             )
 
             if agent_response and agent_response .get ('message')==result .SUCCESS :
+                author_displays .invalidate (username )
                 return {"status":TestStatus .VALID }
             return {"status":TestStatus .INVALID ,"message":"Failed"}
         except Exception as e :
@@ -2904,8 +1732,6 @@ class OstisTestAgent (TestAgent ):
     def update_rating (self ,username :str ):
         """RatingUpdateAgent — теперь возвращает ранг"""
         try :
-            global payload 
-            payload =None 
 
             agent_response =self .ostis .call_rating_update_agent (
             action_name ="action_update_rating",
@@ -2915,6 +1741,7 @@ class OstisTestAgent (TestAgent ):
             print (f"DEBUG: agent_response = {agent_response }")
 
             if agent_response and agent_response .get ("message")==result .SUCCESS :
+                author_displays .invalidate (username )
 
                 rank =agent_response .get ("rating","третий ранг")
                 print (f"DEBUG: Rank extracted = {rank }")
@@ -2938,24 +1765,13 @@ class OstisTestAgent (TestAgent ):
 
 def _resolve_kn(idtf: str, kn_type=sc_types.NODE_CONST_NOROLE) -> ScAddr:
     """Resolve a single keynode by identifier, creating it if absent."""
-    return client.resolve_keynodes(
-        ScIdtfResolveParams(idtf=idtf, type=kn_type)
-    )[0]
+    return keynodes.resolve(idtf, kn_type)
 
 
 def _get_link_attr(node_addr: ScAddr, rel_idtf: str) -> str:
     """Read the string content of a link reachable via a nrel quintuple."""
     try:
-        rel = _resolve_kn(rel_idtf)
-        t = ScTemplate()
-        t.quintuple(node_addr, sc_types.EDGE_D_COMMON_VAR,
-                    sc_types.LINK_VAR >> '_v',
-                    sc_types.EDGE_ACCESS_VAR_POS_PERM, rel)
-        r = client.template_search(t)
-        if r:
-            c = client.get_link_content(r[0].get('_v'))
-            if c:
-                return c[0].data
+        return read_attributes([node_addr], [rel_idtf])[0][rel_idtf]
     except Exception as exc:
         print(f"[CABINET] _get_link_attr({rel_idtf}): {exc}")
     return ''
@@ -2992,9 +1808,7 @@ class OstisProfileAgent(ProfileAgent):
     def _is_specialist(self, user_addr: ScAddr) -> bool:
         """Check if user belongs to concept_specialist class."""
         try:
-            concept_specialist = client.resolve_keynodes(
-                ScIdtfResolveParams(idtf='concept_specialist', type=sc_types.NODE_CONST_CLASS)
-            )[0]
+            concept_specialist = keynodes['concept_specialist']
             tmpl = ScTemplate()
             tmpl.triple(concept_specialist, sc_types.EDGE_ACCESS_VAR_POS_PERM, user_addr)
             return len(client.template_search(tmpl)) > 0
@@ -3012,9 +1826,12 @@ class OstisProfileAgent(ProfileAgent):
                 return {'status': ProfileStatus.INVALID, 'message': 'User not found'}
 
             is_spec = self._is_specialist(user_addr)
-            name = (_get_link_attr(user_addr, 'nrel_full_name')
-                    or _get_link_attr(user_addr, 'nrel_user_name'))
-            jurisdiction = _get_link_attr(user_addr, 'nrel_default_jurisdiction') or 'BY'
+            attrs = read_attributes([user_addr], [
+                'nrel_full_name', 'nrel_user_name', 'nrel_default_jurisdiction',
+                'nrel_field', 'nrel_experience', 'nrel_gender', 'nrel_age',
+            ])[0]
+            name = attrs['nrel_full_name'] or attrs['nrel_user_name']
+            jurisdiction = attrs['nrel_default_jurisdiction'] or 'BY'
 
             profile = {
                 'email': user_email,
@@ -3023,10 +1840,10 @@ class OstisProfileAgent(ProfileAgent):
                 'user_type': 'specialist' if is_spec else 'client',
             }
             if is_spec:
-                profile['field']      = _get_link_attr(user_addr, 'nrel_field') or ''
-                profile['experience'] = _get_link_attr(user_addr, 'nrel_experience') or ''
-                profile['gender']     = _get_link_attr(user_addr, 'nrel_gender') or ''
-                profile['age']        = _get_link_attr(user_addr, 'nrel_age') or ''
+                profile['field']      = attrs['nrel_field']
+                profile['experience'] = attrs['nrel_experience']
+                profile['gender']     = attrs['nrel_gender']
+                profile['age']        = attrs['nrel_age']
 
             print(f"[CABINET][PROFILE] get_profile OK | profile={profile}")
             return {'status': ProfileStatus.VALID, 'profile': profile}
@@ -3075,12 +1892,16 @@ class OstisProfileAgent(ProfileAgent):
                 print(f"[CABINET][PROFILE] get_settings: user not found — {user_email}")
                 return {'status': ProfileStatus.INVALID, 'settings': {}}
 
+            attrs = read_attributes([user_addr], [
+                'nrel_default_jurisdiction', 'nrel_ui_theme', 'nrel_font_size',
+                'nrel_save_history', 'nrel_high_contrast',
+            ])[0]
             settings = {
-                'jurisdiction':  _get_link_attr(user_addr, 'nrel_default_jurisdiction') or 'BY',
-                'theme':         _get_link_attr(user_addr, 'nrel_ui_theme') or 'system',
-                'font_size':     _get_link_attr(user_addr, 'nrel_font_size') or 'normal',
-                'save_history':  _get_link_attr(user_addr, 'nrel_save_history') != 'false',
-                'high_contrast': _get_link_attr(user_addr, 'nrel_high_contrast') == 'true',
+                'jurisdiction':  attrs['nrel_default_jurisdiction'] or 'BY',
+                'theme':         attrs['nrel_ui_theme'] or 'system',
+                'font_size':     attrs['nrel_font_size'] or 'normal',
+                'save_history':  attrs['nrel_save_history'] != 'false',
+                'high_contrast': attrs['nrel_high_contrast'] == 'true',
             }
             print(f"[CABINET][PROFILE] get_settings OK | settings={settings}")
             return {'status': ProfileStatus.VALID, 'settings': settings}
@@ -3138,14 +1959,15 @@ class OstisHistoryAgent(HistoryAgent):
                         sc_types.EDGE_ACCESS_VAR_POS_PERM, nrel_qh)
             results = client.template_search(t)
 
+            query_addrs = [res.get('_query') for res in results]
+            rows = read_attributes(query_addrs, ['nrel_query_type', 'nrel_query_text', 'nrel_query_timestamp'])
             history = []
-            for res in results:
-                query_addr = res.get('_query')
+            for query_addr, attrs in zip(query_addrs, rows):
                 history.append({
                     'id':   str(query_addr.value),
-                    'type': _get_link_attr(query_addr, 'nrel_query_type') or 'Запрос',
-                    'text': _get_link_attr(query_addr, 'nrel_query_text') or '',
-                    'date': _get_link_attr(query_addr, 'nrel_query_timestamp') or '',
+                    'type': attrs['nrel_query_type'] or 'Запрос',
+                    'text': attrs['nrel_query_text'],
+                    'date': attrs['nrel_query_timestamp'],
                 })
 
             # Period filtering
@@ -3279,16 +2101,19 @@ class OstisBookmarksAgent(BookmarksAgent):
                         sc_types.EDGE_ACCESS_VAR_POS_PERM, nrel_ub)
             results = client.template_search(t)
 
+            bm_addrs = [res.get('_bm') for res in results]
+            rows = read_attributes(bm_addrs, [
+                'nrel_bookmark_tags', 'nrel_bookmark_article', 'nrel_bookmark_title', 'nrel_bookmark_date',
+            ])
             bookmarks = []
-            for res in results:
-                bm_addr = res.get('_bm')
-                tags_raw = _get_link_attr(bm_addr, 'nrel_bookmark_tags')
+            for bm_addr, attrs in zip(bm_addrs, rows):
+                tags_raw = attrs['nrel_bookmark_tags']
                 bookmarks.append({
                     'id':         str(bm_addr.value),
-                    'article_id': _get_link_attr(bm_addr, 'nrel_bookmark_article'),
-                    'title':      _get_link_attr(bm_addr, 'nrel_bookmark_title'),
+                    'article_id': attrs['nrel_bookmark_article'],
+                    'title':      attrs['nrel_bookmark_title'],
                     'tags':       [tg.strip() for tg in tags_raw.split(',') if tg.strip()],
-                    'date':       _get_link_attr(bm_addr, 'nrel_bookmark_date'),
+                    'date':       attrs['nrel_bookmark_date'],
                 })
 
             print(f"[CABINET][BOOKMARKS] get_bookmarks OK | count={len(bookmarks)}")
@@ -3442,16 +2267,20 @@ class OstisNotesAgent(NotesAgent):
                         sc_types.EDGE_ACCESS_VAR_POS_PERM, nrel_un)
             results = client.template_search(t)
 
+            note_addrs = [res.get('_note') for res in results]
+            rows = read_attributes(note_addrs, [
+                'nrel_note_article', 'nrel_note_article_title', 'nrel_note_text',
+                'nrel_note_created', 'nrel_note_updated',
+            ])
             notes = []
-            for res in results:
-                note_addr = res.get('_note')
+            for note_addr, attrs in zip(note_addrs, rows):
                 notes.append({
                     'id':            str(note_addr.value),
-                    'article_id':    _get_link_attr(note_addr, 'nrel_note_article'),
-                    'article_title': _get_link_attr(note_addr, 'nrel_note_article_title'),
-                    'text':          _get_link_attr(note_addr, 'nrel_note_text'),
-                    'created_at':    _get_link_attr(note_addr, 'nrel_note_created'),
-                    'updated_at':    _get_link_attr(note_addr, 'nrel_note_updated'),
+                    'article_id':    attrs['nrel_note_article'],
+                    'article_title': attrs['nrel_note_article_title'],
+                    'text':          attrs['nrel_note_text'],
+                    'created_at':    attrs['nrel_note_created'],
+                    'updated_at':    attrs['nrel_note_updated'],
                 })
 
             print(f"[CABINET][NOTES] get_notes OK | count={len(notes)}")
@@ -3593,19 +2422,7 @@ class OstisNotesAgent(NotesAgent):
             return {'status': NotesStatus.ERROR, 'message': str(e)}
 
     def _get_attr(self, node_addr: ScAddr, rel_idtf: str) -> str:
-        try:
-            rel = client.resolve_keynodes(ScIdtfResolveParams(idtf=rel_idtf, type=sc_types.NODE_CONST_NOROLE))[0]
-            t = ScTemplate()
-            t.quintuple(node_addr, sc_types.EDGE_D_COMMON_VAR, sc_types.LINK_VAR >> '_v',
-                        sc_types.EDGE_ACCESS_VAR_POS_PERM, rel)
-            r = client.template_search(t)
-            if r:
-                c = client.get_link_content(r[0].get('_v'))
-                if c:
-                    return c[0].data
-        except:
-            pass
-        return ''
+        return _get_link_attr(node_addr, rel_idtf)
 
 
 class OstisDeleteMessageAgent:
@@ -3614,8 +2431,6 @@ class OstisDeleteMessageAgent:
 
     def delete_message_agent(self, message_addr: ScAddr) -> dict:
         try:
-            global payload
-            payload = None
             agent_response = self.ostis.call_delete_message_agent(
                 action_name="action_delete_message",
                 message_addr=message_addr
@@ -3626,3 +2441,76 @@ class OstisDeleteMessageAgent:
         except Exception as e:
             print(f"Error in delete_message_agent: {e}")
             return {"status": "error", "message": str(e)}
+
+
+class OstisForumAgent(ForumAgent):
+    """
+    Класс для реализации операций форума через OSTIS
+    """
+
+    def __init__(self):
+        self.ostis = Ostis(Config.OSTIS_URL)
+
+    @staticmethod
+    def _status(agent_response) -> dict:
+        if agent_response and agent_response.get("message") == result.SUCCESS:
+            return {"status": ForumStatus.VALID}
+        return {"status": ForumStatus.INVALID}
+
+    @staticmethod
+    def _addr(addr) -> ScAddr:
+        return addr if isinstance(addr, ScAddr) else ScAddr(int(addr))
+
+    def get_all_topics(self) -> list:
+        return self.ostis.get_all_topics()
+
+    def topic_addrs(self) -> list:
+        return self.ostis.get_topic_addrs()
+
+    def get_topic_details(self, topic_addr) -> dict:
+        return self.ostis.get_topic_details(self._addr(topic_addr))
+
+    def get_topic_messages(self, topic_addr) -> list:
+        return self.ostis.get_topic_messages(self._addr(topic_addr))
+
+    def add_topic(self, username: str, title: str, description: str) -> dict:
+        return self._status(self.ostis.call_add_topic_agent(
+            action_name="action_add_topic",
+            username=username,
+            title=title,
+            description=description
+        ))
+
+    def add_message(self, username: str, topic_addr, message_text: str,
+                    image_base64: str = None, image_name: str = None, image_mime: str = None) -> dict:
+        return self._status(self.ostis.call_add_message_agent(
+            action_name="action_add_message",
+            username=username,
+            topic_addr=self._addr(topic_addr),
+            message_text=message_text,
+            image_base64=image_base64,
+            image_name=image_name,
+            image_mime=image_mime
+        ))
+
+    def rate_message(self, message_addr, rating_type: str) -> dict:
+        agent_response = self.ostis.call_rate_message_agent(
+            action_name="action_rate_message",
+            message_addr=self._addr(message_addr),
+            rating_type=rating_type
+        )
+        # Оценку агент подтверждает любым ответом, а не только SUCCESS
+        return {"status": ForumStatus.VALID if agent_response else ForumStatus.INVALID}
+
+    def edit_message(self, message_addr, new_text: str) -> dict:
+        return self._status(self.ostis.call_edit_message_agent(
+            action_name="action_edit_message",
+            message_addr=self._addr(message_addr),
+            new_text=new_text
+        ))
+
+    def delete_message(self, message_addr) -> dict:
+        return self._status(self.ostis.call_delete_message_agent(
+            action_name="action_delete_message",
+            message_addr=self._addr(message_addr)
+        ))
@@ -2,11 +2,13 @@ from typing import Optional ,List
 from flask_login import UserMixin 
 from service import login_manager 
 from pydantic .dataclasses import dataclass 
-from sc_client .client import get_link_content ,search_by_template 
+from service .utils .sc_pool import get_link_content ,search_by_template 
 from sc_client .models import ScTemplate ,ScAddr ,ScIdtfResolveParams 
 from sc_client .constants import sc_types 
-from sc_kpm import ScKeynodes 
-import sc_client .client as client 
+from service .utils .keynode_registry import keynodes 
+from service .utils .sc_pool import client 
+from service .utils .user_directory import user_directory 
+from service .utils .user_session import user_loader 
 
 
 @dataclass 
@@ -81,56 +83,19 @@ def find_user_by_username (username :str )->Optional [User ]:
     Поиск пользователя по email (username теперь = email)
     """
     try :
-
-        import sc_client .client as client 
-
-
-        nrel_system_identifier =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='nrel_system_identifier',type =sc_types .NODE_CONST_NOROLE )
-        )[0 ]
-
-        concept_verified_user =client .resolve_keynodes (
-        ScIdtfResolveParams (idtf ='concept_verified_user',type =sc_types .NODE_CONST_CLASS )
-        )[0 ]
-
-
-        template =ScTemplate ()
-
-
-        template .triple (
-        concept_verified_user ,
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        sc_types .NODE_VAR >>'user'
-        )
-
-
-        template .triple_with_relation (
-        'user',
-        sc_types .EDGE_D_COMMON_VAR ,
-        sc_types .LINK_VAR >>'email',
-        sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-        nrel_system_identifier 
-        )
-
-        results =search_by_template (template )
-
-        for result in results :
-            email_content =get_link_content (result .get ('email'))[0 ].data 
-
-            if email_content ==username :
-
-                user_addr =result .get ('user')
-                return User (
-                sc_addr =str (user_addr .value ),
-                gender ='',
-                surname ='',
-                name ='',
-                fname ='',
-                birthdate ='',
-                reg_place ='',
-                username =email_content ,
-                password =''
-                )
+        user_addr =user_directory .resolve (username ,'concept_verified_user','nrel_system_identifier')
+        if user_addr is not None :
+            return User (
+            sc_addr =str (user_addr .value ),
+            gender ='',
+            surname ='',
+            name ='',
+            fname ='',
+            birthdate ='',
+            reg_place ='',
+            username =username ,
+            password =''
+            )
 
         return None 
 
@@ -145,9 +110,11 @@ def find_user_by_username (username :str )->Optional [User ]:
 @login_manager .user_loader 
 def load_user (username :str )->Optional [User ]:
     """
-    Загрузка пользователя для Flask-Login (по email)
+    Загрузка пользователя для Flask-Login (по email): из кэша или снимка в сессии,
+    в sc-памяти — только при промахе или истечении срока проверки
     """
-    return find_user_by_username (username )
+    from service .services import find_user 
+    return user_loader .load (username ,find_user )
 
 
 def collect_user_info (user :ScAddr )->User :
@@ -160,56 +127,56 @@ def collect_user_info (user :ScAddr )->User :
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'login',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_login']
+    keynodes ['nrel_user_login']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'password',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_password']
+    keynodes ['nrel_user_password']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'surname',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_surname']
+    keynodes ['nrel_user_surname']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'name',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_name']
+    keynodes ['nrel_user_name']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'patronymic',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_patronymic']
+    keynodes ['nrel_user_patronymic']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .LINK_VAR >>'address',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_address']
+    keynodes ['nrel_user_address']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .NODE_VAR >>'gender',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_gender']
+    keynodes ['nrel_user_gender']
     )
     template .triple_with_relation (
     user ,
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .NODE_VAR >>'birthdate',
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_user_birthdate']
+    keynodes ['nrel_user_birthdate']
     )
 
     result =search_by_template (template )[0 ]
@@ -232,79 +199,12 @@ def get_user_by_login (username :str )->ScAddr :
     Получение ScAddr пользователя по логину (работает со старой и новой регистрацией)
     """
     try :
-        from sc_client .models import ScIdtfResolveParams 
-        from sc_client .constants import sc_types 
-
-        print (f"DEBUG get_user_by_login: searching for {username }")
-
-
-        try :
-
-            nrel_system_identifier =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ="nrel_system_identifier",type =sc_types .NODE_CONST_NOROLE )
-            )[0 ]
-
-            concept_user =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ="concept_user",type =sc_types .NODE_CONST_CLASS )
-            )[0 ]
-
-            template =ScTemplate ()
-
-
-            template .quintuple (
-            sc_types .NODE_VAR >>'user',
-            sc_types .EDGE_D_COMMON_VAR ,
-            sc_types .LINK_VAR >>'login_link',
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            nrel_system_identifier 
-            )
-
-
-            template .triple (
-            concept_user ,
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            'user'
-            )
-
-            results =search_by_template (template )
-
-            if results :
-                for result in results :
-                    login_link =result .get ('login_link')
-                    login_content =get_link_content (login_link )[0 ].data 
-
-                    if login_content ==username :
-                        user_node =result .get ('user')
-                        print (f"DEBUG: Found user (new registration): {user_node }")
-                        return user_node 
-
-        except Exception as e :
-            print (f"DEBUG: New registration search failed: {e }")
-
-
-        try :
-            template =ScTemplate ()
-            template .triple_with_relation (
-            sc_types .NODE_VAR >>'user',
-            sc_types .EDGE_D_COMMON_VAR ,
-            sc_types .LINK_VAR >>'login',
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ['nrel_user_login']
-            )
-
-            results =search_by_template (template )
-            for result in results :
-                login_content =get_link_content (result .get ('login'))[0 ].data 
-                if login_content ==username :
-                    user_node =result .get ('user')
-                    print (f"DEBUG: Found user (old registration): {user_node }")
-                    return user_node 
-
-        except Exception as e :
-            print (f"DEBUG: Old registration search failed: {e }")
-
-        print (f"DEBUG: User not found for username: {username }")
-        return None 
+        user_node =user_directory .resolve (username ,'concept_user','nrel_system_identifier')
+        if user_node is None :
+            user_node =user_directory .resolve (username ,None ,'nrel_user_login')
+        if user_node is None :
+            print (f"DEBUG: User not found for username: {username }")
+        return user_node 
 
     except Exception as e :
         print (f"ERROR in get_user_by_login: {e }")
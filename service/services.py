@@ -5,20 +5,21 @@ from service .agents .abstract .reg_agent import RegAgent
 from service .agents .abstract .user_request_agent import RequestAgent 
 from service .agents .abstract .directory_agent import DirectoryAgent 
 from service .agents .abstract .event_agents import AddEventAgent ,DeleteEventAgent ,ShowEventAgent 
+from service .agents .abstract .verification_agent import VerificationAgent 
+from service .agents .abstract .forum_agent import ForumAgent 
 
 from sc_client .models import ScAddr ,ScIdtfResolveParams 
 from sc_client .constants import sc_types 
-import sc_client .client as client 
-from .agents .ostis import OstisVerificationAgent 
+from service .utils .sc_pool import client 
 
 
-from .agents .ostis import OstisAuthAgent ,OstisRegAgent ,OstisVerificationAgent
-from .agents.ostis import OstisProfileAgent, OstisHistoryAgent, OstisBookmarksAgent, OstisNotesAgent 
-
-
-auth_agent_instance =OstisAuthAgent ()
-reg_agent_instance =OstisRegAgent ()
-verification_agent_instance =OstisVerificationAgent ()
+def _agent (name :str ):
+    """
+    Метод для получения агента, загруженного приложением (см. Config.AGENTS_TO_LOAD)
+    :param name: Имя агента
+    :return: Экземпляр агента
+    """
+    return current_app .config ['agents'][name ]
 
 
 def auth_agent (username :str ,password :str ):
@@ -29,7 +30,18 @@ def auth_agent (username :str ,password :str ):
     :param password: Пароль
     :return: Результат аутентификации
     """
-    return auth_agent_instance .auth_agent (username ,password )
+    agent :AuthAgent =_agent ('auth_agent')
+    return agent .auth_agent (username ,password )
+
+
+def find_user (username :str ):
+    """
+    Поиск подтверждённого пользователя по email
+    :param username: Email пользователя
+    :return: Пользователь или None
+    """
+    agent :AuthAgent =_agent ('auth_agent')
+    return agent .find_user (username )
 
 
 def reg_agent (
@@ -46,7 +58,8 @@ field :str =None
     """
     Регистрация пользователя
     """
-    return reg_agent_instance .reg_agent (
+    agent :RegAgent =_agent ('reg_agent')
+    return agent .reg_agent (
     email =email ,
     password =password ,
     password_conf =password_conf ,
@@ -63,14 +76,16 @@ def verification_send_token (email :str ):
     """
     Отправка токена верификации
     """
-    return verification_agent_instance .send_token (email )
+    agent :VerificationAgent =_agent ('verification_agent')
+    return agent .send_token (email )
 
 
 def verification_check_token (email :str ,token :str ):
     """
     Проверка токена верификации
     """
-    return verification_agent_instance .verify_token (email ,token )
+    agent :VerificationAgent =_agent ('verification_agent')
+    return agent .verify_token (email ,token )
 
 
 def user_request_agent (content :str ):
@@ -82,6 +97,15 @@ def user_request_agent (content :str ):
     agent :RequestAgent =current_app .config ['agents']['user_request_agent']
     return agent .request_agent (content )
 
+def user_request_agents (contents :list ):
+    """
+    Метод для одновременного запуска агента юридических запросов по нескольким запросам
+    :param contents: Список контентов для поиска в БЗ
+    :return: Список словарей со статусом результата в том же порядке
+    """
+    agent :RequestAgent =current_app .config ['agents']['user_request_agent']
+    return agent .request_agents (contents )
+
 def directory_agent (content :str ):
     """
     Метод для запуска агента поиска
@@ -93,6 +117,14 @@ def directory_agent (content :str ):
     content =content 
     )
 
+def term_titles ():
+    """
+    Метод для получения названий терминов справочника
+    :return: Список названий терминов
+    """
+    agent :DirectoryAgent =current_app .config ['agents']['directory_agent']
+    return agent .term_titles ()
+
 def add_event_agent (user_name ,event_name :str ,event_date ,event_description :str ):
     """
     Метод для запуска агента добавления события
@@ -134,6 +166,24 @@ def show_event_agent (username ):
     username =username 
     )
 
+def events_by_date (username :str ,date :str ):
+    """
+    Метод для получения событий пользователя на дату
+    :param username: Логин пользователя
+    :param date: Дата в формате ГГГГ-ММ-ДД
+    :return: EventResponse или None
+    """
+    agent :ShowEventAgent =current_app .config ['agents']['show_event_agent']
+    return agent .events_by_date (username ,date )
+
+
+def forum_agent ()->ForumAgent :
+    """
+    Метод для получения агента форума
+    :return: Агент форума
+    """
+    return current_app .config ['agents']['forum_agent']
+
 
 def test_agent_get_question (user_id :str ):
     """Получить следующий вопрос"""
@@ -179,87 +229,80 @@ def test_agent_update_rating (user_id :str ):
 # CABINET SERVICES - Profile, History, Bookmarks, Notes
 # ============================================================================
 
-# Initialize cabinet agents
-profile_agent_instance = OstisProfileAgent()
-history_agent_instance = OstisHistoryAgent()
-bookmarks_agent_instance = OstisBookmarksAgent()
-notes_agent_instance = OstisNotesAgent()
-
-
 # Profile services
 def get_user_profile(user_email: str):
     """Получить профиль пользователя"""
-    return profile_agent_instance.get_profile(user_email)
+    return _agent('profile_agent').get_profile(user_email)
 
 
 def update_user_profile(user_email: str, data: dict):
     """Обновить профиль пользователя"""
-    return profile_agent_instance.update_profile(user_email, data)
+    return _agent('profile_agent').update_profile(user_email, data)
 
 
 def get_user_settings(user_email: str):
     """Получить настройки пользователя"""
-    return profile_agent_instance.get_settings(user_email)
+    return _agent('profile_agent').get_settings(user_email)
 
 
 def update_user_settings(user_email: str, settings: dict):
     """Обновить настройки пользователя"""
-    return profile_agent_instance.update_settings(user_email, settings)
+    return _agent('profile_agent').update_settings(user_email, settings)
 
 
 # History services
 def get_user_history(user_email: str, period: str = 'week'):
     """Получить историю запросов пользователя"""
-    return history_agent_instance.get_history(user_email, period)
+    return _agent('history_agent').get_history(user_email, period)
 
 
 def add_user_history_entry(user_email: str, query_type: str, query_text: str, article_id: str = None):
     """Добавить запись в историю"""
-    return history_agent_instance.add_history_entry(user_email, query_type, query_text, article_id)
+    return _agent('history_agent').add_history_entry(user_email, query_type, query_text, article_id)
 
 
 def clear_user_history(user_email: str):
     """Очистить историю пользователя"""
-    return history_agent_instance.clear_history(user_email)
+    return _agent('history_agent').clear_history(user_email)
 
 
 # Bookmarks services
 def get_user_bookmarks(user_email: str):
     """Получить закладки пользователя"""
-    return bookmarks_agent_instance.get_bookmarks(user_email)
+    return _agent('bookmarks_agent').get_bookmarks(user_email)
 
 
 def add_user_bookmark(user_email: str, article_id: str, title: str, tags: list = None):
     """Добавить закладку"""
-    return bookmarks_agent_instance.add_bookmark(user_email, article_id, title, tags)
+    return _agent('bookmarks_agent').add_bookmark(user_email, article_id, title, tags)
 
 
 def update_user_bookmark(user_email: str, bookmark_id: str, tags: list = None):
     """Обновить закладку"""
-    return bookmarks_agent_instance.update_bookmark(user_email, bookmark_id, tags)
+    return _agent('bookmarks_agent').update_bookmark(user_email, bookmark_id, tags)
 
 
 def delete_user_bookmark(user_email: str, bookmark_id: str):
     """Удалить закладку"""
-    return bookmarks_agent_instance.delete_bookmark(user_email, bookmark_id)
+    return _agent('bookmarks_agent').delete_bookmark(user_email, bookmark_id)
 
 
 # Notes services
 def get_user_notes(user_email: str):
     """Получить заметки пользователя"""
-    return notes_agent_instance.get_notes(user_email)
+    return _agent('notes_agent').get_notes(user_email)
 
 
 def add_user_note(user_email: str, article_id: str, article_title: str, text: str):
     """Добавить заметку"""
-    return notes_agent_instance.add_note(user_email, article_id, article_title, text)
+    return _agent('notes_agent').add_note(user_email, article_id, article_title, text)
 
 
 def update_user_note(user_email: str, note_id: str, text: str):
     """Обновить заметку"""
-    return notes_agent_instance.update_note(user_email, note_id, text)
+    return _agent('notes_agent').update_note(user_email, note_id, text)
 
 
 def delete_user_note(user_email: str, note_id: str):
     """Удалить заметку"""
-    return notes_agent_instance.delete_note(user_email, note_id)
+    return _agent('notes_agent').delete_note(user_email, note_id)
@@ -0,0 +1,138 @@
+"""
+Единый конвейер вызова агента OSTIS.
+
+Вызов проходит одни и те же шаги и в синхронном Ostis, и в AsyncOstis:
+проверка предохранителя, адаптивный таймаут, создание и инициирование
+действия с подпиской на его завершение, учёт длительности и ошибок,
+передача действия сборщику. Отличается только способ ожидания
+результата: блокирующий future.result или await в цикле событий.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import ExitStack
+
+from sc_client.constants import sc_types
+
+from service.exceptions import AgentError
+from service.utils.action_completion import completions
+from service.utils.action_reaper import action_reaper
+from service.utils.action_timeouts import action_timeouts
+from service.utils.circuit_breaker import agent_breaker
+from service.utils.event_subscriptions import event_subscription
+from service.utils.keynode_registry import keynodes
+from service.utils.metrics import agent_call_seconds, record_agent_error
+from service.utils.ostis_utils import build_action_structure, initiate_action
+
+
+class ActionCall:
+    """
+    Один вызов агента: start, ожидание future и finish
+    """
+
+    def __init__(self, action_name: str, arguments: list, callback, timeout: float):
+        self.action_name = action_name
+        self.arguments = arguments
+        self.callback = callback
+        self.timeout = action_timeouts.timeout_for(action_name, timeout)
+        self.main_node = None
+        self.argument_links = []
+        self.future = None
+        self._subscription = ExitStack()
+        self._started = None
+
+    def start(self) -> Future:
+        """
+        Создание и инициирование действия
+        :return: Future, который разрешает колбэк завершения действия
+        :raises ScServerError: Возникает, если предохранитель разомкнут
+        """
+        try:
+            agent_breaker.before_call()
+        except Exception as e:
+            record_agent_error(self.action_name, e)
+            raise
+        try:
+            action_agent = keynodes.resolve(self.action_name, sc_types.NODE_CONST_CLASS)
+            self.main_node, self.argument_links = build_action_structure(action_agent, self.arguments)
+            self.future = completions.register(self.main_node)
+            self._subscription.enter_context(event_subscription(self.main_node, self.callback))
+            self._started = time.monotonic()
+            initiate_action(self.main_node)
+        except Exception as e:
+            self.finish(e)
+            raise
+        return self.future
+
+    def finish(self, error: Exception = None) -> None:
+        """
+        Снятие подписки, передача действия сборщику и учёт результата
+        :param error: Исключение вызова или None при успехе
+        """
+        self.close()
+        if error is None:
+            elapsed = time.monotonic() - self._started
+            action_timeouts.observe(self.action_name, elapsed)
+            agent_call_seconds.observe(elapsed, self.action_name)
+            agent_breaker.record()
+            return
+        agent_breaker.record(error)
+        record_agent_error(self.action_name, error)
+
+    def close(self) -> None:
+        """
+        Освобождение ресурсов вызова без учёта результата (например, при отмене корутины)
+        """
+        try:
+            self._subscription.close()
+        finally:
+            if self.main_node is not None:
+                completions.discard(self.main_node)
+                action_reaper.track(self.action_name, self.main_node, self.argument_links)
+                self.main_node = None
+
+    def _timed_out(self) -> AgentError:
+        action_timeouts.observe(self.action_name, self.timeout)
+        return AgentError(524, "Timeout")
+
+    def run(self):
+        """
+        Синхронный вызов
+        :return: Результат, переданный колбэком
+        :raises AgentError: Возникает при истечении времени ожидания
+        """
+        future = self.start()
+        try:
+            response = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            error = self._timed_out()
+            self.finish(error)
+            raise error
+        except Exception as e:
+            self.finish(e)
+            raise
+        self.finish()
+        return response
+
+    async def run_async(self):
+        """
+        Асинхронный вызов: ожидание результата не занимает поток
+        :return: Результат, переданный колбэком
+        :raises AgentError: Возникает при истечении времени ожидания
+        """
+        future = await asyncio.to_thread(self.start)
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            error = self._timed_out()
+            await asyncio.to_thread(self.finish, error)
+            raise error
+        except Exception as e:
+            await asyncio.to_thread(self.finish, e)
+            raise
+        except BaseException:
+            await asyncio.to_thread(self.close)
+            raise
+        await asyncio.to_thread(self.finish)
+        return response
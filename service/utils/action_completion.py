@@ -0,0 +1,67 @@
+"""
+Реестр ожидающих завершения действий sc-агентов.
+
+Каждый вызов агента регистрирует свой Future по адресу action-ноды.
+Колбэк события завершает Future именно этого действия, поэтому
+параллельные запросы не перезаписывают результаты друг друга.
+"""
+
+import threading
+from concurrent.futures import Future
+
+from sc_client.models import ScAddr
+
+
+class CompletionRegistry:
+    """
+    Таблица Future, ключ — значение адреса action-ноды
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def register(self, action: ScAddr) -> Future:
+        """
+        Регистрация ожидания результата действия
+        :param action: Адрес action-ноды
+        :return: Future, который завершит колбэк события
+        """
+        future = Future()
+        with self._lock:
+            self._futures[action.value] = future
+        return future
+
+    def resolve(self, action: ScAddr, value) -> bool:
+        """
+        Передача результата ожидающему вызову
+        :param action: Адрес action-ноды
+        :param value: Результат выполнения агента
+        :return: True, если результат был передан
+        """
+        with self._lock:
+            future = self._futures.pop(action.value, None)
+        if future is None or future.done():
+            return False
+        future.set_result(value)
+        return True
+
+    def discard(self, action: ScAddr) -> None:
+        """
+        Удаление ожидания (после получения результата или по таймауту)
+        :param action: Адрес action-ноды
+        """
+        with self._lock:
+            future = self._futures.pop(action.value, None)
+        if future is not None:
+            future.cancel()
+
+    def pending(self) -> int:
+        """
+        :return: Количество действий, ожидающих завершения
+        """
+        with self._lock:
+            return len(self._futures)
+
+
+completions = CompletionRegistry()
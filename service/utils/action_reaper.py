@@ -0,0 +1,253 @@
+"""
+Фоновая очистка sc-памяти от завершённых действий.
+
+Каждый вызов агента оставляет в базе action-ноду, дуги аргументов и
+событий и структуру результата. После того как результат прочитан,
+действие ставится в очередь; через max_age секунд фоновый поток удаляет
+action-ноду и узел структуры результата (инцидентные дуги sc-сервер
+удаляет вместе с ними). Для действий из списка temporary_arguments
+удаляются и sc-link, созданные для строковых аргументов: логины при
+входе, поисковые запросы, типы оценок. Аргументы остальных действий
+(регистрация, события, сообщения) агенты сохраняют в базе, поэтому они
+не трогаются. Общие sc-link из link_interning не удаляются никогда: при
+постановке в очередь отбрасываются sc-link из кэша общих, а перед
+удалением остальные проверяются по классу общих в sc-памяти.
+
+Удаление идёт пакетами не больше batch_size действий; между пакетами
+поток ждёт столько же, сколько занял предыдущий, поэтому нагрузка на
+sc-сервер ограничена долей его времени, а не числом действий в секунду.
+
+Очередь ограничена max_queue действиями: при переполнении отбрасывается
+самое старое, а отброшенные считаются в метрике. Такие действия, как и
+действия, оставшиеся от предыдущего запуска процесса, находятся заново
+по классам action_finished_*: при запуске и после переполнения все
+завершённые действия классов приложения ставятся в очередь с текущим
+временем и удаляются не раньше чем через max_age.
+"""
+
+import threading
+import time
+from collections import deque
+
+from flask import Flask
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr, ScTemplate
+
+from config import Config
+from service.utils.keynode_registry import APP_KEYNODES, keynodes
+from service.utils.link_interning import interned_links
+from service.utils.metrics import action_reaper_dropped_total
+from service.utils.sc_pool import client
+
+# Наибольшая пауза между пакетами, когда накопилось больше batch_size действий
+BATCH_PAUSE = 1.0
+
+FINISHED_CLASSES = ('action_finished_successfully', 'action_finished_unsuccessfully', 'action_finished_with_error')
+
+# Классы действий, которые вызывает приложение
+ACTION_CLASSES = tuple(
+    idtf for idtf in APP_KEYNODES
+    if idtf.startswith('action_') and idtf != 'action_initiated' and idtf not in FINISHED_CLASSES
+)
+
+
+class ActionReaper:
+    """
+    Очередь завершённых действий и фоновое удаление их структур
+    """
+
+    def __init__(self, max_age: float, batch_size: int, interval: float, temporary_arguments,
+                 max_queue: int = 10000, clock=time.monotonic):
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.interval = interval
+        self.temporary_arguments = frozenset(temporary_arguments)
+        self.max_queue = max_queue
+        self._clock = clock
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopped = threading.Event()
+        # Поиск завершённых действий в sc-памяти: при запуске и после переполнения очереди
+        self._rediscover = True
+        self._reclaimed_actions = 0
+        self._reclaimed_elements = 0
+        self._failed_batches = 0
+        self._dropped = 0
+        self._rediscovered = 0
+
+    def _append(self, entry: tuple) -> None:
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self._dropped += 1
+            self._rediscover = True
+            action_reaper_dropped_total.inc()
+        self._queue.append(entry)
+
+    def track(self, action_name: str, action: ScAddr, argument_links=()) -> None:
+        """
+        Постановка завершённого действия в очередь на удаление
+        :param action_name: Идентификатор класса действия
+        :param action: Адрес action-ноды
+        :param argument_links: sc-link, созданные для строковых аргументов действия
+        """
+        if action_name in self.temporary_arguments:
+            links = tuple(link for link in argument_links if not interned_links.is_interned(link))
+        else:
+            links = ()
+        with self._lock:
+            self._append((self._clock(), action, links))
+
+    def _take_expired(self) -> list:
+        deadline = self._clock() - self.max_age
+        batch = []
+        with self._lock:
+            while self._queue and len(batch) < self.batch_size and self._queue[0][0] <= deadline:
+                batch.append(self._queue.popleft())
+        return batch
+
+    def _result_structures(self, action: ScAddr) -> list:
+        template = ScTemplate()
+        template.quintuple(
+            action,
+            sc_types.EDGE_D_COMMON_VAR,
+            sc_types.NODE_VAR_STRUCT >> '_result',
+            sc_types.EDGE_ACCESS_VAR_POS_PERM,
+            keynodes['nrel_result'],
+        )
+        return [item.get('_result') for item in client.template_search(template)]
+
+    def _finished_actions(self) -> dict:
+        """
+        Завершённые действия классов приложения в sc-памяти
+        :return: Словарь {адрес action-ноды: sc-link строковых аргументов}
+        """
+        classes = {keynodes[idtf].value: idtf for idtf in ACTION_CLASSES}
+        found = {}
+        temporary = set()
+        for finished in FINISHED_CLASSES:
+            template = ScTemplate()
+            template.triple(keynodes[finished], sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> '_action')
+            template.triple(sc_types.NODE_VAR >> '_class', sc_types.EDGE_ACCESS_VAR_POS_PERM, '_action')
+            for item in client.template_search(template):
+                idtf = classes.get(item.get('_class').value)
+                if idtf is None:
+                    continue
+                action = item.get('_action')
+                found.setdefault(action.value, (action, []))
+                if idtf in self.temporary_arguments:
+                    temporary.add(action.value)
+
+            if not temporary:
+                continue
+            template = ScTemplate()
+            template.triple(keynodes[finished], sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> '_action')
+            template.triple('_action', sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.LINK_VAR >> '_link')
+            for item in client.template_search(template):
+                if item.get('_action').value in temporary:
+                    found[item.get('_action').value][1].append(item.get('_link'))
+        return found
+
+    def rediscover(self) -> int:
+        """
+        Постановка в очередь завершённых действий, которых в ней нет
+        (оставшихся от предыдущего запуска или отброшенных при переполнении)
+        :return: Количество добавленных действий
+        """
+        with self._lock:
+            self._rediscover = False
+            queued = {action.value for _, action, _ in self._queue}
+        found = self._finished_actions()
+        now = self._clock()
+        added = 0
+        with self._lock:
+            for value, (action, links) in found.items():
+                if value in queued:
+                    continue
+                if len(self._queue) >= self.max_queue:
+                    # Остальные найдутся при следующем поиске, когда очередь освободится
+                    self._rediscover = True
+                    break
+                links = tuple(link for link in links if not interned_links.is_interned(link))
+                self._queue.append((now, action, links))
+                added += 1
+            self._rediscovered += added
+        if added:
+            print(f"[REAPER] Найдено завершённых действий в sc-памяти: {added}")
+        return added
+
+    def reap(self) -> int:
+        """
+        Один проход очистки: не больше batch_size действий старше max_age
+        :return: Количество удалённых элементов
+        """
+        if not client.is_connected():
+            return 0
+        batch = self._take_expired()
+        if not batch:
+            return 0
+
+        elements = []
+        for _, action, links in batch:
+            elements.append(action)
+            elements.extend(self._result_structures(action))
+            elements.extend(interned_links.exclude_interned(links))
+        try:
+            client.erase_elements(*elements)
+        except Exception as e:
+            with self._lock:
+                self._failed_batches += 1
+            print(f"[REAPER] Не удалось удалить {len(elements)} элементов: {e}")
+            return 0
+
+        with self._lock:
+            self._reclaimed_actions += len(batch)
+            self._reclaimed_elements += len(elements)
+        print(f"[REAPER] Удалено действий: {len(batch)}, элементов: {len(elements)}")
+        return len(elements)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                if self._rediscover and client.is_connected():
+                    self.rediscover()
+                while True:
+                    started = time.monotonic()
+                    if not self.reap():
+                        break
+                    if self._stopped.wait(min(BATCH_PAUSE, time.monotonic() - started)):
+                        break
+            except Exception as e:
+                print(f"[REAPER] Ошибка очистки: {e}")
+
+    def snapshot(self) -> dict:
+        """
+        :return: Состояние очереди и счётчики удалённых элементов
+        """
+        with self._lock:
+            return {
+                'queued': len(self._queue),
+                'reclaimed_actions': self._reclaimed_actions,
+                'reclaimed_elements': self._reclaimed_elements,
+                'failed_batches': self._failed_batches,
+                'dropped': self._dropped,
+                'rediscovered': self._rediscovered,
+            }
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Запуск фонового потока очистки
+        """
+        if self._started or app.config.get('TESTING'):
+            return
+        self._started = True
+        threading.Thread(target=self._run, name='action-reaper', daemon=True).start()
+
+
+action_reaper = ActionReaper(
+    max_age=Config.REAPER_MAX_AGE,
+    batch_size=Config.REAPER_BATCH_SIZE,
+    interval=Config.REAPER_INTERVAL,
+    temporary_arguments=Config.REAPER_TEMPORARY_ARGUMENTS,
+    max_queue=Config.REAPER_MAX_QUEUE,
+)
@@ -0,0 +1,103 @@
+"""
+Адаптивные таймауты вызовов агентов.
+
+Для каждого класса действия хранится скользящее окно последних
+длительностей вызова. Таймаут очередного вызова вычисляется как p99
+окна, умноженный на запас, и ограничивается снизу и сверху значениями
+из config.ini. Пока наблюдений мало, используется таймаут, заданный в
+месте вызова. Явные значения из секции ACTION_TIMEOUT_OVERRIDES имеют
+приоритет над вычисленными.
+
+Вызов, завершившийся по таймауту, записывается в окно со значением
+таймаута: иначе медленное действие никогда не получило бы больший лимит.
+"""
+
+import math
+import threading
+from collections import deque
+
+from config import Config
+
+
+def percentile(samples, q: float) -> float:
+    """
+    Перцентиль по методу ближайшего ранга
+    :param samples: Наблюдения
+    :param q: Уровень от 0 до 100
+    :return: Значение перцентиля
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class ActionTimeouts:
+    """
+    Скользящая статистика длительностей по action_name и вычисление таймаутов
+    """
+
+    def __init__(self, floor: float, ceiling: float, headroom: float, min_samples: int, window: int, overrides: dict):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.window = window
+        self.overrides = dict(overrides)
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def _clamp(self, value: float) -> float:
+        return min(self.ceiling, max(self.floor, value))
+
+    def observe(self, action_name: str, seconds: float) -> None:
+        """
+        Учёт длительности вызова
+        :param action_name: Идентификатор класса действия
+        :param seconds: Длительность вызова в секундах
+        """
+        with self._lock:
+            samples = self._samples.get(action_name)
+            if samples is None:
+                samples = self._samples[action_name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def timeout_for(self, action_name: str, default: float) -> float:
+        """
+        Таймаут для очередного вызова
+        :param action_name: Идентификатор класса действия
+        :param default: Таймаут места вызова, используется до накопления статистики
+        :return: Таймаут в секундах
+        """
+        if action_name in self.overrides:
+            return self.overrides[action_name]
+        with self._lock:
+            samples = list(self._samples.get(action_name, ()))
+        if len(samples) < self.min_samples:
+            return self._clamp(default)
+        return self._clamp(percentile(samples, 99) * self.headroom)
+
+    def snapshot(self) -> dict:
+        """
+        :return: p50/p99 и текущий таймаут по каждому действию
+        """
+        with self._lock:
+            actions = {name: list(samples) for name, samples in self._samples.items()}
+        return {
+            name: {
+                'samples': len(samples),
+                'p50': round(percentile(samples, 50), 3),
+                'p99': round(percentile(samples, 99), 3),
+                'timeout': round(self.timeout_for(name, self.ceiling), 3),
+            }
+            for name, samples in actions.items()
+        }
+
+
+action_timeouts = ActionTimeouts(
+    floor=Config.ACTION_TIMEOUT_FLOOR,
+    ceiling=Config.ACTION_TIMEOUT_CEILING,
+    headroom=Config.ACTION_TIMEOUT_HEADROOM,
+    min_samples=Config.ACTION_TIMEOUT_MIN_SAMPLES,
+    window=Config.ACTION_TIMEOUT_WINDOW,
+    overrides=Config.ACTION_TIMEOUT_OVERRIDES,
+)
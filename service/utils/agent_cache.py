@@ -0,0 +1,239 @@
+"""
+Кэширующий прокси для агентов только для чтения.
+
+Агент из Config.AGENTS_TO_LOAD может быть обёрнут декораторами (см.
+agent_factory.load_agents); CachingAgent — такой декоратор. Результаты
+методов чтения (CACHED_METHODS) хранятся в LRU ограниченного размера и
+живут не дольше ttl секунд. Пакетные методы (request_agents) разбираются
+на отдельные вызовы: из кэша берутся найденные, агенту передаются
+только недостающие.
+
+Ключ — имя метода и значения аргументов (как в single_flight: строки
+как есть, адреса по значению). Вызовы с аргументами, которые нельзя
+сравнить по значению, не кэшируются; ответы со статусом Invalid/Error
+и пустые ответы (None) тоже, чтобы таймаут или неудачный поиск не
+запоминался на ttl.
+
+Агенты, изменяющие данные, сбрасывают кэш явно:
+agent_caches.invalidate('show_event_agent', username) удаляет записи, в
+аргументах которых встречается username, без аргументов — весь кэш
+агента. Закэшированный результат общий для всех запросов, изменять его
+нельзя.
+
+Включается секцией AGENT_CACHE в config.ini: имя агента = ttl, размер.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from service.utils.metrics import agent_cache_requests_total
+from service.utils.single_flight import normalize_argument
+
+# Методы чтения, которые кэшируются по умолчанию для каждого агента
+CACHED_METHODS = {
+    'directory_agent': ('directory_agent', 'term_titles'),
+    'user_request_agent': ('request_agent',),
+    'show_event_agent': ('show_event_agent', 'events_by_date'),
+}
+
+# Пакетный метод → метод для одного элемента, результаты которого кэшируются
+BATCH_METHODS = {
+    'request_agents': 'request_agent',
+}
+
+UNCACHEABLE_STATUSES = ('invalid', 'error')
+
+
+def make_key(method: str, args: tuple, kwargs: dict):
+    """
+    Ключ записи кэша
+    :return: Хешируемый ключ или None, если аргументы нельзя сравнить по значению
+    """
+    normalized = []
+    for argument in list(args) + [value for _, value in sorted(kwargs.items())]:
+        value = normalize_argument(argument)
+        if value is None:
+            return None
+        normalized.append(value)
+    return method, tuple(sorted(kwargs)), tuple(normalized)
+
+
+def is_cacheable(result) -> bool:
+    """
+    Ответы с ошибкой и пустые ответы (None) не кэшируются
+    """
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        return str(result.get('status', '')).lower() not in UNCACHEABLE_STATUSES
+    return True
+
+
+class AgentCache:
+    """
+    LRU с ограничением времени жизни записей
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidated = 0
+
+    def get(self, key):
+        """
+        :return: (True, значение) при попадании или (False, None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                hit = False
+        agent_cache_requests_total.inc(self.name, 'hit' if hit else 'miss')
+        return (True, entry[1]) if hit else (False, None)
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *values) -> int:
+        """
+        Удаление записей, в аргументах которых есть хотя бы одно из значений
+        :param values: Значения аргументов; без значений очищается весь кэш
+        :return: Количество удалённых записей
+        """
+        targets = {normalize_argument(value) for value in values}
+        with self._lock:
+            if not values:
+                stale = list(self._entries)
+            else:
+                stale = [key for key in self._entries if targets.intersection(key[2])]
+            for key in stale:
+                del self._entries[key]
+            self._invalidated += len(stale)
+        return len(stale)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'cached': len(self._entries),
+                'ttl': self.ttl,
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidated': self._invalidated,
+            }
+
+
+class AgentCacheRegistry:
+    """
+    Кэши агентов по имени агента: через него изменяющие агенты сбрасывают записи
+    """
+
+    def __init__(self):
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def register(self, cache: AgentCache) -> AgentCache:
+        with self._lock:
+            self._caches[cache.name] = cache
+        return cache
+
+    def get(self, name: str):
+        with self._lock:
+            return self._caches.get(name)
+
+    def invalidate(self, name: str, *values) -> int:
+        """
+        Сброс записей кэша агента (см. AgentCache.invalidate)
+        :param name: Имя агента из AGENTS_TO_LOAD
+        :param values: Значения аргументов, записи с которыми устарели
+        :return: Количество удалённых записей (0, если кэш для агента не включён)
+        """
+        cache = self.get(name)
+        return cache.invalidate(*values) if cache is not None else 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            caches = list(self._caches.values())
+        return {cache.name: cache.snapshot() for cache in caches}
+
+
+agent_caches = AgentCacheRegistry()
+
+
+class CachingAgent:
+    """
+    Прокси агента: методы чтения отвечают из кэша, остальные атрибуты берутся у агента
+    """
+
+    def __init__(self, agent, name: str, ttl: float = 300, maxsize: int = 256, methods=None):
+        """
+        :param agent: Обёртываемый агент
+        :param name: Имя агента из AGENTS_TO_LOAD, по нему сбрасывается кэш
+        :param ttl: Время жизни записи в секундах
+        :param maxsize: Максимальное число записей
+        :param methods: Кэшируемые методы (по умолчанию из CACHED_METHODS)
+        """
+        self.agent = agent
+        self.methods = frozenset(methods if methods is not None else CACHED_METHODS.get(name, ()))
+        self.cache = agent_caches.register(AgentCache(name, ttl, maxsize))
+
+    def __getattr__(self, attr):
+        target = getattr(self.agent, attr)
+        if attr in self.methods:
+            return self._cached(attr, target)
+        if BATCH_METHODS.get(attr) in self.methods:
+            return self._batched(attr, target)
+        return target
+
+    def _cached(self, method: str, target):
+        def call(*args, **kwargs):
+            key = make_key(method, args, kwargs)
+            if key is None:
+                return target(*args, **kwargs)
+            hit, value = self.cache.get(key)
+            if hit:
+                return value
+            value = target(*args, **kwargs)
+            if is_cacheable(value):
+                self.cache.put(key, value)
+            return value
+        return call
+
+    def _batched(self, method: str, target):
+        single = BATCH_METHODS[method]
+
+        def call(contents: list) -> list:
+            results = [None] * len(contents)
+            missing = []
+            for index, content in enumerate(contents):
+                key = make_key(single, (content,), {})
+                hit, value = self.cache.get(key) if key is not None else (False, None)
+                if hit:
+                    results[index] = value
+                else:
+                    missing.append((index, key))
+            if missing:
+                fetched = target([contents[index] for index, _ in missing])
+                for (index, key), value in zip(missing, fetched):
+                    results[index] = value
+                    if key is not None and is_cacheable(value):
+                        self.cache.put(key, value)
+            return results
+        return call
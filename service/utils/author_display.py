@@ -0,0 +1,199 @@
+"""
+Кэш отображения авторов форума: email, тип пользователя и ранг специалиста.
+
+Подпись автора ("email (Специалист, второй ранг)") строится для каждого
+топика в списке и каждого сообщения в топике. Для специалиста ранг
+считался перебором всех выбранных ответов с отдельным поиском
+concept_correct_answer на ответ, поэтому страница с десятками ответов
+специалистов стоила тысячи запросов к sc-серверу.
+
+Теперь сведения об авторе хранятся по адресу пользователя (TTL и LRU
+ограниченного размера) и заполняются пакетно для всех различных авторов
+страницы (displays): email всех отсутствующих читается одним вызовом
+read_attributes, а для каждого из них выполняется проверка класса
+специалиста и, для специалиста, один поиск, сразу возвращающий только
+правильные ответы.
+
+Тест специалиста меняет ранг: save_answer, update_rating и удаление
+старых данных теста сбрасывают запись пользователя (invalidate по email).
+Подписи, сохранённые вне кэша (каталог топиков), обновляются через
+subscribe: подписчик получает email сброшенных пользователей.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr, ScTemplate
+
+from config import Config
+from service.utils.keynode_registry import keynodes
+from service.utils.ostis_utils import read_attributes
+from service.utils.sc_pool import client
+
+UNKNOWN = "Unknown"
+
+
+def format_rank(correct_answers: int) -> str:
+    """
+    Ранг специалиста по числу правильных ответов теста
+    """
+    if correct_answers >= 8:
+        return "первый ранг"
+    if correct_answers >= 5:
+        return "второй ранг"
+    return "третий ранг"
+
+
+class AuthorInfo:
+    """
+    Сведения об авторе, из которых строится подпись
+    """
+    __slots__ = ('email', 'is_specialist', 'rank')
+
+    def __init__(self, email: str, is_specialist: bool, rank: str = ''):
+        self.email = email
+        self.is_specialist = is_specialist
+        self.rank = rank
+
+    @property
+    def display(self) -> str:
+        if self.is_specialist:
+            return f"{self.email} (Специалист, {self.rank})"
+        return f"{self.email} (Клиент)"
+
+
+class AuthorDisplayCache:
+    """
+    LRU с ограничением времени жизни: адрес пользователя → AuthorInfo
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._authors = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidated = 0
+        self._listeners = []
+
+    def subscribe(self, callback) -> None:
+        """
+        Подписка на сброс сведений об авторах
+        :param callback: Функция callback(emails); пустой кортеж — сброшен весь кэш
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def display(self, user_addr: ScAddr) -> str:
+        """
+        Подпись одного автора
+        """
+        return self.displays([user_addr]).get(user_addr.value, UNKNOWN)
+
+    def displays(self, user_addrs: list) -> dict:
+        """
+        Подписи авторов страницы; отсутствующие в кэше загружаются пакетно
+        :param user_addrs: Адреса пользователей (повторы допускаются)
+        :return: Словарь значение адреса → подпись
+        """
+        return {value: info.display for value, info in self.authors(user_addrs).items()}
+
+    def authors(self, user_addrs: list) -> dict:
+        """
+        :param user_addrs: Адреса пользователей (повторы допускаются)
+        :return: Словарь значение адреса → AuthorInfo
+        """
+        now = time.monotonic()
+        authors = {}
+        missing = {}
+        with self._lock:
+            for addr in user_addrs:
+                if addr.value in authors or addr.value in missing:
+                    continue
+                entry = self._authors.get(addr.value)
+                if entry is not None and entry[0] > now:
+                    self._authors.move_to_end(addr.value)
+                    self._hits += 1
+                    authors[addr.value] = entry[1]
+                else:
+                    self._misses += 1
+                    missing[addr.value] = addr
+        if not missing:
+            return authors
+
+        loaded = self._load(list(missing.values()))
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for value, info in loaded.items():
+                authors[value] = info
+                if info.email == UNKNOWN:
+                    continue
+                self._authors[value] = (expires, info)
+                self._authors.move_to_end(value)
+            while len(self._authors) > self.maxsize:
+                self._authors.popitem(last=False)
+        return authors
+
+    def _load(self, user_addrs: list) -> dict:
+        emails = read_attributes(user_addrs, ['nrel_system_identifier'], default=UNKNOWN)
+        loaded = {}
+        for addr, attrs in zip(user_addrs, emails):
+            specialist_template = ScTemplate()
+            specialist_template.triple(keynodes["concept_specialist"], sc_types.EDGE_ACCESS_VAR_POS_PERM, addr)
+            if client.template_search(specialist_template):
+                info = AuthorInfo(attrs['nrel_system_identifier'], True, format_rank(self._correct_answers(addr)))
+            else:
+                info = AuthorInfo(attrs['nrel_system_identifier'], False)
+            loaded[addr.value] = info
+        return loaded
+
+    @staticmethod
+    def _correct_answers(user_addr: ScAddr) -> int:
+        """
+        Число правильных среди выбранных ответов одним поиском по шаблону
+        """
+        template = ScTemplate()
+        template.quintuple(
+            user_addr,
+            sc_types.EDGE_D_COMMON_VAR,
+            sc_types.NODE_VAR >> "_answers_set",
+            sc_types.EDGE_ACCESS_VAR_POS_PERM,
+            keynodes["nrel_selected_answers"]
+        )
+        template.triple("_answers_set", sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> "_answer")
+        template.triple(keynodes["concept_correct_answer"], sc_types.EDGE_ACCESS_VAR_POS_PERM, "_answer")
+        return len(client.template_search(template))
+
+    def invalidate(self, *emails) -> int:
+        """
+        Сброс сведений об авторах
+        :param emails: Email пользователей; без аргументов очищается весь кэш
+        :return: Количество удалённых записей
+        """
+        targets = set(emails)
+        with self._lock:
+            stale = [value for value, (_, info) in self._authors.items() if not emails or info.email in targets]
+            for value in stale:
+                del self._authors[value]
+            self._invalidated += len(stale)
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(emails)
+        return len(stale)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'cached': len(self._authors),
+                'ttl': self.ttl,
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidated': self._invalidated,
+            }
+
+
+author_displays = AuthorDisplayCache(Config.AUTHOR_DISPLAY_TTL, Config.AUTHOR_DISPLAY_SIZE)
@@ -0,0 +1,156 @@
+"""
+Предохранитель (circuit breaker) для вызовов агентов sc-сервера.
+
+Когда sc-machine перегружена или недоступна, каждый вызов агента ждёт
+полный таймаут, и рабочие потоки быстро заканчиваются. После K подряд
+неудачных вызовов (таймаут или ошибка соединения) предохранитель
+размыкается, и следующие вызовы сразу завершаются ScServerError. По
+истечении паузы пропускается ограниченное число пробных вызовов:
+успешный замыкает цепь, неудачный снова размыкает её.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from sc_client.constants.exceptions import ServerError
+
+from config import Config
+from service.exceptions import AgentError, ScServerError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+TIMEOUT_CODE = 524
+
+
+def is_server_failure(error: Exception) -> bool:
+    """
+    Признак того, что ошибка вызвана состоянием sc-сервера, а не данными запроса
+    :param error: Исключение вызова агента
+    :return: True для таймаутов и ошибок соединения
+    """
+    if isinstance(error, AgentError):
+        return error.code == TIMEOUT_CODE
+    return isinstance(error, (ScServerError, ServerError, ConnectionError))
+
+
+class CircuitBreaker:
+    """
+    Предохранитель с состояниями closed → open → half_open → closed
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, half_open_probes: int = 1, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Проверка перед вызовом агента
+        :raises ScServerError: Цепь разомкнута или все пробные вызовы уже выполняются
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            self._rejected += 1
+        raise ScServerError()
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                print("[BREAKER] sc-сервер отвечает, цепь замкнута")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._trips += 1
+                    print(f"[BREAKER] Цепь разомкнута после {self._failures} неудачных вызовов")
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+
+    def record_ignored(self) -> None:
+        """
+        Вызов завершился ошибкой, не связанной с sc-сервером: освобождаем слот пробы
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record(self, error: Exception = None) -> None:
+        """
+        Учёт результата вызова
+        :param error: Исключение вызова или None при успехе
+        """
+        if error is None:
+            self.record_success()
+        elif is_server_failure(error):
+            self.record_failure()
+        else:
+            self.record_ignored()
+
+    @contextmanager
+    def guard(self):
+        """
+        Вызов агента под защитой предохранителя
+        """
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            self.record(e)
+            raise
+        self.record()
+
+    def snapshot(self) -> dict:
+        """
+        :return: Текущее состояние предохранителя
+        """
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at)) if state == OPEN else 0.0
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'retry_in': round(retry_in, 1),
+                'rejected': self._rejected,
+                'trips': self._trips,
+            }
+
+
+agent_breaker = CircuitBreaker(
+    Config.BREAKER_FAILURE_THRESHOLD,
+    Config.BREAKER_RESET_TIMEOUT,
+    Config.BREAKER_HALF_OPEN_PROBES,
+)
@@ -0,0 +1,86 @@
+"""
+Подписки на события sc-памяти с гарантированным удалением.
+
+Подписка на action-ноду нужна только до завершения действия, поэтому
+она оформлена как контекстный менеджер: при выходе из блока (результат
+получен, истёк таймаут или возникла ошибка) подписка удаляется на
+sc-сервере. Счётчик открытых подписок позволяет отслеживать утечки:
+подписка, которую не удалось удалить, остаётся в числе открытых, а
+неудачные удаления считаются отдельно.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from sc_client.constants.common import ScEventType
+from sc_client.models import ScAddr, ScEventSubscriptionParams
+
+from service.utils.sc_pool import client
+
+
+class SubscriptionGauge:
+    """
+    Счётчик открытых подписок на события
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = 0
+        self._peak = 0
+        self._created = 0
+        self._failed_destroys = 0
+
+    def opened(self) -> None:
+        with self._lock:
+            self._open += 1
+            self._created += 1
+            self._peak = max(self._peak, self._open)
+
+    def closed(self, destroyed: bool) -> None:
+        with self._lock:
+            if destroyed:
+                self._open -= 1
+            else:
+                self._failed_destroys += 1
+
+    @property
+    def open(self) -> int:
+        return self._open
+
+    def snapshot(self) -> dict:
+        """
+        :return: Текущее состояние счётчика
+        """
+        with self._lock:
+            return {
+                'open': self._open,
+                'peak': self._peak,
+                'created': self._created,
+                'failed_destroys': self._failed_destroys,
+            }
+
+
+subscription_gauge = SubscriptionGauge()
+
+
+@contextmanager
+def event_subscription(node: ScAddr, callback, event_type: ScEventType = ScEventType.AFTER_GENERATE_INCOMING_ARC):
+    """
+    Подписка на событие, которая удаляется при выходе из блока with
+    :param node: Адрес элемента, на который оформляется подписка
+    :param callback: Колбэк-функция события
+    :param event_type: Тип события
+    :return: Созданная подписка
+    """
+    subscriptions = client.events_create(ScEventSubscriptionParams(node, event_type, callback))
+    subscription_gauge.opened()
+    destroyed = False
+    try:
+        yield subscriptions[0]
+    finally:
+        try:
+            destroyed = client.events_destroy(*subscriptions)
+        except Exception as e:
+            print(f"[EVENTS] Не удалось удалить подписку на {node}: {e}")
+        subscription_gauge.closed(destroyed)
+
@@ -0,0 +1,11 @@
+"""
+Поддельный sc-сервер для нагрузочных тестов и CI (см. server.py).
+
+Запуск вместо sc-machine на адресе из Config.OSTIS_URL:
+
+    python -m service.utils.fake_sc --port 8090 --latency 0.05
+"""
+
+from service.utils.fake_sc.agents import AgentContext, AgentRegistry, default_agents
+from service.utils.fake_sc.memory import ScMemory
+from service.utils.fake_sc.server import FakeScServer
@@ -0,0 +1,27 @@
+import argparse
+from urllib.parse import urlparse
+
+from config import Config
+from service.utils.fake_sc.server import FakeScServer
+
+
+def main():
+    default = urlparse(Config.OSTIS_URL)
+    parser = argparse.ArgumentParser(description="Поддельный sc-сервер (JSON websocket протокол sc-machine)")
+    parser.add_argument('--host', default=default.hostname or '127.0.0.1')
+    parser.add_argument('--port', type=int, default=default.port or 8090)
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка выполнения агентов в секундах")
+    parser.add_argument('--unknown-actions', choices=('fail', 'ignore'), default='fail',
+                        help="Что делать с действиями, для которых нет скрипта")
+    args = parser.parse_args()
+
+    server = FakeScServer(args.host, args.port, latency=args.latency, unknown_actions=args.unknown_actions)
+    print(f"[FAKE_SC] Слушаю {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Скрипты агентов для поддельного sc-сервера.
+
+Скрипт — функция handler(context), которая читает аргументы действия,
+изменяет sc-память через AgentContext и возвращает False при неуспехе
+(любое другое значение — успех). После возврата сервер сам создаёт
+структуру результата (nrel_result) и дуги action_finished и
+action_finished_successfully / _unsuccessfully, как это делают агенты
+sc-machine; исключение в скрипте завершает действие с ошибкой.
+
+default_agents() эмулирует агентов приложения в той структуре
+sc-памяти, которую читают ostis.py и models.py: пользователи
+(concept_user + системный идентификатор-логин), топики и сообщения
+форума, запросы к словарю терминов.
+"""
+
+from service.utils.fake_sc.memory import COMMON_ARC, LINK_CONST, MEMBERSHIP_ARC, NODE_CONST, NODE_STRUCTURE, SYSTEM_IDTF
+
+MAX_ARGUMENTS = 10
+
+
+class AgentContext:
+    """
+    Действие, которое выполняет скрипт: аргументы, запись в sc-память и результат
+    """
+
+    def __init__(self, memory, action: int):
+        self.memory = memory
+        self.action = action
+        self._result = None
+        self._finished = False
+
+    def keynode(self, idtf: str, node_type: int = NODE_CONST) -> int:
+        return self.memory.resolve_keynode(idtf, node_type)
+
+    def _role_target(self, node: int, role: int):
+        for arc in self.memory.outgoing(node):
+            source, target = self.memory.ends(arc)
+            if source != node or not self.memory.type_of(arc) & MEMBERSHIP_ARC == MEMBERSHIP_ARC:
+                continue
+            for role_arc in self.memory.incoming(arc):
+                if self.memory.ends(role_arc)[0] == role:
+                    return target
+        return None
+
+    def argument(self, index: int):
+        """
+        :param index: Номер аргумента (rrel_index)
+        :return: Адрес аргумента или None
+        """
+        return self._role_target(self.action, self.keynode(f'rrel_{index}'))
+
+    def arguments(self) -> list:
+        return [self.argument(index) for index in range(1, MAX_ARGUMENTS + 1)]
+
+    def content(self, addr):
+        if addr is None:
+            return None
+        content = self.memory.get_content(addr)
+        return content[0] if content else None
+
+    def node(self, *classes: int, node_type: int = NODE_CONST) -> int:
+        node = self.memory.generate_node(node_type)
+        for node_class in classes:
+            self.memory.generate_connector(MEMBERSHIP_ARC, node_class, node)
+        return node
+
+    def member(self, container: int, element: int) -> int:
+        return self.memory.generate_connector(MEMBERSHIP_ARC, container, element)
+
+    def relation(self, source: int, target: int, relation: str) -> int:
+        """
+        Пара source ⇒ target под неролевым отношением relation
+        """
+        return self.memory.generate_relation_pair(source, target, relation)
+
+    def attribute(self, node: int, relation: str, content) -> int:
+        """
+        Новая sc-link с содержимым content, связанная с node отношением relation
+        """
+        return self.memory.generate_attribute(node, relation, content)
+
+    def attribute_link(self, node: int, relation: str):
+        """
+        sc-link, связанная с node отношением relation, или None
+        """
+        relation_addr = self.memory.find_keynode(relation)
+        for arc in self.memory.outgoing(node):
+            source, target = self.memory.ends(arc)
+            if source != node or self.memory.type_of(arc) != COMMON_ARC:
+                continue
+            if any(self.memory.ends(role_arc)[0] == relation_addr for role_arc in self.memory.incoming(arc)):
+                return target
+        return None
+
+    def owner_by_system_idtf(self, idtf: str, node_class: int = None):
+        """
+        Узел, системный идентификатор которого равен idtf (например, пользователь по логину)
+        """
+        system_idtf = self.memory.find_keynode(SYSTEM_IDTF)
+        for link in self.memory.find_links(idtf):
+            for arc in self.memory.incoming(link):
+                source, _ = self.memory.ends(arc)
+                if not any(self.memory.ends(role_arc)[0] == system_idtf for role_arc in self.memory.incoming(arc)):
+                    continue
+                if node_class is None or self.is_member(node_class, source):
+                    return source
+        return None
+
+    def is_member(self, container: int, element: int) -> bool:
+        return any(self.memory.ends(arc)[0] == container for arc in self.memory.incoming(element))
+
+    def result(self, *elements: int) -> int:
+        """
+        Добавление элементов в структуру результата действия
+        :return: Адрес структуры результата
+        """
+        if self._result is None:
+            self._result = self.memory.generate_node(NODE_STRUCTURE)
+            self.relation(self.action, self._result, 'nrel_result')
+        for element in elements:
+            self.member(self._result, element)
+        return self._result
+
+    def finish(self, succeeded) -> None:
+        """
+        Завершение действия: True — успешно, False — неуспешно, None — с ошибкой
+        """
+        if self._finished:
+            return
+        self._finished = True
+        if succeeded:
+            self.result()
+        status = {True: 'action_finished_successfully', False: 'action_finished_unsuccessfully'}.get(
+            succeeded, 'action_finished_with_error')
+        self.member(self.keynode('action_finished'), self.action)
+        self.member(self.keynode(status), self.action)
+
+
+class AgentRegistry:
+    """
+    Скрипты агентов по идентификатору класса действия
+    """
+
+    def __init__(self):
+        self._agents = {}
+        # Данные для скриптов, например словарь терминов для action_user_request
+        self.data = {}
+
+    def register(self, action_name: str, handler, latency: float = None) -> None:
+        """
+        :param action_name: Идентификатор класса действия
+        :param handler: Функция handler(context)
+        :param latency: Задержка выполнения в секундах (None — задержка сервера)
+        """
+        self._agents[action_name] = (handler, latency)
+
+    def agent(self, action_name: str, latency: float = None):
+        """
+        Декоратор для регистрации скрипта
+        """
+        def decorator(handler):
+            self.register(action_name, handler, latency)
+            return handler
+        return decorator
+
+    def names(self) -> list:
+        return list(self._agents)
+
+    def get(self, action_name: str) -> tuple:
+        return self._agents[action_name]
+
+
+def default_agents() -> AgentRegistry:
+    """
+    Реестр со скриптами, эмулирующими агентов приложения
+    """
+    agents = AgentRegistry()
+
+    def succeed(context):
+        return True
+
+    for name in ('action_verification', 'action_search', 'action_search_answers_for_question',
+                 'action_add_event', 'action_del_event', 'action_user_events', 'action_save_answer',
+                 'action_delete_old_nodes', 'action_update_rating'):
+        agents.register(name, succeed)
+
+    @agents.agent('action_user_registration')
+    def register_user(context):
+        email_link, password_link, confirmation_link, user = context.arguments()[:4]
+        email, password, confirmation = map(context.content, (email_link, password_link, confirmation_link))
+        if not email or password != confirmation:
+            return False
+        if context.owner_by_system_idtf(email, context.keynode('concept_user')):
+            return False
+        user = user or context.node()
+        context.member(context.keynode('concept_user'), user)
+        context.attribute(user, SYSTEM_IDTF, email)
+        context.attribute(user, 'nrel_password', password)
+        context.result(user)
+        return True
+
+    @agents.agent('action_authentication')
+    def authenticate(context):
+        email, password = (context.content(arg) for arg in context.arguments()[:2])
+        user = context.owner_by_system_idtf(email, context.keynode('concept_user'))
+        if user is None:
+            return False
+        return context.content(context.attribute_link(user, 'nrel_password')) == password
+
+    @agents.agent('action_user_request')
+    def user_request(context):
+        query = context.content(context.argument(1)) or ''
+        definitions = agents.data.get('definitions', {})
+        body = definitions.get(query.strip().lower(), f"Термин «{query}» не найден")
+        context.result(context.memory.generate_link(body, link_type=LINK_CONST))
+        return True
+
+    @agents.agent('action_add_topic')
+    def add_topic(context):
+        user, title, description = context.arguments()[:3]
+        topic = context.node(context.keynode('concept_topic'))
+        context.attribute(topic, 'nrel_topic_title', context.content(title))
+        context.attribute(topic, 'nrel_topic_description', context.content(description) or '')
+        if user:
+            context.relation(topic, user, 'nrel_author')
+        context.result(topic)
+        return True
+
+    @agents.agent('action_add_message')
+    def add_message(context):
+        user, topic, text, image, image_name, image_mime = context.arguments()[:6]
+        if topic is None:
+            return False
+        message = context.node(context.keynode('concept_message'))
+        context.member(topic, message)
+        context.attribute(message, 'nrel_message_content', context.content(text) or '')
+        context.attribute(message, 'nrel_likes', '0')
+        context.attribute(message, 'nrel_dislikes', '0')
+        if user:
+            context.relation(message, user, 'nrel_author')
+        if image:
+            attachment = context.node()
+            context.attribute(attachment, 'nrel_attachment_data', context.content(image))
+            context.attribute(attachment, 'nrel_attachment_name', context.content(image_name) or '')
+            context.attribute(attachment, 'nrel_attachment_mime', context.content(image_mime) or '')
+            context.relation(message, attachment, 'nrel_message_attachment')
+        context.result(message)
+        return True
+
+    @agents.agent('action_rate_message')
+    def rate_message(context):
+        message, rating = context.arguments()[:2]
+        relation = 'nrel_likes' if context.content(rating) == 'like' else 'nrel_dislikes'
+        link = context.attribute_link(message, relation)
+        if link is None:
+            context.attribute(message, relation, '1')
+        else:
+            context.memory.set_content(link, str(int(context.content(link) or 0) + 1))
+        return True
+
+    @agents.agent('action_edit_message')
+    def edit_message(context):
+        message, text = context.arguments()[:2]
+        link = context.attribute_link(message, 'nrel_message_content')
+        if link is None:
+            return False
+        return context.memory.set_content(link, context.content(text))
+
+    @agents.agent('action_delete_message')
+    def delete_message(context):
+        message = context.argument(1)
+        if message is None:
+            return False
+        return context.memory.erase(message)
+
+    return agents
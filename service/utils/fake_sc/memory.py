@@ -0,0 +1,389 @@
+"""
+sc-память в памяти процесса для поддельного sc-сервера.
+
+Элементы хранятся в словарях по адресу, для каждого элемента ведутся
+индексы исходящих и входящих коннекторов, для sc-link — индекс
+содержимое → адреса, для системных идентификаторов — idtf → адрес.
+Поиск по шаблону выполняется перебором с возвратом: на каждом шаге
+выбирается тройка с наибольшим числом уже известных элементов, и
+кандидаты берутся из индекса исходящих или входящих коннекторов.
+
+Сопоставление типов повторяет sc-machine: переменный тип шаблона
+переводится в константный, и элемент подходит, если его тип содержит
+все биты этого типа.
+"""
+
+import itertools
+import threading
+from collections import defaultdict
+
+from sc_client.constants import common, sc_type
+from sc_client.constants.sc_type import bitmasks
+
+NODE_CONST = sc_type.CONST_NODE.value
+NODE_NON_ROLE = sc_type.CONST_NODE_NON_ROLE.value
+NODE_CLASS = sc_type.CONST_NODE_CLASS.value
+NODE_STRUCTURE = sc_type.CONST_NODE_STRUCTURE.value
+LINK_CONST = sc_type.CONST_NODE_LINK.value
+MEMBERSHIP_ARC = sc_type.CONST_PERM_POS_ARC.value
+COMMON_ARC = sc_type.CONST_COMMON_ARC.value
+
+CONTENT_TYPES = {0: 'int', 1: 'float', 2: 'string'}
+
+SYSTEM_IDTF = 'nrel_system_identifier'
+
+
+class TemplateError(ValueError):
+    """
+    Шаблон, который поддельный sc-сервер не умеет обработать
+    """
+
+
+def _const_type(value: int) -> int:
+    if value & bitmasks.SC_TYPE_VAR:
+        return (value & ~bitmasks.SC_TYPE_CONSTANCY_MASK) | bitmasks.SC_TYPE_CONST
+    return value
+
+
+def is_link(value: int) -> bool:
+    return value & bitmasks.SC_TYPE_NODE_LINK == bitmasks.SC_TYPE_NODE_LINK
+
+
+def type_matches(element_type: int, template_type: int) -> bool:
+    """
+    Подходит ли элемент под тип из шаблона
+    :param element_type: Тип элемента sc-памяти
+    :param template_type: Тип элемента шаблона (обычно переменный)
+    """
+    expected = _const_type(template_type)
+    return element_type != 0 and element_type & expected == expected
+
+
+class ScMemory:
+    """
+    Хранилище элементов с индексами и событиями генерации коннекторов
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._next_addr = itertools.count(1)
+        self._types = {}
+        self._ends = {}
+        self._contents = {}
+        self._outgoing = defaultdict(set)
+        self._incoming = defaultdict(set)
+        self._links_by_content = defaultdict(set)
+        self._idtfs = {}
+        # Слушатели генерации коннекторов: callback(connector, source, target, type)
+        self.listeners = []
+        self.resolve_keynode(SYSTEM_IDTF, NODE_NON_ROLE)
+
+    # --- элементы ---
+
+    def _new_addr(self) -> int:
+        return next(self._next_addr)
+
+    def generate_node(self, node_type: int = NODE_CONST) -> int:
+        with self.lock:
+            addr = self._new_addr()
+            self._types[addr] = node_type
+            return addr
+
+    def generate_link(self, content, content_type: str = 'string', link_type: int = LINK_CONST) -> int:
+        with self.lock:
+            addr = self._new_addr()
+            self._types[addr] = link_type
+            self._set_content(addr, content, content_type)
+            return addr
+
+    def generate_connector(self, connector_type: int, source: int, target: int) -> int:
+        with self.lock:
+            if source not in self._types or target not in self._types:
+                raise ValueError(f"Нет элемента {source if source not in self._types else target}")
+            addr = self._new_addr()
+            self._types[addr] = connector_type
+            self._ends[addr] = (source, target)
+            self._outgoing[source].add(addr)
+            self._incoming[target].add(addr)
+            if connector_type & bitmasks.SC_TYPE_COMMON_EDGE == bitmasks.SC_TYPE_COMMON_EDGE:
+                self._outgoing[target].add(addr)
+                self._incoming[source].add(addr)
+        for listener in self.listeners:
+            listener(addr, source, target, connector_type)
+        return addr
+
+    def erase(self, *addrs: int) -> bool:
+        """
+        Удаление элементов вместе с инцидентными коннекторами
+        """
+        with self.lock:
+            stack = [addr for addr in addrs if addr in self._types]
+            while stack:
+                addr = stack.pop()
+                if addr not in self._types:
+                    continue
+                stack.extend(self._outgoing.pop(addr, ()))
+                stack.extend(self._incoming.pop(addr, ()))
+                del self._types[addr]
+                ends = self._ends.pop(addr, None)
+                if ends:
+                    for end in ends:
+                        self._outgoing.get(end, set()).discard(addr)
+                        self._incoming.get(end, set()).discard(addr)
+                content = self._contents.pop(addr, None)
+                if content is not None:
+                    self._links_by_content[content[0]].discard(addr)
+        return True
+
+    def type_of(self, addr: int) -> int:
+        return self._types.get(addr, 0)
+
+    def ends(self, connector: int) -> tuple:
+        return self._ends.get(connector, (0, 0))
+
+    def outgoing(self, addr: int) -> set:
+        return self._outgoing.get(addr, set())
+
+    def incoming(self, addr: int) -> set:
+        return self._incoming.get(addr, set())
+
+    # --- содержимое sc-link ---
+
+    def _set_content(self, addr: int, content, content_type: str) -> None:
+        previous = self._contents.get(addr)
+        if previous is not None:
+            self._links_by_content[previous[0]].discard(addr)
+        self._contents[addr] = (content, content_type)
+        self._links_by_content[content].add(addr)
+
+    def set_content(self, addr: int, content, content_type: str = 'string') -> bool:
+        with self.lock:
+            if not is_link(self.type_of(addr)):
+                return False
+            self._set_content(addr, content, content_type)
+            return True
+
+    def get_content(self, addr: int):
+        """
+        :return: (содержимое, тип) или None, если это не sc-link
+        """
+        return self._contents.get(addr)
+
+    def find_links(self, content) -> list:
+        with self.lock:
+            return sorted(self._links_by_content.get(content, ()))
+
+    def find_links_by_substring(self, substring: str) -> list:
+        with self.lock:
+            return sorted(
+                addr for content, addrs in self._links_by_content.items()
+                if isinstance(content, str) and substring in content
+                for addr in addrs
+            )
+
+    def find_strings_by_substring(self, substring: str) -> list:
+        with self.lock:
+            return sorted(
+                content for content, addrs in self._links_by_content.items()
+                if addrs and isinstance(content, str) and substring in content
+            )
+
+    # --- ключевые узлы ---
+
+    def find_keynode(self, idtf: str) -> int:
+        return self._idtfs.get(idtf, 0)
+
+    def resolve_keynode(self, idtf: str, node_type: int = NODE_CONST) -> int:
+        """
+        Узел с системным идентификатором idtf; создаётся вместе с sc-link идентификатора
+        """
+        with self.lock:
+            addr = self._idtfs.get(idtf)
+            if addr:
+                return addr
+            addr = self.generate_node(node_type or NODE_CONST)
+            self._idtfs[idtf] = addr
+            relation = self._idtfs.get(SYSTEM_IDTF, addr)
+            link = self.generate_link(idtf)
+            arc = self.generate_connector(COMMON_ARC, addr, link)
+            self.generate_connector(MEMBERSHIP_ARC, relation, arc)
+            return addr
+
+    # --- конструкции приложения ---
+
+    def generate_relation_pair(self, source: int, target: int, relation: str) -> int:
+        """
+        Пара source ⇒ target под неролевым отношением relation
+        :return: Адрес общей дуги пары
+        """
+        arc = self.generate_connector(COMMON_ARC, source, target)
+        self.generate_connector(MEMBERSHIP_ARC, self.resolve_keynode(relation, NODE_NON_ROLE), arc)
+        return arc
+
+    def generate_attribute(self, node: int, relation: str, content, content_type: str = 'string') -> int:
+        """
+        Новая sc-link с содержимым content, связанная с node отношением relation
+        """
+        link = self.generate_link(content, content_type)
+        self.generate_relation_pair(node, link, relation)
+        return link
+
+    # --- шаблоны ---
+
+    def _parse_template(self, template, params: dict) -> tuple:
+        if not isinstance(template, list):
+            raise TemplateError("Поддерживаются только шаблоны в виде списка троек")
+        bindings = {}
+        for alias, value in (params or {}).items():
+            bindings[alias] = value if isinstance(value, int) else self.find_keynode(value)
+        triples = []
+        for triple in template:
+            items = []
+            for item in triple:
+                kind = item[common.TYPE]
+                if kind == common.Types.ADDR:
+                    items.append((item[common.VALUE], None, item.get(common.ALIAS)))
+                elif kind == common.Types.TYPE:
+                    items.append((None, item[common.VALUE], item.get(common.ALIAS)))
+                elif kind == common.Types.ALIAS:
+                    items.append((None, None, item[common.VALUE]))
+                else:
+                    raise TemplateError(f"Неизвестный элемент шаблона: {kind}")
+            triples.append(items)
+        return triples, bindings
+
+    @staticmethod
+    def _aliases(triples) -> dict:
+        aliases = {}
+        for index, triple in enumerate(triples):
+            for position, (_, _, alias) in enumerate(triple):
+                if alias is not None and alias not in aliases:
+                    aliases[alias] = index * 3 + position
+        return aliases
+
+    def _fixed(self, item, bindings: dict):
+        addr, _, alias = item
+        if addr is not None:
+            return addr
+        if alias is not None:
+            return bindings.get(alias)
+        return None
+
+    def _accepts(self, item, element: int, bindings: dict) -> bool:
+        fixed = self._fixed(item, bindings)
+        if fixed is not None:
+            return fixed == element
+        _, item_type, _ = item
+        return item_type is None or type_matches(self.type_of(element), item_type)
+
+    def _candidates(self, triple, bindings: dict):
+        source, connector, target = (self._fixed(item, bindings) for item in triple)
+        if connector is not None:
+            if connector not in self._ends:
+                return []
+            begin, end = self._ends[connector]
+            if self._types[connector] & bitmasks.SC_TYPE_COMMON_EDGE == bitmasks.SC_TYPE_COMMON_EDGE:
+                return [(begin, connector, end), (end, connector, begin)]
+            return [(begin, connector, end)]
+        if source is not None and target is not None:
+            # Оба конца известны: перебирается меньший из двух индексов
+            if len(self._incoming.get(target, ())) < len(self._outgoing.get(source, ())):
+                source = None
+        if source is not None:
+            result = []
+            for arc in self._outgoing.get(source, ()):
+                begin, end = self._ends[arc]
+                result.append((source, arc, end if begin == source else begin))
+            return result
+        if target is not None:
+            result = []
+            for arc in self._incoming.get(target, ()):
+                begin, end = self._ends[arc]
+                result.append((begin if end == target else end, arc, target))
+            return result
+        return [(begin, arc, end) for arc, (begin, end) in self._ends.items()]
+
+    def _known(self, triple, bindings: dict) -> int:
+        return sum(self._fixed(item, bindings) is not None for item in triple)
+
+    def _solve(self, triples, bindings: dict, solved: dict, results: list, seen: set) -> None:
+        if len(solved) == len(triples):
+            addrs = [addr for index in range(len(triples)) for addr in solved[index]]
+            key = tuple(addrs)
+            if key not in seen:
+                seen.add(key)
+                results.append(addrs)
+            return
+        index = max(
+            (index for index in range(len(triples)) if index not in solved),
+            key=lambda index: (self._known(triples[index], bindings), -index),
+        )
+        triple = triples[index]
+        for candidate in self._candidates(triple, bindings):
+            if not all(self._accepts(item, element, bindings) for item, element in zip(triple, candidate)):
+                continue
+            added = []
+            consistent = True
+            for (_, _, alias), element in zip(triple, candidate):
+                if alias is None:
+                    continue
+                bound = bindings.get(alias)
+                if bound is None:
+                    bindings[alias] = element
+                    added.append(alias)
+                elif bound != element:
+                    consistent = False
+                    break
+            if consistent:
+                solved[index] = candidate
+                self._solve(triples, bindings, solved, results, seen)
+                del solved[index]
+            for alias in added:
+                del bindings[alias]
+
+    def search(self, template, params: dict = None) -> tuple:
+        """
+        Поиск по шаблону в формате payload sc-client
+        :return: (алиасы → индекс в плоском списке адресов, список результатов)
+        """
+        triples, bindings = self._parse_template(template, params)
+        results = []
+        with self.lock:
+            self._solve(triples, bindings, {}, results, set())
+        return self._aliases(triples), results
+
+    def generate(self, template, params: dict = None) -> tuple:
+        """
+        Генерация конструкции по шаблону: неизвестные элементы создаются константными
+        :return: (алиасы → индекс, плоский список адресов)
+        """
+        triples, bindings = self._parse_template(template, params)
+        addrs = []
+        with self.lock:
+            for triple in triples:
+                source_item, connector_item, target_item = triple
+                ends = []
+                for item in (source_item, target_item):
+                    addr = self._fixed(item, bindings)
+                    if addr is None:
+                        item_type = _const_type(item[1] or NODE_CONST)
+                        addr = self.generate_link('') if is_link(item_type) else self.generate_node(item_type)
+                        if item[2] is not None:
+                            bindings[item[2]] = addr
+                    ends.append(addr)
+                connector = self._fixed(connector_item, bindings)
+                if connector is None:
+                    connector = self.generate_connector(_const_type(connector_item[1] or MEMBERSHIP_ARC), *ends)
+                    if connector_item[2] is not None:
+                        bindings[connector_item[2]] = connector
+                addrs.extend((ends[0], connector, ends[1]))
+        return self._aliases(triples), addrs
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'elements': len(self._types),
+                'connectors': len(self._ends),
+                'links': len(self._contents),
+                'keynodes': len(self._idtfs),
+            }
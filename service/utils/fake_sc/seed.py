@@ -0,0 +1,176 @@
+"""
+Синтетические данные для поддельного sc-сервера.
+
+seed_forum() заполняет ScMemory в той структуре, которую читают
+ostis.py, models.py и кабинет: пользователи (concept_user,
+concept_verified_user, системный идентификатор-email), часть из них —
+специалисты; топики форума с автором, заголовком и описанием;
+сообщения с текстом, лайками и автором; история запросов, закладки и
+заметки кабинета. Тексты собираются из юридической лексики, чтобы
+теги топиков и рекомендации работали на правдоподобных данных.
+
+Генерация детерминирована: одинаковые параметры и seed дают одинаковую
+sc-память, поэтому прогоны нагрузочного теста можно сравнивать.
+"""
+
+import random
+
+from sc_client.constants import sc_type
+
+from service.utils.fake_sc.memory import MEMBERSHIP_ARC, NODE_CLASS, NODE_CONST, NODE_NON_ROLE, SYSTEM_IDTF
+from service.utils.keynode_registry import APP_KEYNODES
+
+SUBJECTS = (
+    'трудовой договор', 'увольнение по соглашению сторон', 'налоговый вычет', 'аренда жилья',
+    'алименты на ребёнка', 'раздел имущества', 'наследство по завещанию', 'защита прав потребителей',
+    'возврат товара', 'ДТП и страховая выплата', 'регистрация ИП', 'пенсия по возрасту',
+    'отпуск по уходу за ребёнком', 'долевое строительство', 'административный штраф',
+)
+
+QUESTIONS = (
+    'Как оформить', 'Что делать, если нарушен', 'Сроки по делу:', 'Нужна консультация:',
+    'Какие документы нужны:', 'Судебная практика:', 'Можно ли оспорить',
+)
+
+REPLIES = (
+    'Согласно Гражданскому кодексу, срок исковой давности составляет три года.',
+    'Обратитесь с письменной претензией, а затем в суд по месту жительства.',
+    'Работодатель обязан предупредить об этом не менее чем за месяц.',
+    'Подтверждающие документы подаются в налоговый орган вместе с декларацией.',
+    'В такой ситуации поможет нотариально заверенное соглашение.',
+    'Суд учитывает интересы несовершеннолетних детей в первую очередь.',
+    'Штраф можно обжаловать в течение десяти дней со дня вручения постановления.',
+)
+
+TERMS = {
+    'договор': 'Соглашение двух или нескольких лиц об установлении, изменении или прекращении прав и обязанностей.',
+    'иск': 'Требование истца к ответчику, обращённое через суд.',
+    'наследство': 'Имущество умершего, переходящее к наследникам по закону или по завещанию.',
+    'алименты': 'Средства на содержание, которые обязаны предоставлять члены семьи.',
+    'аренда': 'Предоставление имущества за плату во временное владение и пользование.',
+    'штраф': 'Денежное взыскание за правонарушение.',
+}
+
+SIZES = {
+    'tiny': {'topics': 20, 'messages': 100, 'users': 20},
+    'small': {'topics': 1000, 'messages': 10000, 'users': 1000},
+    'medium': {'topics': 10000, 'messages': 100000, 'users': 10000},
+}
+
+
+def seed_knowledge_base(memory) -> int:
+    """
+    Ключевые узлы, которые приложение только ищет (тип None в APP_KEYNODES):
+    в настоящей базе знаний они есть всегда
+    :return: Число созданных узлов
+    """
+    types = {'nrel_': NODE_NON_ROLE, 'rrel_': sc_type.CONST_NODE_ROLE.value}
+    created = 0
+    for idtf, declared in APP_KEYNODES.items():
+        if declared is None and not memory.find_keynode(idtf):
+            memory.resolve_keynode(idtf, types.get(idtf[:5], NODE_CLASS))
+            created += 1
+    return created
+
+
+def _email(index: int) -> str:
+    return f'user{index:05d}@example.by'
+
+
+def _date(rng: random.Random) -> str:
+    return f'2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00'
+
+
+def _seed_cabinet(memory, rng: random.Random, user: int, items: int) -> None:
+    for index in range(items):
+        query = memory.generate_node(NODE_CONST)
+        memory.generate_relation_pair(user, query, 'nrel_query_history')
+        memory.generate_attribute(query, 'nrel_query_type', 'search')
+        memory.generate_attribute(query, 'nrel_query_text', rng.choice(list(TERMS)))
+        memory.generate_attribute(query, 'nrel_query_timestamp', _date(rng))
+
+        bookmark = memory.generate_node(NODE_CONST)
+        memory.generate_relation_pair(user, bookmark, 'nrel_user_bookmarks')
+        memory.generate_attribute(bookmark, 'nrel_bookmark_article', f'article_{index}')
+        memory.generate_attribute(bookmark, 'nrel_bookmark_title', rng.choice(SUBJECTS))
+        memory.generate_attribute(bookmark, 'nrel_bookmark_tags', 'важное, работа')
+        memory.generate_attribute(bookmark, 'nrel_bookmark_date', _date(rng))
+
+        note = memory.generate_node(NODE_CONST)
+        memory.generate_relation_pair(user, note, 'nrel_user_notes')
+        memory.generate_attribute(note, 'nrel_note_article', f'article_{index}')
+        memory.generate_attribute(note, 'nrel_note_article_title', rng.choice(SUBJECTS))
+        memory.generate_attribute(note, 'nrel_note_text', rng.choice(REPLIES))
+        memory.generate_attribute(note, 'nrel_note_created', _date(rng))
+        memory.generate_attribute(note, 'nrel_note_updated', _date(rng))
+
+
+def seed_forum(memory, topics: int, messages: int, users: int, specialists: float = 0.1,
+               cabinet_items: int = 2, seed: int = 0, agents=None) -> dict:
+    """
+    Заполнение sc-памяти синтетическими пользователями, топиками и сообщениями
+    :param memory: ScMemory поддельного sc-сервера
+    :param topics: Количество топиков
+    :param messages: Количество сообщений (распределяются по топикам случайно)
+    :param users: Количество пользователей
+    :param specialists: Доля специалистов среди пользователей
+    :param cabinet_items: Записей истории, закладок и заметок на пользователя
+    :param seed: Начальное значение генератора случайных чисел
+    :param agents: Реестр скриптов; в data['definitions'] записывается словарь терминов
+    :return: Словарь с логинами пользователей, адресами топиков и терминами для запросов
+    """
+    rng = random.Random(seed)
+    with memory.lock:
+        seed_knowledge_base(memory)
+        concept_user = memory.resolve_keynode('concept_user', NODE_CLASS)
+        concept_verified_user = memory.resolve_keynode('concept_verified_user', NODE_CLASS)
+        concept_specialist = memory.resolve_keynode('concept_specialist', NODE_CLASS)
+        concept_topic = memory.resolve_keynode('concept_topic', NODE_CLASS)
+        concept_message = memory.resolve_keynode('concept_message', NODE_CLASS)
+
+        user_addrs = []
+        emails = []
+        for index in range(users):
+            user = memory.generate_node(NODE_CONST)
+            memory.generate_connector(MEMBERSHIP_ARC, concept_user, user)
+            memory.generate_connector(MEMBERSHIP_ARC, concept_verified_user, user)
+            if rng.random() < specialists:
+                memory.generate_connector(MEMBERSHIP_ARC, concept_specialist, user)
+            email = _email(index)
+            memory.generate_attribute(user, SYSTEM_IDTF, email)
+            memory.generate_attribute(user, 'nrel_password', 'password')
+            memory.generate_attribute(user, 'nrel_user_name', f'Пользователь {index}')
+            memory.generate_attribute(user, 'nrel_default_jurisdiction', 'BY')
+            _seed_cabinet(memory, rng, user, cabinet_items)
+            user_addrs.append(user)
+            emails.append(email)
+
+        topic_addrs = []
+        for _ in range(topics):
+            subject = rng.choice(SUBJECTS)
+            topic = memory.generate_node(NODE_CONST)
+            memory.generate_connector(MEMBERSHIP_ARC, concept_topic, topic)
+            memory.generate_attribute(topic, 'nrel_topic_title', f'{rng.choice(QUESTIONS)} {subject}')
+            memory.generate_attribute(topic, 'nrel_topic_description', f'Вопрос про {subject}. {rng.choice(REPLIES)}')
+            if user_addrs:
+                memory.generate_relation_pair(topic, rng.choice(user_addrs), 'nrel_author')
+            topic_addrs.append(topic)
+
+        for _ in range(messages if topic_addrs else 0):
+            message = memory.generate_node(NODE_CONST)
+            memory.generate_connector(MEMBERSHIP_ARC, concept_message, message)
+            memory.generate_connector(MEMBERSHIP_ARC, rng.choice(topic_addrs), message)
+            memory.generate_attribute(message, 'nrel_message_content', rng.choice(REPLIES))
+            memory.generate_attribute(message, 'nrel_likes', str(rng.randint(0, 20)))
+            memory.generate_attribute(message, 'nrel_dislikes', str(rng.randint(0, 5)))
+            if user_addrs:
+                memory.generate_relation_pair(message, rng.choice(user_addrs), 'nrel_author')
+
+    if agents is not None:
+        agents.data['definitions'] = dict(TERMS)
+    return {
+        'users': emails,
+        'topics': topic_addrs,
+        'messages': messages if topic_addrs else 0,
+        'terms': list(TERMS),
+    }
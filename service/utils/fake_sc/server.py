@@ -0,0 +1,435 @@
+"""
+Поддельный sc-сервер: JSON-протокол sc-machine (ws_json) поверх websocket.
+
+Поддерживается подмножество запросов, которое использует приложение:
+keynodes, create_elements, check_elements, delete_elements, content
+(get/set/find/find_links_by_substr/find_strings_by_substr),
+search_template, generate_template и events (подписки на генерацию
+коннекторов). Данные хранятся в ScMemory, агенты эмулируются скриптами
+(см. agents.py): когда генерируется дуга action_initiated → действие,
+сервер находит скрипт по классу действия и выполняет его в пуле потоков
+с заданной задержкой.
+
+Websocket реализован на стандартной библиотеке (handshake RFC 6455,
+текстовые кадры, ping/pong, close), чтобы сервер запускался без
+дополнительных зависимостей.
+"""
+
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sc_client.constants import common
+from sc_client.constants.common import RequestType, ScEventType
+from sc_client.constants.sc_type import bitmasks
+
+from service.utils.fake_sc.agents import AgentContext, default_agents
+from service.utils.fake_sc.memory import CONTENT_TYPES, ScMemory, TemplateError
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+INITIATED = 'action_initiated'
+
+
+class _WebSocketHandler(socketserver.StreamRequestHandler):
+    """
+    Одно клиентское соединение: handshake и цикл чтения кадров
+    """
+
+    def setup(self):
+        super().setup()
+        self._send_lock = threading.Lock()
+        self.open = False
+
+    def handle(self):
+        if not self._handshake():
+            return
+        self.open = True
+        self.server.fake.connected(self)
+        try:
+            self._read_messages()
+        except (ConnectionError, OSError, struct.error):
+            pass
+        finally:
+            self.open = False
+            self.server.fake.disconnected(self)
+
+    def _handshake(self) -> bool:
+        headers = {}
+        request_line = self.rfile.readline()
+        if not request_line:
+            return False
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            self.wfile.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.wfile.write((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+        ).encode())
+        return True
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self.rfile.read(size)
+        if len(data) < size:
+            raise ConnectionError("Соединение закрыто клиентом")
+        return data
+
+    def _read_frame(self) -> tuple:
+        first, second = self._read_exact(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._read_exact(8))[0]
+        mask = self._read_exact(4) if second & 0x80 else None
+        data = self._read_exact(length)
+        if mask and data:
+            key = (mask * (length // 4 + 1))[:length]
+            data = (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+        return bool(first & 0x80), opcode, data
+
+    def _read_messages(self) -> None:
+        fragments = []
+        while True:
+            final, opcode, data = self._read_frame()
+            if opcode == OP_CLOSE:
+                self._send_frame(OP_CLOSE, data[:2])
+                return
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, data)
+                continue
+            if opcode == OP_PONG:
+                continue
+            fragments.append(data)
+            if final:
+                message = b''.join(fragments).decode('utf-8')
+                fragments = []
+                self.server.fake.handle_message(self, message)
+
+    def _send_frame(self, opcode: int, data: bytes) -> None:
+        length = len(data)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        with self._send_lock:
+            self.wfile.write(header + data)
+
+    def send(self, message: dict) -> None:
+        if not self.open:
+            return
+        try:
+            self._send_frame(OP_TEXT, json.dumps(message, ensure_ascii=False).encode('utf-8'))
+        except OSError:
+            self.open = False
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeScServer:
+    """
+    Поддельный sc-сервер с sc-памятью в процессе и эмуляцией агентов
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, memory: ScMemory = None,
+                 agents=None, latency: float = 0.0, unknown_actions: str = 'fail'):
+        """
+        :param host: Адрес для прослушивания
+        :param port: Порт (0 — выбрать свободный)
+        :param memory: sc-память (по умолчанию пустая)
+        :param agents: Реестр скриптов агентов (по умолчанию default_agents())
+        :param latency: Задержка выполнения агента в секундах, если скрипт не задаёт свою
+        :param unknown_actions: Что делать с действием без скрипта: fail — завершить
+            неуспешно, ignore — оставить без ответа (как sc-machine без агента)
+        """
+        self.memory = memory or ScMemory()
+        self.agents = agents if agents is not None else default_agents()
+        self.latency = latency
+        self.unknown_actions = unknown_actions
+        self._server = _ThreadingServer((host, port), _WebSocketHandler)
+        self._server.fake = self
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fake-sc-agent')
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._subscriptions = {}
+        self._by_element = {}
+        self._next_subscription = 0
+        self._pending = threading.local()
+        self._requests = 0
+        self._actions = 0
+        self._initiated = self.memory.resolve_keynode(INITIATED)
+        self.memory.listeners.append(self._on_connector)
+        self._handlers = {
+            RequestType.SEARCH_KEYNODES.value: self._keynodes,
+            RequestType.GENERATE_ELEMENTS.value: self._create_elements,
+            RequestType.GENERATE_ELEMENTS_BY_SCS.value: self._create_elements_by_scs,
+            RequestType.GET_ELEMENTS_TYPES.value: self._check_elements,
+            RequestType.ERASE_ELEMENTS.value: self._delete_elements,
+            RequestType.HANDLE_CONTENT.value: self._content,
+            RequestType.SEARCH_BY_TEMPLATE.value: self._search_template,
+            RequestType.GENERATE_BY_TEMPLATE.value: self._generate_template,
+        }
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"ws://{host}:{port}/ws_json"
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> 'FakeScServer':
+        """
+        Запуск в фоновом потоке
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-sc-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    # --- соединения ---
+
+    def connected(self, connection) -> None:
+        with self._lock:
+            self._connections.add(connection)
+
+    def disconnected(self, connection) -> None:
+        with self._lock:
+            self._connections.discard(connection)
+            for subscription_id, (_, _, owner) in list(self._subscriptions.items()):
+                if owner is connection:
+                    self._drop_subscription(subscription_id)
+
+    def handle_message(self, connection, message: str) -> None:
+        request = json.loads(message)
+        request_id = request.get(common.ID)
+        self._pending.events = []
+        try:
+            if request.get(common.TYPE) == RequestType.HANDLE_EVENT_SUBSCRIPTIONS.value:
+                payload = self._events(connection, request.get(common.PAYLOAD))
+            else:
+                handler = self._handlers.get(request.get(common.TYPE))
+                if handler is None:
+                    raise TemplateError(f"Неподдерживаемый запрос: {request.get(common.TYPE)}")
+                payload = handler(request.get(common.PAYLOAD))
+            response = {common.ID: request_id, common.STATUS: True, common.EVENT: False,
+                        common.PAYLOAD: payload, common.ERRORS: []}
+        except (TemplateError, ValueError, KeyError, TypeError) as e:
+            response = {common.ID: request_id, common.STATUS: False, common.EVENT: False,
+                        common.PAYLOAD: None, common.ERRORS: str(e)}
+        with self._lock:
+            self._requests += 1
+        connection.send(response)
+        events, self._pending.events = self._pending.events, None
+        for owner, event in events:
+            owner.send(event)
+
+    # --- обработчики запросов ---
+
+    def _keynodes(self, payload: list) -> list:
+        result = []
+        for item in payload:
+            idtf = item[common.IDTF]
+            if item[common.COMMAND] == common.CommandTypes.RESOLVE:
+                result.append(self.memory.resolve_keynode(idtf, item.get(common.ELEMENT_TYPE)))
+            else:
+                result.append(self.memory.find_keynode(idtf))
+        return result
+
+    def _create_elements(self, payload: list) -> list:
+        created = []
+
+        def resolve(end: dict) -> int:
+            if end[common.TYPE] == common.Types.REF:
+                return created[end[common.VALUE]]
+            return end[common.VALUE]
+
+        with self.memory.lock:
+            for item in payload:
+                element = item[common.ELEMENT]
+                if element == common.Elements.NODE:
+                    created.append(self.memory.generate_node(item[common.TYPE]))
+                elif element == common.Elements.LINK:
+                    content_type = CONTENT_TYPES.get(item.get(common.CONTENT_TYPE), 'string')
+                    created.append(self.memory.generate_link(item[common.CONTENT], content_type, item[common.TYPE]))
+                else:
+                    created.append(self.memory.generate_connector(
+                        item[common.TYPE], resolve(item[common.SOURCE]), resolve(item[common.TARGET])))
+        return created
+
+    def _create_elements_by_scs(self, payload: list) -> list:
+        print(f"[FAKE_SC] SCs не поддерживается, пропущено {len(payload)} фрагментов")
+        return [False] * len(payload)
+
+    def _check_elements(self, payload: list) -> list:
+        return [self.memory.type_of(addr) for addr in payload]
+
+    def _delete_elements(self, payload: list) -> bool:
+        return self.memory.erase(*payload)
+
+    def _content(self, payload: list) -> list:
+        result = []
+        for item in payload:
+            command = item[common.COMMAND]
+            if command == common.CommandTypes.GET:
+                content = self.memory.get_content(item[common.ADDR])
+                value, content_type = content if content else (None, 'string')
+                result.append({common.VALUE: value, common.TYPE: content_type})
+            elif command == common.CommandTypes.SET:
+                result.append(self.memory.set_content(item[common.ADDR], item[common.DATA], item[common.TYPE]))
+            elif command == common.CommandTypes.SEARCH:
+                result.append(self.memory.find_links(item[common.DATA]))
+            elif command == common.CommandTypes.SEARCH_LINKS_BY_CONTENT_SUBSTRING:
+                result.append(self.memory.find_links_by_substring(str(item[common.DATA])))
+            elif command == common.CommandTypes.SEARCH_LINKS_CONTENTS_BY_CONTENT_SUBSTRING:
+                result.append(self.memory.find_strings_by_substring(str(item[common.DATA])))
+            else:
+                raise TemplateError(f"Неподдерживаемая команда content: {command}")
+        return result
+
+    def _search_template(self, payload: dict) -> dict:
+        aliases, results = self.memory.search(payload[common.TEMPLATE], payload.get(common.PARAMS))
+        return {common.ALIASES: aliases, common.ADDRS: results}
+
+    def _generate_template(self, payload: dict) -> dict:
+        aliases, addrs = self.memory.generate(payload[common.TEMPLATE], payload.get(common.PARAMS))
+        return {common.ALIASES: aliases, common.ADDRS: addrs}
+
+    # --- события ---
+
+    def _events(self, connection, payload: dict):
+        if common.CommandTypes.GENERATE in payload:
+            ids = []
+            with self._lock:
+                for item in payload[common.CommandTypes.GENERATE]:
+                    self._next_subscription += 1
+                    subscription_id = self._next_subscription
+                    self._subscriptions[subscription_id] = (item[common.ADDR], item[common.TYPE], connection)
+                    self._by_element.setdefault(item[common.ADDR], set()).add(subscription_id)
+                    ids.append(subscription_id)
+            return ids
+        with self._lock:
+            for subscription_id in payload.get(common.CommandTypes.ERASE, ()):
+                self._drop_subscription(subscription_id)
+        return True
+
+    def _drop_subscription(self, subscription_id: int) -> None:
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription:
+            self._by_element.get(subscription[0], set()).discard(subscription_id)
+
+    def _matching(self, element: int, event_types: tuple) -> list:
+        with self._lock:
+            return [
+                (subscription_id, self._subscriptions[subscription_id][2])
+                for subscription_id in self._by_element.get(element, ())
+                if self._subscriptions[subscription_id][1] in event_types
+            ]
+
+    def _on_connector(self, connector: int, source: int, target: int, connector_type: int) -> None:
+        is_edge = connector_type & bitmasks.SC_TYPE_COMMON_EDGE == bitmasks.SC_TYPE_COMMON_EDGE
+        if is_edge:
+            outgoing = incoming = (ScEventType.AFTER_GENERATE_CONNECTOR.value, ScEventType.AFTER_GENERATE_EDGE.value)
+        else:
+            outgoing = (ScEventType.AFTER_GENERATE_CONNECTOR.value, ScEventType.AFTER_GENERATE_OUTGOING_ARC.value)
+            incoming = (ScEventType.AFTER_GENERATE_CONNECTOR.value, ScEventType.AFTER_GENERATE_INCOMING_ARC.value)
+        deliveries = []
+        for element, other, event_types in ((source, target, outgoing), (target, source, incoming)):
+            for subscription_id, owner in self._matching(element, event_types):
+                deliveries.append((owner, {
+                    common.ID: subscription_id,
+                    common.STATUS: True,
+                    common.EVENT: True,
+                    common.PAYLOAD: [element, connector, other],
+                }))
+        pending = getattr(self._pending, 'events', None)
+        for delivery in deliveries:
+            if pending is not None:
+                pending.append(delivery)
+            else:
+                delivery[0].send(delivery[1])
+
+        if source == self._initiated and not is_edge:
+            self._executor.submit(self._run_agent, target)
+
+    # --- агенты ---
+
+    def _action_classes(self, action: int) -> list:
+        classes = []
+        for arc in self.memory.incoming(action):
+            source, _ = self.memory.ends(arc)
+            if source != self._initiated:
+                classes.append(source)
+        return classes
+
+    def _run_agent(self, action: int) -> None:
+        with self._lock:
+            self._actions += 1
+        with self.memory.lock:
+            idtfs = {self.memory.find_keynode(name): name for name in self.agents.names()}
+            names = [idtfs[addr] for addr in self._action_classes(action) if addr in idtfs]
+        context = AgentContext(self.memory, action)
+        if not names:
+            if self.unknown_actions == 'fail':
+                context.finish(False)
+            return
+        handler, latency = self.agents.get(names[0])
+        delay = self.latency if latency is None else latency
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            succeeded = handler(context)
+        except Exception as e:
+            print(f"[FAKE_SC] Ошибка скрипта {names[0]}: {e}")
+            context.finish(None)
+            return
+        context.finish(succeeded is not False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'connections': len(self._connections),
+                'subscriptions': len(self._subscriptions),
+                'requests': self._requests,
+                'actions': self._actions,
+                'memory': self.memory.snapshot(),
+            }
@@ -0,0 +1,236 @@
+"""
+Реестр ключевых узлов (keynodes) приложения.
+
+Все идентификаторы, которые использует приложение, разрешаются одним
+пакетным запросом ``resolve_keynodes`` при подключении к sc-серверу и
+хранятся в неизменяемой таблице. После переподключения таблица
+перестраивается целиком. Неизвестные идентификаторы разрешаются по
+одному и добавляются в таблицу.
+"""
+
+import threading
+from types import MappingProxyType
+
+from flask import Flask, g, has_app_context
+from sc_client.constants import sc_types
+from sc_client.constants.exceptions import InvalidValueError
+from sc_client.models import ScAddr, ScIdtfResolveParams
+
+from service.utils.metrics import keynode_table_hits_total
+from service.utils.sc_pool import client
+
+
+# Тип None — узел только ищется и не создаётся, если его нет в базе
+APP_KEYNODES = {
+    # Ролевые отношения аргументов действий
+    'rrel_1': sc_types.NODE_CONST_ROLE,
+    'rrel_2': sc_types.NODE_CONST_ROLE,
+    'rrel_3': sc_types.NODE_CONST_ROLE,
+    'rrel_4': sc_types.NODE_CONST_ROLE,
+    'rrel_5': sc_types.NODE_CONST_ROLE,
+    'rrel_6': sc_types.NODE_CONST_ROLE,
+    'rrel_7': sc_types.NODE_CONST_ROLE,
+    'rrel_8': sc_types.NODE_CONST_ROLE,
+    'rrel_9': sc_types.NODE_CONST_ROLE,
+    'rrel_event_day': sc_types.NODE_CONST_ROLE,
+    'rrel_event_month': sc_types.NODE_CONST_ROLE,
+    'rrel_event_year': sc_types.NODE_CONST_ROLE,
+
+    # Состояния и результат действий
+    'action_initiated': sc_types.NODE_CONST_CLASS,
+    'action_finished_successfully': sc_types.NODE_CONST_CLASS,
+    'action_finished_unsuccessfully': sc_types.NODE_CONST_CLASS,
+    'action_finished_with_error': sc_types.NODE_CONST_CLASS,
+    'nrel_result': sc_types.NODE_CONST_CLASS,
+
+    # Классы действий агентов
+    'action_user_registration': sc_types.NODE_CONST_CLASS,
+    'action_authentication': sc_types.NODE_CONST_CLASS,
+    'action_verification': sc_types.NODE_CONST_CLASS,
+    'action_user_request': sc_types.NODE_CONST_CLASS,
+    'action_search': sc_types.NODE_CONST_CLASS,
+    'action_add_event': sc_types.NODE_CONST_CLASS,
+    'action_del_event': sc_types.NODE_CONST_CLASS,
+    'action_user_events': sc_types.NODE_CONST_CLASS,
+    'action_choice_next_question': sc_types.NODE_CONST_CLASS,
+    'action_search_answers_for_question': sc_types.NODE_CONST_CLASS,
+    'action_save_answer': sc_types.NODE_CONST_CLASS,
+    'action_check_answer': sc_types.NODE_CONST_CLASS,
+    'action_delete_old_nodes': sc_types.NODE_CONST_CLASS,
+    'action_update_rating': sc_types.NODE_CONST_CLASS,
+    'action_add_topic': sc_types.NODE_CONST_CLASS,
+    'action_add_message': sc_types.NODE_CONST_CLASS,
+    'action_rate_message': sc_types.NODE_CONST_CLASS,
+    'action_delete_message': sc_types.NODE_CONST_CLASS,
+    'action_edit_message': sc_types.NODE_CONST_CLASS,
+
+    # Понятия
+    'concept_client': sc_types.NODE_CONST_CLASS,
+    'concept_specialist': sc_types.NODE_CONST_CLASS,
+    'concept_user': sc_types.NODE_CONST_CLASS,
+    'concept_verified_user': sc_types.NODE_CONST_CLASS,
+    'registered_jurisprudence_user': sc_types.NODE_CONST_CLASS,
+    'concept_topic': sc_types.NODE_CONST_CLASS,
+    'concept_message': sc_types.NODE_CONST_CLASS,
+    'concept_correct_answer': sc_types.NODE_CONST_CLASS,
+    'concept_bookmark': sc_types.NODE_CONST_CLASS,
+    'concept_user_note': sc_types.NODE_CONST_CLASS,
+    'concept_user_query': sc_types.NODE_CONST_CLASS,
+    'concept_interned_link': sc_types.NODE_CONST_CLASS,
+    'concept_man': None,
+    'concept_woman': None,
+    'CONCEPT_FULL_SEARCH': None,
+    'FULL_SEARCH': None,
+    'belarus_legal_article': None,
+    'lang_ru': None,
+
+    # Неролевые отношения
+    'nrel_system_identifier': sc_types.NODE_CONST_NOROLE,
+    'nrel_author': sc_types.NODE_CONST_NOROLE,
+    'nrel_content': sc_types.NODE_CONST_NOROLE,
+    'nrel_topic_title': sc_types.NODE_CONST_NOROLE,
+    'nrel_topic_description': sc_types.NODE_CONST_NOROLE,
+    'nrel_message_content': sc_types.NODE_CONST_NOROLE,
+    'nrel_message_attachment': sc_types.NODE_CONST_NOROLE,
+    'nrel_attachment_data': sc_types.NODE_CONST_NOROLE,
+    'nrel_attachment_mime': sc_types.NODE_CONST_NOROLE,
+    'nrel_likes': sc_types.NODE_CONST_NOROLE,
+    'nrel_dislikes': sc_types.NODE_CONST_NOROLE,
+    'nrel_asked_questions': sc_types.NODE_CONST_NOROLE,
+    'nrel_answer': sc_types.NODE_CONST_NOROLE,
+    'nrel_selected_answers': sc_types.NODE_CONST_NOROLE,
+    'nrel_full_name': sc_types.NODE_CONST_NOROLE,
+    'nrel_user_name': sc_types.NODE_CONST_NOROLE,
+    'nrel_default_jurisdiction': sc_types.NODE_CONST_NOROLE,
+    'nrel_field': sc_types.NODE_CONST_NOROLE,
+    'nrel_experience': sc_types.NODE_CONST_NOROLE,
+    'nrel_gender': sc_types.NODE_CONST_NOROLE,
+    'nrel_age': sc_types.NODE_CONST_NOROLE,
+    'nrel_ui_theme': sc_types.NODE_CONST_NOROLE,
+    'nrel_font_size': sc_types.NODE_CONST_NOROLE,
+    'nrel_save_history': sc_types.NODE_CONST_NOROLE,
+    'nrel_high_contrast': sc_types.NODE_CONST_NOROLE,
+    'nrel_query_history': sc_types.NODE_CONST_NOROLE,
+    'nrel_query_type': sc_types.NODE_CONST_NOROLE,
+    'nrel_query_text': sc_types.NODE_CONST_NOROLE,
+    'nrel_query_timestamp': sc_types.NODE_CONST_NOROLE,
+    'nrel_user_bookmarks': sc_types.NODE_CONST_NOROLE,
+    'nrel_bookmark_article': sc_types.NODE_CONST_NOROLE,
+    'nrel_bookmark_title': sc_types.NODE_CONST_NOROLE,
+    'nrel_bookmark_tags': sc_types.NODE_CONST_NOROLE,
+    'nrel_bookmark_date': sc_types.NODE_CONST_NOROLE,
+    'nrel_user_notes': sc_types.NODE_CONST_NOROLE,
+    'nrel_note_article': sc_types.NODE_CONST_NOROLE,
+    'nrel_note_article_title': sc_types.NODE_CONST_NOROLE,
+    'nrel_note_text': sc_types.NODE_CONST_NOROLE,
+    'nrel_note_created': sc_types.NODE_CONST_NOROLE,
+    'nrel_note_updated': sc_types.NODE_CONST_NOROLE,
+    'nrel_main_idtf': None,
+    'nrel_main_identifier': None,
+    'nrel_system_idtf': None,
+    'nrel_sc_text_translation': None,
+    'nrel_user_event': None,
+    'nrel_event_name': None,
+    'nrel_event_description': None,
+    'nrel_event_date': None,
+    'nrel_user_login': None,
+    'nrel_user_password': None,
+    'nrel_user_surname': None,
+    'nrel_user_patronymic': None,
+    'nrel_user_address': None,
+    'nrel_user_gender': None,
+    'nrel_user_birthdate': None,
+    'rrel_example': None,
+    'rrel_key_sc_element': None,
+}
+
+HITS_HEADER = 'X-Keynode-Table-Hits'
+
+
+class KeynodeRegistry:
+    """
+    Неизменяемая таблица ключевых узлов, общая для всего процесса
+    """
+
+    def __init__(self, declared: dict):
+        self._declared = dict(declared)
+        self._table = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._hits_total = 0
+
+    @property
+    def hits_total(self) -> int:
+        """
+        Сколько обращений обслужено из таблицы с момента запуска.
+        Это верхняя оценка сэкономленных запросов: часть обращений
+        без реестра тоже не дошла бы до сервера
+        """
+        return self._hits_total
+
+    def refresh(self) -> None:
+        """
+        Разрешение всех объявленных идентификаторов одним запросом.
+        Вызывается после подключения и каждого переподключения к sc-серверу
+        """
+        if not client.is_connected():
+            return
+        with self._lock:
+            idtfs = list(self._declared)
+            params = [ScIdtfResolveParams(idtf=idtf, type=self._declared[idtf]) for idtf in idtfs]
+            addrs = client.resolve_keynodes(*params)
+            table = {idtf: addr for idtf, addr in zip(idtfs, addrs) if addr.is_valid()}
+            self._table = MappingProxyType(table)
+        print(f"[KEYNODES] Разрешено {len(table)} из {len(idtfs)} ключевых узлов")
+
+    def resolve(self, idtf: str, sc_type=None) -> ScAddr:
+        """
+        Получение адреса ключевого узла
+        :param idtf: Системный идентификатор
+        :param sc_type: Тип для создания узла, если идентификатор не объявлен в APP_KEYNODES
+        :return: Адрес узла
+        """
+        addr = self._table.get(idtf)
+        if addr is None and not self._table and idtf in self._declared:
+            self.refresh()
+            addr = self._table.get(idtf)
+        if addr is not None:
+            self._count_hit()
+            return addr
+
+        sc_type = self._declared.get(idtf, sc_type)
+        addr = client.resolve_keynodes(ScIdtfResolveParams(idtf=idtf, type=sc_type))[0]
+        if not addr.is_valid():
+            raise InvalidValueError(f"Ключевой узел {idtf} не найден")
+        with self._lock:
+            table = dict(self._table)
+            table[idtf] = addr
+            self._declared.setdefault(idtf, sc_type)
+            self._table = MappingProxyType(table)
+        return addr
+
+    def __getitem__(self, idtf: str) -> ScAddr:
+        return self.resolve(idtf)
+
+    def _count_hit(self) -> None:
+        with self._lock:
+            self._hits_total += 1
+        keynode_table_hits_total.inc()
+        if has_app_context():
+            g.keynode_table_hits = g.get('keynode_table_hits', 0) + 1
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Подключение реестра к приложению: разрешение при (пере)подключении
+        и счётчик обращений к таблице в заголовке ответа
+        """
+        client.set_reconnect_handler(post_reconnect_handler=self.refresh)
+        self.refresh()
+
+        @app.after_request
+        def report_table_hits(response):
+            hits = g.get('keynode_table_hits', 0)
+            response.headers[HITS_HEADER] = str(hits)
+            return response
+
+
+keynodes = KeynodeRegistry(APP_KEYNODES)
@@ -0,0 +1,165 @@
+"""
+Повторное использование sc-link для часто повторяющихся литералов.
+
+Строковый аргумент действия по умолчанию превращается в новую sc-link,
+даже если то же содержимое отправляется тысячи раз (email при каждом
+входе, тип оценки like/dislike, MIME-тип вложения). Для аргументов, обёрнутых в InternedLink, используется уже
+существующая sc-link с тем же содержимым: она ищется через
+search_links_by_contents и запоминается в локальном LRU-кэше.
+Переиспользуются только sc-link, созданные этим модулем (класс
+concept_interned_link): чужая sc-link с тем же текстом, например
+счётчик лайков, может измениться. Принадлежность классу проверяется для
+всех найденных sc-link сразу: класс общих sc-link невелик, поэтому он
+читается одним поиском и пересекается с кандидатами.
+
+Общая sc-link подходит только для литералов, которые агент лишь читает.
+Идентификатор нового узла (ActionNode.system_idtf) всегда создаётся
+заново: одна sc-link не может быть идентификатором многих узлов.
+
+Такие sc-link общие для многих действий, поэтому их нельзя изменять и
+удалять: reaper пропускает их (см. is_interned). Одновременные промахи
+с одинаковым содержимым ждут одного поиска/создания sc-link.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr, ScConstruction, ScLinkContent, ScLinkContentType, ScTemplate
+
+from config import Config
+from service.utils.keynode_registry import keynodes
+from service.utils.sc_pool import client
+
+# Класс общих sc-link: их содержимое никогда не меняется
+INTERNED_CLASS = 'concept_interned_link'
+
+
+class LinkInterner:
+    """
+    LRU-кэш содержимое → адрес неизменяемой sc-link
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._links = OrderedDict()
+        # Адреса sc-link из кэша (для is_interned) и выполняющиеся промахи: содержимое → Future
+        self._interned = set()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._found = 0
+        self._created = 0
+
+    def intern(self, content) -> ScAddr:
+        """
+        Адрес sc-link с заданным содержимым; создаётся, только если такой ещё нет
+        :param content: Содержимое sc-link
+        :return: Адрес sc-link
+        """
+        with self._lock:
+            addr = self._links.get(content)
+            if addr is not None:
+                self._links.move_to_end(content)
+                self._hits += 1
+                return addr
+            future = self._pending.get(content)
+            leader = future is None
+            if leader:
+                future = self._pending[content] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            addr, found = self._find_or_create(content)
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(content, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if found:
+                self._found += 1
+            else:
+                self._created += 1
+            self._links[content] = addr
+            self._interned.add(addr.value)
+            while len(self._links) > self.capacity:
+                _, evicted = self._links.popitem(last=False)
+                self._interned.discard(evicted.value)
+            self._pending.pop(content, None)
+        future.set_result(addr)
+        return addr
+
+    def _find_or_create(self, content) -> tuple:
+        """
+        :return: Адрес общей sc-link и признак того, что она уже существовала
+        """
+        link_content = ScLinkContent(content, ScLinkContentType.STRING)
+        addr = self._find(link_content)
+        if addr is not None:
+            return addr, True
+        construction = ScConstruction()
+        construction.generate_link(sc_types.LINK_CONST, link_content, '_link')
+        construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes[INTERNED_CLASS], '_link')
+        return client.generate_elements(construction)[0], False
+
+    def _find(self, link_content: ScLinkContent):
+        """
+        Поиск общей sc-link: среди sc-link с тем же содержимым берётся только
+        принадлежащая классу INTERNED_CLASS, остальные могут изменяться
+        """
+        candidates = client.search_links_by_contents(link_content)[0]
+        if not candidates:
+            return None
+        interned = self._interned_in_memory()
+        for candidate in candidates:
+            if candidate.value in interned:
+                return candidate
+        return None
+
+    @staticmethod
+    def _interned_in_memory() -> set:
+        """
+        :return: Адреса (value) всех sc-link класса INTERNED_CLASS в sc-памяти
+        """
+        template = ScTemplate()
+        template.triple(keynodes[INTERNED_CLASS], sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.LINK_VAR >> '_link')
+        return {item.get('_link').value for item in client.template_search(template)}
+
+    def is_interned(self, addr: ScAddr) -> bool:
+        """
+        Признак общей sc-link из кэша, которую нельзя удалять вместе с действием
+        (вытесненные из кэша проверяет exclude_interned)
+        """
+        with self._lock:
+            return addr.value in self._interned
+
+    def exclude_interned(self, links) -> list:
+        """
+        sc-link, которые можно удалять: принадлежность классу общих sc-link проверяется в sc-памяти
+        :param links: Адреса sc-link
+        :return: Адреса sc-link, не являющихся общими
+        """
+        links = [link for link in links if not self.is_interned(link)]
+        if not links:
+            return []
+        interned = self._interned_in_memory()
+        return [link for link in links if link.value not in interned]
+
+    def snapshot(self) -> dict:
+        """
+        :return: Размер кэша и счётчики попаданий
+        """
+        with self._lock:
+            return {
+                'cached': len(self._links),
+                'hits': self._hits,
+                'found': self._found,
+                'created': self._created,
+            }
+
+
+interned_links = LinkInterner(Config.INTERNED_LINKS_CAPACITY)
@@ -0,0 +1,380 @@
+"""
+Нагрузочный прогон приложения на поддельном sc-сервере.
+
+Поднимается FakeScServer с синтетическими данными (см. fake_sc/seed.py),
+sc-client и пул соединений приложения направляются на него, и
+create_app() собирает обычное приложение. Каждый endpoint прогоняется
+отдельной фазой: concurrency потоков с собственным test-клиентом и
+сессией вошедшего пользователя выполняют заданное число запросов.
+Для фазы считаются пропускная способность, p50/p95/p99 длительности,
+коды ответов и число запросов к sc-серверу на один HTTP-запрос (по
+счётчику sc_client_calls_total, поэтому он точен, пока фазы идут
+последовательно).
+
+С --backend mock вместо sc-сервера используются агенты в памяти
+(service.agents.mock): это нижняя граница задержки, которую дают сами
+Flask, шаблоны и SQLite.
+
+Результаты пишутся в JSON; с --baseline выводится сравнение с прошлым
+прогоном:
+
+    python -m service.utils.load_test --size small --requests 50 --concurrency 4
+    python -m service.utils.load_test --size small --output new.json --baseline load_test_results.json
+
+SQLite-базы приложения (история просмотров, теги, отзывы) на время
+прогона переносятся во временный каталог, чтобы не засорять рабочие.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from service.utils.fake_sc import FakeScServer
+from service.utils.fake_sc.seed import SIZES, seed_forum
+from service.utils.metrics import sc_client_calls_total
+from service.utils.scheduler import scheduler
+
+PERCENTILES = (50, 95, 99)
+
+
+def _topic(rng: random.Random, data: dict) -> str:
+    return f"/forum/topic/{rng.choice(data['topics'])}"
+
+
+def _term(rng: random.Random, data: dict) -> str:
+    return rng.choice(data['terms'])
+
+
+# Имя фазы → построение URL запроса по данным прогона
+ENDPOINTS = {
+    'forum': lambda rng, data: '/forum?tab=all',
+    'forum_topic': _topic,
+    'requests': lambda rng, data: f'/requests?q={_term(rng, data)}',
+    'articles_search': lambda rng, data: f'/api/articles/search?q={_term(rng, data)}',
+    'news': lambda rng, data: '/news',
+    'forum_search': lambda rng, data: f'/api/forum/search?q={_term(rng, data)}',
+    'profile': lambda rng, data: '/api/profile',
+    'settings': lambda rng, data: '/api/settings',
+    'history': lambda rng, data: '/api/history?period=all',
+    'bookmarks': lambda rng, data: '/api/bookmarks',
+    'notes': lambda rng, data: '/api/notes',
+}
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Процентиль по методу ближайшего ранга
+    :param values: Отсортированные значения
+    :param q: Процентиль от 0 до 100
+    :return: Значение или 0.0 для пустого списка
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(min(rank, len(values))) - 1]
+
+
+def summarize(latencies: list, statuses: Counter, seconds: float, sc_calls: dict) -> dict:
+    """
+    Сводка по фазе
+    :param latencies: Длительности запросов в секундах
+    :param statuses: Коды ответов (или имена исключений)
+    :param seconds: Длительность фазы
+    :param sc_calls: Запросы к sc-серверу за фазу по методу клиента
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    summary = {
+        'requests': count,
+        'errors': sum(number for status, number in statuses.items() if not str(status).isdigit() or int(status) >= 500),
+        'statuses': {str(status): number for status, number in sorted(statuses.items(), key=str)},
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(count / seconds, 3) if seconds > 0 else 0.0,
+        'mean': round(sum(ordered) / count, 6) if count else 0.0,
+        'max': round(ordered[-1], 6) if count else 0.0,
+        'sc_calls_per_request': round(sum(sc_calls.values()) / count, 2) if count else 0.0,
+        'sc_calls_by_method': {method: round(calls / count, 2) for method, calls in sorted(sc_calls.items())} if count else {},
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}'] = round(percentile(ordered, q), 6)
+    return summary
+
+
+def _sc_calls() -> dict:
+    return {labels[0]: value for labels, value in sc_client_calls_total.values().items()}
+
+
+def _login(test_client, username: str) -> None:
+    with test_client.session_transaction() as session:
+        session['_user_id'] = username
+        session['_fresh'] = True
+
+
+def run_endpoint(app, name: str, data: dict, requests: int, concurrency: int, seed: int = 0, warmup: int = 1) -> dict:
+    """
+    Фаза нагрузки на один endpoint
+    :param app: Приложение Flask
+    :param name: Имя endpoint из ENDPOINTS
+    :param data: Данные прогона (результат seed_forum)
+    :param requests: Число измеряемых запросов
+    :param concurrency: Число параллельных клиентов
+    :param seed: Начальное значение для выбора топиков и терминов
+    :param warmup: Число неизмеряемых запросов перед фазой
+    :return: Сводка (см. summarize)
+    """
+    build_url = ENDPOINTS[name]
+    warmup_client = app.test_client()
+    _login(warmup_client, data['users'][0])
+    warmup_rng = random.Random(seed)
+    for _ in range(warmup):
+        warmup_client.get(build_url(warmup_rng, data))
+
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def worker(index: int) -> None:
+        rng = random.Random(f'{seed}-{name}-{index}')
+        test_client = app.test_client()
+        _login(test_client, data['users'][index % len(data['users'])])
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            url = build_url(rng, data)
+            started = time.perf_counter()
+            try:
+                status = test_client.get(url).status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    calls_before = _sc_calls()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(index,), name=f'load-{name}-{index}') for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    # Отложенные записи фазы выполняются после ответа, но их запросы к sc-серверу относятся к ней
+    scheduler.drain(timeout=60)
+    calls_after = _sc_calls()
+    sc_calls = {
+        method: calls - calls_before.get(method, 0)
+        for method, calls in calls_after.items()
+        if calls - calls_before.get(method, 0)
+    }
+    return summarize(latencies, statuses, seconds, sc_calls)
+
+
+@contextlib.contextmanager
+def _sqlite_redirected(sqlite_dir: str = None):
+    """
+    SQLite-базы приложения во временном (или заданном) каталоге на время прогона
+    """
+    from service.utils import recommendation_feedback_db, topic_tags_db, view_history_db
+
+    databases = (recommendation_feedback_db, topic_tags_db, view_history_db)
+    saved_paths = [module.DB_PATH for module in databases]
+    with contextlib.ExitStack() as stack:
+        if sqlite_dir is None:
+            sqlite_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='load_test_'))
+        for module in databases:
+            module.DB_PATH = Path(sqlite_dir) / Path(module.DB_PATH).name
+        try:
+            yield
+        finally:
+            for module, path in zip(databases, saved_paths):
+                module.DB_PATH = path
+
+
+@contextlib.contextmanager
+def fake_backend(size: dict, latency: float = 0.0, seed: int = 0, sqlite_dir: str = None):
+    """
+    Поддельный sc-сервер с данными и приложение, подключённое к нему
+    :param size: Размер данных: topics, messages, users
+    :param latency: Задержка выполнения агентов в секундах
+    :param seed: Начальное значение генератора данных
+    :param sqlite_dir: Каталог для SQLite-баз приложения (по умолчанию временный)
+    :return: (приложение, данные прогона)
+    """
+    import sc_client.client as sc_client
+
+    from config import Config
+    from service.utils.sc_pool import pool
+
+    server = FakeScServer(latency=latency)
+    data = seed_forum(server.memory, seed=seed, agents=server.agents, **size)
+    saved_url = (Config.OSTIS_URL, pool.url)
+    with _sqlite_redirected(sqlite_dir):
+        server.start()
+        try:
+            Config.OSTIS_URL = pool.url = server.url
+            sc_client.connect(server.url)
+            from service import create_app
+            yield create_app(), data
+        finally:
+            pool.stop()
+            if sc_client.is_connected():
+                sc_client.disconnect()
+            Config.OSTIS_URL, pool.url = saved_url
+            server.stop()
+
+
+@contextlib.contextmanager
+def mock_backend(size: dict, latency: float = 0.0, seed: int = 0, sqlite_dir: str = None):
+    """
+    Приложение на агентах в памяти (service.agents.mock) без sc-сервера:
+    задержка складывается только из Flask, шаблонов и SQLite
+    :param size: Размер данных: topics, messages, users
+    :param latency: Не используется, параметр для совместимости с fake_backend
+    :param seed: Начальное значение генератора данных
+    :param sqlite_dir: Каталог для SQLite-баз приложения (по умолчанию временный)
+    :return: (приложение, данные прогона)
+    """
+    from config import Config, agents_to_load
+    from service.agents.mock import store
+
+    store.reset()
+    data = store.populate(seed=seed, **size)
+    saved_agents = Config.AGENTS_TO_LOAD
+    with _sqlite_redirected(sqlite_dir):
+        Config.AGENTS_TO_LOAD = agents_to_load('service.agents.mock', Config.AGENT_CACHES)
+        try:
+            from service import create_app
+            yield create_app(), data
+        finally:
+            Config.AGENTS_TO_LOAD = saved_agents
+            store.reset()
+
+
+BACKENDS = {
+    'fake_sc': fake_backend,
+    'mock': mock_backend,
+}
+
+
+def run(size: dict, endpoints: list, requests: int, concurrency: int, latency: float = 0.0,
+        seed: int = 0, warmup: int = 1, progress=None, backend: str = 'fake_sc') -> dict:
+    """
+    Полный прогон: данные, приложение и фазы по endpoint
+    :return: Результаты в виде, который пишется в JSON
+    """
+    started = time.time()
+    results = {
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'config': {
+            **size,
+            'endpoints': list(endpoints),
+            'requests': requests,
+            'concurrency': concurrency,
+            'agent_latency': latency,
+            'seed': seed,
+            'backend': backend,
+        },
+        'endpoints': {},
+    }
+    with BACKENDS[backend](size, latency, seed) as (app, data):
+        for name in endpoints:
+            results['endpoints'][name] = run_endpoint(app, name, data, requests, concurrency, seed, warmup)
+            if progress:
+                progress(name, results['endpoints'][name])
+    results['seconds'] = round(time.time() - started, 3)
+    return results
+
+
+def format_row(name: str, stats: dict) -> str:
+    return (
+        f"{name:<16} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>9.2f} "
+        f"{stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} {stats['p99'] * 1000:>9.1f} "
+        f"{stats['sc_calls_per_request']:>10.1f}"
+    )
+
+
+HEADER = f"{'endpoint':<16} {'reqs':>6} {'errs':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'sc/req':>10}"
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """
+    Сравнение двух прогонов по общим endpoint
+    :return: Строки отчёта: p95 и запросы к sc-серверу было → стало
+    """
+    lines = [f"{'endpoint':<16} {'p95 ms':>21} {'sc/req':>21}"]
+    for name, stats in results['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        lines.append(
+            f"{name:<16} {before['p95'] * 1000:>9.1f} → {stats['p95'] * 1000:>9.1f} "
+            f"{before['sc_calls_per_request']:>9.1f} → {stats['sc_calls_per_request']:>9.1f}"
+        )
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон приложения на поддельном sc-сервере")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='fake_sc',
+                        help="fake_sc — поддельный sc-сервер, mock — агенты в памяти без sc-сервера")
+    parser.add_argument('--size', choices=sorted(SIZES), default='tiny', help="Набор размеров данных")
+    parser.add_argument('--topics', type=int, help="Число топиков (вместо значения из --size)")
+    parser.add_argument('--messages', type=int, help="Число сообщений")
+    parser.add_argument('--users', type=int, help="Число пользователей")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help="Endpoint через запятую")
+    parser.add_argument('--requests', type=int, default=50, help="Запросов на endpoint")
+    parser.add_argument('--concurrency', type=int, default=4, help="Параллельных клиентов")
+    parser.add_argument('--warmup', type=int, default=1, help="Неизмеряемых запросов перед фазой")
+    parser.add_argument('--agent-latency', type=float, default=0.0, help="Задержка агентов, с")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='load_test_results.json', help="Файл для результатов (JSON)")
+    parser.add_argument('--baseline', help="Результаты прошлого прогона для сравнения")
+    parser.add_argument('--verbose', action='store_true', help="Не скрывать вывод приложения")
+    args = parser.parse_args(argv)
+
+    size = dict(SIZES[args.size])
+    for key in size:
+        if getattr(args, key) is not None:
+            size[key] = getattr(args, key)
+    endpoints = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Неизвестные endpoint: {', '.join(unknown)}")
+
+    report = sys.stderr
+    print(f"[LOAD_TEST] Данные: {size}, {args.requests} запросов × {args.concurrency} клиентов", file=report)
+    print(HEADER, file=report)
+
+    def progress(name, stats):
+        print(format_row(name, stats), file=report, flush=True)
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        results = run(size, endpoints, args.requests, args.concurrency, args.agent_latency,
+                      args.seed, args.warmup, progress, args.backend)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f"[LOAD_TEST] Результаты записаны в {args.output}", file=report)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print('\n'.join(compare(results, baseline)), file=report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Реестр хранится в памяти процесса и безопасен при обращении из
+нескольких потоков: каждое изменение метрики выполняется под её
+блокировкой. Собираются:
+- длительность вызовов агентов по action_name, таймауты и ошибки;
+- количество и длительность запросов к sc-серверу по методу клиента
+  (search_by_template, get_link_content, generate_elements, ...);
+- попадания и промахи кэша агентов только для чтения;
+- глубина очередей планировщика, ожидание задач и их итоги;
+- источник пользователя при загрузке сессии (кэш, снимок, sc-память);
+- длительность обработки HTTP-запросов по endpoint.
+
+Значения отдаются маршрутом /metrics.
+"""
+
+import threading
+import time
+
+from flask import Flask, g, request
+
+from service.exceptions import AgentError
+from service.utils.circuit_breaker import TIMEOUT_CODE
+
+# Границы корзин гистограмм в секундах: от быстрых запросов к sc-серверу до таймаутов агентов
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Общая часть метрик: имя, описание, метки и значения по наборам меток
+    """
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}")
+        return tuple(str(value) for value in labelvalues)
+
+    def render(self) -> list:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Монотонно растущий счётчик
+    """
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        """
+        Увеличение счётчика
+        :param labelvalues: Значения меток в порядке labelnames
+        :param amount: Величина увеличения
+        """
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        key = self._key(labelvalues)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def values(self) -> dict:
+        """
+        :return: Копия значений: кортеж меток → значение
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def _render_samples(self, items) -> list:
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Текущее значение, которое может как расти, так и уменьшаться
+    """
+    kind = 'gauge'
+
+    def set(self, value: float, *labelvalues) -> None:
+        """
+        Установка значения
+        :param value: Новое значение
+        :param labelvalues: Значения меток в порядке labelnames
+        """
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labelvalues) -> float:
+        key = self._key(labelvalues)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def _render_samples(self, items) -> list:
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Гистограмма длительностей с фиксированными корзинами
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets)) + (float('inf'),)
+
+    def observe(self, amount: float, *labelvalues) -> None:
+        """
+        Учёт одного наблюдения
+        :param amount: Наблюдаемое значение (секунды)
+        :param labelvalues: Значения меток в порядке labelnames
+        """
+        key = self._key(labelvalues)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += amount
+            state[2] += 1
+
+    def count(self, *labelvalues) -> int:
+        key = self._key(labelvalues)
+        with self._lock:
+            state = self._values.get(key)
+            return state[2] if state else 0
+
+    def _render_samples(self, items) -> list:
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Набор метрик процесса
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        :return: Все метрики в текстовом формате Prometheus
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+agent_call_seconds = registry.histogram(
+    'sc_agent_call_seconds', 'Длительность успешных вызовов агентов', ('action',))
+agent_timeouts_total = registry.counter(
+    'sc_agent_timeouts_total', 'Вызовы агентов, завершившиеся по таймауту', ('action',))
+agent_errors_total = registry.counter(
+    'sc_agent_errors_total', 'Вызовы агентов, завершившиеся ошибкой (кроме таймаута)', ('action', 'error'))
+sc_client_calls_total = registry.counter(
+    'sc_client_calls_total', 'Запросы к sc-серверу по методу клиента', ('method',))
+sc_client_call_seconds = registry.histogram(
+    'sc_client_call_seconds', 'Длительность запросов к sc-серверу по методу клиента', ('method',))
+agent_cache_requests_total = registry.counter(
+    'agent_cache_requests_total', 'Обращения к кэшу агентов по результату (hit, miss)', ('agent', 'result'))
+scheduler_queue_depth = registry.gauge(
+    'scheduler_queue_depth', 'Задачи, ожидающие выполнения, по очереди планировщика', ('queue',))
+scheduler_wait_seconds = registry.histogram(
+    'scheduler_wait_seconds', 'Время ожидания задачи в очереди планировщика', ('queue',))
+scheduler_tasks_total = registry.counter(
+    'scheduler_tasks_total', 'Задачи планировщика по итогу (ok, error, dropped)', ('queue', 'result'))
+keynode_table_hits_total = registry.counter(
+    'keynode_table_hits_total', 'Обращения к ключевым узлам, обслуженные из таблицы реестра без запроса к sc-серверу')
+action_reaper_dropped_total = registry.counter(
+    'action_reaper_dropped_total', 'Завершённые действия, вытесненные из переполненной очереди очистки')
+request_memo_reads_total = registry.counter(
+    'request_memo_reads_total', 'Чтения sc-памяти в пределах HTTP-запроса по результату (hit, miss)', ('result',))
+user_loader_requests_total = registry.counter(
+    'user_loader_requests_total', 'Загрузки пользователя Flask-Login по источнику (cache, session, sc, not_found)',
+    ('result',))
+http_request_seconds = registry.histogram(
+    'http_request_seconds', 'Длительность обработки HTTP-запросов', ('endpoint', 'method'))
+http_requests_total = registry.counter(
+    'http_requests_total', 'HTTP-запросы по endpoint и коду ответа', ('endpoint', 'method', 'status'))
+
+
+def record_agent_error(action_name: str, error: Exception) -> None:
+    """
+    Учёт неудачного вызова агента: таймауты и остальные ошибки считаются раздельно
+    :param action_name: Идентификатор класса действия
+    :param error: Исключение вызова
+    """
+    if isinstance(error, AgentError) and error.code == TIMEOUT_CODE:
+        agent_timeouts_total.inc(action_name)
+    else:
+        agent_errors_total.inc(action_name, type(error).__name__)
+
+
+def init_app(app: Flask) -> None:
+    """
+    Учёт длительности обработки каждого HTTP-запроса приложения
+    """
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            http_request_seconds.observe(time.perf_counter() - started, endpoint, request.method)
+            http_requests_total.inc(endpoint, request.method, response.status_code)
+        return response
@@ -1,7 +1,7 @@
 import re 
 
-import sc_client .client as client 
-from sc_client .client import search_links_by_contents 
+from service .utils .sc_pool import client 
+from service .utils .sc_pool import search_links_by_contents 
 from sc_client .models import (
 ScAddr ,
 ScConstruction ,
@@ -10,7 +10,9 @@ ScLinkContentType ,
 ScTemplate ,
 )
 from sc_client .constants import sc_types 
-from sc_kpm import ScKeynodes 
+from sc_client .constants .exceptions import InvalidValueError 
+from service .utils .keynode_registry import keynodes 
+from service .utils .link_interning import interned_links 
 from sc_kpm .utils .common_utils import (
 generate_link 
 )
@@ -43,40 +45,170 @@ def get_node (client )->ScAddr :
     main_node :ScAddr =client .generate_elements (construction )[0 ]
     return main_node 
 
+class ActionNode :
+    """
+    Описание нового узла, который создаётся вместе со структурой действия
+    """
+    def __init__ (self ,sc_type =sc_types .NODE_CONST ,classes =(),system_idtf =None ,members =()):
+        """
+        :param sc_type: Тип узла
+        :param classes: Классы (ScAddr), которым принадлежит узел
+        :param system_idtf: Контент новой sc-link, связанной с узлом отношением nrel_system_identifier
+        :param members: Пары (ролевое отношение, элемент) — элементы, входящие в узел
+        """
+        self .sc_type =sc_type
+        self .classes =classes
+        self .system_idtf =system_idtf
+        self .members =members
+
+class InternedLink :
+    """
+    Строковый аргумент, для которого используется общая неизменяемая sc-link
+    (только для литералов, которые агенты не изменяют и не удаляют)
+    """
+    def __init__ (self ,content ):
+        """
+        :param content: Содержимое sc-link
+        """
+        self .content =content
+
+def _add_action_member (construction :ScConstruction ,owner ,element ,role :ScAddr ,alias :str ):
+    """
+    Метод для добавления элемента в конструкцию под ролевым отношением
+    :param construction: Генерируемая конструкция
+    :param owner: Алиас или адрес узла-владельца
+    :param element: str — новая sc-link, InternedLink — общая sc-link, ScAddr — существующий элемент,
+        ActionNode — новый узел
+    :param role: Ролевое отношение
+    :param alias: Алиас элемента в конструкции
+    """
+    if isinstance (element ,ScAddr ):
+        target =element
+    elif isinstance (element ,InternedLink ):
+        target =interned_links .intern (element .content )
+    elif isinstance (element ,ActionNode ):
+        construction .generate_node (element .sc_type ,alias )
+        for node_class in element .classes :
+            construction .generate_connector (sc_types .EDGE_ACCESS_CONST_POS_PERM ,node_class ,alias )
+        if element .system_idtf is not None :
+            # Идентификатор принадлежит только этому узлу, общая sc-link здесь не используется
+            construction .generate_link (
+            sc_types .LINK_CONST ,
+            ScLinkContent (element .system_idtf ,ScLinkContentType .STRING ),
+            f"{alias }_idtf"
+            )
+            construction .generate_connector (sc_types .EDGE_D_COMMON_CONST ,alias ,f"{alias }_idtf",f"{alias }_idtf_arc")
+            construction .generate_connector (
+            sc_types .EDGE_ACCESS_CONST_POS_PERM ,
+            keynodes ["nrel_system_identifier"],
+            f"{alias }_idtf_arc"
+            )
+        for index ,(member_role ,member )in enumerate (element .members ):
+            _add_action_member (construction ,alias ,member ,member_role ,f"{alias }_{index }")
+        target =alias
+    else :
+        construction .generate_link (sc_types .LINK_CONST ,ScLinkContent (element ,ScLinkContentType .STRING ),alias )
+        target =alias
+
+    construction .generate_connector (sc_types .EDGE_ACCESS_CONST_POS_PERM ,owner ,target ,f"{alias }_arc")
+    construction .generate_connector (sc_types .EDGE_ACCESS_CONST_POS_PERM ,role ,f"{alias }_arc")
+
+def build_action_structure (action_class :ScAddr ,arguments :list )->tuple :
+    """
+    Метод для генерации структуры действия одним запросом к sc-серверу
+    :param action_class: Класс действия
+    :param arguments: Аргументы по порядку rrel_1, rrel_2, ...:
+        str — новая sc-link, InternedLink — общая sc-link, ScAddr — существующий элемент,
+        ActionNode — новый узел, None — позиция пропускается
+    :return: Адрес action-ноды (действие ещё не инициировано) и адреса sc-link,
+        созданных для строковых аргументов
+    """
+    construction =ScConstruction ()
+    construction .generate_node (sc_types .NODE_CONST ,"_action")
+    construction .generate_connector (sc_types .EDGE_ACCESS_CONST_POS_PERM ,action_class ,"_action")
+    link_aliases =[]
+    for index ,argument in enumerate (arguments ,start =1 ):
+        if argument is None :
+            continue
+        _add_action_member (construction ,"_action",argument ,keynodes [f"rrel_{index }"],f"_arg_{index }")
+        if isinstance (argument ,str ):
+            link_aliases .append (f"_arg_{index }")
+    addrs =client .generate_elements (construction )
+    return addrs [0 ],[addrs [construction .get_index (alias )]for alias in link_aliases ]
+
+def build_action (action_class :ScAddr ,arguments :list )->ScAddr :
+    """
+    Метод для генерации структуры действия одним запросом к sc-серверу
+    :param action_class: Класс действия
+    :param arguments: Аргументы действия (см. build_action_structure)
+    :return: Адрес action-ноды (действие ещё не инициировано)
+    """
+    return build_action_structure (action_class ,arguments )[0 ]
+
+def initiate_action (action :ScAddr )->None :
+    """
+    Метод для инициирования действия
+    :param action: Адрес action-ноды
+    """
+    construction =ScConstruction ()
+    construction .generate_connector (sc_types .EDGE_ACCESS_CONST_POS_PERM ,keynodes ["action_initiated"],action )
+    client .generate_elements (construction )
+
+def read_attributes (nodes :list ,relations :list ,default :str ='')->list :
+    """
+    Метод для чтения строковых атрибутов узлов, связанных с ними неролевыми отношениями
+    (матрица узлы × отношения). На каждый узел выполняется один поиск по шаблону
+    с переменным отношением (тип узла отношения не проверяется, найденные отношения
+    отбираются по адресам), содержимое всех найденных sc-link читается одним запросом
+    :param nodes: Адреса узлов
+    :param relations: Идентификаторы неролевых отношений
+    :param default: Значение отсутствующего атрибута
+    :return: Словари {идентификатор отношения: содержимое} в порядке nodes
+    """
+    relation_idtfs ={}
+    for idtf in relations :
+        try :
+            relation_idtfs [keynodes .resolve (idtf ,sc_types .NODE_CONST_NOROLE ).value ]=idtf 
+        except InvalidValueError :
+            continue 
+
+    cells =[]
+    links =[]
+    if relation_idtfs :
+        for index ,node in enumerate (nodes ):
+            template =ScTemplate ()
+            template .quintuple (
+            node ,
+            sc_types .EDGE_D_COMMON_VAR ,
+            sc_types .LINK_VAR >>"_value",
+            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
+            sc_types .NODE_VAR >>"_relation"
+            )
+            found =set ()
+            for item in client .template_search (template ):
+                idtf =relation_idtfs .get (item .get ("_relation").value )
+                if idtf is None or idtf in found :
+                    continue 
+                found .add (idtf )
+                cells .append ((index ,idtf ))
+                links .append (item .get ("_value"))
+
+    attributes =[{idtf :default for idtf in relations }for _ in nodes ]
+    if links :
+        for (index ,idtf ),content in zip (cells ,client .get_link_content (*links )):
+            attributes [index ][idtf ]=content .data 
+    return attributes 
+
 def get_main_idtf (node :ScAddr )->str :
     """
     Метод для получения основного идентификатора ноды
     :param node: Нода
     :return: Основной идентификатор ноды
     """
-    template =ScTemplate ()
-    template .quintuple (
-    node ,
-    sc_types .EDGE_D_COMMON_VAR ,
-    '_value',
-    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_main_idtf']
-    )
-    template_result =client .template_search (template )
-    value =''
-    if len (template_result ):
-        value =client .get_link_content (template_result [0 ].get ('_value'))[0 ].data 
-    return value 
+    return read_attributes ([node ],['nrel_main_idtf'])[0 ]['nrel_main_idtf']
 
 def get_system_idtf (node :ScAddr )->str :
-    template =ScTemplate ()
-    template .quintuple (
-    node ,
-    sc_types .EDGE_D_COMMON_VAR ,
-    '_value',
-    sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ['nrel_system_idtf']
-    )
-    template_result =client .template_search (template )
-    value =''
-    if len (template_result ):
-        value =client .get_link_content (template_result [0 ].get ('_value'))[0 ].data 
-    return value 
+    return read_attributes ([node ],['nrel_system_idtf'])[0 ]['nrel_system_idtf']
 
 def set_system_idtf (content :str )->ScAddr :
 
@@ -89,7 +221,7 @@ def set_system_idtf (content :str )->ScAddr :
     sc_types .EDGE_D_COMMON_VAR ,
     _link >>"_link",
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ["nrel_system_identifier"]
+    keynodes ["nrel_system_identifier"]
     )
 
     result =client .generate_by_template (template )
@@ -107,7 +239,7 @@ def set_main_idtf (content :str )->ScAddr :
     sc_types .EDGE_D_COMMON_VAR ,
     _link >>"_link",
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ["nrel_main_identifier"]
+    keynodes ["nrel_main_identifier"]
     )
 
     result =client .generate_by_template (template )
@@ -121,9 +253,9 @@ def set_gender_content (gender )->ScAddr :
     :return: Кейнода для представления пола
     """
     if gender =="male":
-        return ScKeynodes ['concept_man']
+        return keynodes ['concept_man']
     if gender =="female":
-        return ScKeynodes ['concept_woman']
+        return keynodes ['concept_woman']
     else :
         raise ParseDataError (666 ,"Failed to parse args")
 
@@ -145,7 +277,7 @@ def get_term_titles ()->list [str ]:
     template =ScTemplate ()
     term_list =[]
     template .triple (
-    ScKeynodes ["belarus_legal_article"],
+    keynodes ["belarus_legal_article"],
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
     sc_types .NODE_VAR >>"_term_node"
     )
@@ -167,7 +299,7 @@ def get_event_by_date (date :str ,username :str )->EventResponse |None :
     sc_types .EDGE_D_COMMON_VAR ,
     sc_types .NODE_VAR >>"_event",
     sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-    ScKeynodes ["nrel_user_event"]
+    keynodes ["nrel_user_event"]
     )
 
     result =client .template_search (template )
@@ -182,42 +314,42 @@ def get_event_by_date (date :str ,username :str )->EventResponse |None :
             sc_types .EDGE_D_COMMON_VAR ,
             sc_types .LINK_VAR >>"_event_name",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["nrel_event_name"]
+            keynodes ["nrel_event_name"]
             )
             sc_filter .triple_with_relation (
             event_node ,
             sc_types .EDGE_D_COMMON_VAR ,
             sc_types .LINK_VAR >>"_event_description",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["nrel_event_description"]
+            keynodes ["nrel_event_description"]
             )
             sc_filter .triple_with_relation (
             event_node ,
             sc_types .EDGE_D_COMMON_VAR ,
             sc_types .NODE_VAR_TUPLE >>"_event_date_tuple",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["nrel_event_date"]
+            keynodes ["nrel_event_date"]
             )
             sc_filter .triple_with_relation (
             "_event_date_tuple",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             sc_types .LINK_VAR >>"_day_lnk",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["rrel_event_day"]
+            keynodes ["rrel_event_day"]
             )
             sc_filter .triple_with_relation (
             "_event_date_tuple",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             sc_types .LINK_VAR >>"_month_lnk",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["rrel_event_month"]
+            keynodes ["rrel_event_month"]
             )
             sc_filter .triple_with_relation (
             "_event_date_tuple",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
             sc_types .LINK_VAR >>"_year_lnk",
             sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            ScKeynodes ["rrel_event_year"]
+            keynodes ["rrel_event_year"]
             )
             filter_result =client .search_by_template (sc_filter )
             if len (filter_result )==0 :
@@ -0,0 +1,89 @@
+"""
+Запоминание чтений sc-памяти в пределах одного HTTP-запроса.
+
+За один запрос одни и те же узлы читаются многократно: один автор для
+каждого своего сообщения, проверка класса пользователя в цикле по
+сообщениям, детали текущего топика при сборке списка всех топиков.
+Одинаковые чтения (READ_METHODS с тем же содержимым запроса) внутри
+запроса выполняются один раз, повторные получают запомненный результат.
+
+Память хранится в flask.g и живёт до конца запроса. Любой другой запрос к
+sc-серверу (генерация, удаление, изменение содержимого) может изменить
+прочитанное, поэтому он очищает память запроса. Изменения, которые агенты
+вносят после запуска действия, тоже не видны устаревшими: действие
+создаётся генерацией элементов, а она очищает память.
+
+Вне HTTP-запроса (фоновые потоки, задачи планировщика, колбэки событий)
+чтения не запоминаются. Попадания и промахи считаются метрикой
+request_memo_reads_total, для отдельного запроса — в заголовке X-Sc-Read-Memo.
+"""
+
+import json
+
+from flask import Flask, g, has_request_context
+from sc_client.constants.common import ClientCommand
+
+from service.utils.metrics import request_memo_reads_total
+from service.utils.sc_client_internals import build_payload
+
+# Методы клиента, результат которых зависит только от содержимого sc-памяти
+READ_METHODS = frozenset({'search_by_template', 'get_link_content', 'search_links_by_contents', 'get_elements_types'})
+
+MEMO_HEADER = 'X-Sc-Read-Memo'
+
+
+class RequestMemo:
+    """
+    Память чтений текущего запроса поверх PooledClient
+    """
+
+    def execute(self, name: str, command: ClientCommand, args: tuple, call):
+        """
+        Выполнение запроса к sc-серверу через call с запоминанием чтений
+        :param name: Имя метода клиента
+        :param command: Команда sc-server
+        :param args: Аргументы команды
+        :param call: Выполнение запроса: call(name, command, *args)
+        :return: Результат (для запомненного чтения — копия списка)
+        """
+        if not has_request_context():
+            return call(name, command, *args)
+        memo = g.setdefault('sc_read_memo', {})
+        if name not in READ_METHODS:
+            memo.clear()
+            return call(name, command, *args)
+
+        payload = build_payload(command, *args)
+        key = name + ' ' + json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        if key in memo:
+            g.sc_read_memo_hits = g.get('sc_read_memo_hits', 0) + 1
+            request_memo_reads_total.inc('hit')
+            result = memo[key]
+        else:
+            g.sc_read_memo_misses = g.get('sc_read_memo_misses', 0) + 1
+            request_memo_reads_total.inc('miss')
+            result = memo[key] = call(name, command, *args)
+        # Вызывающий код может изменить список результатов, запомненный остаётся прежним
+        return list(result) if isinstance(result, list) else result
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Включение памяти для клиента пула и заголовок с попаданиями в ответе
+        """
+        from service.utils.sc_pool import client
+
+        if not app.config.get('REQUEST_MEMO_ENABLED', True):
+            client.memo = None
+            return
+        client.memo = self
+
+        @app.after_request
+        def report_read_memo(response):
+            hits = g.get('sc_read_memo_hits', 0)
+            misses = g.get('sc_read_memo_misses', 0)
+            if hits or misses:
+                response.headers[MEMO_HEADER] = f'hits={hits}, misses={misses}'
+            return response
+
+
+request_memo = RequestMemo()
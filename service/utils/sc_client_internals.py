@@ -0,0 +1,68 @@
+"""
+Доступ к внутренним модулям py-sc-client.
+
+Пул соединений, память запроса и запись трафика собирают и разбирают
+сообщения sc-сервера так же, как стандартный клиент. Для этого нужны
+непубличные классы sc_client.client._*, которые могут измениться в любой
+версии библиотеки. Они используются только через этот модуль, и только
+с версией, под которую он написан: при другой версии импорт завершается
+ошибкой при запуске, а не неверным разбором ответов во время работы.
+"""
+
+from importlib import metadata
+
+from sc_client.constants.common import ClientCommand
+from sc_client.models import Response
+
+SUPPORTED_VERSION = '0.4.0'
+
+
+def _check_version() -> None:
+    try:
+        installed = metadata.version('py-sc-client')
+    except metadata.PackageNotFoundError:
+        return
+    if installed != SUPPORTED_VERSION:
+        raise ImportError(
+            f"service.utils.sc_client_internals написан для py-sc-client {SUPPORTED_VERSION}, "
+            f"установлена версия {installed}")
+
+
+_check_version()
+
+from sc_client.client._executor import Executor  # noqa: E402
+from sc_client.client._payload_factory import PayloadFactory  # noqa: E402
+from sc_client.client._response_processor import ResponseProcessor  # noqa: E402
+
+# Фабрика и обработчик не хранят состояния, поэтому один экземпляр общий для всех потоков
+_payload_factory = PayloadFactory()
+_response_processor = ResponseProcessor()
+
+
+def request_type(command: ClientCommand) -> str:
+    """
+    :param command: Команда sc-client
+    :return: Тип запроса в протоколе sc-сервера
+    """
+    return Executor._executor_mapper[command].value
+
+
+def build_payload(command: ClientCommand, *args):
+    """
+    Тело запроса в том виде, в каком его отправляет стандартный клиент
+    :param command: Команда sc-client
+    :param args: Аргументы команды (как в sc_client.client)
+    :return: Payload для JSON-сообщения
+    """
+    return _payload_factory.run(command, *args)
+
+
+def process_response(command: ClientCommand, response: Response, *args):
+    """
+    Разбор ответа sc-сервера в результат команды
+    :param command: Команда sc-client
+    :param response: Ответ сервера
+    :param args: Аргументы команды
+    :return: Результат, как у sc_client.client
+    """
+    return _response_processor.run(command, response, *args)
@@ -0,0 +1,452 @@
+"""
+Пул websocket-соединений с sc-сервером.
+
+Стандартный sc-client держит одно соединение на процесс, и все запросы
+приложения выстраиваются в очередь на одном сокете. Пул открывает N
+соединений к Config.OSTIS_URL и выдаёт их запросам по очереди
+(checkout/checkin). Соединения периодически проверяются и при сбое
+переоткрываются. События доставляются через то соединение, на котором
+оформлена подписка, поэтому подписка и её удаление всегда идут через
+один и тот же сокет. Колбэки событий выполняются в ограниченном пуле
+потоков соединения, а ответы на команды, которые уже не ждут (истёк
+таймаут), отбрасываются.
+
+Пока пул не запущен (размер 0 или sc-сервер недоступен), объект client
+передаёт вызовы стандартному sc_client.client.
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import sc_client.client as sc_client
+import websocket
+from sc_client.constants import common
+from sc_client.constants.common import ClientCommand
+from sc_client.constants.exceptions import ServerError
+from sc_client.models import Response, ScAddr, ScEventSubscription, ScIdtfResolveParams
+
+from config import Config
+from service.exceptions import ScServerError
+from service.utils.metrics import sc_client_call_seconds, sc_client_calls_total
+from service.utils.sc_client_internals import build_payload, process_response, request_type
+
+PING_IDTF = 'nrel_system_identifier'
+
+
+class ScConnection:
+    """
+    Одно websocket-соединение с sc-сервером со своей таблицей подписок
+    """
+
+    def __init__(self, url: str, name: str, event_workers: int = Config.SC_POOL_EVENT_WORKERS):
+        self.url = url
+        self.name = name
+        self._ws = None
+        self._opened = threading.Event()
+        self._lock = threading.Lock()
+        self._command_id = 0
+        # Ответы принимаются только на команды, которые ещё ждут в _send
+        self._pending = set()
+        self._responses = {}
+        self._responses_ready = threading.Condition()
+        self._subscriptions = {}
+        # Колбэки событий не должны задерживать поток чтения сокета
+        self._events = ThreadPoolExecutor(max_workers=event_workers, thread_name_prefix=f"sc-events-{name}")
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened.is_set()
+
+    def connect(self, timeout: float) -> bool:
+        """
+        Открытие соединения
+        :param timeout: Время ожидания открытия в секундах
+        :return: True, если соединение открыто
+        """
+        self._opened.clear()
+        self._ws = websocket.WebSocketApp(
+            self.url,
+            on_open=self._on_open,
+            on_message=self._on_message,
+            on_close=self._on_close,
+            on_error=self._on_error,
+        )
+        threading.Thread(target=self._ws.run_forever, name=f"sc-pool-{self.name}", daemon=True).start()
+        return self._opened.wait(timeout)
+
+    def close(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+        self._on_close(self._ws, None, None)
+
+    def _on_open(self, _) -> None:
+        self._opened.set()
+
+    def _on_close(self, _, _status, _message) -> None:
+        self._opened.clear()
+        self._subscriptions.clear()
+        with self._responses_ready:
+            self._responses_ready.notify_all()
+
+    def _on_error(self, _, error: Exception) -> None:
+        print(f"[SC_POOL] Ошибка соединения {self.name}: {error}")
+
+    def _on_message(self, _, message: str) -> None:
+        response = json.loads(message, object_hook=Response)
+        if response.get(common.EVENT):
+            self._events.submit(self._emit_event, response.get(common.ID), response.get(common.PAYLOAD))
+            return
+        command_id = response.get(common.ID)
+        with self._responses_ready:
+            if command_id not in self._pending:
+                return
+            self._responses[command_id] = response
+            self._responses_ready.notify_all()
+
+    def _emit_event(self, subscription_id: int, elements: list) -> None:
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription:
+            subscription.callback(*[ScAddr(addr) for addr in elements])
+
+    def _send(self, command: ClientCommand, payload, timeout: float) -> Response:
+        with self._lock:
+            self._command_id += 1
+            command_id = self._command_id
+        data = json.dumps({
+            common.ID: command_id,
+            common.TYPE: request_type(command),
+            common.PAYLOAD: payload,
+        })
+        with self._responses_ready:
+            self._pending.add(command_id)
+        try:
+            self._ws.send(data)
+        except (websocket.WebSocketException, AttributeError) as e:
+            self._opened.clear()
+            with self._responses_ready:
+                self._pending.discard(command_id)
+            raise ConnectionAbortedError(f"Соединение {self.name} закрыто") from e
+        with self._responses_ready:
+            self._responses_ready.wait_for(
+                lambda: command_id in self._responses or not self.is_open,
+                timeout,
+            )
+            self._pending.discard(command_id)
+            response = self._responses.pop(command_id, None)
+        if response is None:
+            raise ConnectionAbortedError("Sc-server takes a long time to respond")
+        return response
+
+    def execute(self, command: ClientCommand, *args, timeout: float = 30):
+        """
+        Выполнение команды sc-client через это соединение
+        :param command: Команда sc-client
+        :param args: Аргументы команды (как в sc_client.client)
+        :param timeout: Время ожидания ответа в секундах
+        :return: Результат команды
+        """
+        payload = build_payload(command, *args)
+        response = self._send(command, payload, timeout)
+        errors = response.get(common.ERRORS)
+        if errors:
+            if isinstance(errors, str):
+                raise ServerError(errors)
+            raise ServerError("\n".join(error.get(common.MESSAGE) for error in errors))
+
+        if command == ClientCommand.CREATE_EVENT_SUBSCRIPTIONS:
+            subscriptions = []
+            for subscription_id, params in zip(response.get(common.PAYLOAD), args):
+                subscription = ScEventSubscription(subscription_id, params.event_type, params.callback)
+                self._subscriptions[subscription_id] = subscription
+                subscriptions.append(subscription)
+            return subscriptions
+        if command == ClientCommand.DESTROY_EVENT_SUBSCRIPTIONS:
+            for subscription in args:
+                self._subscriptions.pop(subscription.id, None)
+            return response.get(common.STATUS)
+        return process_response(command, response, *args)
+
+    def ping(self, timeout: float = 5) -> bool:
+        """
+        Проверка соединения лёгким запросом к sc-серверу
+        :return: True, если сервер ответил
+        """
+        if not self.is_open:
+            return False
+        try:
+            self.execute(ClientCommand.SEARCH_KEYNODES, ScIdtfResolveParams(idtf=PING_IDTF, type=None), timeout=timeout)
+            return True
+        except (ConnectionAbortedError, ServerError):
+            return False
+
+
+class ScConnectionPool:
+    """
+    Пул соединений с выдачей по запросу и фоновой проверкой
+    """
+
+    def __init__(self, url: str, size: int, checkout_timeout: float, health_check_interval: float):
+        self.url = url
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._connections = []
+        self._idle = queue.LifoQueue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def start(self) -> bool:
+        """
+        Открытие соединений и запуск фоновой проверки
+        :return: True, если пул готов к работе
+        """
+        with self._start_lock:
+            if self._started or self.size <= 0:
+                return self._started
+            connections = [ScConnection(self.url, str(index)) for index in range(self.size)]
+            threads = [
+                threading.Thread(target=connection.connect, args=(self.checkout_timeout,))
+                for connection in connections
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            opened = [connection for connection in connections if connection.is_open]
+            if not opened:
+                print(f"[SC_POOL] Не удалось открыть соединения с {self.url}")
+                return False
+            self._connections = connections
+            for connection in connections:
+                self._idle.put(connection)
+            self._stopped.clear()
+            threading.Thread(target=self._health_loop, name="sc-pool-health", daemon=True).start()
+            self._started = True
+        print(f"[SC_POOL] Открыто {len(opened)} из {self.size} соединений с {self.url}")
+        return True
+
+    def stop(self) -> None:
+        with self._start_lock:
+            self._stopped.set()
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._idle = queue.LifoQueue()
+            self._started = False
+
+    def checkout(self) -> ScConnection:
+        """
+        Получение свободного соединения; закрытое соединение переоткрывается
+        :return: Открытое соединение
+        """
+        try:
+            connection = self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise ScServerError("Нет свободных соединений с sc-сервером")
+        if not connection.is_open and not connection.connect(self.checkout_timeout):
+            self._idle.put(connection)
+            raise ScServerError(f"Соединение {connection.name} с sc-сервером недоступно")
+        return connection
+
+    def checkin(self, connection: ScConnection) -> None:
+        self._idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Соединение на время блока with
+        """
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def health_check(self) -> int:
+        """
+        Проверка свободных соединений и переоткрытие неотвечающих
+        :return: Количество переоткрытых соединений
+        """
+        reconnected = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if not connection.ping():
+                    connection.close()
+                    if connection.connect(self.checkout_timeout):
+                        reconnected += 1
+            finally:
+                self._idle.put(connection)
+        if reconnected:
+            print(f"[SC_POOL] Переоткрыто соединений: {reconnected}")
+        return reconnected
+
+    def _health_loop(self) -> None:
+        while not self._stopped.wait(self.health_check_interval):
+            self.health_check()
+
+    def snapshot(self) -> dict:
+        """
+        :return: Текущее состояние пула
+        """
+        return {
+            'size': len(self._connections),
+            'open': sum(connection.is_open for connection in self._connections),
+            'idle': self._idle.qsize(),
+        }
+
+
+class PooledClient:
+    """
+    Замена модулю sc_client.client: запросы выполняются через пул соединений
+    """
+
+    def __init__(self, pool: ScConnectionPool):
+        self.pool = pool
+        self._owners = {}
+        # Запись или воспроизведение обмена с sc-сервером (см. sc_traffic)
+        self.traffic = None
+        # Память чтений в пределах HTTP-запроса (см. request_memo)
+        self.memo = None
+
+    def _ready(self) -> bool:
+        if self.pool.started:
+            return True
+        if self.pool.size <= 0 or not sc_client.is_connected():
+            return False
+        return self.pool.start()
+
+    def _execute(self, name: str, command: ClientCommand, *args):
+        if self.memo is not None:
+            return self.memo.execute(name, command, args, self._call)
+        return self._call(name, command, *args)
+
+    def _call(self, name: str, command: ClientCommand, *args):
+        sc_client_calls_total.inc(name)
+        started = time.perf_counter()
+        try:
+            if self.traffic is not None:
+                return self.traffic.execute(name, command, args, self._send)
+            return self._send(name, command, *args)
+        finally:
+            sc_client_call_seconds.observe(time.perf_counter() - started, name)
+
+    def _send(self, name: str, command: ClientCommand, *args):
+        if not self._ready():
+            return getattr(sc_client, name)(*args)
+        with self.pool.connection() as connection:
+            return connection.execute(command, *args)
+
+    def is_connected(self) -> bool:
+        if self.traffic is not None and self.traffic.offline:
+            return True
+        return sc_client.is_connected()
+
+    def set_reconnect_handler(self, **reconnect_kwargs) -> None:
+        sc_client.set_reconnect_handler(**reconnect_kwargs)
+
+    def resolve_keynodes(self, *params):
+        return self._execute('resolve_keynodes', ClientCommand.SEARCH_KEYNODES, *params)
+
+    def generate_elements(self, construction):
+        return self._execute('generate_elements', ClientCommand.GENERATE_ELEMENTS, construction)
+
+    def generate_elements_by_scs(self, text):
+        return self._execute('generate_elements_by_scs', ClientCommand.GENERATE_ELEMENTS_BY_SCS, text)
+
+    def get_elements_types(self, *addrs):
+        return self._execute('get_elements_types', ClientCommand.GET_ELEMENTS_TYPES, *addrs)
+
+    def erase_elements(self, *addrs):
+        return self._execute('erase_elements', ClientCommand.ERASE_ELEMENTS, *addrs)
+
+    def get_link_content(self, *addrs):
+        return self._execute('get_link_content', ClientCommand.GET_LINK_CONTENT, *addrs)
+
+    def set_link_contents(self, *contents):
+        return self._execute('set_link_contents', ClientCommand.SET_LINK_CONTENTS, *contents)
+
+    def search_links_by_contents(self, *contents):
+        return self._execute('search_links_by_contents', ClientCommand.SEARCH_LINKS_BY_CONTENT, *contents)
+
+    def search_by_template(self, template, params=None):
+        return self._execute('search_by_template', ClientCommand.SEARCH_BY_TEMPLATE, template, params)
+
+    def generate_by_template(self, template, params=None):
+        return self._execute('generate_by_template', ClientCommand.GENERATE_BY_TEMPLATE, template, params)
+
+    # Устаревшие имена sc-client, которые использует приложение
+    template_search = search_by_template
+    template_generate = generate_by_template
+    get_links_by_content = search_links_by_contents
+    create_elements_by_scs = generate_elements_by_scs
+
+    def events_create(self, *params):
+        """
+        Подписка оформляется на соединении, которое остаётся её владельцем
+        """
+        if self.traffic is not None:
+            return self.traffic.subscribe(params, self._subscribe)
+        return self._subscribe(*params)
+
+    def _subscribe(self, *params):
+        if not self._ready():
+            return sc_client.events_create(*params)
+        with self.pool.connection() as connection:
+            subscriptions = connection.execute(ClientCommand.CREATE_EVENT_SUBSCRIPTIONS, *params)
+        for subscription in subscriptions:
+            self._owners[id(subscription)] = connection
+        return subscriptions
+
+    def events_destroy(self, *subscriptions):
+        """
+        Удаление подписок через соединения, на которых они оформлены
+        """
+        if self.traffic is not None:
+            return self.traffic.destroy(subscriptions, self._unsubscribe)
+        return self._unsubscribe(*subscriptions)
+
+    def _unsubscribe(self, *subscriptions):
+        owned = {}
+        foreign = []
+        for subscription in subscriptions:
+            connection = self._owners.pop(id(subscription), None)
+            if connection is None:
+                foreign.append(subscription)
+            else:
+                owned.setdefault(connection, []).append(subscription)
+        destroyed = True
+        for connection, own in owned.items():
+            if connection.is_open:
+                destroyed = connection.execute(ClientCommand.DESTROY_EVENT_SUBSCRIPTIONS, *own) and destroyed
+        if foreign:
+            destroyed = sc_client.events_destroy(*foreign) and destroyed
+        return destroyed
+
+
+pool = ScConnectionPool(
+    Config.OSTIS_URL,
+    Config.SC_POOL_SIZE,
+    Config.SC_POOL_CHECKOUT_TIMEOUT,
+    Config.SC_POOL_HEALTH_CHECK_INTERVAL,
+)
+client = PooledClient(pool)
+
+# Функции с именами sc_client.client для модулей, импортирующих их напрямую
+is_connected = client.is_connected
+get_link_content = client.get_link_content
+search_by_template = client.search_by_template
+search_links_by_contents = client.search_links_by_contents
+create_elements_by_scs = client.create_elements_by_scs
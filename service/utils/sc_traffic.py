@@ -0,0 +1,363 @@
+"""
+Запись и воспроизведение обмена с sc-сервером.
+
+В режиме record каждый запрос клиента sc_pool.client (а значит, все
+обращения ostis.py, models.py и ostis_utils.py к sc-серверу) вместе с
+ответом и длительностью записывается в JSONL-файл, по строке на вызов:
+
+    {"m": "search_by_template", "q": <payload запроса>, "r": <ответ>, "t": 0.012}
+
+Запрос хранится в том же виде, в котором sc-client отправляет его по
+websocket, поэтому он же служит ключом при воспроизведении. События
+подписок записываются строками с "m": "event": адреса элементов события
+и задержка от оформления подписки.
+
+В режиме replay sc-сервер не нужен: ответы выдаются из файла по ключу
+(метод, запрос), одинаковые запросы получают ответы в порядке записи,
+после исчерпания повторяется последний. События воспроизводятся для
+подписки с тем же запросом и тем же порядковым номером. Задержку ответа
+можно эмулировать: записанная длительность × latency_scale + latency.
+
+Сводка по файлу (число вызовов и время по методам), чтобы сравнить два
+прогона одной и той же страницы:
+
+    python -m service.utils.sc_traffic trace.jsonl
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import Flask
+from sc_client.constants.common import ClientCommand
+from sc_client.constants.exceptions import ServerError
+from sc_client.constants.sc_types import ScType
+from sc_client.models import (
+    ScAddr,
+    ScEventSubscription,
+    ScEventSubscriptionParams,
+    ScLinkContent,
+    ScTemplateResult,
+)
+
+from service.exceptions import ScServerError
+from service.utils.sc_client_internals import build_payload
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+EVENT = 'event'
+
+
+class ReplayMissError(ScServerError):
+    """
+    Запрос, которого нет в записи: для приложения выглядит как недоступный sc-сервер
+    """
+
+    def __init__(self, method: str):
+        super().__init__(f"Нет записанного ответа для {method}")
+        self.method = method
+
+
+def encode(value):
+    """
+    Результат вызова sc-client в JSON-совместимом виде
+    :param value: Результат (ScAddr, ScTemplateResult, ScLinkContent, ScType, списки, скаляры)
+    :return: Значение для записи в файл
+    :raises TypeError: Тип результата не поддерживается
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, ScAddr):
+        return {'a': value.value}
+    if isinstance(value, ScTemplateResult):
+        return {'tr': [addr.value for addr in value.addrs], 'al': value.aliases}
+    if isinstance(value, ScLinkContent):
+        return {'lc': value.data, 'ct': value.content_type.value, 'la': value.addr.value if value.addr else None}
+    if isinstance(value, ScType):
+        return {'st': value.value}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {'d': {key: encode(item) for key, item in value.items()}}
+    raise TypeError(f"Неподдерживаемый тип результата: {type(value).__name__}")
+
+
+def decode(value):
+    """
+    Обратное преобразование к объектам sc-client (см. encode)
+    """
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if 'a' in value:
+        return ScAddr(value['a'])
+    if 'tr' in value:
+        return ScTemplateResult([ScAddr(addr) for addr in value['tr']], value['al'])
+    if 'lc' in value:
+        addr = ScAddr(value['la']) if value['la'] is not None else None
+        return ScLinkContent(value['lc'], value['ct'], addr)
+    if 'st' in value:
+        return ScType(value['st'])
+    return {key: decode(item) for key, item in value['d'].items()}
+
+
+def request_key(method: str, payload) -> str:
+    return method + ' ' + json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+
+class TrafficRecorder:
+    """
+    Запись запросов к sc-серверу, ответов и событий в JSONL-файл
+    """
+    offline = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._subscriptions = Counter()
+        self._recorded = 0
+
+    def _write(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self._recorded += 1
+
+    def execute(self, name: str, command: ClientCommand, args: tuple, send):
+        """
+        Выполнение запроса через send с записью запроса и ответа
+        """
+        payload = build_payload(command, *args)
+        started = time.perf_counter()
+        try:
+            result = send(name, command, *args)
+        except ServerError as e:
+            self._write({'m': name, 'q': payload, 'e': str(e), 't': round(time.perf_counter() - started, 6)})
+            raise
+        elapsed = round(time.perf_counter() - started, 6)
+        try:
+            self._write({'m': name, 'q': payload, 'r': encode(result), 't': elapsed})
+        except TypeError as e:
+            print(f"[SC_TRAFFIC] Ответ {name} не записан: {e}")
+        return result
+
+    def subscribe(self, params: tuple, subscribe) -> list:
+        """
+        Оформление подписок через subscribe; события записываются перед вызовом колбэка
+        """
+        wrapped = []
+        for param in params:
+            payload = build_payload(ClientCommand.CREATE_EVENT_SUBSCRIPTIONS, param)
+            key = request_key(EVENT, payload)
+            with self._lock:
+                number = self._subscriptions[key]
+                self._subscriptions[key] += 1
+            wrapped.append(ScEventSubscriptionParams(
+                param.addr,
+                param.event_type,
+                self._recording_callback(payload, number, param.callback),
+            ))
+        return subscribe(*wrapped)
+
+    def _recording_callback(self, payload, number: int, callback):
+        subscribed = time.perf_counter()
+
+        def record(*elements):
+            self._write({
+                'm': EVENT,
+                'q': payload,
+                'n': number,
+                'r': encode(list(elements)),
+                't': round(time.perf_counter() - subscribed, 6),
+            })
+            return callback(*elements)
+        return record
+
+    def destroy(self, subscriptions: tuple, destroy) -> bool:
+        return destroy(*subscriptions)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'mode': RECORD, 'path': self.path, 'recorded': self._recorded}
+
+
+class TrafficReplayer:
+    """
+    Воспроизведение записанных ответов и событий без sc-сервера
+    """
+    offline = True
+
+    def __init__(self, path: str, latency_scale: float = 0.0, latency: float = 0.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.latency = latency
+        self._responses = {}
+        self._events = {}
+        self._lock = threading.Lock()
+        self._subscriptions = Counter()
+        self._timers = {}
+        self._next_subscription_id = 0
+        self._served = Counter()
+        self._missed = Counter()
+        self._load(path)
+
+    def _load(self, path: str) -> None:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = request_key(entry['m'], entry['q'])
+                if entry['m'] == EVENT:
+                    self._events.setdefault((key, entry['n']), []).append(entry)
+                else:
+                    self._responses.setdefault(key, deque()).append(entry)
+
+    def _delay(self, recorded: float) -> float:
+        return recorded * self.latency_scale + self.latency
+
+    def execute(self, name: str, command: ClientCommand, args: tuple, send):
+        """
+        Ответ из записи для того же метода и запроса
+        :raises ReplayMissError: Такого запроса в записи нет
+        """
+        key = request_key(name, build_payload(command, *args))
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                self._missed[name] += 1
+                raise ReplayMissError(name)
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+            self._served[name] += 1
+        delay = self._delay(entry['t'])
+        if delay > 0:
+            time.sleep(delay)
+        if 'e' in entry:
+            raise ServerError(entry['e'])
+        return decode(entry['r'])
+
+    def subscribe(self, params: tuple, subscribe) -> list:
+        """
+        Подписки без sc-сервера: записанные события приходят с записанной задержкой
+        """
+        subscriptions = []
+        for param in params:
+            payload = build_payload(ClientCommand.CREATE_EVENT_SUBSCRIPTIONS, param)
+            key = request_key(EVENT, payload)
+            with self._lock:
+                number = self._subscriptions[key]
+                self._subscriptions[key] += 1
+                self._next_subscription_id += 1
+                subscription = ScEventSubscription(self._next_subscription_id, param.event_type, param.callback)
+            timers = []
+            for entry in self._events.get((key, number), ()):
+                timer = threading.Timer(self._delay(entry['t']), param.callback, args=decode(entry['r']))
+                timer.daemon = True
+                timers.append(timer)
+            with self._lock:
+                self._timers[subscription.id] = timers
+            for timer in timers:
+                timer.start()
+            subscriptions.append(subscription)
+        return subscriptions
+
+    def destroy(self, subscriptions: tuple, destroy) -> bool:
+        for subscription in subscriptions:
+            with self._lock:
+                timers = self._timers.pop(subscription.id, ())
+            for timer in timers:
+                timer.cancel()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            timers = [timer for timers in self._timers.values() for timer in timers]
+            self._timers.clear()
+        for timer in timers:
+            timer.cancel()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'mode': REPLAY,
+                'path': self.path,
+                'served': sum(self._served.values()),
+                'missed': dict(self._missed),
+            }
+
+
+def install(client, mode: str, path: str, latency_scale: float = 0.0, latency: float = 0.0):
+    """
+    Включение записи или воспроизведения для клиента sc_pool.client
+    :param client: PooledClient
+    :param mode: off, record или replay
+    :param path: Путь к JSONL-файлу
+    :param latency_scale: Множитель записанной длительности ответа (replay)
+    :param latency: Дополнительная задержка каждого ответа в секундах (replay)
+    :return: Установленный перехватчик или None
+    """
+    if client.traffic is not None:
+        client.traffic.close()
+        client.traffic = None
+    if mode == RECORD:
+        client.traffic = TrafficRecorder(path)
+    elif mode == REPLAY:
+        client.traffic = TrafficReplayer(path, latency_scale, latency)
+    elif mode != OFF:
+        raise ValueError(f"Неизвестный режим SC_TRAFFIC: {mode}")
+    if client.traffic is not None:
+        print(f"[SC_TRAFFIC] Режим {mode}: {path}")
+    return client.traffic
+
+
+def init_app(app: Flask) -> None:
+    """
+    Включение режима из конфигурации приложения (SC_TRAFFIC_*)
+    """
+    from service.utils.sc_pool import client
+    install(
+        client,
+        app.config.get('SC_TRAFFIC_MODE', OFF),
+        app.config.get('SC_TRAFFIC_PATH', ''),
+        app.config.get('SC_TRAFFIC_LATENCY_SCALE', 0.0),
+        app.config.get('SC_TRAFFIC_LATENCY', 0.0),
+    )
+
+
+def summarize(path: str) -> dict:
+    """
+    Сводка по записи: число вызовов и суммарное время по методам
+    :param path: Путь к JSONL-файлу
+    :return: Словарь метод → {'calls', 'seconds'}
+    """
+    summary = {}
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            method = summary.setdefault(entry['m'], {'calls': 0, 'seconds': 0.0})
+            method['calls'] += 1
+            method['seconds'] += entry.get('t', 0.0)
+    return summary
+
+
+if __name__ == '__main__':
+    for trace in sys.argv[1:]:
+        totals = summarize(trace)
+        print(trace)
+        for method, stats in sorted(totals.items(), key=lambda item: -item[1]['calls']):
+            print(f"  {method:<28} {stats['calls']:>7} {stats['seconds']:>10.3f}s")
+        calls = sum(stats['calls'] for method, stats in totals.items() if method != EVENT)
+        print(f"  {'total requests':<28} {calls:>7}")
@@ -0,0 +1,206 @@
+"""
+Планировщик работы приложения по приоритетам.
+
+Записи, результат которых странице не нужен (история запросов, просмотры
+топиков, сохранение тегов, отзывы о рекомендациях), конкурируют с
+интерактивными чтениями за соединения пула sc_pool и за SQLite. Они
+откладываются в очередь низкого приоритета (defer), которую выполняет
+ограниченное число потоков (low_workers, по умолчанию один): сколько бы
+фоновой работы ни накопилось, она занимает не больше low_workers
+соединений, и остальные достаются запросам пользователей.
+
+Очередь высокого приоритета (submit(HIGH, ...), map) выполняет
+пользовательскую работу, которую страница ждёт, например параллельную
+загрузку топиков форума; её потоков столько же, сколько соединений в
+пуле.
+
+Очередь низкого приоритета ограничена по длине: при переполнении задача
+отбрасывается (её Future получает SchedulerFullError, отброшенные задачи
+считаются в scheduler_tasks_total с итогом dropped), чтобы отложенная
+работа не выполнялась в потоке запроса пользователя. Задача выполняется
+в контексте приложения, из которого она поставлена.
+
+Для каждой очереди считаются глубина (scheduler_queue_depth), время
+ожидания до начала выполнения (scheduler_wait_seconds) и итоги задач
+(scheduler_tasks_total); snapshot() отдаётся в /health.
+"""
+
+import threading
+import time
+import queue
+from concurrent.futures import Future
+
+from flask import current_app, has_app_context
+
+from config import Config
+from service.utils.metrics import scheduler_queue_depth, scheduler_tasks_total, scheduler_wait_seconds
+
+HIGH = 'high'
+LOW = 'low'
+
+
+class SchedulerFullError(RuntimeError):
+    """
+    Очередь переполнена, задача отброшена
+    """
+
+
+class _Task:
+    __slots__ = ('fn', 'args', 'kwargs', 'future', 'enqueued', 'app')
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+        self.app = current_app._get_current_object() if has_app_context() else None
+
+    def run(self):
+        if self.app is None:
+            return self.fn(*self.args, **self.kwargs)
+        with self.app.app_context():
+            return self.fn(*self.args, **self.kwargs)
+
+
+class PriorityScheduler:
+    """
+    Две очереди с собственными пулами потоков: HIGH для пользовательской работы, LOW для отложенной
+    """
+
+    def __init__(self, high_workers: int, low_workers: int, low_queue_size: int):
+        self.workers = {HIGH: max(1, high_workers), LOW: max(1, low_workers)}
+        self._queues = {HIGH: queue.Queue(), LOW: queue.Queue(maxsize=low_queue_size)}
+        self._threads = {HIGH: [], LOW: []}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._stats = {
+            priority: {'submitted': 0, 'completed': 0, 'failed': 0, 'dropped': 0, 'running': 0, 'max_wait': 0.0}
+            for priority in (HIGH, LOW)
+        }
+
+    def _start_workers(self, priority: str) -> None:
+        with self._lock:
+            threads = self._threads[priority]
+            while len(threads) < self.workers[priority]:
+                thread = threading.Thread(
+                    target=self._work, args=(priority,), name=f'scheduler-{priority}-{len(threads)}', daemon=True)
+                threads.append(thread)
+                thread.start()
+
+    def submit(self, priority: str, fn, *args, **kwargs) -> Future:
+        """
+        Постановка задачи в очередь
+        :param priority: HIGH или LOW
+        :param fn: Функция задачи
+        :return: Future с результатом или исключением задачи (SchedulerFullError, если очередь переполнена)
+        """
+        task = _Task(fn, args, kwargs)
+        self._start_workers(priority)
+        with self._lock:
+            self._pending += 1
+            self._stats[priority]['submitted'] += 1
+        try:
+            self._queues[priority].put_nowait(task)
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                self._stats[priority]['dropped'] += 1
+                if not self._pending:
+                    self._idle.notify_all()
+            scheduler_tasks_total.inc(priority, 'dropped')
+            print(f"[SCHEDULER] {priority} queue is full, dropped {getattr(fn, '__name__', fn)}")
+            task.future.set_exception(SchedulerFullError(priority))
+            return task.future
+        scheduler_queue_depth.set(self._queues[priority].qsize(), priority)
+        return task.future
+
+    def defer(self, fn, *args, **kwargs) -> Future:
+        """
+        Отложенное выполнение с низким приоритетом; ошибка задачи пишется в лог
+        """
+        return self.submit(LOW, fn, *args, **kwargs)
+
+    def map(self, fn, items, priority: str = HIGH) -> list:
+        """
+        Параллельное выполнение fn для каждого элемента с ожиданием всех результатов
+        :param fn: Функция одного аргумента
+        :param items: Элементы
+        :param priority: Очередь
+        :return: Результаты в порядке элементов; исключение первой неудачной задачи пробрасывается
+        """
+        items = list(items)
+        # Поток очереди не ждёт задачи своей же очереди: при занятых потоках это взаимная блокировка
+        if getattr(self._local, 'priority', None) == priority or len(items) < 2:
+            return [fn(item) for item in items]
+        futures = [self.submit(priority, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def _work(self, priority: str) -> None:
+        self._local.priority = priority
+        tasks = self._queues[priority]
+        while True:
+            task = tasks.get()
+            scheduler_queue_depth.set(tasks.qsize(), priority)
+            wait = time.perf_counter() - task.enqueued
+            scheduler_wait_seconds.observe(wait, priority)
+            with self._lock:
+                stats = self._stats[priority]
+                stats['max_wait'] = max(stats['max_wait'], wait)
+            try:
+                self._execute(priority, task)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.notify_all()
+
+    def _execute(self, priority: str, task: _Task) -> None:
+        with self._lock:
+            self._stats[priority]['running'] += 1
+        try:
+            result = task.run()
+        except Exception as e:
+            if priority == LOW:
+                print(f"[SCHEDULER] deferred {getattr(task.fn, '__name__', task.fn)} failed: {e}")
+            with self._lock:
+                self._stats[priority]['failed'] += 1
+            scheduler_tasks_total.inc(priority, 'error')
+            task.future.set_exception(e)
+        else:
+            with self._lock:
+                self._stats[priority]['completed'] += 1
+            scheduler_tasks_total.inc(priority, 'ok')
+            task.future.set_result(result)
+        finally:
+            with self._lock:
+                self._stats[priority]['running'] -= 1
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Ожидание выполнения всех поставленных задач
+        :param timeout: Максимальное время ожидания в секундах
+        :return: True, если очереди пусты
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def snapshot(self) -> dict:
+        """
+        :return: Глубина очередей, число потоков и счётчики задач
+        """
+        with self._lock:
+            return {
+                priority: {
+                    'depth': self._queues[priority].qsize(),
+                    'workers': self.workers[priority],
+                    **self._stats[priority],
+                    'max_wait': round(self._stats[priority]['max_wait'], 6),
+                }
+                for priority in (HIGH, LOW)
+            }
+
+
+scheduler = PriorityScheduler(Config.SCHEDULER_HIGH_WORKERS, Config.SCHEDULER_LOW_WORKERS, Config.SCHEDULER_LOW_QUEUE_SIZE)
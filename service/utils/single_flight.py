@@ -0,0 +1,147 @@
+"""
+Объединение одновременных одинаковых вызовов агентов (single-flight).
+
+Когда несколько пользователей одновременно ищут один и тот же термин,
+каждый запрос запускает своё действие, и sc-machine выполняет одну и ту
+же работу N раз. Для агентов только для чтения (секция SINGLE_FLIGHT в
+config.ini) первый вызов с данным ключом выполняется, а остальные
+ожидают его результат или исключение. Ключ — класс действия, колбэк и
+точные значения аргументов: по-разному записанный текст (регистр,
+пробелы) — разные вызовы, ведь агент может ответить на них по-разному. Запись удаляется сразу после завершения
+вызова: это не кэш, следующий вызов снова обращается к sc-серверу.
+
+Вызовы с аргументами, которые нельзя сравнить по значению (ActionNode и
+т.п.), не объединяются.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from sc_client.models import ScAddr
+
+from config import Config
+from service.utils.ostis_utils import InternedLink
+
+
+def normalize_argument(argument):
+    """
+    Значение аргумента для ключа вызова
+    :param argument: Аргумент действия (см. build_action)
+    :return: Хешируемое значение или None, если аргумент нельзя сравнить
+    """
+    if isinstance(argument, InternedLink):
+        argument = argument.content
+    if isinstance(argument, str):
+        return 'str', argument
+    if isinstance(argument, ScAddr):
+        return 'addr', argument.value
+    if isinstance(argument, (int, float)):
+        return 'num', argument
+    return None
+
+
+class SingleFlight:
+    """
+    Реестр выполняющихся вызовов: ключ → Future с результатом первого вызова
+    """
+
+    def __init__(self, actions):
+        self.actions = frozenset(actions)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._shared = 0
+
+    def key(self, action_name: str, arguments: list, callback):
+        """
+        Ключ вызова агента
+        :param action_name: Идентификатор класса действия
+        :param arguments: Аргументы действия
+        :param callback: Колбэк-функция, извлекающая результат
+        :return: Ключ или None, если вызов не объединяется
+        """
+        if action_name not in self.actions:
+            return None
+        normalized = []
+        for argument in arguments:
+            value = normalize_argument(argument)
+            if value is None:
+                return None
+            normalized.append(value)
+        return action_name, callback, tuple(normalized)
+
+    def _join(self, key):
+        """
+        :return: (Future, True) для первого вызова или (Future, False) для ожидающего
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self._shared += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self._leaders += 1
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """
+        Выполнение fn один раз на все одновременные вызовы с тем же ключом
+        :param key: Ключ вызова (None — выполнить без объединения)
+        :param fn: Функция без аргументов, выполняющая вызов агента
+        :return: Результат fn
+        """
+        if key is None:
+            return fn()
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, coroutine_fn):
+        """
+        Асинхронный вариант do; ожидание общее с синхронными вызовами
+        :param key: Ключ вызова (None — выполнить без объединения)
+        :param coroutine_fn: Функция без аргументов, возвращающая корутину вызова агента
+        :return: Результат корутины
+        """
+        if key is None:
+            return await coroutine_fn()
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await coroutine_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def snapshot(self) -> dict:
+        """
+        :return: Количество выполняющихся и объединённых вызовов
+        """
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'leaders': self._leaders,
+                'shared': self._shared,
+            }
+
+
+single_flight = SingleFlight(Config.SINGLE_FLIGHT_ACTIONS)
@@ -0,0 +1,410 @@
+"""
+Каталог топиков форума в памяти процесса.
+
+Главная страница форума, рекомендации и поиск по форуму работают со
+сводкой всех топиков: заголовок, описание, подпись автора, текст первых
+сообщений, число сообщений, теги. Раньше сводка собиралась на каждый
+запрос: для каждого топика читались детали и все сообщения (с авторами,
+оценками и вложениями), то есть O(топики × сообщения) запросов к
+sc-серверу ради трёх первых текстов.
+
+TopicCatalog строит сводку один раз: при запуске приложения в фоне
+(параллельно, через очередь HIGH планировщика), как только появится
+подключение к sc-серверу, а если запрос пришёл раньше — в этом запросе.
+Дальше сводка обновляется по одному топику:
+- CatalogForumAgent (декоратор агента форума, см. config.agents_to_load)
+  после создания топика находит новые топики (ForumAgent.topic_addrs), а
+  после добавления, изменения и удаления сообщения откладывает обновление
+  его топика в очередь LOW;
+- страница топика и так читает все его сообщения и передаёт их каталогу
+  (update_messages);
+- сброс подписи автора (author_displays.invalidate после теста
+  специалиста) откладывает обновление топиков этого автора;
+- раз в sync_interval секунд фоновый поток сверяет список топиков с
+  sc-памятью (sync): так появляются топики, созданные другими процессами.
+
+В каталог попадают только топики, которые уже в нём есть или которые
+подтверждает ForumAgent.topic_addrs: адрес из URL несуществующего топика
+не добавляет запись. Детали топика с ошибкой чтения (ключ error) не
+сохраняются, остаётся прежняя запись.
+
+Записи каталога общие для всех запросов и заменяются целиком, изменять
+их нельзя. last_activity — время последнего изменения топика, замеченного
+процессом (None, если с запуска изменений не было).
+"""
+
+import threading
+import time
+from typing import Optional
+
+from sc_client.models import ScAddr
+
+from config import Config
+from service.agent_factory import uses_sc_server
+from service.agents.abstract.forum_agent import ForumStatus
+from service.utils.author_display import author_displays
+from service.utils.sc_pool import is_connected
+from service.utils.scheduler import scheduler
+from service.utils.topic_tags import classify_topic
+from service.utils.topic_tags_db import get_topic_tags, save_topic_tags
+
+
+# Возвращение сохранённого тега темы.
+def get_or_create_topic_tags(topic_addr: int, title: str, description: str) -> list[dict]:
+    """
+    Возвращает сохранённые теги темы.
+    Если тегов ещё нет, автоматически определяет до 4 тегов; сохранение в SQLite откладывается.
+    """
+    saved_tags = get_topic_tags(topic_addr)
+
+    if saved_tags:
+        return saved_tags
+
+    detected_tags = classify_topic(title, description)
+
+    scheduler.defer(
+        save_topic_tags,
+        topic_addr=topic_addr,
+        tags=detected_tags
+    )
+
+    return [
+        {
+            "key": tag["key"],
+            "label": tag["label"],
+            "confidence": tag["confidence"],
+            "matched_terms": ", ".join(tag.get("matched_terms", [])),
+            "is_primary": index == 0,
+        }
+        for index, tag in enumerate(detected_tags)
+    ]
+
+
+# Пауза между попытками построения при запуске: от RETRY_DELAY с удвоением до MAX_RETRY_DELAY
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+def _addr_value(addr) -> int:
+    return addr.value if isinstance(addr, ScAddr) else int(addr)
+
+
+class TopicCatalog:
+    """
+    Сводка всех топиков форума: адрес топика → запись с полями страницы форума
+    """
+
+    def __init__(self, messages_in_text: int, sync_interval: float = 0):
+        self.messages_in_text = messages_in_text
+        self.sync_interval = sync_interval
+        self.forum = None
+        self._app = None
+        self._started = False
+        self._topics = {}
+        # Адреса сообщений топика в порядке get_topic_messages: по ним находится топик изменённого сообщения
+        self._messages = {}
+        self._refreshed = {}
+        self._built = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._builds = 0
+        self._refreshes = 0
+        self._syncs = 0
+        self._build_seconds = 0.0
+
+    def entry(self, topic_addr, details: dict, messages: list) -> tuple:
+        """
+        Запись каталога по деталям и сообщениям топика
+        :return: Запись и адреса сообщений топика
+        """
+        topic_addr = _addr_value(topic_addr)
+        title = details.get("title", "")
+        description = details.get("description", "")
+        tags = get_or_create_topic_tags(topic_addr=topic_addr, title=title, description=description)
+        return {
+            "addr": topic_addr,
+            "title": title,
+            "author": details.get("author", ""),
+            "author_email": details.get("author_email", ""),
+            "description": description,
+            "messages_text": " ".join(
+                message.get("content", "")
+                for message in messages[:self.messages_in_text]
+            ),
+            "message_count": len(messages),
+            "tags": tags,
+            "primary_tag": tags[0] if tags else None,
+            "tag_keys": [tag["key"] for tag in tags],
+            "last_activity": None,
+        }, tuple(message.get("addr") for message in messages)
+
+    def _load(self, topic_addr) -> Optional[tuple]:
+        """
+        :return: Запись и адреса сообщений или None, если детали топика не прочитаны
+        """
+        addr = ScAddr(_addr_value(topic_addr))
+        details = self.forum.get_topic_details(addr)
+        if details.get("error"):
+            print(f"[TOPIC_CATALOG] Топик {addr.value} не прочитан: {details['error']}")
+            return None
+        return self.entry(addr, details, self.forum.get_topic_messages(addr))
+
+    def _exists(self, topic_addr: int) -> bool:
+        with self._lock:
+            if topic_addr in self._topics:
+                return True
+        return topic_addr in self.forum.topic_addrs()
+
+    def build(self) -> int:
+        """
+        Полное построение каталога; топики загружаются параллельно
+        :return: Количество топиков
+        """
+        with self._build_lock:
+            started = time.monotonic()
+            addrs = self.forum.topic_addrs()
+            loaded = scheduler.map(self._load, addrs)
+            with self._lock:
+                topics, messages = {}, {}
+                for addr, result in zip(addrs, loaded):
+                    # Топик, обновлённый во время построения или не прочитанный сейчас, сохраняет прежнюю запись
+                    if addr in self._topics and (result is None or self._refreshed.get(addr, 0) > started):
+                        topics[addr], messages[addr] = self._topics[addr], self._messages[addr]
+                    elif result is not None:
+                        topics[addr], messages[addr] = result
+                self._topics, self._messages = topics, messages
+                self._built = True
+                self._builds += 1
+                self._build_seconds = time.monotonic() - started
+            print(f"[TOPIC_CATALOG] {len(topics)} топиков за {self._build_seconds:.2f} с")
+            return len(topics)
+
+    def _ensure_built(self) -> None:
+        # Запросы, пришедшие во время построения, ждут его вместо повторного построения
+        if not self._built:
+            with self._build_lock:
+                if not self._built:
+                    self.build()
+
+    def topics(self) -> list:
+        """
+        :return: Записи всех топиков
+        """
+        self._ensure_built()
+        with self._lock:
+            return list(self._topics.values())
+
+    def get(self, topic_addr) -> Optional[dict]:
+        """
+        Запись топика; отсутствующий в каталоге топик загружается из sc-памяти
+        :return: Запись или None, если такого топика нет
+        """
+        self._ensure_built()
+        topic_addr = _addr_value(topic_addr)
+        with self._lock:
+            entry = self._topics.get(topic_addr)
+        return entry if entry is not None else self.refresh_topic(topic_addr)
+
+    def _store(self, entry: dict, message_addrs: tuple, changed: bool = True) -> dict:
+        with self._lock:
+            previous = self._topics.get(entry["addr"])
+            if changed:
+                entry["last_activity"] = time.time()
+            elif previous is not None:
+                entry["last_activity"] = previous["last_activity"]
+            self._topics[entry["addr"]] = entry
+            self._messages[entry["addr"]] = message_addrs
+            self._refreshed[entry["addr"]] = time.monotonic()
+            self._refreshes += 1
+        return entry
+
+    def refresh_topic(self, topic_addr, confirmed: bool = False) -> Optional[dict]:
+        """
+        Повторная загрузка одного топика из sc-памяти
+        :param topic_addr: Адрес топика
+        :param confirmed: Адрес уже получен из ForumAgent.topic_addrs
+        :return: Запись или None, если такого топика нет
+        """
+        topic_addr = _addr_value(topic_addr)
+        if not confirmed and not self._exists(topic_addr):
+            return None
+        loaded = self._load(topic_addr)
+        if loaded is None:
+            with self._lock:
+                return self._topics.get(topic_addr)
+        return self._store(*loaded)
+
+    def update_messages(self, topic_addr, details: dict, messages: list) -> Optional[dict]:
+        """
+        Обновление записи по уже прочитанным деталям и сообщениям топика (страница топика)
+        :return: Запись каталога или None, если такого топика нет или детали не прочитаны
+        """
+        topic_addr = _addr_value(topic_addr)
+        if details.get("error") or not self._exists(topic_addr):
+            return None
+        entry, message_addrs = self.entry(topic_addr, details, messages)
+        with self._lock:
+            previous = self._topics.get(entry["addr"])
+            changed = previous is None or self._messages.get(entry["addr"]) != message_addrs or any(
+                previous[key] != entry[key] for key in ("title", "description", "messages_text"))
+        return self._store(entry, message_addrs, changed)
+
+    def topic_of(self, message_addr) -> Optional[int]:
+        """
+        :return: Адрес топика, которому принадлежит сообщение, или None
+        """
+        message_addr = _addr_value(message_addr)
+        with self._lock:
+            for topic_addr, message_addrs in self._messages.items():
+                if message_addr in message_addrs:
+                    return topic_addr
+        return None
+
+    def sync(self) -> list:
+        """
+        Загрузка новых топиков и удаление исчезнувших без повторной загрузки остальных
+        :return: Адреса добавленных топиков
+        """
+        if not self._built:
+            self.build()
+            return []
+        addrs = self.forum.topic_addrs()
+        with self._lock:
+            added = [addr for addr in addrs if addr not in self._topics]
+            for addr in set(self._topics) - set(addrs):
+                del self._topics[addr]
+                self._messages.pop(addr, None)
+        for addr in added:
+            self.refresh_topic(addr, confirmed=True)
+        with self._lock:
+            self._syncs += 1
+        return added
+
+    def authors_changed(self, emails: tuple) -> None:
+        """
+        Подписи авторов устарели (см. AuthorDisplayCache.subscribe): их топики обновляются в фоне
+        :param emails: Email авторов; пустой кортеж — все авторы
+        """
+        if self.forum is None or not self._built:
+            return
+        if not emails:
+            scheduler.defer(self.build)
+            return
+        with self._lock:
+            stale = [addr for addr, entry in self._topics.items() if entry.get("author_email") in emails]
+        for addr in stale:
+            scheduler.defer(self.refresh_topic, addr)
+
+    @staticmethod
+    def _ready() -> bool:
+        # Агентам в памяти процесса sc-сервер не нужен
+        return not uses_sc_server() or is_connected()
+
+    def _build_on_startup(self) -> None:
+        """
+        Построение после подключения к sc-серверу: попытки повторяются с растущей паузой,
+        пока каталог не построен (в том числе первым запросом)
+        """
+        delay = RETRY_DELAY
+        while not self._built:
+            if self._ready():
+                try:
+                    with self._app.app_context():
+                        self._ensure_built()
+                    return
+                except Exception as e:
+                    print(f"[TOPIC_CATALOG] Построение не удалось: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _run(self, build_on_startup: bool) -> None:
+        if build_on_startup:
+            self._build_on_startup()
+        while self.sync_interval > 0:
+            time.sleep(self.sync_interval)
+            # Каталог, который ещё не строился, построит первый запрос
+            if not self._built or not self._ready():
+                continue
+            try:
+                with self._app.app_context():
+                    self.sync()
+            except Exception as e:
+                print(f"[TOPIC_CATALOG] Сверка с sc-памятью не удалась: {e}")
+
+    def init_app(self, app) -> None:
+        """
+        Привязка к агенту форума приложения, построение каталога в фоне и периодическая сверка
+        """
+        with self._lock:
+            self.forum = app.config['agents']['forum_agent']
+            self._app = app
+            self._topics, self._messages, self._refreshed = {}, {}, {}
+            self._built = False
+        build_on_startup = app.config.get('TOPIC_CATALOG_BUILD_ON_STARTUP', True)
+        if self._started or app.config.get('TESTING') or not (build_on_startup or self.sync_interval > 0):
+            return
+        self._started = True
+        threading.Thread(target=self._run, args=(build_on_startup,), name='topic-catalog', daemon=True).start()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'built': self._built,
+                'topics': len(self._topics),
+                'builds': self._builds,
+                'refreshes': self._refreshes,
+                'syncs': self._syncs,
+                'build_seconds': round(self._build_seconds, 3),
+            }
+
+
+topic_catalog = TopicCatalog(Config.TOPIC_CATALOG_MESSAGES_IN_TEXT, Config.TOPIC_CATALOG_SYNC_INTERVAL)
+author_displays.subscribe(topic_catalog.authors_changed)
+
+
+class CatalogForumAgent:
+    """
+    Декоратор агента форума: изменения топиков и сообщений обновляют каталог
+    """
+
+    def __init__(self, agent, name: str, catalog: TopicCatalog = None):
+        self.agent = agent
+        self.catalog = catalog or topic_catalog
+
+    def __getattr__(self, attr):
+        return getattr(self.agent, attr)
+
+    def _refresh_later(self, topic_addr) -> None:
+        if topic_addr is not None:
+            scheduler.defer(self.catalog.refresh_topic, _addr_value(topic_addr))
+
+    def add_topic(self, username: str, title: str, description: str) -> dict:
+        response = self.agent.add_topic(username=username, title=title, description=description)
+        if response.get("status") == ForumStatus.VALID:
+            # Новый топик должен появиться на странице форума, куда ведёт перенаправление
+            try:
+                self.catalog.sync()
+            except Exception as e:
+                print(f"[TOPIC_CATALOG] {e}")
+        return response
+
+    def add_message(self, username: str, topic_addr, message_text: str, **attachment) -> dict:
+        response = self.agent.add_message(
+            username=username, topic_addr=topic_addr, message_text=message_text, **attachment)
+        if response.get("status") == ForumStatus.VALID:
+            self._refresh_later(topic_addr)
+        return response
+
+    def edit_message(self, message_addr, new_text: str) -> dict:
+        topic_addr = self.catalog.topic_of(message_addr)
+        response = self.agent.edit_message(message_addr=message_addr, new_text=new_text)
+        if response.get("status") == ForumStatus.VALID:
+            self._refresh_later(topic_addr)
+        return response
+
+    def delete_message(self, message_addr) -> dict:
+        topic_addr = self.catalog.topic_of(message_addr)
+        response = self.agent.delete_message(message_addr=message_addr)
+        if response.get("status") == ForumStatus.VALID:
+            self._refresh_later(topic_addr)
+        return response
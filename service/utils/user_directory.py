@@ -0,0 +1,150 @@
+"""
+Поиск пользователя по логину без перебора всех пользователей.
+
+Раньше логин сравнивался с содержимым sc-link идентификатора каждого
+пользователя класса: один поиск по шаблону и по запросу get_link_content
+на пользователя. Теперь sc-link с содержимым, равным логину, находятся
+индексом содержимого (search_links_by_contents), а пользователь — обратным
+шаблоном от найденной sc-link: узел класса, связанный с ней отношением
+идентификатора. Тот же текст может содержать и чужая sc-link (аргумент
+действия, общая sc-link из link_interning), поэтому проверяются все
+найденные sc-link, но их число не зависит от числа пользователей.
+
+Найденные соответствия (класс, отношение, логин) → ScAddr хранятся в LRU
+ограниченного размера. Отсутствие пользователя не запоминается: он может
+зарегистрироваться или подтвердить email в любой момент. Агенты
+регистрации и верификации сбрасывают логин из кэша (invalidate).
+resolve_logins ищет несколько логинов за один запрос
+search_links_by_contents.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr, ScLinkContent, ScLinkContentType, ScTemplate
+
+from config import Config
+from service.utils.keynode_registry import keynodes
+from service.utils.sc_pool import client
+
+# Класс и отношение идентификатора пользователей новой регистрации
+USER_CLASS = 'concept_user'
+LOGIN_RELATION = 'nrel_system_identifier'
+
+
+class UserDirectory:
+    """
+    LRU-кэш логин → адрес узла пользователя поверх поиска по содержимому sc-link
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._found = 0
+        self._not_found = 0
+        self._invalidated = 0
+
+    def resolve(self, login: str, user_class: Optional[str] = USER_CLASS,
+                relation: str = LOGIN_RELATION) -> Optional[ScAddr]:
+        """
+        Узел пользователя по логину
+        :param login: Логин (email)
+        :param user_class: Системный идентификатор класса пользователя; None — без проверки класса
+        :param relation: Системный идентификатор отношения между пользователем и логином
+        :return: Адрес узла пользователя или None
+        """
+        return self.resolve_logins([login], user_class, relation)[login]
+
+    def resolve_logins(self, logins: list, user_class: Optional[str] = USER_CLASS,
+                       relation: str = LOGIN_RELATION) -> dict:
+        """
+        Узлы пользователей для нескольких логинов
+        :param logins: Логины
+        :param user_class: Системный идентификатор класса пользователя; None — без проверки класса
+        :param relation: Системный идентификатор отношения между пользователем и логином
+        :return: Словарь логин → адрес узла пользователя или None
+        """
+        users = {}
+        missing = []
+        with self._lock:
+            for login in dict.fromkeys(logins):
+                addr = self._users.get((user_class, relation, login))
+                if addr is not None:
+                    self._users.move_to_end((user_class, relation, login))
+                    self._hits += 1
+                    users[login] = addr
+                else:
+                    missing.append(login)
+        if not missing:
+            return users
+
+        contents = [ScLinkContent(login, ScLinkContentType.STRING) for login in missing]
+        for login, links in zip(missing, client.search_links_by_contents(*contents)):
+            users[login] = self._owner(links, user_class, relation)
+
+        with self._lock:
+            for login in missing:
+                if users[login] is None:
+                    self._not_found += 1
+                    continue
+                self._found += 1
+                self._users[(user_class, relation, login)] = users[login]
+                self._users.move_to_end((user_class, relation, login))
+            while len(self._users) > self.capacity:
+                self._users.popitem(last=False)
+        return users
+
+    def _owner(self, links: list, user_class: Optional[str], relation: str) -> Optional[ScAddr]:
+        """
+        Пользователь, которому одна из sc-link принадлежит как идентификатор
+        """
+        for link in links:
+            template = ScTemplate()
+            template.quintuple(
+                sc_types.NODE_VAR >> 'user',
+                sc_types.EDGE_D_COMMON_VAR,
+                link,
+                sc_types.EDGE_ACCESS_VAR_POS_PERM,
+                keynodes[relation]
+            )
+            if user_class is not None:
+                template.triple(keynodes[user_class], sc_types.EDGE_ACCESS_VAR_POS_PERM, 'user')
+            results = client.search_by_template(template)
+            if results:
+                return results[0].get('user')
+        return None
+
+    def invalidate(self, *logins) -> int:
+        """
+        Сброс соответствий для логинов (при регистрации и подтверждении email)
+        :param logins: Логины; без аргументов очищается весь кэш
+        :return: Количество удалённых записей
+        """
+        targets = set(logins)
+        with self._lock:
+            stale = [key for key in self._users if not logins or key[2] in targets]
+            for key in stale:
+                del self._users[key]
+            self._invalidated += len(stale)
+        return len(stale)
+
+    def snapshot(self) -> dict:
+        """
+        :return: Размер кэша и счётчики поиска
+        """
+        with self._lock:
+            return {
+                'cached': len(self._users),
+                'capacity': self.capacity,
+                'hits': self._hits,
+                'found': self._found,
+                'not_found': self._not_found,
+                'invalidated': self._invalidated,
+            }
+
+
+user_directory = UserDirectory(Config.USER_DIRECTORY_CAPACITY)
@@ -0,0 +1,146 @@
+"""
+Загрузка пользователя Flask-Login без обращения к sc-серверу на каждый запрос.
+
+load_user вызывается для каждого запроса вошедшего пользователя, и каждый
+раз пользователь искался в sc-памяти. Теперь он восстанавливается из:
+1. кэша процесса: TTL cache_ttl секунд, не больше cache_size записей;
+2. снимка в сессии (sc_addr, email), который записывается при входе и
+   при каждой проверке в sc-памяти. Сессия Flask подписана SECRET_KEY
+   (config.ini или переменная окружения, см. Config.SECRET_KEY): снимок
+   защищён ровно настолько, насколько секретен этот ключ. Снимок
+   доверяется revalidate_after секунд с последней проверки, затем
+   пользователь снова ищется в sc-памяти (удалённый пользователь перестаёт
+   входить не позже чем через revalidate_after секунд). Снимок с временем
+   проверки в будущем не принимается.
+
+К sc-серверу обращается только промах обоих уровней. Результат каждой
+загрузки считается метрикой user_loader_requests_total (cache, session,
+sc, not_found). Выход из системы удаляет снимок и запись кэша.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask import session
+from flask_login import user_logged_in, user_logged_out
+
+from config import Config
+from service.utils.metrics import user_loader_requests_total
+
+SESSION_KEY = '_user_snapshot'
+
+
+def make_snapshot(user, checked: float) -> dict:
+    """
+    Компактный снимок пользователя для сессии
+    :param user: Пользователь
+    :param checked: Время последней проверки пользователя в sc-памяти (time.time())
+    """
+    return {
+        'sc_addr': user.sc_addr,
+        'username': user.username,
+        'checked': checked,
+    }
+
+
+class UserLoader:
+    """
+    Двухуровневый кэш пользователей Flask-Login: память процесса и снимок в сессии
+    """
+
+    def __init__(self, cache_ttl: float, cache_size: int, revalidate_after: float):
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.revalidate_after = revalidate_after
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, username: str, find_user: Callable) -> Optional[object]:
+        """
+        Пользователь по идентификатору сессии Flask-Login
+        :param username: Email пользователя
+        :param find_user: Поиск пользователя в sc-памяти
+        :return: Пользователь или None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is not None and entry[0] > now:
+                self._users.move_to_end(username)
+                user_loader_requests_total.inc('cache')
+                return entry[1]
+
+        snapshot = session.get(SESSION_KEY)
+        if isinstance(snapshot, dict) and snapshot.get('username') == username and self._fresh(snapshot):
+            from service.models import User
+            user = User(sc_addr=snapshot['sc_addr'], username=username)
+            self._cache(user)
+            user_loader_requests_total.inc('session')
+            return user
+
+        user = find_user(username)
+        if user is None:
+            session.pop(SESSION_KEY, None)
+            self.forget(username)
+            user_loader_requests_total.inc('not_found')
+            return None
+        self.remember(user)
+        user_loader_requests_total.inc('sc')
+        return user
+
+    def _fresh(self, snapshot: dict) -> bool:
+        """
+        Снимок проверен не раньше revalidate_after секунд назад и не в будущем
+        """
+        checked = snapshot.get('checked')
+        if not isinstance(checked, (int, float)):
+            return False
+        age = time.time() - checked
+        return 0 <= age < self.revalidate_after
+
+    def remember(self, user) -> None:
+        """
+        Запись проверенного пользователя в сессию и кэш процесса
+        """
+        session[SESSION_KEY] = make_snapshot(user, time.time())
+        self._cache(user)
+
+    def _cache(self, user) -> None:
+        with self._lock:
+            self._users[user.username] = (time.monotonic() + self.cache_ttl, user)
+            self._users.move_to_end(user.username)
+            while len(self._users) > self.cache_size:
+                self._users.popitem(last=False)
+
+    def forget(self, username: str) -> None:
+        with self._lock:
+            self._users.pop(username, None)
+
+    def init_app(self, app) -> None:
+        """
+        Снимок записывается при входе и удаляется при выходе пользователя
+        """
+        def _logged_in(sender, user=None, **extra):
+            if user is not None:
+                self.remember(user)
+
+        def _logged_out(sender, user=None, **extra):
+            session.pop(SESSION_KEY, None)
+            if user is not None and getattr(user, 'username', None):
+                self.forget(user.username)
+
+        user_logged_in.connect(_logged_in, app, weak=False)
+        user_logged_out.connect(_logged_out, app, weak=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'cached': len(self._users),
+                'cache_ttl': self.cache_ttl,
+                'revalidate_after': self.revalidate_after,
+            }
+
+
+user_loader = UserLoader(Config.USER_LOADER_CACHE_TTL, Config.USER_LOADER_CACHE_SIZE, Config.USER_LOADER_REVALIDATE_AFTER)
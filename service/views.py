@@ -1,30 +1,48 @@
-from flask import Blueprint ,request ,render_template ,redirect ,url_for ,flash ,session, jsonify 
+from flask import Blueprint ,request ,render_template ,redirect ,url_for ,flash ,session, jsonify, Response 
 from flask_login import login_user ,logout_user ,login_required ,current_user 
 from .utils.view_history_db import save_topic_view, get_recent_viewed_topic_ids
-from sc_client .client import get_link_content ,search_by_template 
+from service .utils .sc_pool import get_link_content ,search_by_template ,is_connected 
 from sc_client .models import ScAddr ,ScIdtfResolveParams ,ScTemplate 
 from .utils.recommendation import build_recommendations, build_personalized_recommendations, search_topics_by_semantics
 from .utils.recommendation_feedback_db import save_feedback
-from .utils.topic_tags import classify_topic, TAG_OPTIONS
-from .utils.topic_tags_db import get_topic_tags, save_topic_tags
+from .utils.topic_tags import TAG_OPTIONS
 
 from .models import (
-find_user_by_username ,
 collect_user_info ,
 )
 
 from .utils .string_processing import string_processing
-from .utils .ostis_utils import get_term_titles ,get_event_by_date
+from .utils .ostis_utils import read_attributes
+from .utils .keynode_registry import keynodes 
+from .utils .event_subscriptions import subscription_gauge 
+from .utils .circuit_breaker import agent_breaker ,CLOSED 
+from .utils .sc_pool import pool as sc_pool 
+from .utils .action_timeouts import action_timeouts 
+from .utils .action_reaper import action_reaper 
+from .utils .link_interning import interned_links 
+from .utils .single_flight import single_flight 
+from .utils .agent_cache import agent_caches 
+from .utils .scheduler import scheduler 
+from .utils .user_directory import user_directory 
+from .utils .user_session import user_loader 
+from .utils .author_display import author_displays 
+from .utils .topic_catalog import topic_catalog 
+from .agent_factory import uses_sc_server 
+from .utils .metrics import registry as metrics_registry ,CONTENT_TYPE as METRICS_CONTENT_TYPE 
 from .utils .article_index import search_articles ,get_article ,get_all_titles
 from .utils .news_reader import get_news ,get_news_sources ,get_news_count
 from .services import (
 auth_agent ,
+find_user ,
 reg_agent ,
-user_request_agent ,
+user_request_agents ,
 directory_agent ,
 add_event_agent ,
 delete_event_agent ,
 show_event_agent,
+term_titles as get_term_titles,
+events_by_date,
+forum_agent,
 get_user_profile,
 update_user_profile,
 get_user_settings,
@@ -54,7 +72,7 @@ test_agent_update_rating
 
 from .services import verification_send_token ,verification_check_token 
 from .forms import VerificationForm 
-from service .agents .ostis import Ostis ,result 
+from .agents .abstract .forum_agent import ForumStatus 
 
 
 
@@ -65,7 +83,7 @@ main =Blueprint ("main",__name__ )
 _PUBLIC_ENDPOINTS = {
     'main.auth', 'main.reg', 'main.verification',
     'main.resend_code', 'main.guest_mode', 'main.logout',
-    'static',
+    'static', 'main.api_sc_subscriptions', 'main.health', 'main.metrics',
 }
 
 @main .before_request
@@ -121,7 +139,7 @@ def auth ():
 
         if auth_response ['status']=='Valid':
 
-            user =find_user_by_username (email )
+            user =find_user (email )
 
             if user :
                 login_user (user )
@@ -211,7 +229,7 @@ def verification ():
                 user_type =session .get ('user_type','user')
 
 
-                user =find_user_by_username (email )
+                user =find_user (email )
                 if user :
                     login_user (user )
 
@@ -273,7 +291,7 @@ def show_calendar ():
     user =current_user .username 
 
     selected_date =request .args .get ("selected_date")
-    events =get_event_by_date (selected_date ,user )if selected_date else []
+    events =events_by_date (user ,selected_date )if selected_date else []
 
     return render_template (
     "calendar.html",
@@ -292,7 +310,7 @@ def add_event ():
     """
     form =AddEventForm ()
     if form .validate_on_submit ():
-        user =get_link_content (current_user .username )[0 ].data 
+        user =get_user_login_from_current_user ()
         add_event_agent (
         user_name =user ,
         event_name =form .title .data ,
@@ -304,7 +322,7 @@ def add_event ():
 @main .route ("/delete_event")
 @login_required 
 def delete_event ():
-    user =get_link_content (current_user .username )[0 ].data 
+    user =get_user_login_from_current_user ()
     event_name =request .args .get ("event_name")
     selected_date =request .args .get ("selected_date")
 
@@ -333,14 +351,15 @@ def requests ():
         all_results =[]
         all_queries =[]
 
-        for term in processed_terms :
-            try :
-                response =user_request_agent (content =term )
-            except Exception as _req_err :
-                print (f"[REQUESTS] agent error for term={term!r}: {_req_err}")
-                flash ("Ошибка при обращении к системе. Попробуйте позже.",category ="empty-result-error")
-                return render_template ("requests.html",article_titles =_article_titles )
+        try :
+            # Термины независимы — агент вызывается для всех одновременно
+            responses =user_request_agents (processed_terms )
+        except Exception as _req_err :
+            print (f"[REQUESTS] agent error for terms={processed_terms!r}: {_req_err}")
+            flash ("Ошибка при обращении к системе. Попробуйте позже.",category ="empty-result-error")
+            return render_template ("requests.html",article_titles =_article_titles )
 
+        for term ,response in zip (processed_terms ,responses ):
             msg =response .get ("message")
             if not isinstance (msg ,list ):
                 # agent returned None or non-list (timeout / not connected)
@@ -369,7 +388,7 @@ def requests ():
             session ['search_results']=all_results
             if current_user .is_authenticated :
                 try :
-                    add_user_history_entry (get_user_login_from_current_user (),'search',session ['search_query'])
+                    scheduler .defer (add_user_history_entry ,get_user_login_from_current_user (),'search',session ['search_query'])
                 except Exception as _he :
                     print (f"[history] {_he }")
             return redirect (url_for ('main.requests_results'))
@@ -381,7 +400,7 @@ def requests ():
             session ['search_results']=fallback
             if current_user .is_authenticated :
                 try :
-                    add_user_history_entry (get_user_login_from_current_user (),'search',content )
+                    scheduler .defer (add_user_history_entry ,get_user_login_from_current_user (),'search',content )
                 except Exception as _he :
                     print (f"[history] {_he }")
             return redirect (url_for ('main.requests_results'))
@@ -491,7 +510,7 @@ def get_user_login_from_current_user ():
         return current_user .username 
 
 
-    from sc_client .client import get_link_content 
+    from service .utils .sc_pool import get_link_content 
     from sc_client .models import ScAddr 
 
     if isinstance (current_user .username ,ScAddr ):
@@ -501,76 +520,6 @@ def get_user_login_from_current_user ():
 
     return str (current_user .username )
 
-# Возвращение сохранённого тега темы.
-def get_or_create_topic_tags(topic_addr: int, title: str, description: str) -> list[dict]:
-    """
-    Возвращает сохранённые теги темы.
-    Если тегов ещё нет, автоматически определяет до 4 тегов и сохраняет их в SQLite.
-    """
-    saved_tags = get_topic_tags(topic_addr)
-
-    if saved_tags:
-        return saved_tags
-
-    detected_tags = classify_topic(title, description)
-
-    save_topic_tags(
-        topic_addr=topic_addr,
-        tags=detected_tags
-    )
-
-    return [
-        {
-            "key": tag["key"],
-            "label": tag["label"],
-            "confidence": tag["confidence"],
-            "matched_terms": ", ".join(tag.get("matched_terms", [])),
-            "is_primary": index == 0,
-        }
-        for index, tag in enumerate(detected_tags)
-    ]
-
-def build_topic_payload(ostis_instance, topic_addr_value):
-    topic_addr = topic_addr_value if isinstance(topic_addr_value, ScAddr) else ScAddr(topic_addr_value)
-
-    details = ostis_instance.get_topic_details(topic_addr)
-    messages = ostis_instance.get_topic_messages(topic_addr)
-
-    messages_text = " ".join(
-        message.get("content", "")
-        for message in messages[:3]
-    )
-
-    tags = get_or_create_topic_tags(
-        topic_addr=topic_addr.value,
-        title=details.get("title", ""),
-        description=details.get("description", "")
-    )
-
-    primary_tag = tags[0] if tags else None
-
-    return {
-        "addr": topic_addr.value,
-        "title": details.get("title", ""),
-        "author": details.get("author", ""),
-        "description": details.get("description", ""),
-        "messages_text": messages_text,
-        "tags": tags,
-        "primary_tag": primary_tag,
-        "tag_keys": [tag["key"] for tag in tags],
-    }
-
-
-def load_all_topics_with_details(ostis_instance):
-    raw_topics = ostis_instance.get_all_topics()
-    all_topics = []
-
-    for topic in raw_topics:
-        payload = build_topic_payload(ostis_instance, topic["addr"])
-        all_topics.append(payload)
-
-    return all_topics
-
 @main .route ("/test")
 @login_required 
 def test_page ():
@@ -615,33 +564,9 @@ def test_get_question ():
             if not question_addr :
                 return {'success':False ,'message':'Нет вопросов'},404 
 
-            import sc_client .client as client 
-            from sc_client .models import ScIdtfResolveParams ,ScTemplate 
-            from sc_client .constants import sc_types 
-
-
-            nrel_content =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ="nrel_content",type =sc_types .NODE_CONST_NOROLE )
-            )[0 ]
-
-
-            content_template =ScTemplate ()
-            content_template .quintuple (
-            question_addr ,
-            sc_types .EDGE_D_COMMON_VAR ,
-            sc_types .LINK_VAR >>"content_link",
-            sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-            nrel_content 
-            )
-
-            content_result =client .template_search (content_template )
-            question_text =str (question_addr .value )
-
-            if content_result and len (content_result )>0 :
-                content_link =content_result [0 ].get ("content_link")
-                content_data =client .get_link_content (content_link )
-                if content_data :
-                    question_text =content_data [0 ].data 
+            question_text =result .get ('question_text')or read_attributes ([question_addr ],['nrel_content'],default =None )[0 ]['nrel_content']
+            if not question_text :
+                question_text =str (question_addr .value )
 
             return {
             'success':True ,
@@ -723,10 +648,6 @@ def test_finish ():
 def test_get_answers (question_id ):
     """API: Получить варианты ответов для вопроса"""
     try :
-        import sc_client .client as client 
-        from sc_client .models import ScIdtfResolveParams ,ScAddr ,ScTemplate 
-        from sc_client .constants import sc_types 
-
         question_addr =ScAddr (int (question_id ))
         result =test_agent_get_answers (question_addr )
 
@@ -735,32 +656,15 @@ def test_get_answers (question_id ):
         if result ['status']=='valid':
             answers_list =[]
 
+            answers =result .get ('answers',[])
+            answer_addrs =[answer_item ['answer_addr']for answer_item in answers ]
+            if all ('text'in answer_item for answer_item in answers ):
+                answer_texts =[{'nrel_content':answer_item ['text']}for answer_item in answers ]
+            else :
+                answer_texts =read_attributes (answer_addrs ,['nrel_content'],default =None )
 
-            nrel_content =client .resolve_keynodes (
-            ScIdtfResolveParams (idtf ='nrel_content',type =sc_types .NODE_CONST_NOROLE )
-            )[0 ]
-
-            for answer_item in result .get ('answers',[]):
-                answer_addr =answer_item ['answer_addr']
-
-
-                answer_template =ScTemplate ()
-                answer_template .quintuple (
-                answer_addr ,
-                sc_types .EDGE_D_COMMON_VAR ,
-                sc_types .LINK_VAR >>"_answer_link",
-                sc_types .EDGE_ACCESS_VAR_POS_PERM ,
-                nrel_content 
-                )
-
-                answer_result =client .template_search (answer_template )
-
-                answer_text =str (answer_addr .value )
-                if answer_result and len (answer_result )>0 :
-                    answer_link =answer_result [0 ].get ("_answer_link")
-                    answer_content =client .get_link_content (answer_link )
-                    if answer_content and len (answer_content )>0 :
-                        answer_text =answer_content [0 ].data 
+            for answer_addr ,attrs in zip (answer_addrs ,answer_texts ):
+                answer_text =attrs ['nrel_content']or str (answer_addr .value )
 
                 answers_list .append ({
                 "id":str (answer_addr .value ),
@@ -787,17 +691,13 @@ def test_get_answers (question_id ):
 def forum():
     """Форум: вкладки, семантический поиск и режим категорий"""
     try:
-        from .agents.ostis import Ostis
-        from config import Config
-
         username = get_user_login_from_current_user()
         active_tab = request.args.get("tab", "recommendations")
         mode = request.args.get("mode", "normal")
         search_query = request.args.get("q", "").strip()
         selected_tag = request.args.get("tag", "all")
 
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        all_topics = load_all_topics_with_details(ostis_instance)
+        all_topics = topic_catalog.topics()
 
         if selected_tag != "all":
             filtered_topics = [
@@ -873,9 +773,6 @@ def forum_create_topic ():
 def forum_create_topic_post ():
     """Создание нового топика"""
     try :
-        from .agents .ostis import Ostis ,result 
-        from config import Config 
-
         title =request .form .get ('title')
         description =request .form .get ('description')
 
@@ -889,15 +786,13 @@ def forum_create_topic_post ():
             flash ('Пользователь не авторизован','error')
             return redirect (url_for ('main.auth'))
 
-        ostis_instance =Ostis (Config .OSTIS_URL )
-        response =ostis_instance .call_add_topic_agent (
-        action_name ="action_add_topic",
+        response =forum_agent ().add_topic (
         username =username ,
         title =title ,
         description =description 
         )
 
-        if response and response .get ('message')==result .SUCCESS :
+        if response ['status']==ForumStatus .VALID :
             flash ('Топик успешно создан!','success')
             return redirect (url_for ('main.forum'))
         else :
@@ -915,28 +810,25 @@ def forum_create_topic_post ():
 @login_required
 def forum_topic(topic_addr):
     try:
-        from .agents.ostis import Ostis
-        from config import Config
-
         sort_type = request.args.get('sort_type', 'by_date')
         filter_author = request.args.get('filter_author', '')
         filter_best = request.args.get('filter_best', 'false')
         filter_experts = request.args.get('filter_experts', 'false')
 
         topic_sc_addr = ScAddr(topic_addr)
-        ostis_instance = Ostis(Config.OSTIS_URL)
+        forum = forum_agent()
 
-        topic_details = ostis_instance.get_topic_details(topic_sc_addr)
-        messages = ostis_instance.get_topic_messages(topic_sc_addr)
-
-        topic_tags = get_or_create_topic_tags(
-            topic_addr=topic_addr,
-            title=topic_details.get("title", ""),
-            description=topic_details.get("description", "")
+        topic_details = forum.get_topic_details(topic_sc_addr)
+        messages = forum.get_topic_messages(topic_sc_addr)
 
-        )
+        # Страница и так читает все сообщения топика: каталог обновляется без лишних запросов
+        topic_entry = topic_catalog.update_messages(topic_addr, topic_details, messages)
+        if topic_entry is None:
+            flash('Топик не найден', 'error')
+            return redirect(url_for('main.forum'))
+        topic_tags = topic_entry["tags"]
         username = get_user_login_from_current_user()
-        save_topic_view(username, topic_addr)
+        scheduler.defer(save_topic_view, username, topic_addr)
         from_rec = request.args.get("from_rec")
         feedback_saved = request.args.get("feedback_saved")
 
@@ -961,37 +853,8 @@ def forum_topic(topic_addr):
         else:
             messages = sorted(messages, key=lambda m: m.get('addr', 0))
 
-        current_messages_text = " ".join(
-            message.get("content", "")
-            for message in messages[:3]
-        )
-
-        all_topics_raw = ostis_instance.get_all_topics()
-        all_topics = []
-
-        for topic in all_topics_raw:
-            other_topic_addr = ScAddr(topic["addr"])
-            details = ostis_instance.get_topic_details(other_topic_addr)
-            topic_messages = ostis_instance.get_topic_messages(other_topic_addr)
-
-            messages_text = " ".join(
-                message.get("content", "")
-                for message in topic_messages[:3]
-            )
-
-            all_topics.append({
-                "addr": topic["addr"],
-                "title": topic.get("title", ""),
-                "description": details.get("description", ""),
-                "messages_text": messages_text
-            })
-
-        current_topic_for_rec = {
-            "addr": topic_addr,
-            "title": topic_details.get("title", ""),
-            "description": topic_details.get("description", ""),
-            "messages_text": current_messages_text
-        }
+        all_topics = topic_catalog.topics()
+        current_topic_for_rec = topic_entry
 
         recommendations = build_recommendations(
             current_topic_for_rec,
@@ -1041,7 +904,8 @@ def recommendation_feedback():
                 feedback_saved='0'
             ))
 
-        save_feedback(
+        scheduler.defer(
+            save_feedback,
             username=username,
             source_topic_addr=source_topic_addr,
             recommended_topic_addr=recommended_topic_addr,
@@ -1068,8 +932,6 @@ def recommendation_feedback():
 def forum_add_message(topic_addr):
     import base64
     try:
-        from .agents.ostis import Ostis, result
-        from config import Config
         from .utils.profanity_filter import censor_text
 
         message_text = request.form.get('message')
@@ -1099,9 +961,7 @@ def forum_add_message(topic_addr):
                 image_base64 = base64.b64encode(file.read()).decode('utf-8')
 
         topic_sc_addr = ScAddr(topic_addr)
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        response = ostis_instance.call_add_message_agent(
-            action_name='action_add_message',
+        response = forum_agent().add_message(
             username=username,
             topic_addr=topic_sc_addr,
             message_text=censored_text,
@@ -1110,7 +970,7 @@ def forum_add_message(topic_addr):
             image_mime=image_mime
         )
 
-        if response and response.get('message') == result.SUCCESS:
+        if response['status'] == ForumStatus.VALID:
             flash('Сообщение добавлено!', 'success')
         else:
             flash('Ошибка при добавлении сообщения', 'error')
@@ -1124,9 +984,6 @@ def forum_add_message(topic_addr):
 @login_required
 def forum_rate_message(topic_addr, message_addr):
     try:
-        from .agents.ostis import Ostis
-        from config import Config
-
         rating_type = request.form.get('rating_type')
         print(f"DEBUG rate: topic={topic_addr}, message={message_addr}, type={rating_type}")
 
@@ -1140,14 +997,12 @@ def forum_rate_message(topic_addr, message_addr):
         if vote_key in session['votes']:
             return {'status': 'already_voted', 'voted': session['votes'][vote_key]}, 200
 
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        response = ostis_instance.call_rate_message_agent(
-            action_name='action_rate_message',
+        response = forum_agent().rate_message(
             message_addr=ScAddr(message_addr),
             rating_type=rating_type
         )
 
-        if response:
+        if response['status'] == ForumStatus.VALID:
             session['votes'][vote_key] = rating_type
             session.modified = True
             return {'status': 'ok'}, 200
@@ -1175,16 +1030,11 @@ def delete_message():
         if not message_addr:
             return {'success': False, 'message': 'Не указан message_addr'}, 400
 
-        from .agents.ostis import Ostis
-        from config import Config
-
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        response = ostis_instance.call_delete_message_agent(
-            action_name="action_delete_message",
+        response = forum_agent().delete_message(
             message_addr=ScAddr(int(message_addr))
         )
 
-        if response and response.get('message') == result.SUCCESS:
+        if response['status'] == ForumStatus.VALID:
             return {'success': True}, 200
         return {'success': False, 'message': 'Агент вернул FAILURE'}, 500
 
@@ -1202,12 +1052,9 @@ def api_forum_search():
         return {'results': []}
 
     try:
-        from .agents.ostis import Ostis
-        from config import Config
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        all_topics = ostis_instance.get_all_topics()
         results = [
-            t for t in all_topics
+            {'addr': t['addr'], 'title': t['title'], 'author': t['author']}
+            for t in topic_catalog.topics()
             if query in (t.get('title') or '').lower()
         ]
         return {'results': results}
@@ -1225,17 +1072,12 @@ def edit_message():
         if not message_addr or not new_text:
             return {'success': False, 'message': 'Не указан message_addr или текст'}, 400
 
-        from .agents.ostis import Ostis
-        from config import Config
-
-        ostis_instance = Ostis(Config.OSTIS_URL)
-        response = ostis_instance.call_edit_message_agent(
-            action_name="action_edit_message",
+        response = forum_agent().edit_message(
             message_addr=ScAddr(int(message_addr)),
             new_text=new_text
         )
 
-        if response and response.get('message') == result.SUCCESS:
+        if response['status'] == ForumStatus.VALID:
             return {'success': True}, 200
         return {'success': False, 'message': 'Агент вернул FAILURE'}, 500
 
@@ -1388,3 +1230,45 @@ def api_search_articles():
         for item in matches
     ]
     return jsonify({'results': articles})
+
+
+@main.route('/api/sc/subscriptions', methods=['GET'])
+def api_sc_subscriptions():
+    """Открытые подписки на события sc-сервера (для мониторинга утечек)."""
+    return jsonify(subscription_gauge.snapshot())
+
+
+@main.route('/health', methods=['GET'])
+def health():
+    """Состояние связи с sc-сервером: подключение, пул соединений, предохранитель, таймауты действий и очереди планировщика."""
+    breaker = agent_breaker.snapshot()
+    if uses_sc_server():
+        connected = is_connected()
+        healthy = connected and breaker['state'] == CLOSED
+        sc_server = {'connected': connected}
+    else:
+        # Агенты в памяти процесса: подключение и предохранитель к ним не относятся
+        healthy = True
+        sc_server = {'connected': None, 'applicable': False}
+    return jsonify({
+        'status': 'ok' if healthy else 'degraded',
+        'sc_server': sc_server,
+        'pool': sc_pool.snapshot(),
+        'circuit_breaker': breaker,
+        'action_timeouts': action_timeouts.snapshot(),
+        'reaper': action_reaper.snapshot(),
+        'interned_links': interned_links.snapshot(),
+        'single_flight': single_flight.snapshot(),
+        'agent_cache': agent_caches.snapshot(),
+        'scheduler': scheduler.snapshot(),
+        'user_directory': user_directory.snapshot(),
+        'user_loader': user_loader.snapshot(),
+        'author_display': author_displays.snapshot(),
+        'topic_catalog': topic_catalog.snapshot(),
+    }), 200 if healthy else 503
+
+
+@main.route('/metrics', methods=['GET'])
+def metrics():
+    """Метрики вызовов агентов, запросов к sc-серверу и HTTP-запросов в формате Prometheus."""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,49 @@
+import sc_client.client as client
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr
+
+from service.utils.keynode_registry import keynodes
+from service.utils.ostis_utils import ActionNode, build_action, initiate_action
+
+
+def _capture_writes(monkeypatch):
+    writes = []
+
+    def generate_elements(construction):
+        writes.append(construction)
+        return [ScAddr(1000 + i) for i in range(len(construction.commands))]
+
+    monkeypatch.setattr(client, 'generate_elements', generate_elements)
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: ScAddr(abs(hash(idtf)) % 1000 + 1))
+    return writes
+
+
+def test_action_is_built_and_initiated_in_two_writes(monkeypatch):
+    writes = _capture_writes(monkeypatch)
+    user = ScAddr(42)
+
+    action = build_action(ScAddr(7), [user, 'title', None, ActionNode(classes=(ScAddr(8),))])
+    initiate_action(action)
+
+    assert len(writes) == 2
+    structure = writes[0]
+    assert action == ScAddr(1000)
+    # action node + class arc, rrel_1 (2 arcs), rrel_2 (link + 2 arcs), rrel_4 (node + class arc + 2 arcs)
+    assert len(structure.commands) == 2 + 2 + 3 + 4
+    assert 'arg_3' not in ''.join(structure.aliases)
+    assert len(writes[1].commands) == 1
+
+
+def test_nested_node_members_and_system_idtf(monkeypatch):
+    writes = _capture_writes(monkeypatch)
+    date = ActionNode(
+        sc_type=sc_types.NODE_CONST_TUPLE,
+        members=((ScAddr(9), ActionNode(system_idtf=12)),),
+    )
+
+    build_action(ScAddr(7), [date])
+
+    aliases = writes[0].aliases
+    assert '_arg_1' in aliases
+    assert '_arg_1_0_idtf' in aliases
+    assert '_arg_1_0_idtf_arc' in aliases
@@ -0,0 +1,29 @@
+import threading
+
+from sc_client.models import ScAddr
+
+from service.utils.action_completion import CompletionRegistry
+
+
+def test_concurrent_actions_receive_own_results():
+    registry = CompletionRegistry()
+    first, second = ScAddr(101), ScAddr(102)
+    first_future = registry.register(first)
+    second_future = registry.register(second)
+
+    threading.Thread(target=registry.resolve, args=(second, {"message": "second"})).start()
+    threading.Thread(target=registry.resolve, args=(first, {"message": "first"})).start()
+
+    assert first_future.result(timeout=1) == {"message": "first"}
+    assert second_future.result(timeout=1) == {"message": "second"}
+    assert registry.pending() == 0
+
+
+def test_resolve_after_discard_is_ignored():
+    registry = CompletionRegistry()
+    action = ScAddr(103)
+    future = registry.register(action)
+    registry.discard(action)
+
+    assert registry.resolve(action, {"message": "late"}) is False
+    assert future.cancelled()
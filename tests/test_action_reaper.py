@@ -0,0 +1,78 @@
+from sc_client.models import ScAddr
+
+from service.utils.action_reaper import FINISHED_CLASSES, ActionReaper, client
+from service.utils.keynode_registry import keynodes
+from service.utils.metrics import action_reaper_dropped_total
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_expired_actions_are_erased_in_bounded_batches(monkeypatch):
+    erased = []
+    monkeypatch.setattr(client, 'is_connected', lambda: True)
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: ScAddr(1))
+    monkeypatch.setattr(client, 'template_search', lambda template, params=None: [])
+    monkeypatch.setattr(client, 'erase_elements', lambda *addrs: erased.append(addrs) or True)
+
+    clock = FakeClock()
+    reaper = ActionReaper(max_age=60, batch_size=2, interval=10,
+                          temporary_arguments=['action_authentication'], clock=clock)
+    reaper.track('action_authentication', ScAddr(10), [ScAddr(11), ScAddr(12)])
+    reaper.track('action_user_registration', ScAddr(20), [ScAddr(21)])
+    reaper.track('action_authentication', ScAddr(30), [ScAddr(31)])
+
+    assert reaper.reap() == 0
+    clock.now = 61
+
+    assert reaper.reap() == 4
+    assert erased == [(ScAddr(10), ScAddr(11), ScAddr(12), ScAddr(20))]
+    assert reaper.reap() == 2
+    assert reaper.snapshot() == {
+        'queued': 0, 'reclaimed_actions': 3, 'reclaimed_elements': 6, 'failed_batches': 0,
+        'dropped': 0, 'rediscovered': 0,
+    }
+
+
+class FakeResult:
+    def __init__(self, **aliases):
+        self.aliases = aliases
+
+    def get(self, alias):
+        return self.aliases[alias]
+
+
+def test_overflow_is_counted_and_finished_actions_are_rediscovered(monkeypatch):
+    addrs = {idtf: ScAddr(index) for index, idtf in enumerate(FINISHED_CLASSES + ('action_search',), start=1)}
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: addrs.get(idtf, ScAddr(99)))
+    # Поиск по классу завершения: сначала действия с классами, затем sc-link их аргументов.
+    # Завершены успешно действия 40 и 50 класса action_search; 50 уже в очереди
+    replies = {addrs['action_finished_successfully'].value: [
+        [FakeResult(_action=ScAddr(value), _class=addrs['action_search']) for value in (40, 50)],
+        [FakeResult(_action=ScAddr(40), _link=ScAddr(41))],
+    ]}
+
+    def template_search(template, params=None):
+        source = template.triple_list[0].source.value.value
+        return replies[source].pop(0) if replies.get(source) else []
+
+    monkeypatch.setattr(client, 'template_search', template_search)
+
+    clock = FakeClock()
+    dropped = action_reaper_dropped_total.value()
+    reaper = ActionReaper(max_age=60, batch_size=10, interval=10,
+                          temporary_arguments=['action_search'], max_queue=2, clock=clock)
+    for value in (10, 20, 50):
+        reaper.track('action_user_registration', ScAddr(value))
+    assert reaper.snapshot()['queued'] == 2
+    assert reaper.snapshot()['dropped'] == 1
+    assert action_reaper_dropped_total.value() == dropped + 1
+
+    reaper._queue.popleft()
+    assert reaper.rediscover() == 1
+    assert [(entry[1], entry[2]) for entry in reaper._queue] == [(ScAddr(50), ()), (ScAddr(40), (ScAddr(41),))]
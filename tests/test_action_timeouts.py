@@ -0,0 +1,34 @@
+from service.utils.action_timeouts import ActionTimeouts
+
+
+def make_timeouts(**overrides):
+    return ActionTimeouts(floor=2, ceiling=30, headroom=2, min_samples=5, window=50, overrides=overrides)
+
+
+def test_default_is_used_until_enough_samples():
+    timeouts = make_timeouts()
+    for _ in range(4):
+        timeouts.observe('action_search', 0.1)
+
+    assert timeouts.timeout_for('action_search', 10) == 10
+    assert timeouts.timeout_for('action_search', 60) == 30
+
+
+def test_timeout_follows_p99_within_bounds():
+    timeouts = make_timeouts()
+    for seconds in [1.0] * 98 + [4.0, 4.0]:
+        timeouts.observe('action_user_request', seconds)
+    for _ in range(10):
+        timeouts.observe('action_search', 0.05)
+
+    assert timeouts.timeout_for('action_user_request', 30) == 8.0
+    assert timeouts.timeout_for('action_search', 10) == 2
+    assert timeouts.snapshot()['action_user_request']['p50'] == 1.0
+
+
+def test_override_takes_precedence():
+    timeouts = make_timeouts(action_search=15.0)
+    for _ in range(10):
+        timeouts.observe('action_search', 0.05)
+
+    assert timeouts.timeout_for('action_search', 10) == 15.0
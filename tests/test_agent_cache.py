@@ -0,0 +1,82 @@
+from service.agent_factory import build_agent
+from service.utils import agent_cache
+from service.utils.agent_cache import CachingAgent, agent_caches
+
+
+class CountingRequestAgent:
+    def __init__(self):
+        self.calls = []
+
+    def request_agent(self, content):
+        self.calls.append(content)
+        status = 'invalid' if content == 'timeout' else 'valid'
+        return {'status': status, 'message': [content.upper()]}
+
+    def request_agents(self, contents):
+        self.calls.append(tuple(contents))
+        return [{'status': 'valid', 'message': [content.upper()]} for content in contents]
+
+
+class CountingEventAgent:
+    def __init__(self):
+        self.calls = 0
+
+    def show_event_agent(self, username):
+        self.calls += 1
+        return {'status': 'Valid', 'message': [username]}
+
+    def events_by_date(self, username, date):
+        self.calls += 1
+        return None
+
+
+def test_agent_is_wrapped_by_decorator_spec():
+    spec = ('tests.test_agent_cache.CountingRequestAgent',
+            ('service.utils.agent_cache.CachingAgent', {'ttl': 60, 'maxsize': 2}))
+    agent = build_agent('user_request_agent', spec)
+
+    assert isinstance(agent, CachingAgent)
+    assert agent.request_agent('договор') == agent.request_agent('договор')
+    # По-разному записанный термин — отдельный вызов агента
+    assert agent.request_agent('Договор ')['message'] == ['ДОГОВОР ']
+    agent.request_agent('timeout')
+    agent.request_agent('timeout')
+    assert agent.agent.calls == ['договор', 'Договор ', 'timeout', 'timeout']
+
+    # Пакетный вызов передаёт агенту только отсутствующие в кэше термины
+    results = agent.request_agents(['договор', 'иск'])
+    assert [result['message'] for result in results] == [['ДОГОВОР'], ['ИСК']]
+    assert agent.agent.calls[-1] == ('иск',)
+
+    # LRU на две записи: самая старая вытесняется
+    agent.request_agent('штраф')
+    agent.request_agent('договор')
+    assert agent.agent.calls[-1] == 'договор'
+
+
+def test_entries_expire_and_are_invalidated_by_argument(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(agent_cache.time, 'monotonic', lambda: now[0])
+    agent = CachingAgent(CountingEventAgent(), name='show_event_agent', ttl=30, maxsize=10)
+
+    agent.show_event_agent('a@example.by')
+    agent.show_event_agent('b@example.by')
+    agent.show_event_agent('a@example.by')
+    assert agent.agent.calls == 2
+
+    assert agent_caches.invalidate('show_event_agent', 'a@example.by') == 1
+    agent.show_event_agent('a@example.by')
+    agent.show_event_agent('b@example.by')
+    assert agent.agent.calls == 3
+
+    now[0] += 31
+    agent.show_event_agent('b@example.by')
+    assert agent.agent.calls == 4
+
+
+def test_empty_results_are_not_cached():
+    agent = CachingAgent(CountingEventAgent(), name='show_event_agent', ttl=30, maxsize=10)
+
+    assert agent.events_by_date('a@example.by', '2026-10-18') is None
+    assert agent.events_by_date('a@example.by', '2026-10-18') is None
+    assert agent.agent.calls == 2
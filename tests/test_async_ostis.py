@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+import sc_client.client as client
+from sc_client.models import ScAddr
+
+from service.agents import async_ostis
+from service.agents.async_ostis import AsyncOstis
+from service.agents.ostis import Ostis
+from service.exceptions import AgentError
+from service.utils import action_call
+from service.utils.action_completion import completions
+from service.utils.keynode_registry import keynodes
+
+
+@pytest.fixture()
+def fake_server(monkeypatch):
+    """Действия завершаются агентом в отдельном потоке сразу после инициирования."""
+    actions = iter(range(500, 600))
+    replies = {}
+
+    def build_action_structure(action_class, arguments):
+        action = ScAddr(next(actions))
+        replies[action.value] = arguments[0]
+        return action, []
+
+    def initiate_action(action):
+        reply = replies[action.value]
+        if reply is not None:
+            threading.Timer(0.05, completions.resolve, args=(action, {"message": reply})).start()
+
+    monkeypatch.setattr(async_ostis, 'is_connected', lambda: True)
+    monkeypatch.setattr(action_call, 'build_action_structure', build_action_structure)
+    monkeypatch.setattr(action_call, 'initiate_action', initiate_action)
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: ScAddr(1))
+    monkeypatch.setattr(client, 'events_create', lambda *params: ['subscription'])
+    monkeypatch.setattr(client, 'events_destroy', lambda *subs: True)
+
+
+def test_invocations_run_concurrently(fake_server):
+    ostis = AsyncOstis()
+
+    first, second = AsyncOstis.run(
+        ostis.invoke("action_user_request", ["first"]),
+        ostis.invoke("action_user_request", ["second"]),
+    )
+
+    assert first == {"message": "first"}
+    assert second == {"message": "second"}
+
+
+def test_invoke_times_out_with_agent_error(fake_server):
+    with pytest.raises(AgentError):
+        asyncio.run(AsyncOstis().invoke("action_user_request", [None], timeout=0.1))
+    assert completions.pending() == 0
+
+
+def test_sync_invoke_shares_the_pipeline(fake_server, monkeypatch):
+    tracked = []
+    monkeypatch.setattr(action_call.action_reaper, 'track', lambda *args: tracked.append(args[0]))
+
+    assert Ostis("ws://test").invoke("action_user_request", ["sync"]) == {"message": "sync"}
+    with pytest.raises(AgentError):
+        asyncio.run(AsyncOstis().invoke("action_user_request", [None], timeout=0.1))
+    assert tracked == ["action_user_request", "action_user_request"]
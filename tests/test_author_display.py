@@ -0,0 +1,66 @@
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand
+from sc_client.models import ScConstruction, ScIdtfResolveParams
+
+from service.utils import author_display as author_module
+from service.utils.author_display import AuthorDisplayCache
+from service.utils.fake_sc import FakeScServer
+from service.utils.sc_pool import ScConnection
+
+
+class Client:
+    def __init__(self, connection):
+        self.connection = connection
+        self.searches = 0
+
+    def template_search(self, template, params=None):
+        self.searches += 1
+        return self.connection.execute(ClientCommand.SEARCH_BY_TEMPLATE, template, params)
+
+
+def test_authors_are_loaded_in_bulk_cached_and_invalidated(monkeypatch):
+    with FakeScServer() as server:
+        connection = ScConnection(server.url, 'test')
+        assert connection.connect(5)
+        idtfs = ('concept_specialist', 'nrel_selected_answers', 'concept_correct_answer')
+        params = [ScIdtfResolveParams(idtf=idtf, type=sc_types.NODE_CONST_CLASS) for idtf in idtfs]
+        keynodes = dict(zip(idtfs, connection.execute(ClientCommand.SEARCH_KEYNODES, *params)))
+
+        construction = ScConstruction()
+        construction.generate_node(sc_types.NODE_CONST, '_specialist')
+        construction.generate_node(sc_types.NODE_CONST, '_client')
+        construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['concept_specialist'], '_specialist')
+        construction.generate_node(sc_types.NODE_CONST, '_answers')
+        construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_specialist', '_answers', '_pair')
+        construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['nrel_selected_answers'], '_pair')
+        for index in range(7):
+            construction.generate_node(sc_types.NODE_CONST, f'_answer{index}')
+            construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, '_answers', f'_answer{index}')
+            if index < 5:
+                construction.generate_connector(
+                    sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['concept_correct_answer'], f'_answer{index}')
+        specialist, client_user = connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[:2]
+
+        client = Client(connection)
+        emails = {specialist.value: 'expert@example.by', client_user.value: 'client@example.by'}
+        monkeypatch.setattr(author_module, 'client', client)
+        monkeypatch.setattr(author_module, 'keynodes', keynodes)
+        monkeypatch.setattr(author_module, 'read_attributes', lambda nodes, relations, default='': [
+            {'nrel_system_identifier': emails[node.value]} for node in nodes])
+
+        cache = AuthorDisplayCache(ttl=60, maxsize=10)
+        displays = cache.displays([specialist, client_user, specialist])
+        assert displays == {
+            specialist.value: 'expert@example.by (Специалист, второй ранг)',
+            client_user.value: 'client@example.by (Клиент)',
+        }
+        # Проверка класса на каждого автора и один поиск правильных ответов специалиста
+        assert client.searches == 3
+
+        assert cache.display(specialist) == 'expert@example.by (Специалист, второй ранг)'
+        assert client.searches == 3
+
+        assert cache.invalidate('expert@example.by') == 1
+        cache.display(specialist)
+        assert client.searches == 5
+        connection.close()
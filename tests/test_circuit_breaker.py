@@ -0,0 +1,53 @@
+import pytest
+
+from service.exceptions import AgentError, ParseDataError, ScServerError
+from service.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail(breaker, error):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+
+def test_opens_after_consecutive_timeouts_and_recovers_after_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+
+    for _ in range(3):
+        fail(breaker, AgentError(524, "Timeout"))
+    assert breaker.state == OPEN
+    with pytest.raises(ScServerError):
+        breaker.before_call()
+
+    clock.now = 31
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(ScServerError):
+        breaker.before_call()
+    breaker.record()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_and_client_errors_are_ignored():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    fail(breaker, ParseDataError(666, "Failed to parse args"))
+    fail(breaker, ParseDataError(666, "Failed to parse args"))
+    assert breaker.state == CLOSED
+
+    fail(breaker, ConnectionAbortedError())
+    fail(breaker, ScServerError())
+    clock.now = 11
+    fail(breaker, AgentError(524, "Timeout"))
+    assert breaker.state == OPEN
+    assert breaker.snapshot()['trips'] == 2
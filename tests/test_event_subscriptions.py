@@ -0,0 +1,30 @@
+import pytest
+import sc_client.client as client
+
+from service.utils.event_subscriptions import SubscriptionGauge, event_subscription, subscription_gauge
+
+
+def test_gauge_tracks_open_and_failed_subscriptions():
+    gauge = SubscriptionGauge()
+    gauge.opened()
+    gauge.opened()
+    gauge.closed(destroyed=True)
+    gauge.closed(destroyed=False)
+
+    # Неудалённая подписка остаётся открытой на sc-сервере
+    assert gauge.snapshot() == {'open': 1, 'peak': 2, 'created': 2, 'failed_destroys': 1}
+
+
+def test_subscription_destroyed_on_error(monkeypatch):
+    destroyed = []
+    monkeypatch.setattr(client, 'events_create', lambda *params: ['subscription'])
+    monkeypatch.setattr(client, 'events_destroy', lambda *subs: destroyed.extend(subs) or True)
+    before = subscription_gauge.open
+
+    with pytest.raises(TimeoutError):
+        with event_subscription(None, callback=None):
+            assert subscription_gauge.open == before + 1
+            raise TimeoutError
+
+    assert destroyed == ['subscription']
+    assert subscription_gauge.open == before
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand, ScEventType
+from sc_client.models import (
+    ScConstruction,
+    ScEventSubscriptionParams,
+    ScIdtfResolveParams,
+    ScLinkContent,
+    ScLinkContentType,
+    ScTemplate,
+)
+
+from service.utils.fake_sc import FakeScServer
+from service.utils.sc_pool import ScConnection
+
+
+@pytest.fixture
+def connection():
+    with FakeScServer() as server:
+        connection = ScConnection(server.url, 'test')
+        assert connection.connect(5)
+        yield server, connection
+        connection.close()
+
+
+def keynodes(connection, *idtfs):
+    params = [ScIdtfResolveParams(idtf=idtf, type=sc_types.NODE_CONST_CLASS) for idtf in idtfs]
+    return connection.execute(ClientCommand.SEARCH_KEYNODES, *params)
+
+
+def test_template_search_and_link_content(connection):
+    _, connection = connection
+    concept, relation = keynodes(connection, 'concept_topic', 'nrel_topic_title')
+    construction = ScConstruction()
+    construction.generate_node(sc_types.NODE_CONST, '_topic')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, concept, '_topic')
+    construction.generate_link(sc_types.LINK_CONST, ScLinkContent('Заголовок', ScLinkContentType.STRING), '_title')
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_topic', '_title', '_pair')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, relation, '_pair')
+    topic = connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[0]
+
+    template = ScTemplate()
+    template.triple(concept, sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> '_topic')
+    template.quintuple('_topic', sc_types.EDGE_D_COMMON_VAR, sc_types.LINK_VAR >> '_title',
+                       sc_types.EDGE_ACCESS_VAR_POS_PERM, relation)
+    results = connection.execute(ClientCommand.SEARCH_BY_TEMPLATE, template, None)
+
+    assert [result.get('_topic') for result in results] == [topic]
+    content = connection.execute(ClientCommand.GET_LINK_CONTENT, results[0].get('_title'))
+    assert content[0].data == 'Заголовок'
+
+
+def test_initiated_action_is_finished_by_agent_script(connection):
+    server, connection = connection
+    action_class, initiated, succeeded, rrel_1, rrel_2 = keynodes(
+        connection, 'action_add_topic', 'action_initiated', 'action_finished_successfully', 'rrel_1', 'rrel_2')
+    construction = ScConstruction()
+    construction.generate_node(sc_types.NODE_CONST, '_action')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, action_class, '_action')
+    construction.generate_node(sc_types.NODE_CONST, '_user')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, '_action', '_user', '_arg1')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, rrel_1, '_arg1')
+    construction.generate_link(sc_types.LINK_CONST, ScLinkContent('Новый топик', ScLinkContentType.STRING), '_title')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, '_action', '_title', '_arg2')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, rrel_2, '_arg2')
+    action = connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[0]
+
+    finished = threading.Event()
+
+    def on_arc(_, __, source):
+        if source == succeeded:
+            finished.set()
+
+    subscriptions = connection.execute(
+        ClientCommand.CREATE_EVENT_SUBSCRIPTIONS,
+        ScEventSubscriptionParams(action, ScEventType.AFTER_GENERATE_INCOMING_ARC, on_arc),
+    )
+    construction = ScConstruction()
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, initiated, action)
+    connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)
+
+    assert finished.wait(5)
+    assert connection.execute(ClientCommand.SEARCH_LINKS_BY_CONTENT, 'Новый топик')[0]
+    assert server.snapshot()['actions'] == 1
+    connection.execute(ClientCommand.DESTROY_EVENT_SUBSCRIPTIONS, *subscriptions)
@@ -0,0 +1,104 @@
+import pytest
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand
+from sc_client.models import ScConstruction, ScIdtfResolveParams, ScLinkContent, ScLinkContentType
+
+from service.agents import ostis as ostis_module
+from service.agents.ostis import Ostis
+from service.utils.fake_sc import FakeScServer
+from service.utils.sc_pool import ScConnection
+
+KEYNODES = (
+    'concept_topic', 'concept_message', 'concept_user', 'concept_verified_user', 'nrel_author',
+    'nrel_message_attachment', 'nrel_attachment_data', 'nrel_attachment_mime',
+)
+
+
+class Client:
+    def __init__(self, connection):
+        self.connection = connection
+        self.calls = []
+
+    def template_search(self, template, params=None):
+        self.calls.append('search')
+        return self.connection.execute(ClientCommand.SEARCH_BY_TEMPLATE, template, params)
+
+    def get_link_content(self, *links):
+        self.calls.append('content')
+        return self.connection.execute(ClientCommand.GET_LINK_CONTENT, *links)
+
+
+@pytest.fixture
+def forum(monkeypatch):
+    with FakeScServer() as server:
+        connection = ScConnection(server.url, 'test')
+        assert connection.connect(5)
+        params = [ScIdtfResolveParams(idtf=idtf, type=sc_types.NODE_CONST_CLASS) for idtf in KEYNODES]
+        keynodes = dict(zip(KEYNODES, connection.execute(ClientCommand.SEARCH_KEYNODES, *params)))
+        client = Client(connection)
+        monkeypatch.setattr(ostis_module, 'client', client)
+        monkeypatch.setattr(ostis_module, 'keynodes', keynodes)
+        yield connection, keynodes, client
+
+
+def link(text):
+    return ScLinkContent(text, ScLinkContentType.STRING)
+
+
+def relate(construction, source, target, relation, alias):
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, source, target, alias)
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, relation, alias)
+
+
+def test_topic_attachments_are_read_in_one_search(forum):
+    connection, keynodes, client = forum
+    construction = ScConstruction()
+    construction.generate_node(sc_types.NODE_CONST, '_topic')
+    for index in range(3):
+        construction.generate_node(sc_types.NODE_CONST, f'_message{index}')
+    for index in range(3):
+        construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, '_topic', f'_message{index}')
+    # Сообщение 0: картинка с типом, сообщение 1: данные без типа, сообщение 2 без вложения
+    for index, mime in ((0, 'image/png'), (1, None)):
+        construction.generate_node(sc_types.NODE_CONST, f'_attach{index}')
+        relate(construction, f'_message{index}', f'_attach{index}', keynodes['nrel_message_attachment'], f'_a{index}')
+        construction.generate_link(sc_types.LINK_CONST, link(f'data{index}'), f'_data{index}')
+        relate(construction, f'_attach{index}', f'_data{index}', keynodes['nrel_attachment_data'], f'_d{index}')
+        if mime:
+            construction.generate_link(sc_types.LINK_CONST, link(mime), f'_mime{index}')
+            relate(construction, f'_attach{index}', f'_mime{index}', keynodes['nrel_attachment_mime'], f'_m{index}')
+    topic, first, second, _ = connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[:4]
+
+    attachments = Ostis('ws://test')._topic_attachments(topic)
+
+    assert attachments == {first.value: ('data0', 'image/png'), second.value: ('data1', None)}
+    assert client.calls == ['search', 'content']
+
+
+def test_topic_authors_are_found_with_one_search_per_user_class(forum):
+    connection, keynodes, client = forum
+    construction = ScConstruction()
+    construction.generate_node(sc_types.NODE_CONST, '_topic')
+    for index in range(3):
+        construction.generate_node(sc_types.NODE_CONST, f'_message{index}')
+    construction.generate_node(sc_types.NODE_CONST, '_user')
+    construction.generate_node(sc_types.NODE_CONST, '_verified')
+    construction.generate_node(sc_types.NODE_CONST, '_other')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['concept_user'], '_user')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['concept_verified_user'], '_verified')
+    for index in range(3):
+        construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, '_topic', f'_message{index}')
+        construction.generate_connector(
+            sc_types.EDGE_ACCESS_CONST_POS_PERM, keynodes['concept_message'], f'_message{index}')
+    # Сообщение 0 от обычного пользователя, 1 от подтверждённого, у 2 связь только с узлом не-пользователем
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_message0', '_user')
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_message1', '_verified')
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_message2', '_other')
+    topic, first, second, _, user, verified = connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[:6]
+
+    authors = Ostis('ws://test')._topic_authors(topic)
+
+    assert {message: author.value for message, author in authors.items()} == {
+        first.value: user.value, second.value: verified.value,
+    }
+    assert client.calls == ['search', 'search']
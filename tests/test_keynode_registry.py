@@ -0,0 +1,99 @@
+import pytest
+from flask import Flask
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand
+from sc_client.constants.exceptions import InvalidValueError
+
+from service.utils import keynode_registry as registry_module
+from service.utils.fake_sc import FakeScServer
+from service.utils.keynode_registry import HITS_HEADER, KeynodeRegistry
+from service.utils.sc_pool import ScConnection
+
+
+class Client:
+    def __init__(self, connection):
+        self.connection = connection
+        self.connected = True
+        self.resolves = []
+        self.reconnect_handler = None
+
+    def is_connected(self):
+        return self.connected
+
+    def resolve_keynodes(self, *params):
+        self.resolves.append([param['idtf'] for param in params])
+        return self.connection.execute(ClientCommand.SEARCH_KEYNODES, *params)
+
+    def set_reconnect_handler(self, post_reconnect_handler=None, **_):
+        self.reconnect_handler = post_reconnect_handler
+
+
+DECLARED = {
+    'concept_topic': sc_types.NODE_CONST_CLASS,
+    'nrel_author': sc_types.NODE_CONST_NOROLE,
+    'concept_absent': None,
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    with FakeScServer() as server:
+        connection = ScConnection(server.url, 'test')
+        assert connection.connect(5)
+        client = Client(connection)
+        monkeypatch.setattr(registry_module, 'client', client)
+        yield client
+
+
+def test_declared_keynodes_are_resolved_in_one_batch(client):
+    keynodes = KeynodeRegistry(DECLARED)
+    topic = keynodes['concept_topic']
+    assert topic.is_valid()
+    assert keynodes['nrel_author'].is_valid()
+    assert keynodes.resolve('concept_topic') == topic
+    assert client.resolves == [list(DECLARED)]
+    assert keynodes.hits_total == 3
+
+    # Узел без типа не создаётся: поиск идёт отдельным запросом и падает
+    with pytest.raises(InvalidValueError):
+        keynodes['concept_absent']
+    assert client.resolves[-1] == ['concept_absent']
+
+
+def test_unknown_keynode_is_resolved_once_and_kept(client):
+    keynodes = KeynodeRegistry(DECLARED)
+    keynodes.refresh()
+    addr = keynodes.resolve('concept_extra', sc_types.NODE_CONST_CLASS)
+    assert addr.is_valid()
+    assert client.resolves[-1] == ['concept_extra']
+    assert keynodes['concept_extra'] == addr
+    assert len(client.resolves) == 2
+
+    # После переподключения таблица перестраивается вместе с добавленным узлом
+    app = Flask(__name__)
+    keynodes.init_app(app)
+    client.reconnect_handler()
+    assert client.resolves[-1] == list(DECLARED) + ['concept_extra']
+    assert keynodes['concept_extra'] == addr
+
+
+def test_table_hits_are_reported_in_response_header(client):
+    keynodes = KeynodeRegistry(DECLARED)
+    app = Flask(__name__)
+    keynodes.init_app(app)
+
+    @app.route('/')
+    def index():
+        keynodes['concept_topic']
+        keynodes['nrel_author']
+        return ''
+
+    response = app.test_client().get('/')
+    assert response.headers[HITS_HEADER] == '2'
+
+
+def test_refresh_is_skipped_while_disconnected(client):
+    client.connected = False
+    keynodes = KeynodeRegistry(DECLARED)
+    keynodes.refresh()
+    assert client.resolves == []
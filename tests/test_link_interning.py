@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sc_client.models import ScAddr
+
+from service.utils.action_reaper import ActionReaper
+from service.utils.keynode_registry import keynodes
+from service.utils.link_interning import LinkInterner, client
+
+
+class FakeResult:
+    def __init__(self, **aliases):
+        self.aliases = aliases
+
+    def get(self, alias):
+        return self.aliases[alias]
+
+
+def test_literal_links_are_reused_and_never_reaped(monkeypatch):
+    interned_class = ScAddr(5)
+    created = iter(range(300, 400))
+    writes = []
+    # sc-link 200 с текстом "like" уже есть, но не принадлежит классу общих sc-link
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: interned_class)
+    monkeypatch.setattr(client, 'search_links_by_contents', lambda *contents: [[ScAddr(200)]])
+    monkeypatch.setattr(client, 'template_search', lambda template, params=None: [])
+    monkeypatch.setattr(client, 'generate_elements',
+                        lambda construction: writes.append(construction) or [ScAddr(next(created)), ScAddr(0)])
+
+    interner = LinkInterner(capacity=1)
+    like = interner.intern('like')
+    assert like == ScAddr(300)
+    assert interner.intern('like') == like
+    assert len(writes) == 1
+
+    interner.intern('dislike')
+    assert interner.snapshot() == {'cached': 1, 'hits': 1, 'found': 0, 'created': 2}
+
+    monkeypatch.setattr('service.utils.action_reaper.interned_links', interner)
+    reaper = ActionReaper(max_age=0, batch_size=10, interval=1, temporary_arguments=['action_rate_message'])
+    reaper.track('action_rate_message', ScAddr(10), [interner.intern('dislike'), ScAddr(11)])
+    assert reaper._queue[0][2] == (ScAddr(11),)
+
+    # Вытесненная из кэша общая sc-link распознаётся по классу в sc-памяти перед удалением
+    reaper.track('action_rate_message', ScAddr(12), [like, ScAddr(13)])
+    erased = []
+    monkeypatch.setattr(client, 'is_connected', lambda: True)
+    monkeypatch.setattr(client, 'template_search', lambda template, params=None: (
+        [FakeResult(_link=like)] if template.triple_list[0].source.value is interned_class else []))
+    monkeypatch.setattr(client, 'erase_elements', lambda *elements: erased.extend(elements) or True)
+    reaper.reap()
+    assert like not in erased
+    assert ScAddr(11) in erased and ScAddr(13) in erased
+
+
+def test_concurrent_misses_create_one_link(monkeypatch):
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: ScAddr(5))
+    monkeypatch.setattr(client, 'search_links_by_contents', lambda *contents: [[]])
+    release = threading.Event()
+    writes = []
+
+    def generate_elements(construction):
+        writes.append(construction)
+        release.wait(5)
+        return [ScAddr(300 + len(writes)), ScAddr(0)]
+
+    monkeypatch.setattr(client, 'generate_elements', generate_elements)
+    interner = LinkInterner(capacity=4)
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(interner.intern, 'user@example.by') for _ in range(4)]
+        assert not release.wait(0.2)
+        release.set()
+        assert {future.result(timeout=5) for future in futures} == {ScAddr(301)}
+    assert len(writes) == 1
+
+    for content in ('a', 'b', 'c', 'd'):
+        interner.intern(content)
+    assert not interner.is_interned(ScAddr(301))
+
+
+def test_interned_link_is_found_among_all_candidates(monkeypatch):
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: ScAddr(5))
+    # Двенадцать чужих sc-link с тем же текстом, общая — последняя
+    candidates = [ScAddr(value) for value in range(200, 213)]
+    monkeypatch.setattr(client, 'search_links_by_contents', lambda *contents: [candidates])
+    searches = []
+    monkeypatch.setattr(client, 'template_search', lambda template, params=None: searches.append(template) or [
+        FakeResult(_link=ScAddr(212)), FakeResult(_link=ScAddr(900))])
+    monkeypatch.setattr(client, 'generate_elements', lambda construction: pytest.fail('link must be reused'))
+
+    interner = LinkInterner(capacity=4)
+    assert interner.intern('text/plain') == ScAddr(212)
+    assert len(searches) == 1
+    assert interner.snapshot()['found'] == 1
@@ -0,0 +1,51 @@
+from collections import Counter
+
+from service.utils.fake_sc import ScMemory
+from service.utils.fake_sc.memory import MEMBERSHIP_ARC
+from service.utils.fake_sc.seed import seed_forum
+from service.utils.load_test import compare, percentile, summarize
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([0.3], 99) == 0.3
+    assert percentile([], 50) == 0.0
+
+
+def test_summary_counts_server_errors_and_sc_calls_per_request():
+    summary = summarize([0.1, 0.2, 0.3, 0.4], Counter({200: 2, 500: 1, 'ConnectionError': 1}), 2.0,
+                        {'search_by_template': 8, 'get_link_content': 4})
+
+    assert summary['requests'] == 4
+    assert summary['errors'] == 2
+    assert summary['throughput_rps'] == 2.0
+    assert summary['sc_calls_per_request'] == 3.0
+    assert summary['sc_calls_by_method'] == {'get_link_content': 1.0, 'search_by_template': 2.0}
+    assert summary['p50'] == 0.2
+
+
+def test_seeded_forum_is_deterministic():
+    first, second = ScMemory(), ScMemory()
+
+    data = seed_forum(first, topics=5, messages=30, users=4, seed=7)
+    seed_forum(second, topics=5, messages=30, users=4, seed=7)
+
+    assert len(data['topics']) == 5
+    assert data['users'][0] == 'user00000@example.by'
+    assert first.snapshot() == second.snapshot()
+    topics = first.find_keynode('concept_topic')
+    assert sum(first.type_of(arc) == MEMBERSHIP_ARC for arc in first.outgoing(topics)) == 5
+
+
+def test_compare_reports_common_endpoints():
+    run = {'endpoints': {'forum': {'p95': 0.5, 'sc_calls_per_request': 100.0}}}
+    baseline = {'endpoints': {'forum': {'p95': 1.0, 'sc_calls_per_request': 400.0}, 'news': {}}}
+
+    lines = compare(run, baseline)
+
+    assert len(lines) == 2
+    assert lines[1].startswith('forum')
@@ -0,0 +1,30 @@
+from service import create_app
+from service.utils.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter('sc_calls_total', 'Calls', ('method',))
+    latency = registry.histogram('agent_seconds', 'Latency', ('action',), buckets=(0.1, 1))
+    calls.inc('get_link_content')
+    calls.inc('get_link_content')
+    latency.observe(0.05, 'action_search')
+    latency.observe(0.5, 'action_search')
+
+    text = registry.render()
+    assert '# TYPE sc_calls_total counter' in text
+    assert 'sc_calls_total{method="get_link_content"} 2' in text
+    assert 'agent_seconds_bucket{action="action_search",le="0.1"} 1' in text
+    assert 'agent_seconds_bucket{action="action_search",le="1.0"} 2' in text
+    assert 'agent_seconds_bucket{action="action_search",le="+Inf"} 2' in text
+    assert 'agent_seconds_count{action="action_search"} 2' in text
+
+
+def test_metrics_endpoint_reports_request_latency():
+    client = create_app('config.TestingConfig').test_client()
+    client.get('/health')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert 'http_request_seconds_count{endpoint="main.health",method="GET"}' in response.get_data(as_text=True)
@@ -0,0 +1,66 @@
+import pytest
+
+from config import Config, agents_to_load
+from service.agents.abstract.forum_agent import ForumStatus
+from service.agents.mock import OstisAuthAgent, OstisRegAgent, OstisTestAgent, OstisVerificationAgent, store
+
+
+@pytest.fixture
+def mock_store():
+    store.reset()
+    yield store
+    store.reset()
+
+
+def test_registration_verification_and_test_flow(mock_store):
+    assert OstisRegAgent().reg_agent('new@example.by', 'pw', 'pw', 'specialist', full_name='Иванов')['status'] == 'Valid'
+    assert OstisAuthAgent().auth_agent('new@example.by', 'pw')['status'] == 'Invalid'
+    assert OstisAuthAgent().find_user('new@example.by') is None
+
+    verification = OstisVerificationAgent()
+    verification.send_token('new@example.by')
+    assert verification.verify_token('new@example.by', mock_store.tokens['new@example.by'])['status'] == 'EmailVerified'
+    assert OstisAuthAgent().auth_agent('new@example.by', 'pw')['status'] == 'Valid'
+    assert OstisAuthAgent().find_user('new@example.by').username == 'new@example.by'
+
+    agent = OstisTestAgent()
+    question = agent.get_next_question('new@example.by')
+    answers = agent.get_answers_for_question(question['question_addr'])['answers']
+    correct = mock_store.questions[question['question_addr'].value]['correct']
+    agent.save_answer('new@example.by', next(a['answer_addr'] for a in answers if a['answer_addr'].value == correct))
+    assert agent.check_answer('new@example.by', question['question_addr'])['is_correct'] is True
+
+
+def test_forum_pages_run_on_mock_agents(mock_store, monkeypatch, tmp_path):
+    from service.utils import recommendation_feedback_db, topic_tags_db, view_history_db
+    for module in (recommendation_feedback_db, topic_tags_db, view_history_db):
+        monkeypatch.setattr(module, 'DB_PATH', tmp_path / f'{module.__name__.rsplit(".", 1)[-1]}.db')
+    monkeypatch.setattr(Config, 'AGENTS_TO_LOAD', agents_to_load('service.agents.mock'))
+    data = mock_store.populate(topics=3, messages=6, users=2)
+    from service import create_app
+
+    app = create_app()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = data['users'][0]
+        session['_fresh'] = True
+
+    topic = data['topics'][0]
+    assert client.get(f'/forum/topic/{topic}').status_code == 200
+    client.post(f'/forum/topic/{topic}/add_message', data={'message': 'Новый ответ'})
+    messages = app.config['agents']['forum_agent'].get_topic_messages(topic)
+    assert messages[-1]['content'] == 'Новый ответ'
+
+    response = client.post(f"/forum/topic/{topic}/message/{messages[-1]['addr']}/rate", data={'rating_type': 'like'})
+    assert response.get_json() == {'status': 'ok'}
+    assert mock_store.messages[messages[-1]['addr']]['likes'] == 1
+    assert app.config['agents']['forum_agent'].delete_message(messages[-1]['addr'])['status'] == ForumStatus.VALID
+
+    # Без sc-сервера приложение на агентах в памяти исправно
+    health = client.get('/health')
+    assert health.status_code == 200
+    assert health.get_json()['sc_server'] == {'connected': None, 'applicable': False}
+
+    # Просмотр топика записывается отложенно: дожидаемся его до восстановления DB_PATH
+    from service.utils.scheduler import scheduler
+    assert scheduler.drain(timeout=5)
@@ -0,0 +1,47 @@
+import sc_client.client as client
+from sc_client.constants import sc_types
+from sc_client.models import ScAddr, ScLinkContent, ScLinkContentType
+
+from service.utils.keynode_registry import keynodes
+from service.utils.ostis_utils import read_attributes
+
+
+class FakeResult:
+    def __init__(self, **aliases):
+        self.aliases = aliases
+
+    def get(self, alias):
+        return self.aliases[alias]
+
+
+def test_attribute_matrix_is_read_with_one_search_per_node(monkeypatch):
+    relations = {'nrel_note_text': ScAddr(1), 'nrel_note_created': ScAddr(2), 'nrel_author': ScAddr(3)}
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: relations[idtf])
+    # Узел 10: текст и дата (и лишний атрибут nrel_author), узел 20: только текст
+    stored = {
+        10: [(1, 101), (2, 102), (3, 103), (1, 104)],
+        20: [(1, 201)],
+    }
+    calls = []
+
+    def search_by_template(template, params=None):
+        calls.append('search')
+        # Отношение ищется любого типа узла: keynode может быть создан как NODE_CONST_CLASS
+        assert template.triple_list[1].source.value == sc_types.NODE_VAR
+        node = template.triple_list[0].source.value
+        return [FakeResult(_value=ScAddr(link), _relation=ScAddr(rel)) for rel, link in stored[node.value]]
+
+    def get_link_content(*links):
+        calls.append('content')
+        return [ScLinkContent(f"v{link.value}", ScLinkContentType.STRING) for link in links]
+
+    monkeypatch.setattr(client, 'search_by_template', search_by_template)
+    monkeypatch.setattr(client, 'get_link_content', get_link_content)
+
+    rows = read_attributes([ScAddr(10), ScAddr(20)], ['nrel_note_text', 'nrel_note_created'])
+
+    assert rows == [
+        {'nrel_note_text': 'v101', 'nrel_note_created': 'v102'},
+        {'nrel_note_text': 'v201', 'nrel_note_created': ''},
+    ]
+    assert calls == ['search', 'search', 'content']
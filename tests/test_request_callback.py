@@ -0,0 +1,49 @@
+import sc_client.client as client
+from sc_client.models import ScAddr, ScLinkContent, ScLinkContentType
+
+import service.agents.ostis as ostis
+from service.utils.action_completion import completions
+from service.utils.keynode_registry import keynodes
+
+
+class FakeResult:
+    def __init__(self, **aliases):
+        self.aliases = aliases
+
+    def get(self, alias):
+        return self.aliases[alias]
+
+
+def test_request_result_is_read_in_four_round_trips(monkeypatch):
+    addrs = {}
+    monkeypatch.setattr(keynodes, 'resolve', lambda idtf, sc_type=None: addrs.setdefault(idtf, ScAddr(len(addrs) + 1)))
+    links = {100 + i: f"text {i}" for i in range(60)}
+    calls = []
+
+    def template_search(template, params=None):
+        calls.append('search')
+        aliases = {value.alias for triple in template.triple_list
+                   for value in (triple.source, triple.connector, triple.target)}
+        if '_link_body' in aliases:
+            return [FakeResult(_src_link=ScAddr(100), _link_body=ScAddr(101))]
+        if '_related_article' in aliases:
+            return [FakeResult(_related_article=ScAddr(500 + i), _main_idtf=ScAddr(102 + i)) for i in range(20)]
+        return [FakeResult(_related_term=ScAddr(600), _main_idtf=ScAddr(130))]
+
+    def get_link_content(*link_addrs):
+        calls.append('content')
+        return [ScLinkContent(links[addr.value], ScLinkContentType.STRING) for addr in link_addrs]
+
+    monkeypatch.setattr(client, 'search_by_template', template_search)
+    monkeypatch.setattr(client, 'get_link_content', get_link_content)
+
+    action = ScAddr(900)
+    future = completions.register(action)
+    ostis.call_back_request(action, ScAddr(901), keynodes['action_finished_successfully'])
+
+    response = future.result(timeout=1)['message'][0]
+    assert response.term == 'text 0'
+    assert response.content == 'text 1'
+    assert response.related_articles == [f"text {i}" for i in range(2, 22)]
+    assert response.related_concepts == ['text 30']
+    assert len(calls) == 4
@@ -0,0 +1,56 @@
+from flask import Flask
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand
+from sc_client.models import ScAddr, ScConstruction, ScTemplate
+
+from service.utils.metrics import request_memo_reads_total
+from service.utils.request_memo import MEMO_HEADER, RequestMemo
+
+
+def test_identical_reads_are_served_once_per_request():
+    calls = []
+
+    def call(name, command, *args):
+        calls.append(name)
+        return [len(calls)]
+
+    memo = RequestMemo()
+    template = ScTemplate()
+    template.triple(ScAddr(5), sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> '_user')
+    search = ('search_by_template', ClientCommand.SEARCH_BY_TEMPLATE, (template, None), call)
+    read = ('get_link_content', ClientCommand.GET_LINK_CONTENT, (ScAddr(7),), call)
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        assert memo.execute(*search) == memo.execute(*search) == [1]
+        memo.execute(*search)[0] = 'changed'
+        assert memo.execute(*read) == memo.execute(*read) == [2]
+        assert calls == ['search_by_template', 'get_link_content']
+
+        # Запись очищает память запроса
+        memo.execute('generate_elements', ClientCommand.GENERATE_ELEMENTS, (ScConstruction(),), call)
+        assert memo.execute(*search) == [4]
+
+    with app.test_request_context():
+        assert memo.execute(*search) == [5]
+    # Вне запроса чтения не запоминаются
+    assert memo.execute(*search) == [6] and memo.execute(*search) == [7]
+
+
+def test_hits_are_reported_in_response_header(monkeypatch):
+    from service.utils.sc_pool import client
+
+    monkeypatch.setattr(client, 'memo', None)
+    monkeypatch.setattr(client, '_call', lambda name, command, *args: [])
+    app = Flask(__name__)
+    RequestMemo().init_app(app)
+
+    @app.route('/read')
+    def read():
+        client.get_link_content(ScAddr(7))
+        client.get_link_content(ScAddr(7))
+        return 'ok'
+
+    hits = request_memo_reads_total.value('hit')
+    assert app.test_client().get('/read').headers[MEMO_HEADER] == 'hits=1, misses=1'
+    assert request_memo_reads_total.value('hit') == hits + 1
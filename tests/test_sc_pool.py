@@ -0,0 +1,104 @@
+import json
+import threading
+
+import pytest
+from sc_client.constants.common import ClientCommand, ScEventType
+from sc_client.models import ScAddr, ScEventSubscription, ScEventSubscriptionParams
+
+from service.utils.sc_pool import PooledClient, ScConnection, ScConnectionPool
+
+
+class FakeSocket:
+    """Отвечает на каждую команду синхронно, выдавая свой номер подписки"""
+
+    def __init__(self, connection, subscription_id):
+        self.connection = connection
+        self.subscription_id = subscription_id
+        self.sent = []
+
+    def send(self, data):
+        request = json.loads(data)
+        self.sent.append(request)
+        if request['payload'].get('create'):
+            payload = [self.subscription_id]
+        else:
+            payload = []
+        self.connection._on_message(self, json.dumps({
+            'id': request['id'], 'event': False, 'status': True, 'errors': [], 'payload': payload,
+        }))
+
+
+def make_pool(size):
+    pool = ScConnectionPool('ws://test', size, checkout_timeout=1, health_check_interval=60)
+    for index in range(size):
+        connection = ScConnection('ws://test', str(index))
+        connection._ws = FakeSocket(connection, subscription_id=7)
+        connection._opened.set()
+        pool._connections.append(connection)
+        pool._idle.put(connection)
+    pool._started = True
+    return pool
+
+
+def test_events_are_routed_to_owner_connection():
+    pool = make_pool(2)
+    client = PooledClient(pool)
+    received = threading.Event()
+    params = ScEventSubscriptionParams(ScAddr(10), ScEventType.AFTER_GENERATE_INCOMING_ARC, lambda *_: received.set())
+
+    subscription = client.events_create(params)[0]
+    owner, other = pool._connections if pool._connections[0]._subscriptions else pool._connections[::-1]
+
+    other._on_message(other._ws, json.dumps({'id': 7, 'event': True, 'payload': [10, 11, 12]}))
+    assert not received.wait(0.2)
+    owner._on_message(owner._ws, json.dumps({'id': 7, 'event': True, 'payload': [10, 11, 12]}))
+    assert received.wait(1)
+
+    assert client.events_destroy(subscription) is True
+    assert owner._ws.sent[-1]['payload'] == {'delete': [7]}
+    assert not other._ws.sent
+    assert not owner._subscriptions
+
+
+def test_client_falls_back_to_global_session(monkeypatch):
+    import sc_client.client as sc_client
+
+    monkeypatch.setattr(sc_client, 'is_connected', lambda: False)
+    monkeypatch.setattr(sc_client, 'get_link_content', lambda *addrs: ['global'])
+    client = PooledClient(ScConnectionPool('ws://test', 4, 1, 60))
+
+    assert client.get_link_content(ScAddr(1)) == ['global']
+    assert not client.pool.started
+
+
+class SilentSocket:
+    """Не отвечает: ответ приходит позже, когда его уже никто не ждёт"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+def test_late_responses_are_dropped_and_events_share_workers():
+    connection = ScConnection('ws://test', 'late', event_workers=2)
+    connection._ws = SilentSocket()
+    connection._opened.set()
+
+    with pytest.raises(ConnectionAbortedError):
+        connection.execute(ClientCommand.GET_LINK_CONTENT, ScAddr(5), timeout=0.1)
+    late = connection._ws.sent[-1]['id']
+    connection._on_message(connection._ws, json.dumps({
+        'id': late, 'event': False, 'status': True, 'errors': [], 'payload': [],
+    }))
+    assert not connection._responses and not connection._pending
+
+    threads = set()
+    connection._subscriptions[3] = ScEventSubscription(
+        3, ScEventType.AFTER_GENERATE_INCOMING_ARC, lambda *_: threads.add(threading.current_thread().name))
+    for _ in range(20):
+        connection._on_message(connection._ws, json.dumps({'id': 3, 'event': True, 'payload': [1, 2, 3]}))
+    connection._events.shutdown(wait=True)
+    assert 1 <= len(threads) <= 2
+    assert all(name.startswith('sc-events-late') for name in threads)
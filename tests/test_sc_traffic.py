@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand, ScEventType
+from sc_client.models import ScAddr, ScEventSubscription, ScEventSubscriptionParams, ScLinkContent, ScLinkContentType, ScTemplate, ScTemplateResult
+
+from service.utils.sc_traffic import ReplayMissError, TrafficRecorder, TrafficReplayer, summarize
+
+
+def template(addr):
+    result = ScTemplate()
+    result.triple(addr, sc_types.EDGE_ACCESS_VAR_POS_PERM, sc_types.NODE_VAR >> '_x')
+    return result
+
+
+def test_recorded_traffic_is_replayed(tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    recorder = TrafficRecorder(path)
+
+    def send(name, command, *args):
+        if command == ClientCommand.SEARCH_BY_TEMPLATE:
+            return [ScTemplateResult([ScAddr(1), ScAddr(2), ScAddr(3)], {'_x': 2})]
+        return [ScLinkContent('текст', ScLinkContentType.STRING)]
+
+    def subscribe(*params):
+        params[0].callback(ScAddr(7), ScAddr(8), ScAddr(9))
+        return [ScEventSubscription(1, params[0].event_type, params[0].callback)]
+
+    recorder.execute('search_by_template', ClientCommand.SEARCH_BY_TEMPLATE, (template(ScAddr(1)), None), send)
+    recorder.execute('get_link_content', ClientCommand.GET_LINK_CONTENT, (ScAddr(3),), send)
+    recorder.subscribe((ScEventSubscriptionParams(ScAddr(7), ScEventType.AFTER_GENERATE_OUTGOING_ARC, lambda *e: None),), subscribe)
+    recorder.close()
+    assert summarize(path)['search_by_template']['calls'] == 1
+
+    replayer = TrafficReplayer(path)
+    found = replayer.execute('search_by_template', ClientCommand.SEARCH_BY_TEMPLATE, (template(ScAddr(1)), None), None)
+    assert found[0].get('_x') == ScAddr(3)
+    content = replayer.execute('get_link_content', ClientCommand.GET_LINK_CONTENT, (ScAddr(3),), None)
+    assert content[0].data == 'текст'
+    with pytest.raises(ReplayMissError):
+        replayer.execute('search_by_template', ClientCommand.SEARCH_BY_TEMPLATE, (template(ScAddr(2)), None), None)
+
+    delivered = threading.Event()
+    events = []
+
+    def callback(*elements):
+        events.append(elements)
+        delivered.set()
+
+    replayer.subscribe((ScEventSubscriptionParams(ScAddr(7), ScEventType.AFTER_GENERATE_OUTGOING_ARC, callback),), None)
+    assert delivered.wait(1)
+    assert events == [(ScAddr(7), ScAddr(8), ScAddr(9))]
+    assert replayer.snapshot()['served'] == 2
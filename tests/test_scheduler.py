@@ -0,0 +1,42 @@
+import threading
+
+from flask import Flask, current_app
+
+from service.utils.scheduler import HIGH, LOW, PriorityScheduler, SchedulerFullError
+
+
+def test_low_priority_backlog_does_not_block_high_priority():
+    scheduler = PriorityScheduler(high_workers=2, low_workers=1, low_queue_size=2)
+    started, release = threading.Event(), threading.Event()
+    blocker = scheduler.defer(lambda: started.set() or release.wait(5))
+    assert started.wait(5)
+    queued = [scheduler.defer(lambda value: value, value) for value in (1, 2)]
+
+    # Очередь low занята и заполнена: следующая задача отбрасывается, а не выполняется в вызывающем потоке
+    ran = []
+    overflow = scheduler.defer(lambda: ran.append('overflow'))
+    assert isinstance(overflow.exception(timeout=0), SchedulerFullError)
+
+    assert scheduler.map(lambda value: value * 2, [1, 2, 3]) == [2, 4, 6]
+    assert not blocker.done()
+
+    release.set()
+    assert scheduler.drain(timeout=5)
+    assert [future.result() for future in queued] == [1, 2]
+    snapshot = scheduler.snapshot()
+    assert snapshot[LOW]['dropped'] == 1
+    assert snapshot[LOW]['completed'] == 3
+    assert ran == []
+    assert snapshot[HIGH]['completed'] == 3
+
+
+def test_task_runs_in_submitting_app_context_and_errors_are_kept():
+    scheduler = PriorityScheduler(high_workers=1, low_workers=1, low_queue_size=10)
+    app = Flask('scheduled')
+    with app.app_context():
+        future = scheduler.submit(HIGH, lambda: current_app.name)
+    assert future.result(timeout=5) == 'scheduled'
+
+    failed = scheduler.defer(lambda: 1 / 0)
+    assert isinstance(failed.exception(timeout=5), ZeroDivisionError)
+    assert scheduler.snapshot()[LOW]['failed'] == 1
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sc_client.models import ScAddr
+
+from service.utils.ostis_utils import ActionNode
+from service.utils.single_flight import SingleFlight
+
+
+def callback():
+    pass
+
+
+def test_key_uses_exact_argument_values():
+    flights = SingleFlight(['action_search'])
+    key = flights.key('action_search', [ScAddr(1), 'трудовой договор'], callback)
+    assert key == flights.key('action_search', [ScAddr(1), 'трудовой договор'], callback)
+    assert key != flights.key('action_search', [ScAddr(1), '  Трудовой   Договор '], callback)
+    assert flights.key('action_add_event', ['x'], callback) is None
+    assert flights.key('action_search', [ActionNode()], callback) is None
+
+
+class ObservedFlight(SingleFlight):
+    def __init__(self, actions, followers: int):
+        super().__init__(actions)
+        self.followers = followers
+        self.joined = threading.Event()
+
+    def _join(self, key):
+        future, leader = super()._join(key)
+        if self.snapshot()['shared'] >= self.followers:
+            self.joined.set()
+        return future, leader
+
+
+def test_concurrent_calls_share_one_result():
+    flights = ObservedFlight(['action_user_request'], followers=3)
+    key = flights.key('action_user_request', ['договор'], callback)
+    release = threading.Event()
+    calls = []
+
+    def run():
+        calls.append(1)
+        release.wait(5)
+        return 'result'
+
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(flights.do, key, run) for _ in range(4)]
+        assert flights.joined.wait(5)
+        release.set()
+        assert [future.result(timeout=1) for future in futures] == ['result'] * 4
+
+    assert len(calls) == 1
+    assert flights.snapshot()['in_flight'] == 0
+    assert flights.do(key, lambda: 'again') == 'again'
@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from service.agents.abstract.forum_agent import ForumStatus
+from service.agents.abstract.reg_agent import UserType
+from service.agents.mock import OstisForumAgent, store
+from service.utils import topic_catalog as catalog_module
+from service.utils import topic_tags_db
+from service.utils.author_display import AuthorDisplayCache
+from service.utils.scheduler import scheduler
+from service.utils.topic_catalog import CatalogForumAgent, TopicCatalog
+
+
+class CountingForumAgent(OstisForumAgent):
+    def __init__(self):
+        self.loads = 0
+
+    def get_topic_messages(self, topic_addr) -> list:
+        self.loads += 1
+        return super().get_topic_messages(topic_addr)
+
+
+@pytest.fixture
+def catalog(monkeypatch, tmp_path):
+    monkeypatch.setattr(topic_tags_db, 'DB_PATH', tmp_path / 'topic_tags.db')
+    topic_tags_db.init_topic_tags_db()
+    store.reset()
+    catalog = TopicCatalog(messages_in_text=2)
+    catalog.forum = CountingForumAgent()
+    yield catalog
+    assert scheduler.drain(timeout=5)
+    store.reset()
+
+
+def test_catalog_is_built_once_and_updated_per_topic(catalog):
+    data = store.populate(topics=4, messages=12, users=2)
+    topics = {topic['addr']: topic for topic in catalog.topics()}
+    assert set(topics) == set(data['topics'])
+    assert catalog.forum.loads == 4
+
+    first = data['topics'][0]
+    contents = [store.messages[addr]['content'] for addr in store.topic_messages[first]]
+    assert topics[first]['messages_text'] == ' '.join(contents[:2])
+    assert topics[first]['message_count'] == len(contents)
+    assert topics[first]['tag_keys'] == [tag['key'] for tag in topics[first]['tags']]
+
+    catalog.topics()
+    assert catalog.forum.loads == 4
+
+    agent = CatalogForumAgent(catalog.forum, name='forum_agent', catalog=catalog)
+    author = data['users'][0]
+    assert agent.add_message(author, first, 'Новый ответ')['status'] == ForumStatus.VALID
+    assert scheduler.drain(timeout=5)
+    assert catalog.get(first)['message_count'] == len(contents) + 1
+    assert catalog.get(first)['last_activity'] is not None
+    assert catalog.forum.loads == 5
+
+    response = agent.add_topic(author, 'Аренда жилья', 'Договор найма квартиры')
+    assert response['status'] == ForumStatus.VALID
+    assert catalog.get(response['addr'])['title'] == 'Аренда жилья'
+    assert catalog.forum.loads == 6
+
+    message = store.topic_messages[first][0]
+    assert catalog.topic_of(message) == first
+    agent.delete_message(message)
+    assert scheduler.drain(timeout=5)
+    assert catalog.get(first)['message_count'] == len(contents)
+
+
+def test_topic_page_messages_update_catalog_without_reload(catalog):
+    data = store.populate(topics=2, messages=4, users=1)
+    topic = data['topics'][0]
+    before = catalog.get(topic)
+    loads = catalog.forum.loads
+
+    messages = catalog.forum.get_topic_messages(topic)
+    details = catalog.forum.get_topic_details(topic)
+    assert catalog.update_messages(topic, details, messages)['last_activity'] == before['last_activity']
+
+    store.add_message(data['users'][0], topic, 'Ответ из другого процесса')
+    messages = catalog.forum.get_topic_messages(topic)
+    entry = catalog.update_messages(topic, details, messages)
+    assert entry['message_count'] == before['message_count'] + 1
+    assert entry['last_activity'] is not None
+    assert catalog.forum.loads == loads + 2
+
+
+def test_unknown_topic_is_not_catalogued(catalog):
+    data = store.populate(topics=2, messages=4, users=1)
+    catalog.topics()
+    missing = max(store.messages) + 1000
+
+    details = catalog.forum.get_topic_details(missing)
+    assert catalog.update_messages(missing, details, []) is None
+    assert catalog.get(missing) is None
+    assert scheduler.drain(timeout=5)
+    assert len(catalog.topics()) == len(data['topics'])
+    assert topic_tags_db.get_topic_tags(missing) == []
+
+
+def test_author_invalidation_refreshes_author_topics(catalog):
+    displays = AuthorDisplayCache(ttl=60, maxsize=8)
+    displays.subscribe(catalog.authors_changed)
+    store.populate(topics=3, messages=3, users=2, specialists=0)
+    topic = catalog.topics()[0]
+    author = topic['author_email']
+    assert topic['author'] == store.format_user_display(author)
+
+    store.users[author]['user_type'] = UserType.SPECIALIST
+    displays.invalidate(author)
+    assert scheduler.drain(timeout=5)
+    assert catalog.get(topic['addr'])['author'] == store.format_user_display(author)
+    assert 'Специалист' in catalog.get(topic['addr'])['author']
+
+
+def test_messages_keep_forum_order(catalog):
+    data = store.populate(topics=1, messages=3, users=1)
+    topic = data['topics'][0]
+    messages = list(reversed(catalog.forum.get_topic_messages(topic)))
+    entry, message_addrs = catalog.entry(topic, catalog.forum.get_topic_details(topic), messages)
+    assert message_addrs == tuple(message['addr'] for message in messages)
+    assert entry['messages_text'] == ' '.join(message['content'] for message in messages[:2])
+
+
+def test_startup_build_waits_for_sc_connection(catalog, monkeypatch):
+    store.populate(topics=2, messages=2, users=1)
+    connected = threading.Event()
+    monkeypatch.setattr(catalog_module, 'uses_sc_server', lambda: True)
+    monkeypatch.setattr(catalog_module, 'is_connected', connected.is_set)
+    monkeypatch.setattr(catalog_module, 'RETRY_DELAY', 0.01)
+    catalog._app = Flask('catalog')
+
+    thread = threading.Thread(target=catalog._build_on_startup, daemon=True)
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive() and catalog.forum.loads == 0
+
+    connected.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert catalog.snapshot()['built'] and catalog.forum.loads == 2
@@ -0,0 +1,59 @@
+from sc_client.constants import sc_types
+from sc_client.constants.common import ClientCommand
+from sc_client.models import ScConstruction, ScIdtfResolveParams, ScLinkContent, ScLinkContentType
+
+from service.utils import user_directory as directory_module
+from service.utils.fake_sc import FakeScServer
+from service.utils.sc_pool import ScConnection
+from service.utils.user_directory import UserDirectory
+
+
+def add_user(connection, user_class, relation, login):
+    construction = ScConstruction()
+    construction.generate_node(sc_types.NODE_CONST, '_user')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, user_class, '_user')
+    construction.generate_link(sc_types.LINK_CONST, ScLinkContent(login, ScLinkContentType.STRING), '_login')
+    construction.generate_connector(sc_types.EDGE_D_COMMON_CONST, '_user', '_login', '_pair')
+    construction.generate_connector(sc_types.EDGE_ACCESS_CONST_POS_PERM, relation, '_pair')
+    return connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)[0]
+
+
+def test_logins_resolve_by_link_content_and_are_cached(monkeypatch):
+    with FakeScServer() as server:
+        connection = ScConnection(server.url, 'test')
+        assert connection.connect(5)
+        idtfs = ('concept_user', 'concept_verified_user', 'nrel_system_identifier')
+        params = [ScIdtfResolveParams(idtf=idtf, type=sc_types.NODE_CONST_CLASS) for idtf in idtfs]
+        monkeypatch.setattr(directory_module, 'keynodes',
+                            dict(zip(idtfs, connection.execute(ClientCommand.SEARCH_KEYNODES, *params))))
+        calls = []
+
+        def execute(command):
+            return lambda *args: calls.append(command) or connection.execute(command, *args)
+
+        monkeypatch.setattr(directory_module.client, 'search_links_by_contents',
+                            execute(ClientCommand.SEARCH_LINKS_BY_CONTENT))
+        monkeypatch.setattr(directory_module.client, 'search_by_template',
+                            lambda template, params=None: execute(ClientCommand.SEARCH_BY_TEMPLATE)(template, params))
+
+        keynodes = directory_module.keynodes
+        users = [add_user(connection, keynodes['concept_user'], keynodes['nrel_system_identifier'], f'u{i}@example.by')
+                 for i in range(20)]
+        # Тот же текст в sc-link, которая не является идентификатором пользователя
+        construction = ScConstruction()
+        construction.generate_link(sc_types.LINK_CONST, ScLinkContent('u7@example.by', ScLinkContentType.STRING))
+        connection.execute(ClientCommand.GENERATE_ELEMENTS, construction)
+
+        directory = UserDirectory(capacity=2)
+        assert directory.resolve('u7@example.by') == users[7]
+        assert len(calls) <= 3
+        assert directory.resolve('u7@example.by', 'concept_verified_user') is None
+
+        calls.clear()
+        resolved = directory.resolve_logins(['u7@example.by', 'u3@example.by', 'nobody@example.by'])
+        assert resolved == {'u7@example.by': users[7], 'u3@example.by': users[3], 'nobody@example.by': None}
+        assert calls.count(ClientCommand.SEARCH_LINKS_BY_CONTENT) == 1
+
+        assert directory.invalidate('u3@example.by') == 1
+        assert directory.snapshot()['cached'] == 1
+        connection.close()
@@ -0,0 +1,59 @@
+from flask import Flask, session
+
+from service.models import User
+from service.utils import user_session
+from service.utils.metrics import user_loader_requests_total
+from service.utils.user_session import SESSION_KEY, UserLoader
+
+
+def test_loader_uses_cache_then_session_snapshot_then_sc(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_session.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(user_session.time, 'time', lambda: now[0])
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    lookups = []
+
+    def find_user(username):
+        lookups.append(username)
+        return User(sc_addr='42', username=username)
+
+    loader = UserLoader(cache_ttl=10, cache_size=8, revalidate_after=60)
+    sc_before = user_loader_requests_total.value('sc')
+    with app.test_request_context():
+        assert loader.load('a@example.by', find_user).sc_addr == '42'
+        assert session[SESSION_KEY]['sc_addr'] == '42'
+        loader.load('a@example.by', find_user)
+
+        # Кэш процесса истёк, снимок в сессии ещё действителен
+        now[0] += 30
+        user = loader.load('a@example.by', find_user)
+        assert user.sc_addr == '42'
+        assert lookups == ['a@example.by']
+
+        # Снимок устарел: пользователь снова проверяется в sc-памяти
+        now[0] += 60
+        loader.load('a@example.by', find_user)
+        assert lookups == ['a@example.by', 'a@example.by']
+        assert user_loader_requests_total.value('sc') - sc_before == 2
+
+        loader.forget('a@example.by')
+        now[0] += 61
+        assert loader.load('a@example.by', lambda username: None) is None
+        assert SESSION_KEY not in session
+
+
+def test_snapshot_checked_in_the_future_is_revalidated(monkeypatch):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    lookups = []
+
+    def find_user(username):
+        lookups.append(username)
+        return User(sc_addr='42', username=username)
+
+    loader = UserLoader(cache_ttl=10, cache_size=8, revalidate_after=60)
+    with app.test_request_context():
+        session[SESSION_KEY] = {'sc_addr': '7', 'username': 'a@example.by', 'checked': user_session.time.time() + 10 ** 9}
+        assert loader.load('a@example.by', find_user).sc_addr == '42'
+        assert lookups == ['a@example.by']